@@ -9,15 +9,31 @@ Prerequisites:
     - Python 3.x with openpyxl and pywin32
     - Excel 2016 or later
     - "Trust access to the VBA project object model" enabled in Excel Trust Center
+    (--offline-vba needs only Python and openpyxl; see its help text for what it leaves out)
 """
 import argparse
 import os
 import sys
 import time
+from contextlib import nullcontext
 from datetime import datetime
 from src.config import WorkbookConfig
 from src.phase1_structure import build_structure
-from src.vba_injection import inject_vba
+from src.parallel_build import build_structure_parallel
+from src.profiler import BuildProfiler
+from src.vba_injection import inject_vba, inject_vba_offline
+from src.xlsx import fill_cached_values, share_formulas
+
+
+def write_profile(profiler, output_dir, year):
+    """Write build_profile_<year>.json and .trace.json next to the workbook."""
+    if profiler is None:
+        return
+    json_path = os.path.join(output_dir, f"build_profile_{year}.json")
+    trace_path = os.path.join(output_dir, f"build_profile_{year}.trace.json")
+    profiler.write(json_path, trace_path)
+    print(f"\nProfile written: {json_path}")
+    print(f"Chrome trace:    {trace_path} (open in chrome://tracing or ui.perfetto.dev)")
 
 
 def main():
@@ -40,6 +56,34 @@ def main():
         "--skip-vba", action="store_true",
         help="Skip VBA injection (produces .xlsx without macros)"
     )
+    parser.add_argument(
+        "--offline-vba", action="store_true",
+        help="Write the VBA project directly instead of through Excel (no UserForms or Control buttons)"
+    )
+    parser.add_argument(
+        "--lookup-key", action="store_true",
+        help="Add a Key column to tblDaily and use exact-match lookups on ward sheets"
+    )
+    parser.add_argument(
+        "--cache-dir", type=str, default=None,
+        help="Reuse unchanged sheets from this build cache directory (created if missing)"
+    )
+    parser.add_argument(
+        "--jobs", type=int, default=1,
+        help="Worker processes for Phase 1 (default: 1 = sequential, 0 = all cores)"
+    )
+    parser.add_argument(
+        "--cached-values", action="store_true",
+        help="Compute every formula in Python and store the results, so Excel opens without recalculating"
+    )
+    parser.add_argument(
+        "--share-formulas", action="store_true",
+        help="Store repeated formulas as shared formulas after Phase 1 (smaller file)"
+    )
+    parser.add_argument(
+        "--profile", action="store_true",
+        help="Time each build step and write build_profile_<year>.json plus a Chrome trace"
+    )
     args = parser.parse_args()
 
     print(f"=" * 60)
@@ -49,7 +93,8 @@ def main():
     print(f"=" * 60)
 
     # Create config
-    config = WorkbookConfig(year=args.year, carry_forward_path=args.carry_forward)
+    config = WorkbookConfig(year=args.year, carry_forward_path=args.carry_forward,
+                            daily_lookup_key=args.lookup_key)
 
     if args.carry_forward:
         print(f"\nCarry-forward data loaded from: {args.carry_forward}")
@@ -64,14 +109,46 @@ def main():
     xlsx_path = os.path.join(output_dir, f"Bed_Utilization_{args.year}.xlsx")
     xlsm_path = os.path.join(output_dir, f"Bed_Utilization_{args.year}.xlsm")
 
+    profiler = None
+    if args.profile:
+        profiler = BuildProfiler(
+            year=args.year, wards=len(config.WARDS), jobs=args.jobs,
+            cache_dir=args.cache_dir, daily_lookup_key=args.lookup_key,
+            preferences=vars(config.preferences),
+        )
+
     # Phase 1: Build structure with openpyxl
     print(f"\n--- Phase 1: Building workbook structure ---")
-    build_structure(config, xlsx_path)
+    if args.jobs == 1:
+        build_structure(config, xlsx_path, cache_dir=args.cache_dir, profiler=profiler)
+    else:
+        build_structure_parallel(config, xlsx_path, workers=args.jobs or None,
+                                 cache_dir=args.cache_dir, profiler=profiler)
+
+    if args.cached_values:
+        with (profiler.phase("cached values", "save") if profiler else nullcontext()):
+            report = fill_cached_values(xlsx_path)
+        print(report.format())
+
+    if args.share_formulas:
+        with (profiler.phase("share formulas", "save") if profiler else nullcontext()):
+            report = share_formulas(xlsx_path)
+        print(report.format())
 
     if args.skip_vba:
+        write_profile(profiler, output_dir, args.year)
         print(f"\nDone (VBA skipped). Open {xlsx_path} in Excel.")
         return
 
+    if args.offline_vba:
+        print("\n--- Phase 2: Writing VBA project (offline) ---")
+        report = inject_vba_offline(xlsx_path, xlsm_path, config, profiler=profiler)
+        print(report.format())
+        write_profile(profiler, output_dir, args.year)
+        os.remove(xlsx_path)
+        print(f"\nDone. Open {xlsm_path} in Excel and enable macros.")
+        return
+
     # Clean up openpyxl objects to ensure file handles are released
     import gc
     gc.collect()
@@ -101,13 +178,16 @@ def main():
         sys.exit(1)
 
     try:
-        inject_vba(xlsx_path, xlsm_path, config)
+        inject_vba(xlsx_path, xlsm_path, config, profiler=profiler)
     except Exception as e:
+        write_profile(profiler, output_dir, args.year)
         print(f"\nVBA injection failed: {e}")
         print(f"\nThe .xlsx file was still created at: {xlsx_path}")
         print("You can open it in Excel and add VBA manually if needed.")
         sys.exit(1)
 
+    write_profile(profiler, output_dir, args.year)
+
     # Clean up intermediate xlsx
     try:
         os.remove(xlsx_path)
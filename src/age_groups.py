@@ -0,0 +1,106 @@
+"""
+Bed Utilization Workbook - Age groups
+The one definition of the report age groups, used by the Ages Summary,
+Deaths Summary and DHIMS Summary formulas and by the Python engines.
+
+An age is normalized to days (Days x 1, Months x 30.4375, Years x 365.25,
+the average month and year) and a group is a half-open range of days, so
+every record with a numeric age and a known unit falls in exactly one
+group: 35 days and 1 month are both "1-11 months", 12 months and 4.5 years
+both "1-4". Python classifies whole columns with one np.searchsorted over
+the group edges. In the workbook, tblAdmissions and tblDeaths carry an
+AgeGroup calculated column (group_formula) that does the same MATCH over the
+same edges once per record: the group's number from 1, 0 when there is none.
+Each summary cell then counts one AgeGroup value (countifs).
+"""
+import math
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, List
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .xlsx.columnar import Categorical
+
+UNIT_DAYS = {"Days": 1.0, "Months": 30.4375, "Years": 365.25}
+YEAR = UNIT_DAYS["Years"]
+
+# Calculated column of tblAdmissions and tblDeaths holding group_formula
+AGE_GROUP_COLUMN = "AgeGroup"
+
+
+@dataclass(frozen=True)
+class AgeGroup:
+    label: str        # Ages Summary / Deaths Summary row label
+    dhims_label: str  # DHIMS Summary row label
+    lower: float      # days, inclusive
+    upper: float      # days, exclusive
+
+
+AGE_GROUPS: List[AgeGroup] = [
+    AgeGroup("0-28", "0-28 Days", 0, 29),
+    AgeGroup("1-11", "1-11 Months", 29, YEAR),
+    AgeGroup("1-4", "1-4", YEAR, 5 * YEAR),
+    AgeGroup("5-9", "5-9", 5 * YEAR, 10 * YEAR),
+    AgeGroup("10-14", "10-14", 10 * YEAR, 15 * YEAR),
+    AgeGroup("15-17", "15-17", 15 * YEAR, 18 * YEAR),
+    AgeGroup("18-19", "18-19", 18 * YEAR, 20 * YEAR),
+    AgeGroup("20-34", "20-34", 20 * YEAR, 35 * YEAR),
+    AgeGroup("35-49", "35-49", 35 * YEAR, 50 * YEAR),
+    AgeGroup("50-59", "50-59", 50 * YEAR, 60 * YEAR),
+    AgeGroup("60-69", "60-69", 60 * YEAR, 70 * YEAR),
+    AgeGroup("70+", "70 & Above", 70 * YEAR, math.inf),
+]
+
+# Group i is [EDGES[i], EDGES[i + 1]); the groups must be contiguous
+EDGES = np.array([g.lower for g in AGE_GROUPS] + [AGE_GROUPS[-1].upper])
+UNCATEGORIZED = len(AGE_GROUPS)
+
+
+def age_in_days(age: np.ndarray, unit: "Categorical") -> np.ndarray:
+    """Ages in days; NaN for a blank age or an unknown unit (units match case-insensitively)."""
+    factors = {u.upper(): f for u, f in UNIT_DAYS.items()}
+    lookup = np.array([factors.get(c.upper(), np.nan) for c in unit.categories] + [np.nan])
+    return np.asarray(age, dtype=np.float64) * lookup[unit.codes]
+
+
+def classify(age: np.ndarray, unit: "Categorical") -> np.ndarray:
+    """Group index of every record; UNCATEGORIZED when there is none."""
+    days = age_in_days(age, unit)
+    group = np.searchsorted(EDGES, days, side="right") - 1
+    group[np.isnan(days) | (group < 0) | (group >= UNCATEGORIZED)] = UNCATEGORIZED
+    return group
+
+
+def _bound(value: float) -> str:
+    # 15 significant digits, as Excel keeps them
+    return f"{value:.15g}"
+
+
+def group_formula(table: str) -> str:
+    """
+    Calculated-column formula (no "=") of a table's AgeGroup column.
+
+    The age in days is MATCHed against the lower edges of AGE_GROUPS; a blank
+    or non-numeric age, an unknown unit or a negative age gives 0.
+    """
+    age = f"{table}[[#This Row],[Age]]"
+    unit = f"{table}[[#This Row],[AgeUnit]]"
+    units = ",".join(f'"{u}"' for u in UNIT_DAYS)
+    factors = ",".join(_bound(f) for f in UNIT_DAYS.values())
+    edges = ",".join(_bound(g.lower) for g in AGE_GROUPS)
+    return (f"IF(ISNUMBER({age}),IFERROR(MATCH({age}*INDEX({{{factors}}},MATCH({unit},{{{units}}},0)),"
+            f"{{{edges}}},1),0),0)")
+
+
+def countifs(table: str, group: AgeGroup, criteria: str = "") -> str:
+    """
+    Formula text (no "=") counting a table's records in one age group.
+
+    Args:
+        table: Table name, e.g. "tblAdmissions"
+        group: The age group
+        criteria: Further COUNTIFS criteria pairs, e.g. 'tblAdmissions[Sex],"M"'
+    """
+    extra = f",{criteria}" if criteria else ""
+    return f"COUNTIFS({table}[{AGE_GROUP_COLUMN}],{AGE_GROUPS.index(group) + 1}{extra})"
@@ -0,0 +1,170 @@
+"""
+Bed Utilization Workbook - Columnar archive
+Keeps the data tables of every year's workbook in one directory of NumPy
+.npy files, one file per column, so trend questions across years do not
+reopen each .xlsm:
+
+    archive/
+        2024/manifest.json
+        2024/tblAdmissions.AdmissionDate.npy
+        2024/tblAdmissions.WardCode.npy
+        ...
+
+Columns keep the types xlsx.columnar.load_tables gives them. Codes (wards,
+sex, NHIS, age unit, cause of death) are dictionary-encoded: the .npy holds
+int32 codes and the manifest the categories. Text columns (IDs, names) are
+fixed-width unicode, blank = "". Everything else is stored as loaded.
+
+open_archive memory-maps the files, so opening ten years reads only the
+manifests; the operating system pages column data in as it is used and can
+drop it again. combine() stacks one table across years (a copy of the
+columns asked for), recoding categories to their union and adding a Year
+column.
+"""
+import json
+import os
+import shutil
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .kpi import read_settings
+from .xlsx.columnar import CODE, COUNT, DATA_TABLES, TABLE_SCHEMAS, TEXT, Categorical, ColumnarTable, load_tables
+
+ARCHIVE_TABLES = list(DATA_TABLES) + ["tblWardConfig"]
+MANIFEST = "manifest.json"
+FORMAT_VERSION = 1
+
+Archive = Dict[int, Dict[str, ColumnarTable]]
+
+
+@dataclass
+class ExportResult:
+    year: int
+    directory: str
+    rows: Dict[str, int] = field(default_factory=dict)
+    bytes: int = 0
+
+
+def _column_file(directory: str, table: str, column: str) -> str:
+    return os.path.join(directory, f"{table}.{column}.npy")
+
+
+def export_year(path: str, archive: str, year: Optional[int] = None) -> ExportResult:
+    """
+    Write a workbook's data tables into the archive, replacing that year.
+
+    Args:
+        path: Workbook to read (.xlsx/.xlsm)
+        archive: Archive directory (created if needed)
+        year: Year to file the tables under (default: the workbook's Control!B5)
+
+    Returns:
+        The year's directory, rows per table and bytes written
+    """
+    year = year or read_settings(path).year
+    loaded = load_tables(path, ARCHIVE_TABLES)
+    target = os.path.join(archive, str(year))
+    tmp = target + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    manifest = {"version": FORMAT_VERSION, "year": year, "workbook": os.path.abspath(path), "tables": {}}
+    result = ExportResult(year, target)
+    for name in ARCHIVE_TABLES:
+        table = loaded[name]
+        columns = {}
+        np.save(_column_file(tmp, name, "_sheet_rows"), np.asarray(table.sheet_rows, dtype=np.int64))
+        for column, kind in TABLE_SCHEMAS[name].items():
+            values = table[column]
+            entry = {"kind": kind}
+            if kind == CODE:
+                entry["categories"] = values.categories
+                values = values.codes
+            elif kind == TEXT:
+                values = np.array(["" if v is None else v for v in values], dtype=str)
+            np.save(_column_file(tmp, name, column), values)
+            columns[column] = entry
+        manifest["tables"][name] = {"rows": len(table), "columns": columns}
+        result.rows[name] = len(table)
+    with open(os.path.join(tmp, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=1)
+
+    result.bytes = sum(os.path.getsize(os.path.join(tmp, f)) for f in os.listdir(tmp))
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(tmp, target)
+    return result
+
+
+def archive_years(archive: str) -> List[int]:
+    """Years present in the archive, oldest first."""
+    if not os.path.isdir(archive):
+        return []
+    return sorted(int(d) for d in os.listdir(archive)
+                  if d.isdigit() and os.path.exists(os.path.join(archive, d, MANIFEST)))
+
+
+def open_year(archive: str, year: int, tables: Optional[List[str]] = None) -> Dict[str, ColumnarTable]:
+    """One year's tables, columns memory-mapped read-only."""
+    directory = os.path.join(archive, str(year))
+    with open(os.path.join(directory, MANIFEST)) as f:
+        manifest = json.load(f)
+    if manifest.get("version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported archive format in {directory}: {manifest.get('version')}")
+
+    result = {}
+    for name in tables or ARCHIVE_TABLES:
+        info = manifest["tables"][name]
+        table = ColumnarTable(name, rows=info["rows"],
+                              sheet_rows=np.load(_column_file(directory, name, "_sheet_rows"), mmap_mode="r"))
+        for column, entry in info["columns"].items():
+            values = np.load(_column_file(directory, name, column), mmap_mode="r")
+            if entry["kind"] == CODE:
+                values = Categorical(values, entry["categories"])
+            table.columns[column] = values
+        result[name] = table
+    return result
+
+
+def open_archive(archive: str, years: Optional[List[int]] = None,
+                 tables: Optional[List[str]] = None) -> Archive:
+    """Year -> tables for every archived year (or those given), memory-mapped."""
+    return {year: open_year(archive, year, tables) for year in (years or archive_years(archive))}
+
+
+def combine(archive: Archive, table: str, columns: Optional[List[str]] = None) -> ColumnarTable:
+    """
+    One table across all years of an opened archive, with a Year column.
+
+    Args:
+        archive: As returned by open_archive
+        table: Table name, e.g. "tblAdmissions"
+        columns: Columns to include (default: all); only these are read
+
+    Returns:
+        A ColumnarTable in year order; codes recoded to the union of the
+        years' categories
+    """
+    columns = columns or list(TABLE_SCHEMAS[table])
+    parts = [archive[year][table] for year in sorted(archive)]
+    result = ColumnarTable(table, rows=sum(len(p) for p in parts),
+                           sheet_rows=np.concatenate([p.sheet_rows for p in parts] or [np.zeros(0, np.int64)]))
+    result.columns["Year"] = np.repeat(np.array(sorted(archive), dtype=np.int64), [len(p) for p in parts])
+    for column in columns:
+        kind = TABLE_SCHEMAS[table][column]
+        values = [p[column] for p in parts]
+        if kind == CODE:
+            categories = sorted({c for v in values for c in v.categories})
+            lookup = {c: i for i, c in enumerate(categories)}
+            codes = []
+            for v in values:
+                # Index -1 (blank) maps to the appended -1
+                recode = np.array([lookup[c] for c in v.categories] + [-1], dtype=np.int32)
+                codes.append(recode[v.codes])
+            result.columns[column] = Categorical(np.concatenate(codes or [np.zeros(0, np.int32)]), categories)
+        elif values:
+            result.columns[column] = np.concatenate(values)
+        else:
+            result.columns[column] = np.zeros(0, dtype=np.int64 if kind == COUNT else object)
+    return result
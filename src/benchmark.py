@@ -0,0 +1,157 @@
+"""
+Bed Utilization Workbook - Phase 1 benchmark suite
+Builds the workbook (--skip-vba semantics) across ward counts, preference
+combinations and leap/non-leap years, and compares against a stored baseline.
+
+Each case runs in a freshly spawned process so its peak RSS is its own.
+Build time and peak memory depend on the machine, so refresh the baseline
+(tools/benchmark.py --update-baseline) when moving to new hardware; file
+size, cell and formula counts are deterministic and portable.
+"""
+import contextlib
+import io
+import itertools
+import json
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, fields
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .config import HospitalPreferences, WardDef, WorkbookConfig
+from .phase1_structure import build_structure
+from .profiler import BuildProfiler
+
+WARD_COUNTS = (9, 30, 100, 250)
+YEARS = (2027, 2028)  # non-leap, leap
+PREF_FLAGS = tuple(f.name for f in fields(HospitalPreferences))
+
+# Allowed growth over the baseline before a case counts as a regression:
+# (relative, absolute floor) - a metric regresses only when it exceeds both.
+DEFAULT_TOLERANCES = {
+    "build_s": (0.25, 0.25),
+    "peak_rss_mb": (0.20, 10.0),
+    "bytes": (0.02, 0),
+    "cells": (0.0, 0),
+    "formulas": (0.0, 0),
+}
+
+# The nine production wards; larger counts append generic non-emergency wards
+_BASE_WARDS = [
+    ("MW", "Male Medical", 32, False),
+    ("FW", "Female Medical", 28, False),
+    ("CW", "Paediatric", 27, False),
+    ("BF", "Block F", 20, False),
+    ("BG", "Block G", 14, False),
+    ("BH", "Block H", 22, False),
+    ("NICU", "Neonatal", 15, False),
+    ("MAE", "Male Emergency", 10, True),
+    ("FAE", "Female Emergency", 10, True),
+]
+
+
+def synthetic_wards(n: int) -> List[WardDef]:
+    """The production ward list padded (or truncated) to n wards."""
+    wards = []
+    for i in range(n):
+        if i < len(_BASE_WARDS):
+            code, name, beds, emergency = _BASE_WARDS[i]
+        else:
+            code, name, beds, emergency = f"W{i + 1:03d}", f"Ward {i + 1:03d}", 20 + i % 15, False
+        wards.append(WardDef(code, name, beds, emergency, i + 1))
+    return wards
+
+
+@dataclass(frozen=True)
+class BenchCase:
+    wards: int
+    year: int
+    prefs: Tuple[bool, ...]  # in PREF_FLAGS order
+
+    @property
+    def id(self) -> str:
+        flags = "".join("1" if p else "0" for p in self.prefs)
+        return f"w{self.wards}-y{self.year}-p{flags}"
+
+    def config(self) -> WorkbookConfig:
+        # WorkbookConfig reports what it loads; the wards and prefs are replaced anyway
+        with contextlib.redirect_stdout(io.StringIO()):
+            config = WorkbookConfig(year=self.year)
+        config.WARDS = synthetic_wards(self.wards)
+        config.preferences = HospitalPreferences(**dict(zip(PREF_FLAGS, self.prefs)))
+        return config
+
+
+def cases(ward_counts: Iterable[int] = WARD_COUNTS,
+          years: Iterable[int] = YEARS) -> List[BenchCase]:
+    """Every ward count x preference combination x year."""
+    combos = list(itertools.product((False, True), repeat=len(PREF_FLAGS)))
+    return [BenchCase(w, y, p) for w in ward_counts for y in years for p in combos]
+
+
+def run_case(case: BenchCase, workdir: Optional[str] = None) -> Dict:
+    """Build one case in this process and return its metrics."""
+    config = case.config()
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        output = os.path.join(tmp, "bench.xlsx")
+        profiler = BuildProfiler()
+        with contextlib.redirect_stdout(io.StringIO()):
+            build_structure(config, output, profiler=profiler)
+    save = next(p for p in profiler.phases if p["category"] == "save")
+    return {
+        "id": case.id,
+        "build_s": round(sum(p["wall_ms"] for p in profiler.phases) / 1000, 3),
+        "bytes": save["bytes"],
+        "cells": save["cells"],
+        "formulas": save["formulas"],
+        "peak_rss_mb": save["peak_rss_mb"],
+    }
+
+
+def run_isolated(case: BenchCase, workdir: Optional[str] = None) -> Dict:
+    """run_case in a fresh spawned interpreter (clean peak-RSS high-water mark)."""
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+        return pool.submit(run_case, case, workdir).result()
+
+
+def load_baseline(path: str) -> Dict[str, Dict]:
+    """Baseline results keyed by case id ({} if the file does not exist)."""
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return {r["id"]: r for r in json.load(f)["results"]}
+
+
+def save_baseline(path: str, results: List[Dict], merge: bool = True):
+    """Write results as the baseline, keeping other cases already stored."""
+    merged = load_baseline(path) if merge else {}
+    merged.update({r["id"]: r for r in results})
+    with open(path, "w") as f:
+        json.dump({"results": [merged[k] for k in sorted(merged)]}, f, indent=1)
+        f.write("\n")
+
+
+def compare(results: List[Dict], baseline: Dict[str, Dict],
+            tolerances: Dict = DEFAULT_TOLERANCES) -> List[str]:
+    """
+    Regressions of results against the baseline.
+
+    Returns:
+        One message per metric over tolerance; cases missing from the
+        baseline are not compared.
+    """
+    regressions = []
+    for r in results:
+        base = baseline.get(r["id"])
+        if base is None:
+            continue
+        for metric, (rel, floor) in tolerances.items():
+            old, new = base.get(metric), r.get(metric)
+            if old is None or new is None:
+                continue
+            if new > old * (1 + rel) and new - old > floor:
+                change = f"+{(new - old) / old:.0%}" if old else "new"
+                regressions.append(f"{r['id']}: {metric} {old} -> {new} ({change})")
+    return regressions
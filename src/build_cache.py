@@ -0,0 +1,158 @@
+"""
+Bed Utilization Workbook - Incremental build cache
+Reuses rendered sheet packages whose inputs have not changed.
+
+Each build step is keyed on the config inputs it actually reads (year,
+hospital name, the WardDef fields it depends on, the HospitalPreferences
+flags it branches on) plus a hash of the builder source, so editing one
+ward's bed complement re-renders only the Control sheet and that ward's
+sheet. Cached entries are the standalone .xlsx packages produced by
+parallel_build.render_shard, stored as <cache_dir>/<year>/<key>.xlsx. After
+each build the entries of that year it did not use are deleted, so the cache
+holds one workbook's worth of shards per report year however often the
+config or code changes. Only files named like cache entries are ever
+deleted; anything else in the directory is left alone.
+"""
+import hashlib
+import json
+import os
+import re
+import tempfile
+from dataclasses import asdict, fields
+from typing import Iterable, Optional
+
+import openpyxl
+
+from .config import HospitalPreferences, WorkbookConfig
+
+# Source files whose contents decide what a builder emits
+_SOURCES = ("phase1_structure.py", "styles.py", "config.py", "age_groups.py")
+
+# Names SheetCache writes: "<sha256>.xlsx" entries and their temp files
+_TMP_PREFIX = "shard-"
+_CACHE_FILE = re.compile(rf"[0-9a-f]{{64}}\.xlsx|{_TMP_PREFIX}\w+\.tmp")
+
+_ALL_PREFS = tuple(f.name for f in fields(HospitalPreferences))
+_SUBTRACT = ("subtract_deaths_under_24hrs_from_admissions",)
+_SUMMARY_PREFS = ("subtract_deaths_under_24hrs_from_admissions", "show_emergency_total_remaining")
+
+# Preference flags each builder reads; builders not listed read none
+_PREF_INPUTS = {
+    "build_control_sheet": _ALL_PREFS,
+    "build_ward_sheet": _SUBTRACT,
+    "build_emergency_combined_sheet": _SUBTRACT,
+    "build_monthly_summary_sheet": _SUMMARY_PREFS,
+    "build_quarterly_summary_sheet": _SUMMARY_PREFS,
+    "build_halfyear_summary_sheet": _SUMMARY_PREFS,
+    "build_statement_of_inpatient_sheet": _SUBTRACT,
+}
+
+# Which WardDef fields each builder depends on:
+#   "all"  - every field of every ward (only Control writes the numbers into tblWardConfig)
+#   "own"  - every field of the ward passed as the step argument
+#   "none" - the ward list is not read
+# Everything else reads the ward list but looks numbers up through tblWardConfig,
+# so only the identity fields matter.
+_WARD_INPUTS = {
+    "build_control_sheet": "all",
+    "build_ward_sheet": "own",
+    "build_daily_data_sheet": "none",
+    "build_admissions_sheet": "none",
+    "build_deaths_data_sheet": "none",
+    "build_transfers_sheet": "none",
+}
+_WARD_IDENTITY = ("code", "name", "is_emergency", "display_order")
+
+_code_version = None
+
+
+def code_version() -> str:
+    """Hash of the builder sources and the openpyxl version."""
+    global _code_version
+    if _code_version is None:
+        h = hashlib.sha256(openpyxl.__version__.encode())
+        here = os.path.dirname(os.path.abspath(__file__))
+        for name in _SOURCES:
+            with open(os.path.join(here, name), "rb") as f:
+                h.update(f.read())
+        _code_version = h.hexdigest()
+    return _code_version
+
+
+def step_inputs(config: WorkbookConfig, builder, args: tuple) -> dict:
+    """The config values one build step depends on, as a JSON-able dict."""
+    name = builder.__name__
+    inputs = {
+        "builder": name,
+        "year": config.year,
+        "hospital_name": config.hospital_name,
+        "daily_lookup_key": config.daily_lookup_key,
+        "preferences": {p: getattr(config.preferences, p) for p in _PREF_INPUTS.get(name, ())},
+    }
+    wards = _WARD_INPUTS.get(name)
+    if wards == "all":
+        inputs["wards"] = [asdict(w) for w in config.WARDS]
+    elif wards == "own":
+        inputs["ward"] = asdict(args[0])
+    elif wards is None:
+        inputs["wards"] = [[getattr(w, f) for f in _WARD_IDENTITY] for w in config.WARDS]
+    return inputs
+
+
+class SheetCache:
+    """On-disk store of rendered shard packages, keyed by their inputs."""
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, config: WorkbookConfig, steps) -> str:
+        """
+        Cache key for a shard.
+
+        Args:
+            config: Workbook configuration
+            steps: The shard's (builder, args) pairs, in render order
+        """
+        payload = {
+            "code": code_version(),
+            "steps": [step_inputs(config, builder, args) for builder, args in steps],
+        }
+        blob = json.dumps(payload, sort_keys=True, default=str).encode()
+        return hashlib.sha256(blob).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.xlsx")
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._path(key), "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        return data
+
+    def put(self, key: str, data: bytes):
+        # Write-then-rename so an interrupted build never leaves a truncated entry
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, prefix=_TMP_PREFIX, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, self._path(key))
+
+    def prune(self, keep: Iterable[str]) -> int:
+        """
+        Delete every entry (and leftover temp file) not in keep; returns the count.
+
+        Files not named like cache entries (a workbook saved into the
+        directory, say) are never touched.
+        """
+        keep = {f"{key}.xlsx" for key in keep}
+        removed = 0
+        for name in os.listdir(self.cache_dir):
+            if name not in keep and _CACHE_FILE.fullmatch(name):
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                    removed += 1
+                except OSError:
+                    pass
+        return removed
@@ -8,6 +8,8 @@ import os
 from dataclasses import dataclass, field
 from typing import List, Optional
 
+from .age_groups import AGE_GROUPS
+
 
 @dataclass
 class WardDef:
@@ -34,25 +36,14 @@ class WorkbookConfig:
     carry_forward_path: Optional[str] = None
     wards_config_path: str = "config/wards_config.json"
     preferences_path: str = "config/hospital_preferences.json"
+    # Build mode: add tblDaily[Key] and resolve ward-sheet cells with one exact match
+    daily_lookup_key: bool = False
 
     WARDS: List[WardDef] = field(default_factory=list)
     preferences: HospitalPreferences = field(default_factory=HospitalPreferences)
 
-    # Age groups for the Ages Summary report
-    AGE_GROUPS = [
-        ("0-28",  "Days",   0,  28),
-        ("1-11",  "Months", 1,  11),
-        ("1-4",   "Years",  1,   4),
-        ("5-9",   "Years",  5,   9),
-        ("10-14", "Years",  10, 14),
-        ("15-17", "Years",  15, 17),
-        ("18-19", "Years",  18, 19),
-        ("20-34", "Years",  20, 34),
-        ("35-49", "Years",  35, 49),
-        ("50-59", "Years",  50, 59),
-        ("60-69", "Years",  60, 69),
-        ("70+",   "Years",  70, 200),
-    ]
+    # Age groups of the Ages, Deaths and DHIMS summaries (see age_groups.py)
+    AGE_GROUPS = AGE_GROUPS
 
     MONTH_NAMES = [
         "JANUARY", "FEBRUARY", "MARCH", "APRIL", "MAY", "JUNE",
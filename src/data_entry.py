@@ -0,0 +1,179 @@
+"""
+Bed Utilization Workbook - Bulk data entry
+Headless modDataAccess.SaveDailyEntry / SaveAdmission / SaveDeath for many
+records at once, e.g. a month of back-entered or scanned forms. The records
+are appended with xlsx.table_append, which rewrites only the table's
+worksheet and table parts, so the VBA project is copied as is.
+
+Each record is completed as the Save routines complete it:
+
+    AdmissionID / DeathID   GenerateNextID: "A"/"D" + report year + "-#####",
+                            continuing from the highest number of that
+                            prefix and year already in the table
+    Month                   month of the record's date (0 without a date)
+    EntryTimestamp          the time of the import
+    PrevRemaining/Remaining tblDaily only: the chain of remaining.py over the
+                            existing and new rows
+
+Values for these columns in the records are replaced. Dates and timestamps
+are formatted yyyy-mm-dd and yyyy-mm-dd hh:mm, as the VBA formats them.
+
+Given a journal.Journal, the new records are also journaled (source
+"append_records"), so the journal keeps up without a re-import.
+
+Unlike SaveDailyEntry, a tblDaily record for a (date, ward) that already
+has a row is an error rather than an overwrite, and the table is not
+re-sorted; rows of the imported wards dated after a new row whose
+PrevRemaining/Remaining change are updated in place, as
+RecalculateSubsequentRows does.
+"""
+import re
+from datetime import date, datetime
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .kpi import read_settings
+from .remaining import compute_remaining, ward_prev_year
+from .xlsx.columnar import Categorical, ColumnarTable, load_tables
+from .xlsx.table_append import AppendResult, append_table_rows
+
+# Table -> its date column
+ENTRY_TABLES = {"tblDaily": "EntryDate", "tblAdmissions": "AdmissionDate", "tblDeaths": "DateOfDeath"}
+# Table -> (ID column, GenerateNextID prefix)
+ID_COLUMNS = {"tblAdmissions": ("AdmissionID", "A"), "tblDeaths": ("DeathID", "D")}
+DATE_FORMAT = "yyyy-mm-dd"
+TIMESTAMP_FORMAT = "yyyy-mm-dd hh:mm"
+
+_DAILY_COUNTS = ["Admissions", "Discharges", "Deaths", "DeathsUnder24Hrs", "TransfersIn", "TransfersOut"]
+
+Record = Dict[str, object]
+
+
+def next_ids(existing: Sequence[Optional[str]], prefix: str, year: int, count: int) -> List[str]:
+    """
+    The next `count` IDs after the highest "[prefix]YYYY-#####" in `existing`.
+
+    As in GenerateNextID, only IDs starting with prefix + year + "-" count,
+    and their number is whatever follows the first "-".
+    """
+    start = f"{prefix}{year}-"
+    highest = 0
+    for value in existing:
+        if value and value.startswith(start):
+            number = value.partition("-")[2].strip()
+            if re.fullmatch(r"\d+", number):
+                highest = max(highest, int(number))
+    return [f"{start}{n:05d}" for n in range(highest + 1, highest + count + 1)]
+
+
+def _day(value) -> Optional[np.datetime64]:
+    if isinstance(value, (date, datetime)):
+        return np.datetime64(value.date() if isinstance(value, datetime) else value, "D")
+    return None
+
+
+def _daily_with(daily: ColumnarTable, records: List[Record]) -> ColumnarTable:
+    """tblDaily with the new records appended, for compute_remaining."""
+    n = len(daily)
+    combined = ColumnarTable("tblDaily", rows=n + len(records))
+    combined.columns["WardCode"] = Categorical.from_values(
+        list(daily["WardCode"].to_numpy()) + [r.get("WardCode") for r in records])
+    combined.columns["EntryDate"] = np.concatenate(
+        [daily["EntryDate"], np.array([_day(r.get("EntryDate")) for r in records], dtype="datetime64[D]")])
+    for column in _DAILY_COUNTS + ["PrevRemaining", "Remaining"]:
+        combined.columns[column] = np.concatenate(
+            [daily[column], np.array([int(r.get(column) or 0) for r in records], dtype=np.int64)])
+    return combined
+
+
+def _daily_records(path: str, records: List[Record]) -> Dict[int, Record]:
+    """
+    Fill in tblDaily records' counts and remaining chain.
+
+    Returns:
+        Updates for existing rows: worksheet row -> changed PrevRemaining/Remaining
+    """
+    tables = load_tables(path, ["tblDaily", "tblWardConfig"])
+    daily = tables["tblDaily"]
+
+    seen = set()
+    existing = set(zip(daily["WardCode"].to_numpy(), daily["EntryDate"].tolist()))
+    for r in records:
+        if not r.get("WardCode") or _day(r.get("EntryDate")) is None:
+            raise ValueError(f"tblDaily records need an EntryDate and a WardCode: {r}")
+        key = (r["WardCode"], _day(r["EntryDate"]).astype(object))
+        if key in existing or key in seen:
+            raise ValueError(f"tblDaily already has an entry for {key[0]} on {key[1]}")
+        seen.add(key)
+        for column in _DAILY_COUNTS:
+            r[column] = int(r.get(column) or 0)
+
+    combined = _daily_with(daily, records)
+    result = compute_remaining(combined, ward_prev_year(tables["tblWardConfig"]))
+    n = len(daily)
+    for i, r in enumerate(records):
+        r["PrevRemaining"] = int(result.prev_remaining[n + i])
+        r["Remaining"] = int(result.remaining[n + i])
+
+    # Later rows of the imported wards, as RecalculateSubsequentRows
+    first_new: Dict[str, np.datetime64] = {}
+    for r in records:
+        day = _day(r["EntryDate"])
+        first_new[r["WardCode"]] = min(first_new.get(r["WardCode"], day), day)
+    updates = {}
+    for i in np.flatnonzero(result.mismatched[:n]):
+        ward = daily["WardCode"][i]
+        if ward in first_new and daily["EntryDate"][i] > first_new[ward]:
+            updates[int(daily.sheet_rows[i])] = {"PrevRemaining": int(result.prev_remaining[i]),
+                                                 "Remaining": int(result.remaining[i])}
+    return updates
+
+
+def append_records(path: str, table: str, records: List[Record], output_path: Optional[str] = None,
+                   now: Optional[datetime] = None, journal=None) -> AppendResult:
+    """
+    Append records to tblDaily, tblAdmissions or tblDeaths.
+
+    Args:
+        path: Workbook to update (.xlsx/.xlsm)
+        table: One of ENTRY_TABLES
+        records: Column name -> value; dates as date/datetime
+        output_path: Destination (default: overwrite `path`)
+        now: EntryTimestamp of the new rows (default: the current time)
+        journal: Optional journal.Journal to record the new rows in, once written
+
+    Returns:
+        Where the rows went and the table's new ref
+
+    Raises:
+        KeyError: If `table` is not a data-entry table
+        ValueError: For unknown columns, tblDaily records without a date or
+                    ward, or a tblDaily (date, ward) that already has a row
+    """
+    if table not in ENTRY_TABLES:
+        raise KeyError(f"Not a data-entry table: {table}")
+    date_column = ENTRY_TABLES[table]
+    now = now or datetime.now().replace(microsecond=0)
+    records = [dict(r) for r in records]
+    for r in records:
+        entered = r.get(date_column)
+        r["Month"] = entered.month if isinstance(entered, (date, datetime)) else 0
+        r["EntryTimestamp"] = now
+
+    updates = {}
+    if table == "tblDaily":
+        updates = _daily_records(path, records)
+    else:
+        column, prefix = ID_COLUMNS[table]
+        year = read_settings(path).year
+        existing = load_tables(path, [table])[table][column]
+        for r, new_id in zip(records, next_ids(existing, prefix, year, len(records))):
+            r[column] = new_id
+
+    result = append_table_rows(path, table, records, output_path, updates=updates,
+                               number_formats={date_column: DATE_FORMAT, "EntryTimestamp": TIMESTAMP_FORMAT})
+    if journal is not None:
+        for r in records:
+            journal.put(table, r, "append_records", at=now)
+    return result
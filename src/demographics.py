@@ -0,0 +1,179 @@
+"""
+Bed Utilization Workbook - Age/sex/insurance cube
+Counts every tblAdmissions and tblDeaths record once into a cube of
+
+    month (0 = not 1-12) x ward x age group x sex x NHIS
+
+with a single np.bincount over composite keys. The Ages Summary, Deaths
+Summary and DHIMS Summary sheets (and any DHIMS ward/month filter) are then
+slices of the cube, instead of thousands of COUNTIFS that each rescan a
+table with up to five criteria.
+
+Matching follows COUNTIFS: text compares case-insensitively, age groups are
+those of age_groups.classify (the sheets count the AgeGroup column, which
+classifies the same way), the Ages/Deaths "Uncategorized" row is what no age
+group claims, and the DHIMS "All Wards" filter ("*") skips rows without a
+ward code. Month and ward criteria of both sheets are the only things the
+cube keeps per record; everything else is summed away.
+"""
+import zipfile
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .age_groups import UNCATEGORIZED, classify
+from .xlsx.cell_writer import write_cells
+from .xlsx.columnar import Categorical, ColumnarTable, load_tables
+from .xlsx.reader import iter_cells, shared_strings, sheet_parts
+
+SEXES = ["M", "F"]
+NHIS_STATUSES = ["Insured", "Non-Insured"]
+ALL_WARDS = "All Wards"
+ALL_MONTHS = "All Months"
+
+# Sheet layout (phase1_structure.build_ages_summary_sheet / build_dhims_summary_sheet)
+SECTION_WIDTH = 7
+AGES_FIRST_ROW = 4
+DHIMS_FIRST_ROW = 8
+DHIMS_FILTERS = {"ward": (2, 2), "month": (3, 2)}
+
+
+def _codes(values: Categorical, labels: Sequence[str]) -> np.ndarray:
+    """Index of each row's value in labels (case-insensitive); len(labels) if none."""
+    lookup = {label.upper(): i for i, label in enumerate(labels)}
+    table = np.array([lookup.get(c.upper(), len(labels)) for c in values.categories]
+                     + [len(labels)], dtype=np.int64)
+    return table[values.codes]
+
+
+@dataclass
+class Cube:
+    """Record counts; the last index of every axis but month means "none of these"."""
+    counts: np.ndarray   # (13 months, wards + 1, age groups + 1, 3 sexes, 3 NHIS)
+    wards: List[str]     # ward axis labels (upper-cased codes)
+
+    def ward_index(self, code: str) -> Optional[int]:
+        try:
+            return self.wards.index(code.upper())
+        except ValueError:
+            return None
+
+
+def build_cube(table: ColumnarTable) -> Cube:
+    """Bucket every row of tblAdmissions or tblDeaths once."""
+    month = table["Month"]
+    month = np.where((month >= 1) & (month <= 12), month, 0)
+    wards = sorted({c.upper() for c in table["WardCode"].categories})
+    axes = [
+        (13, month),
+        (len(wards) + 1, _codes(table["WardCode"], wards)),
+        (UNCATEGORIZED + 1, classify(table["Age"], table["AgeUnit"])),
+        (3, _codes(table["Sex"], SEXES)),
+        (3, _codes(table["NHIS"], NHIS_STATUSES)),
+    ]
+    key = np.zeros(len(month), dtype=np.int64)
+    for size, index in axes:
+        key = key * size + index
+    shape = tuple(size for size, _ in axes)
+    counts = np.bincount(key, minlength=int(np.prod(shape))).reshape(shape)
+    return Cube(counts, wards)
+
+
+def build_cubes(tables: Dict[str, ColumnarTable]) -> Dict[str, Cube]:
+    """Cubes for tblAdmissions and tblDeaths."""
+    return {name: build_cube(tables[name]) for name in ("tblAdmissions", "tblDeaths")}
+
+
+def ages_summary(cube: Cube) -> np.ndarray:
+    """
+    Ages/Deaths Summary figures: [month - 1, row, column] with rows the age
+    groups, Uncategorized and Total, and columns Male/Female for all
+    patients, Non-Insured and Insured.
+    """
+    by_age = cube.counts[1:].sum(axis=1)             # (12, age + 1, sex, nhis)
+    sexes = by_age[:, :, :2]                          # M, F
+    columns = np.concatenate([sexes.sum(axis=3), sexes[..., 1], sexes[..., 0]], axis=2)
+    total = columns.sum(axis=1, keepdims=True)
+    return np.concatenate([columns, total], axis=1)
+
+
+def dhims_summary(admissions: Cube, deaths: Cube, ward: str = ALL_WARDS,
+                  month=ALL_MONTHS) -> np.ndarray:
+    """
+    DHIMS Summary figures for one ward/month filter: rows are the age groups
+    then TOTAL; columns C:L (insured admissions M/F, insured deaths
+    M/F, non-insured admissions M/F, non-insured deaths M/F, total M/F).
+    """
+    def part(cube: Cube) -> np.ndarray:
+        counts = cube.counts[1:] if month == ALL_MONTHS else cube.counts[int(month):int(month) + 1]
+        if ward == ALL_WARDS:
+            counts = counts[:, :-1]
+        else:
+            w = cube.ward_index(str(ward))
+            counts = counts[:, w:w + 1] if w is not None else counts[:, :0]
+        return counts.sum(axis=(0, 1))[:-1, :2, :2]   # (age group, sex, nhis)
+
+    adm, dth = part(admissions), part(deaths)
+    rows = np.stack([adm[..., 0], dth[..., 0], adm[..., 1], dth[..., 1]], axis=1)
+    rows = rows.reshape(len(rows), 8)
+    total = rows[:, 0::2].sum(axis=1, keepdims=True), rows[:, 1::2].sum(axis=1, keepdims=True)
+    rows = np.concatenate([rows, *total], axis=1)
+    return np.concatenate([rows, rows.sum(axis=0, keepdims=True)])
+
+
+def _ages_cells(figures: np.ndarray) -> Dict[Tuple[int, int], int]:
+    cells = {}
+    for m in range(12):
+        sc = 1 + m * SECTION_WIDTH
+        for r in range(figures.shape[1]):
+            for c in range(6):
+                cells[(AGES_FIRST_ROW + r, sc + 1 + c)] = int(figures[m, r, c])
+    return cells
+
+
+def _dhims_filters(path: str) -> Tuple[str, object]:
+    """The ward and month currently selected on the DHIMS Summary sheet."""
+    with zipfile.ZipFile(path) as zf:
+        parts = {name: part for part, name in sheet_parts(zf).items()}
+        cells = {(c.row, c.col): c.value
+                 for c in iter_cells(zf.read(parts["DHIMS Summary"]), shared_strings(zf))}
+    ward = cells.get(DHIMS_FILTERS["ward"]) or ALL_WARDS
+    month = cells.get(DHIMS_FILTERS["month"]) or ALL_MONTHS
+    if isinstance(month, float):
+        month = int(month)
+    return str(ward), month
+
+
+def write_demographic_summaries(path: str, output_path: Optional[str] = None,
+                                ward: Optional[str] = None, month=None) -> Dict[str, Cube]:
+    """
+    Replace the Ages Summary, Deaths Summary and DHIMS Summary formulas with
+    their values.
+
+    Args:
+        path: Workbook to update (.xlsx/.xlsm)
+        output_path: Destination (default: overwrite `path`)
+        ward, month: DHIMS filter (default: the one selected on the sheet)
+
+    Returns:
+        The cubes, for further slicing
+    """
+    tables = load_tables(path, ["tblAdmissions", "tblDeaths"])
+    cubes = build_cubes(tables)
+    selected_ward, selected_month = _dhims_filters(path)
+    ward = selected_ward if ward is None else ward
+    month = selected_month if month is None else month
+
+    dhims = dhims_summary(cubes["tblAdmissions"], cubes["tblDeaths"], ward, month)
+    dhims_cells = {DHIMS_FILTERS["ward"]: ward, DHIMS_FILTERS["month"]: month}
+    for r, row in enumerate(dhims):
+        for c, value in enumerate(row):
+            dhims_cells[(DHIMS_FIRST_ROW + r, 3 + c)] = int(value)
+
+    write_cells(path, {
+        "Ages Summary": _ages_cells(ages_summary(cubes["tblAdmissions"])),
+        "Deaths Summary": _ages_cells(ages_summary(cubes["tblDeaths"])),
+        "DHIMS Summary": dhims_cells,
+    }, output_path)
+    return cubes
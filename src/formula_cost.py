@@ -0,0 +1,208 @@
+"""
+Bed Utilization Workbook - Static formula-cost analyzer
+Estimates which sheets dominate recalculation without opening Excel.
+
+Every formula is tokenized and each table column passed directly to a
+scanning function (SUMIFS, COUNTIFS, MATCH, ...) is counted as one full
+column scan. A sheet's cost is then linear in the table sizes:
+
+    cost = sum over tables of (column scans on that table) x (table rows)
+
+measured in cell visits. INDEX is a direct offset and costs nothing; exact
+MATCH is charged a full scan (the cost of a miss, and the upper bound for a
+hit). A1-style ranges do not grow with the data and are ignored.
+"""
+import re
+import zipfile
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from openpyxl import load_workbook
+from openpyxl.formula.tokenizer import Token, Tokenizer
+
+# Functions that visit every cell of a range argument
+SCANNING_FUNCTIONS = {
+    "SUMIFS", "COUNTIFS", "AVERAGEIFS", "MAXIFS", "MINIFS",
+    "SUMIF", "COUNTIF", "AVERAGEIF",
+    "MATCH", "XMATCH", "VLOOKUP", "HLOOKUP", "XLOOKUP", "LOOKUP",
+    "SUMPRODUCT", "COUNTA", "COUNT", "SUM", "MAX", "MIN",
+}
+
+# The row-count-dependent data tables the cost is reported against
+DATA_TABLES = ("tblDaily", "tblAdmissions", "tblDeaths", "tblTransfers")
+
+_TABLE_COLUMN = re.compile(r"^(\w+)\[([^\[\]@#]+)\]$")
+_TABLE_PART = re.compile(rb'<table\b[^>]*?\sdisplayName="([^"]+)"[^>]*?\sref="([^"]+)"')
+_TABLE_PART_REV = re.compile(rb'<table\b[^>]*?\sref="([^"]+)"[^>]*?\sdisplayName="([^"]+)"')
+_ROWS = re.compile(r"[A-Z]+(\d+):[A-Z]+(\d+)")
+
+
+@dataclass
+class FormulaCost:
+    """Scan profile of one formula."""
+    functions: Counter = field(default_factory=Counter)
+    column_scans: Counter = field(default_factory=Counter)  # (table, column) -> scans
+
+
+@dataclass
+class SheetCost:
+    """Aggregated scan profile of one worksheet."""
+    name: str
+    formula_cells: int = 0
+    functions: Counter = field(default_factory=Counter)
+    column_scans: Counter = field(default_factory=Counter)
+
+    def scans_per_row(self) -> Dict[str, int]:
+        """Column scans per table, i.e. the cost coefficient of each table's row count."""
+        per_table = Counter()
+        for (table, _), n in self.column_scans.items():
+            per_table[table] += n
+        return dict(per_table)
+
+    def estimated_cost(self, rows: Dict[str, int]) -> int:
+        """Cell visits for one full recalculation at the given table row counts."""
+        return sum(n * rows.get(table, 0) for table, n in self.scans_per_row().items())
+
+
+def analyze_formula(formula: str) -> FormulaCost:
+    """
+    Count scanning calls and table-column scans in one formula.
+
+    Args:
+        formula: Formula text including the leading "="
+
+    Returns:
+        FormulaCost; INDEX(..., MATCH(...)) pairs are counted as "INDEX/MATCH"
+    """
+    cost = FormulaCost()
+    stack: List[Tuple[str, list]] = []  # (function name or "", direct (table, column) args)
+
+    for tok in Tokenizer(formula).items:
+        if tok.type in (Token.FUNC, Token.PAREN) and tok.subtype == Token.OPEN:
+            name = tok.value[:-1].upper() if tok.type == Token.FUNC else ""
+            if name.startswith("_XLFN."):
+                name = name[6:]
+            stack.append((name, []))
+        elif tok.type in (Token.FUNC, Token.PAREN) and tok.subtype == Token.CLOSE:
+            if not stack:
+                continue
+            name, ranges = stack.pop()
+            if not name:
+                # A bare parenthesis passes its ranges through to the enclosing call
+                if stack:
+                    stack[-1][1].extend(ranges)
+                continue
+            if name == "MATCH" and stack and stack[-1][0] == "INDEX":
+                cost.functions["INDEX/MATCH"] += 1
+            elif name in SCANNING_FUNCTIONS:
+                cost.functions[name] += 1
+            if name in SCANNING_FUNCTIONS:
+                for ref in ranges:
+                    cost.column_scans[ref] += 1
+        elif tok.type == Token.OPERAND and tok.subtype == Token.RANGE and stack:
+            m = _TABLE_COLUMN.match(tok.value)
+            if m:
+                stack[-1][1].append((m.group(1), m.group(2)))
+
+    return cost
+
+
+def table_row_counts(path: str) -> Dict[str, int]:
+    """Data-row count of every table in the package, from the table parts' refs."""
+    counts = {}
+    with zipfile.ZipFile(path) as zf:
+        for name in zf.namelist():
+            if not name.startswith("xl/tables/"):
+                continue
+            head = zf.read(name)[:2048]
+            m = _TABLE_PART.search(head)
+            if m:
+                table, ref = m.group(1), m.group(2)
+            else:
+                m = _TABLE_PART_REV.search(head)
+                if not m:
+                    continue
+                ref, table = m.group(1), m.group(2)
+            rows = _ROWS.match(ref.decode())
+            if rows:
+                counts[table.decode()] = int(rows.group(2)) - int(rows.group(1))
+    return counts
+
+
+def analyze_workbook(path: str) -> List[SheetCost]:
+    """
+    Scan-profile every worksheet of a built workbook (.xlsx or .xlsm).
+
+    Args:
+        path: Workbook produced by build_structure (formulas, not cached values)
+
+    Returns:
+        One SheetCost per worksheet, in workbook order
+    """
+    wb = load_workbook(path, read_only=True)
+    cache: Dict[str, FormulaCost] = {}
+    sheets = []
+    try:
+        for ws in wb.worksheets:
+            sheet = SheetCost(ws.title)
+            for row in ws.iter_rows(values_only=True):
+                for value in row:
+                    if not (isinstance(value, str) and value.startswith("=")):
+                        continue
+                    cost = cache.get(value)
+                    if cost is None:
+                        cost = cache[value] = analyze_formula(value)
+                    sheet.formula_cells += 1
+                    sheet.functions.update(cost.functions)
+                    sheet.column_scans.update(cost.column_scans)
+            sheets.append(sheet)
+    finally:
+        wb.close()
+    return sheets
+
+
+def format_report(sheets: List[SheetCost], rows: Dict[str, int],
+                  show_columns: bool = False) -> str:
+    """
+    Render the per-sheet cost table, most expensive sheet first.
+
+    Args:
+        sheets: Output of analyze_workbook
+        rows: Table row counts the estimate is evaluated at
+        show_columns: Also list the scanned table columns under each sheet
+    """
+    total = sum(s.estimated_cost(rows) for s in sheets) or 1
+    lines = [
+        "Rows: " + ", ".join(f"{t}={rows.get(t, 0):,}" for t in DATA_TABLES),
+        "",
+        f"{'Sheet':<26}{'Formulas':>9}{'SUMIFS':>8}{'COUNTIFS':>9}{'IDX/MATCH':>10}"
+        f"{'Scans/row':>11}{'Est. cost':>16}{'Share':>7}",
+        "-" * 96,
+    ]
+    ranked = sorted(sheets, key=lambda s: s.estimated_cost(rows), reverse=True)
+    for s in ranked:
+        if not s.formula_cells:
+            continue
+        cost = s.estimated_cost(rows)
+        lines.append(
+            f"{s.name[:25]:<26}{s.formula_cells:>9,}{s.functions['SUMIFS']:>8,}"
+            f"{s.functions['COUNTIFS']:>9,}{s.functions['INDEX/MATCH']:>10,}"
+            f"{sum(s.scans_per_row().values()):>11,}{cost:>16,}{cost / total:>7.1%}"
+        )
+        if show_columns:
+            for (table, column), n in s.column_scans.most_common():
+                lines.append(f"    {table}[{column}]: {n:,} scans")
+    lines.append("-" * 96)
+    lines.append(f"{'TOTAL':<26}{sum(s.formula_cells for s in sheets):>9,}"
+                 f"{'':>38}{sum(s.estimated_cost(rows) for s in sheets):>16,}")
+    lines.append("")
+    lines.append("Cost = sum over tables of scans/row x table rows (cell visits per full recalc)")
+    return "\n".join(lines)
+
+
+def resolve_rows(path: str, overrides: Optional[Dict[str, int]] = None) -> Dict[str, int]:
+    """Table row counts from the workbook, with any overrides applied."""
+    rows = table_row_counts(path)
+    rows.update(overrides or {})
+    return rows
@@ -0,0 +1,938 @@
+"""
+Bed Utilization Workbook - Formula evaluator
+Computes the formulas the Phase 1 builders emit, so their values can be
+stored as cached values (see xlsx/cached_values.py).
+
+Supported: IFERROR, IF, AND, OR, NOT, SUMIFS, COUNTIFS, INDEX, MATCH, DATE,
+INT, N, ISNUMBER, ISBLANK, SUM, MIN, MAX, ROUND; the operators + - * / ^ &
+and comparisons, unary minus and %; array constants {1,2;3,4}; same-sheet
+cell and range references; and structured references tbl[Col] /
+tbl[[#This Row],[Col]].
+Anything else raises UnsupportedFormula, and the caller leaves that cell for
+Excel to calculate.
+
+Formulas are compiled once per template: string, number and cell literals
+are lifted out as parameters, so the 31 x 12 x 7 SUMIFS cells of a ward sheet
+share one compiled template. SUMIFS/COUNTIFS equality criteria on table
+columns are answered from hash indexes built on first use, and MATCH(...,0)
+from a first-occurrence dictionary.
+"""
+import math
+import re
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from openpyxl.utils import column_index_from_string
+
+EXCEL_EPOCH = date(1899, 12, 30)
+
+
+class UnsupportedFormula(Exception):
+    """The formula uses syntax or a function the evaluator does not implement."""
+
+
+class ExcelError:
+    """An Excel error value (#N/A, #VALUE!, ...); propagates through operators."""
+    __slots__ = ("code",)
+
+    def __init__(self, code: str):
+        self.code = code
+
+    def __repr__(self):
+        return self.code
+
+
+NA = ExcelError("#N/A")
+VALUE = ExcelError("#VALUE!")
+DIV0 = ExcelError("#DIV/0!")
+REF = ExcelError("#REF!")
+NUM = ExcelError("#NUM!")
+
+
+class Range:
+    """A 1-D or 2-D block of values; `key` identifies a table column for indexing."""
+    __slots__ = ("rows", "key")
+
+    def __init__(self, rows: List[list], key=None):
+        self.rows = rows
+        self.key = key
+
+    def flat(self):
+        return [v for row in self.rows for v in row]
+
+    @property
+    def width(self):
+        return len(self.rows[0]) if self.rows else 0
+
+
+# ─── Lexer ─────────────────────────────────────────────────────────────────
+
+_TOKEN = re.compile(r'''
+    (?P<ws>\s+)
+   |(?P<str>"(?:[^"]|"")*")
+   |(?P<sref>[A-Za-z_][A-Za-z0-9_.]*\[(?:[^\[\]]|\[[^\]]*\])*\])
+   |(?P<func>[A-Za-z][A-Za-z0-9._]*)\(
+   |(?P<range>\$?[A-Z]{1,3}\$?\d+:\$?[A-Z]{1,3}\$?\d+)
+   |(?P<cell>\$?[A-Z]{1,3}\$?\d+)
+   |(?P<num>\d+\.?\d*(?:[eE][+-]?\d+)?|\.\d+)
+   |(?P<bool>TRUE|FALSE)
+   |(?P<op><>|<=|>=|[-+*/^&=<>%(),{};])
+''', re.X)
+
+_CELL_PARTS = re.compile(r"\$?([A-Z]{1,3})\$?(\d+)")
+
+
+def _cell_coord(text: str) -> Tuple[int, int]:
+    letters, digits = _CELL_PARTS.fullmatch(text).groups()
+    return int(digits), column_index_from_string(letters)
+
+
+def _lex(formula: str):
+    """(shape, params): token shape with literals replaced by '?', and the literals."""
+    shape, params = [], []
+    pos = 0
+    for m in _TOKEN.finditer(formula):
+        if m.start() != pos:
+            raise UnsupportedFormula(f"Cannot parse {formula[pos:m.start() + 10]!r}")
+        pos = m.end()
+        kind = m.lastgroup
+        text = m.group(kind)
+        if kind == "ws":
+            continue
+        if kind == "str":
+            params.append(text[1:-1].replace('""', '"'))
+            shape.append(("str", None))
+        elif kind == "num":
+            params.append(float(text))
+            shape.append(("num", None))
+        elif kind == "cell":
+            params.append(_cell_coord(text))
+            shape.append(("cell", None))
+        elif kind == "range":
+            a, b = text.split(":")
+            params.append((_cell_coord(a), _cell_coord(b)))
+            shape.append(("range", None))
+        elif kind == "func":
+            shape.append(("func", text.upper()))
+        else:
+            shape.append((kind, text))
+    if pos != len(formula):
+        raise UnsupportedFormula(f"Cannot parse {formula[pos:pos + 10]!r}")
+    return tuple(shape), params
+
+
+# ─── Parser / compiler ─────────────────────────────────────────────────────
+# Each node compiles to fn(ctx, params) -> value.
+
+_COMPARE = {"=", "<>", "<", ">", "<=", ">="}
+
+
+class _Parser:
+    def __init__(self, shape):
+        self.shape = shape
+        self.i = 0
+        self.param = 0
+
+    def peek(self):
+        return self.shape[self.i] if self.i < len(self.shape) else (None, None)
+
+    def take(self):
+        tok = self.peek()
+        self.i += 1
+        return tok
+
+    def expect(self, value):
+        kind, text = self.take()
+        if text != value:
+            raise UnsupportedFormula(f"Expected {value!r}, got {text!r}")
+
+    def parse(self):
+        node = self.comparison()
+        if self.i != len(self.shape):
+            raise UnsupportedFormula(f"Unexpected {self.peek()[1]!r}")
+        return node
+
+    def comparison(self):
+        left = self.concat()
+        while self.peek()[0] == "op" and self.peek()[1] in _COMPARE:
+            op = self.take()[1]
+            left = _binary(op, left, self.concat())
+        return left
+
+    def concat(self):
+        left = self.additive()
+        while self.peek() == ("op", "&"):
+            self.take()
+            left = _binary("&", left, self.additive())
+        return left
+
+    def additive(self):
+        left = self.term()
+        while self.peek()[0] == "op" and self.peek()[1] in "+-":
+            op = self.take()[1]
+            left = _binary(op, left, self.term())
+        return left
+
+    def term(self):
+        left = self.power()
+        while self.peek()[0] == "op" and self.peek()[1] in "*/":
+            op = self.take()[1]
+            left = _binary(op, left, self.power())
+        return left
+
+    def power(self):
+        left = self.unary()
+        while self.peek() == ("op", "^"):
+            self.take()
+            left = _binary("^", left, self.unary())
+        return left
+
+    def unary(self):
+        if self.peek() == ("op", "-"):
+            self.take()
+            inner = self.unary()
+            return lambda ctx, p: _arith("-", 0.0, inner(ctx, p))
+        if self.peek() == ("op", "+"):
+            self.take()
+            return self.unary()
+        node = self.primary()
+        if self.peek() == ("op", "%"):
+            self.take()
+            base = node
+            node = lambda ctx, p: _arith("/", base(ctx, p), 100.0)
+        return node
+
+    def primary(self):
+        kind, text = self.take()
+        if kind in ("str", "num"):
+            idx = self.param
+            self.param += 1
+            return lambda ctx, p: p[idx]
+        if kind == "bool":
+            value = text == "TRUE"
+            return lambda ctx, p: value
+        if kind == "cell":
+            idx = self.param
+            self.param += 1
+            return lambda ctx, p: ctx.cell(*p[idx])
+        if kind == "range":
+            idx = self.param
+            self.param += 1
+            return lambda ctx, p: ctx.range(*p[idx])
+        if kind == "sref":
+            return _structured_ref(text)
+        if kind == "func":
+            args = []
+            if self.peek() != ("op", ")"):
+                while True:
+                    if self.peek()[1] in (",", ")"):
+                        args.append(lambda ctx, p: None)  # omitted argument
+                    else:
+                        args.append(self.comparison())
+                    if self.peek() == ("op", ","):
+                        self.take()
+                        continue
+                    break
+            self.expect(")")
+            impl = _FUNCTIONS.get(text)
+            if impl is None:
+                raise UnsupportedFormula(f"Function {text} is not supported")
+            return lambda ctx, p: impl(ctx, p, args)
+        if (kind, text) == ("op", "("):
+            node = self.comparison()
+            self.expect(")")
+            return node
+        if (kind, text) == ("op", "{"):
+            return self.array()
+        raise UnsupportedFormula(f"Unexpected {text!r}")
+
+    def array(self):
+        """Array constant after "{": literals, "," between columns, ";" between rows."""
+        rows = [[]]
+        while True:
+            negative = self.peek() == ("op", "-")
+            if negative:
+                self.take()
+            kind, text = self.take()
+            if kind in ("str", "num") and not (negative and kind == "str"):
+                rows[-1].append((self.param, negative))
+                self.param += 1
+            elif kind == "bool" and not negative:
+                rows[-1].append((None, text == "TRUE"))
+            else:
+                raise UnsupportedFormula(f"Unexpected {text!r} in array constant")
+            sep = self.take()[1]
+            if sep == ";":
+                rows.append([])
+            elif sep != ",":
+                if sep != "}":
+                    raise UnsupportedFormula(f"Unexpected {sep!r} in array constant")
+                break
+        if len({len(r) for r in rows}) != 1:
+            raise UnsupportedFormula("Array constant rows differ in length")
+
+        def item(p, idx, flag):
+            if idx is None:
+                return flag
+            return -p[idx] if flag else p[idx]
+
+        return lambda ctx, p: Range([[item(p, idx, flag) for idx, flag in row] for row in rows])
+
+
+_SREF = re.compile(r"([A-Za-z_][A-Za-z0-9_.]*)\[(.*)\]$")
+
+
+def _structured_ref(text: str):
+    table, inner = _SREF.match(text).groups()
+    if inner.startswith("["):
+        items = re.findall(r"\[([^\]]*)\]", inner)
+    else:
+        items = [inner]
+    this_row = False
+    columns = []
+    for item in items:
+        if item.lower() in ("#this row", "@"):
+            this_row = True
+        elif item.lower() == "#data":
+            continue
+        elif item.startswith("#"):
+            raise UnsupportedFormula(f"Structured reference {text} is not supported")
+        else:
+            columns.append(item.replace("'", ""))
+    if len(columns) != 1:
+        raise UnsupportedFormula(f"Structured reference {text} is not supported")
+    column = columns[0]
+    if this_row:
+        return lambda ctx, p: ctx.this_row(table, column)
+    return lambda ctx, p: ctx.column(table, column)
+
+
+# ─── Value semantics ───────────────────────────────────────────────────────
+
+def _scalar(v):
+    if isinstance(v, Range):
+        return VALUE  # implicit intersection is not supported
+    return v
+
+
+def _to_number(v):
+    v = _scalar(v)
+    if isinstance(v, ExcelError):
+        return v
+    if v is None:
+        return 0.0
+    if isinstance(v, bool):
+        return float(v)
+    if isinstance(v, (int, float)):
+        return float(v)
+    try:
+        return float(v)
+    except ValueError:
+        return VALUE
+
+
+def to_text(v) -> str:
+    """Excel's General-format text of a value (as used by &)."""
+    if v is None:
+        return ""
+    if isinstance(v, bool):
+        return "TRUE" if v else "FALSE"
+    if isinstance(v, float):
+        if v.is_integer() and abs(v) < 1e15:
+            return str(int(v))
+        return format(v, ".15g")
+    return str(v)
+
+
+def _arith(op, a, b):
+    a, b = _to_number(a), _to_number(b)
+    if isinstance(a, ExcelError):
+        return a
+    if isinstance(b, ExcelError):
+        return b
+    if op == "+":
+        return a + b
+    if op == "-":
+        return a - b
+    if op == "*":
+        return a * b
+    if op == "/":
+        return DIV0 if b == 0 else a / b
+    try:
+        return float(a ** b)
+    except (OverflowError, ZeroDivisionError, ValueError):
+        return NUM
+
+
+def _rank(v):
+    # Excel orders numbers < text < logicals; blanks compare as 0 or ""
+    if isinstance(v, bool):
+        return 2
+    if isinstance(v, str):
+        return 1
+    return 0
+
+
+def _compare(op, a, b):
+    a, b = _scalar(a), _scalar(b)
+    if isinstance(a, ExcelError):
+        return a
+    if isinstance(b, ExcelError):
+        return b
+    if a is None:
+        a = "" if isinstance(b, str) else (False if isinstance(b, bool) else 0.0)
+    if b is None:
+        b = "" if isinstance(a, str) else (False if isinstance(a, bool) else 0.0)
+    ra, rb = _rank(a), _rank(b)
+    if ra != rb:
+        a, b = ra, rb
+    elif ra == 1:
+        a, b = a.lower(), b.lower()
+    if op == "=":
+        return a == b
+    if op == "<>":
+        return a != b
+    if op == "<":
+        return a < b
+    if op == ">":
+        return a > b
+    if op == "<=":
+        return a <= b
+    return a >= b
+
+
+def _binary(op, left, right):
+    if op in _COMPARE:
+        return lambda ctx, p: _compare(op, left(ctx, p), right(ctx, p))
+    if op == "&":
+        def concat(ctx, p):
+            a, b = _scalar(left(ctx, p)), _scalar(right(ctx, p))
+            if isinstance(a, ExcelError):
+                return a
+            if isinstance(b, ExcelError):
+                return b
+            return to_text(a) + to_text(b)
+        return concat
+    return lambda ctx, p: _arith(op, left(ctx, p), right(ctx, p))
+
+
+def _truthy(v):
+    v = _scalar(v)
+    if isinstance(v, ExcelError):
+        return v
+    if v is None:
+        return False
+    if isinstance(v, str):
+        if v.upper() in ("TRUE", "FALSE"):
+            return v.upper() == "TRUE"
+        return VALUE
+    return bool(v)
+
+
+# ─── Criteria (SUMIFS / COUNTIFS) ──────────────────────────────────────────
+
+_CRITERION = re.compile(r"^(<=|>=|<>|<|>|=)?(.*)$", re.S)
+
+
+def _norm(v):
+    """Hash key under which a cell matches an equality criterion."""
+    if isinstance(v, bool):
+        return ("b", v)
+    if isinstance(v, float):
+        return v
+    if isinstance(v, int):
+        return float(v)
+    if isinstance(v, str):
+        try:
+            return float(v)
+        except ValueError:
+            return v.lower()
+    return None
+
+
+def _criterion(value):
+    """(equality_key or None, predicate) for one criterion value."""
+    value = _scalar(value)
+    if isinstance(value, ExcelError):
+        return None, None
+    if not isinstance(value, str):
+        key = _norm(value if value is not None else 0.0)
+        return key, lambda v: _norm(v) == key
+    op, operand = _CRITERION.match(value).groups()
+    if not op or op == "=":
+        if operand == "":
+            return None, lambda v: v is None or v == ""
+        if "*" in operand or "?" in operand:
+            pattern = re.compile(
+                "".join(".*" if ch == "*" else "." if ch == "?" else re.escape(ch) for ch in operand),
+                re.I | re.S)
+            return None, lambda v: isinstance(v, str) and pattern.fullmatch(v) is not None
+        key = _norm(operand)
+        return key, lambda v: _norm(v) == key
+    try:
+        target = float(operand)
+        numeric = True
+    except ValueError:
+        target, numeric = operand.lower(), False
+
+    def pred(v):
+        if op == "<>":
+            if operand == "":
+                return v is not None and v != ""   # "<>" alone: non-blank cells
+            return _norm(v) != target
+        if numeric:
+            if isinstance(v, bool) or not isinstance(v, (int, float)):
+                return False
+        elif not isinstance(v, str):
+            return False
+        else:
+            v = v.lower()
+        if op == "<":
+            return v < target
+        if op == ">":
+            return v > target
+        if op == "<=":
+            return v <= target
+        return v >= target
+    return None, pred
+
+
+def _matching_rows(ctx, pairs) -> Optional[List[int]]:
+    """Row indices satisfying every (range, criterion) pair; None on a shape error."""
+    ranges = [r for r, _ in pairs]
+    if any(not isinstance(r, Range) for r in ranges):
+        return None
+    length = len(ranges[0].rows)
+    if any(len(r.rows) != length or r.width != 1 for r in ranges):
+        return None
+
+    eq_ranges, eq_keys, others = [], [], []
+    for rng, crit in pairs:
+        key, pred = _criterion(crit)
+        if pred is None:
+            return None
+        if key is not None and rng.key is not None:
+            eq_ranges.append(rng)
+            eq_keys.append(key)
+        else:
+            others.append((rng, pred))
+
+    if eq_ranges:
+        rows = ctx.index(eq_ranges).get(tuple(eq_keys), ())
+    else:
+        rows = range(length)
+    for rng, pred in others:
+        rows = [i for i in rows if pred(rng.rows[i][0])]
+    return rows
+
+
+def _criteria_pairs(ctx, p, args):
+    values = [a(ctx, p) for a in args]
+    return list(zip(values[0::2], values[1::2]))
+
+
+def _sumifs(ctx, p, args):
+    if len(args) < 3 or len(args) % 2 == 0:
+        raise UnsupportedFormula("SUMIFS needs a sum range and criteria pairs")
+    total_range = args[0](ctx, p)
+    pairs = _criteria_pairs(ctx, p, args[1:])
+    rows = _matching_rows(ctx, pairs)
+    if rows is None or not isinstance(total_range, Range) or len(total_range.rows) != len(pairs[0][0].rows):
+        return VALUE
+    total = 0.0
+    for i in rows:
+        v = total_range.rows[i][0]
+        if isinstance(v, float) or (isinstance(v, int) and not isinstance(v, bool)):
+            total += v
+    return total
+
+
+def _countifs(ctx, p, args):
+    if not args or len(args) % 2:
+        raise UnsupportedFormula("COUNTIFS needs criteria pairs")
+    rows = _matching_rows(ctx, _criteria_pairs(ctx, p, args))
+    return VALUE if rows is None else float(len(rows))
+
+
+# ─── Other functions ───────────────────────────────────────────────────────
+
+def _iferror(ctx, p, args):
+    v = _scalar(args[0](ctx, p))
+    if isinstance(v, ExcelError):
+        return args[1](ctx, p) if len(args) > 1 else 0.0
+    return v
+
+
+def _if(ctx, p, args):
+    cond = _truthy(args[0](ctx, p))
+    if isinstance(cond, ExcelError):
+        return cond
+    if cond:
+        return args[1](ctx, p) if len(args) > 1 else True
+    return args[2](ctx, p) if len(args) > 2 else False
+
+
+def _logical(combine):
+    def fn(ctx, p, args):
+        results = []
+        for a in args:
+            v = a(ctx, p)
+            items = v.flat() if isinstance(v, Range) else [v]
+            for item in items:
+                if isinstance(item, ExcelError):
+                    return item
+                if item is None or (isinstance(item, str) and isinstance(v, Range)):
+                    continue
+                t = _truthy(item)
+                if isinstance(t, ExcelError):
+                    return t
+                results.append(t)
+        return combine(results) if results else VALUE
+    return fn
+
+
+def _not(ctx, p, args):
+    t = _truthy(args[0](ctx, p))
+    return t if isinstance(t, ExcelError) else not t
+
+
+def _numbers(ctx, p, args):
+    """Numbers of a SUM/MIN/MAX argument list (text and blanks in ranges are skipped)."""
+    out = []
+    for a in args:
+        v = a(ctx, p)
+        if isinstance(v, Range):
+            for item in v.flat():
+                if isinstance(item, ExcelError):
+                    return item
+                if isinstance(item, float) or (isinstance(item, int) and not isinstance(item, bool)):
+                    out.append(float(item))
+        else:
+            n = _to_number(v)
+            if isinstance(n, ExcelError):
+                return n
+            out.append(n)
+    return out
+
+
+def _aggregate(combine, empty=0.0):
+    def fn(ctx, p, args):
+        nums = _numbers(ctx, p, args)
+        if isinstance(nums, ExcelError):
+            return nums
+        return combine(nums) if nums else empty
+    return fn
+
+
+def _round(ctx, p, args):
+    x = _to_number(args[0](ctx, p))
+    digits = _to_number(args[1](ctx, p)) if len(args) > 1 else 0.0
+    for v in (x, digits):
+        if isinstance(v, ExcelError):
+            return v
+    factor = 10 ** int(digits)
+    # Excel rounds half away from zero
+    return math.copysign(math.floor(abs(x) * factor + 0.5) / factor, x)
+
+
+def _int(ctx, p, args):
+    x = _to_number(args[0](ctx, p))
+    return x if isinstance(x, ExcelError) else float(math.floor(x))
+
+
+def _n(ctx, p, args):
+    v = _scalar(args[0](ctx, p))
+    if isinstance(v, ExcelError):
+        return v
+    if isinstance(v, bool):
+        return float(v)
+    if isinstance(v, (int, float)):
+        return float(v)
+    return 0.0
+
+
+def _isnumber(ctx, p, args):
+    v = _scalar(args[0](ctx, p))
+    return isinstance(v, (int, float)) and not isinstance(v, bool)
+
+
+def _isblank(ctx, p, args):
+    return _scalar(args[0](ctx, p)) is None
+
+
+def date_serial(y: int, m: int, d: int) -> float:
+    """Excel DATE(): months and days may overflow into the next month/year."""
+    y += (m - 1) // 12
+    m = (m - 1) % 12 + 1
+    return float((date(y, m, 1) + timedelta(days=d - 1) - EXCEL_EPOCH).days)
+
+
+def _date(ctx, p, args):
+    parts = [_to_number(a(ctx, p)) for a in args[:3]]
+    for v in parts:
+        if isinstance(v, ExcelError):
+            return v
+    if len(parts) != 3:
+        return VALUE
+    y, m, d = (int(math.floor(v)) for v in parts)
+    if y < 1900:
+        y += 1900
+    try:
+        return date_serial(y, m, d)
+    except (ValueError, OverflowError):
+        return NUM
+
+
+def _index(ctx, p, args):
+    rng = args[0](ctx, p)
+    if not isinstance(rng, Range):
+        return REF
+    row = _to_number(args[1](ctx, p)) if len(args) > 1 else 0.0
+    col = _to_number(args[2](ctx, p)) if len(args) > 2 else 0.0
+    for v in (row, col):
+        if isinstance(v, ExcelError):
+            return v
+    row, col = int(row), int(col)
+    if rng.width == 1 and col <= 1:
+        col = 1
+    elif len(rng.rows) == 1 and len(args) == 2:
+        row, col = 1, row
+    if row < 1 or col < 1 or row > len(rng.rows) or col > rng.width:
+        return REF
+    v = rng.rows[row - 1][col - 1]
+    return v
+
+
+def _match(ctx, p, args):
+    target = _scalar(args[0](ctx, p))
+    rng = args[1](ctx, p)
+    kind = _to_number(args[2](ctx, p)) if len(args) > 2 else 1.0
+    if isinstance(target, ExcelError):
+        return target
+    if not isinstance(rng, Range) or isinstance(kind, ExcelError):
+        return NA
+    if kind == 0:
+        pos = ctx.first_positions(rng).get(_norm(target))
+        return NA if pos is None else float(pos + 1)
+    # Approximate match on sorted data: last position not past the target
+    values = rng.flat()
+    best = None
+    for i, v in enumerate(values):
+        if v is None or _rank(v) != _rank(target):
+            continue
+        ok = _compare("<=", v, target) if kind > 0 else _compare(">=", v, target)
+        if ok is True:
+            best = i
+        elif best is not None:
+            break
+    return NA if best is None else float(best + 1)
+
+
+_FUNCTIONS: Dict[str, Callable] = {
+    "IFERROR": _iferror,
+    "IF": _if,
+    "AND": _logical(all),
+    "OR": _logical(any),
+    "NOT": _not,
+    "SUMIFS": _sumifs,
+    "COUNTIFS": _countifs,
+    "SUM": _aggregate(sum),
+    "MIN": _aggregate(min),
+    "MAX": _aggregate(max),
+    "ROUND": _round,
+    "INT": _int,
+    "N": _n,
+    "ISNUMBER": _isnumber,
+    "ISBLANK": _isblank,
+    "DATE": _date,
+    "INDEX": _index,
+    "MATCH": _match,
+}
+
+
+# Literal scan used to key the template cache without a full lex: strings,
+# cell/range references and numbers. It does not know about structured
+# references; compile_formula checks it against the lexer once per template.
+_LITERALS = re.compile(r'''
+    (?P<str>"[^"]*(?:""[^"]*)*")
+   |(?<![A-Za-z0-9_.\[])(?:
+        (?P<range>\$?[A-Z]{1,3}\$?\d+:\$?[A-Z]{1,3}\$?\d+)
+       |(?P<cell>\$?[A-Z]{1,3}\$?\d+)(?![A-Za-z0-9_(])
+       |(?P<num>\d+\.?\d*(?:[eE][+-]?\d+)?|\.\d+))
+''', re.X)
+
+_compiled: Dict[str, tuple] = {}
+
+
+def _template(formula: str):
+    """(template key, params) - the key is the formula with every literal blanked."""
+    pieces, params = [], []
+    pos = 0
+    for m in _LITERALS.finditer(formula):
+        kind = m.lastgroup
+        pieces.append(formula[pos:m.start()])
+        text = m.group()
+        if kind == "str":
+            pieces.append('"')
+            params.append(text[1:-1].replace('""', '"'))
+        elif kind == "num":
+            pieces.append("#")
+            params.append(float(text))
+        elif kind == "cell":
+            pieces.append("@")
+            params.append(_cell_coord(text))
+        else:
+            pieces.append("@:@")
+            a, b = text.split(":")
+            params.append((_cell_coord(a), _cell_coord(b)))
+        pos = m.end()
+    pieces.append(formula[pos:])
+    return "".join(pieces), params
+
+
+def compile_formula(formula: str):
+    """(fn, params) for a formula (without the leading '='); fn(ctx, params) -> value."""
+    key, params = _template(formula)
+    entry = _compiled.get(key)
+    if entry is None:
+        shape, lexed = _lex(formula)
+        # The quick literal scan must agree with the lexer, otherwise always lex
+        entry = (_Parser(shape).parse(), lexed == params)
+        _compiled[key] = entry
+        return entry[0], lexed
+    fn, fast = entry
+    return fn, (params if fast else _lex(formula)[1])
+
+
+# ─── Evaluation context ────────────────────────────────────────────────────
+
+class Evaluator:
+    """
+    Evaluates formulas of one sheet against the workbook's tables.
+
+    Args:
+        tables: Table name -> reader.TableData (values column by column)
+    """
+
+    def __init__(self, tables):
+        self.tables = {name.lower(): t for name, t in tables.items()}
+        self._columns: Dict[tuple, Range] = {}
+        self._indexes: Dict[tuple, dict] = {}
+        self._firsts: Dict[tuple, dict] = {}
+        self.cells: Dict[Tuple[int, int], object] = {}
+        self.formulas: Dict[Tuple[int, int], str] = {}
+        self._done: Dict[Tuple[int, int], object] = {}
+        self._row_context = None
+
+    # Sheet cells ---------------------------------------------------------
+    def set_sheet(self, cells: Dict[Tuple[int, int], object], formulas: Dict[Tuple[int, int], str]):
+        """Cells (constants) and formulas of the sheet to evaluate."""
+        self.cells = cells
+        self.formulas = formulas
+        self._done = {}
+
+    def cell(self, row: int, col: int):
+        key = (row, col)
+        if key in self._done:
+            v = self._done[key]
+            if v is _IN_PROGRESS:
+                raise UnsupportedFormula(f"Circular reference at row {row}, column {col}")
+            return v
+        formula = self.formulas.get(key)
+        if formula is None:
+            return self.cells.get(key)
+        self._done[key] = _IN_PROGRESS
+        try:
+            value = self.evaluate(formula)
+        except BaseException:
+            del self._done[key]
+            raise
+        self._done[key] = value
+        return value
+
+    def range(self, a, b):
+        (r1, c1), (r2, c2) = a, b
+        r1, r2 = sorted((r1, r2))
+        c1, c2 = sorted((c1, c2))
+        return Range([[self.cell(r, c) for c in range(c1, c2 + 1)] for r in range(r1, r2 + 1)])
+
+    def value(self, row: int, col: int):
+        """Final value of a formula cell (evaluating dependencies first)."""
+        return self.cell(row, col)
+
+    # Tables -------------------------------------------------------------
+    def _table(self, name):
+        table = self.tables.get(name.lower())
+        if table is None:
+            raise UnsupportedFormula(f"Unknown table {name}")
+        return table
+
+    def column(self, table_name: str, column: str) -> Range:
+        key = (table_name.lower(), column.lower())
+        rng = self._columns.get(key)
+        if rng is None:
+            table = self._table(table_name)
+            lookup = {c.lower(): c for c in table.columns}
+            if column.lower() not in lookup:
+                raise UnsupportedFormula(f"Unknown column {table_name}[{column}]")
+            rng = Range([[v] for v in table.values[lookup[column.lower()]]], key)
+            self._columns[key] = rng
+        return rng
+
+    def this_row(self, table_name: str, column: str):
+        if self._row_context is None or self._row_context[0] != table_name.lower():
+            raise UnsupportedFormula("[#This Row] outside its table")
+        return self.column(table_name, column).rows[self._row_context[1]][0]
+
+    def index(self, ranges: List[Range]) -> dict:
+        """Equality index over table columns: normalised value tuple -> row indices."""
+        key = tuple(r.key for r in ranges)
+        idx = self._indexes.get(key)
+        if idx is None:
+            idx = {}
+            columns = [[_norm(row[0]) for row in r.rows] for r in ranges]
+            for i, values in enumerate(zip(*columns)):
+                idx.setdefault(values, []).append(i)
+            self._indexes[key] = idx
+        return idx
+
+    def first_positions(self, rng: Range) -> dict:
+        cache_key = rng.key or id(rng)
+        firsts = self._firsts.get(cache_key) if rng.key else None
+        if firsts is None:
+            firsts = {}
+            for i, v in enumerate(rng.flat()):
+                if v is not None:
+                    firsts.setdefault(_norm(v), i)
+            if rng.key:
+                self._firsts[cache_key] = firsts
+        return firsts
+
+    def fill_calculated_columns(self):
+        """Compute calculated-column cells that carry no cached value."""
+        for table in self.tables.values():
+            for column, formula in table.formulas.items():
+                values = table.values[column]
+                if all(v is not None for v in values):
+                    continue
+                fn, params = compile_formula(formula.lstrip("="))
+                for i, v in enumerate(values):
+                    if v is None and any(table.values[c][i] is not None
+                                         for c in table.columns if c != column):
+                        self._row_context = (table.name.lower(), i)
+                        try:
+                            result = fn(self, params)
+                        finally:
+                            self._row_context = None
+                        values[i] = None if isinstance(result, (ExcelError, Range)) else result
+                # Indexes built before the fill would be stale
+                self._columns.pop((table.name.lower(), column.lower()), None)
+        self._indexes.clear()
+        self._firsts.clear()
+
+    def evaluate(self, formula: str):
+        fn, params = compile_formula(formula.lstrip("="))
+        return _scalar(fn(self, params))
+
+
+_IN_PROGRESS = object()
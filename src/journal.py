@@ -0,0 +1,327 @@
+"""
+Bed Utilization Workbook - Entry journal
+An append-only record of every change to tblDaily, tblAdmissions,
+tblDeaths, tblTransfers and tblWardConfig, from which the tables (and the
+PrevRemaining/Remaining chain) can be rebuilt at any time. The workbook
+becomes a view of the journal: a bad edit is undone by journaling the
+correction, and every earlier value stays on record.
+
+The journal is JSON Lines, one event per line:
+
+    {"seq": 12, "at": "2026-03-02 08:15:00", "op": "put", "table": "tblDaily",
+     "key": "MW|2026-03-01", "values": {...}, "source": "SaveDailyEntry"}
+
+"put" inserts a record or replaces the one with the same key, as
+SaveDailyEntry replaces an existing (date, ward) entry; "delete" removes it.
+Records are keyed by KEY_COLUMNS: tblDaily by ward and date, the record
+tables by their IDs, tblWardConfig by ward code. Dates are ISO text, blank
+columns are left out, and tblDaily's PrevRemaining/Remaining are not
+journaled (they are recomputed on replay).
+
+Events come from data_entry.append_records (given a journal) and from
+import_workbook, which journals only what differs from the journal's
+current tables, so re-importing a workbook records just its corrections.
+
+Every SNAPSHOT_EVERY events the current tables are written to
+<journal>.snapshot together with the journal offset they cover, so a replay
+reads the snapshot and only the events after it. A last line cut short by a
+crash is ignored on replay and trimmed before the next append.
+"""
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .data_entry import DATE_FORMAT, TIMESTAMP_FORMAT
+from .remaining import compute_remaining, ward_prev_year
+from .xlsx.columnar import DATE, TABLE_SCHEMAS, TIMESTAMP, ColumnarTable, column_values, convert_column, load_tables
+from .xlsx.table_append import append_table_rows
+
+JOURNAL_TABLES = ["tblDaily", "tblAdmissions", "tblDeaths", "tblTransfers", "tblWardConfig"]
+KEY_COLUMNS = {
+    "tblDaily": ("WardCode", "EntryDate"),
+    "tblAdmissions": ("AdmissionID",),
+    "tblDeaths": ("DeathID",),
+    "tblTransfers": ("TransferID",),
+    "tblWardConfig": ("WardCode",),
+}
+# Columns replay recomputes rather than reads
+DERIVED_COLUMNS = {"tblDaily": ("PrevRemaining", "Remaining")}
+PUT, DELETE = "put", "delete"
+SNAPSHOT_EVERY = 5000
+
+Record = Dict[str, object]
+
+
+@dataclass
+class Event:
+    seq: int
+    at: str
+    op: str               # PUT or DELETE
+    table: str
+    key: str
+    values: Optional[Record] = None
+    source: str = ""
+
+
+@dataclass
+class JournalState:
+    """The tables as of event `seq`: table -> key -> record, in first-put order."""
+    seq: int = 0
+    offset: int = 0       # journal bytes covered
+    tables: Dict[str, Dict[str, Record]] = field(default_factory=lambda: {t: {} for t in JOURNAL_TABLES})
+
+    def apply(self, event: Event):
+        records = self.tables[event.table]
+        if event.op == PUT:
+            records[event.key] = event.values
+        else:
+            records.pop(event.key, None)
+        self.seq = event.seq
+
+
+def _json_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ", timespec="seconds")
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def journal_values(table: str, values: Record) -> Record:
+    """A record as journaled: JSON values, blank and derived columns left out."""
+    derived = DERIVED_COLUMNS.get(table, ())
+    values = {c: _json_value(v) for c, v in values.items() if c not in derived}
+    return {c: v for c, v in values.items() if v is not None and v != ""}
+
+
+def record_key(table: str, values: Record) -> str:
+    """Journal key of a record (KEY_COLUMNS joined with "|")."""
+    parts = []
+    for column in KEY_COLUMNS[table]:
+        value = _json_value(values.get(column))
+        if value is None or value == "":
+            raise ValueError(f"{table} record has no {column}: {values}")
+        parts.append(str(value)[:10] if TABLE_SCHEMAS[table].get(column) == DATE else str(value))
+    return "|".join(parts)
+
+
+def _read_events(path: str, offset: int = 0) -> Iterator[Tuple[Event, int]]:
+    """Events from byte `offset` on, each with the offset after it."""
+    if not os.path.exists(path):
+        return
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for line in f:
+            if not line.endswith(b"\n"):
+                return      # torn last line
+            offset += len(line)
+            if line.strip():
+                yield Event(**json.loads(line)), offset
+
+
+class Journal:
+    """
+    An entry journal file and its snapshot.
+
+    Args:
+        path: Journal file (.jsonl); created on the first event
+        snapshot_every: Events between automatic snapshots (0 = never)
+    """
+
+    def __init__(self, path: str, snapshot_every: int = SNAPSHOT_EVERY):
+        self.path = path
+        self.snapshot_path = path + ".snapshot"
+        self.snapshot_every = snapshot_every
+        self._state: Optional[JournalState] = None
+        self._snapshot_seq = 0
+
+    # Reading -------------------------------------------------------------
+    def state(self) -> JournalState:
+        """Current tables: the snapshot plus the events after it."""
+        if self._state is None:
+            state = JournalState()
+            if os.path.exists(self.snapshot_path):
+                with open(self.snapshot_path) as f:
+                    saved = json.load(f)
+                state = JournalState(saved["seq"], saved["offset"], saved["tables"])
+            self._snapshot_seq = state.seq
+            for event, offset in _read_events(self.path, state.offset):
+                state.apply(event)
+                state.offset = offset
+            self._state = state
+        return self._state
+
+    def history(self, table: str, key: str) -> List[Event]:
+        """Every event of one record, oldest first (reads the whole journal)."""
+        return [e for e, _ in _read_events(self.path) if e.table == table and e.key == key]
+
+    def materialize(self) -> Dict[str, ColumnarTable]:
+        """The tables as xlsx.columnar.load_tables would load them, Remaining recomputed."""
+        return materialize(self.state())
+
+    # Writing -------------------------------------------------------------
+    def put(self, table: str, values: Record, source: str = "", at: Optional[datetime] = None) -> Event:
+        """Insert or replace a record (columns not given are blank)."""
+        unknown = sorted(set(values) - set(TABLE_SCHEMAS[table]))
+        if unknown:
+            raise ValueError(f"Columns not in {table}: {', '.join(unknown)}")
+        values = journal_values(table, values)
+        return self._append(PUT, table, record_key(table, values), values, source, at)
+
+    def delete(self, table: str, key: str, source: str = "", at: Optional[datetime] = None) -> Event:
+        """Remove a record by its journal key."""
+        if key not in self.state().tables[table]:
+            raise KeyError(f"No {table} record {key}")
+        return self._append(DELETE, table, key, None, source, at)
+
+    def _append(self, op, table, key, values, source, at) -> Event:
+        if table not in JOURNAL_TABLES:
+            raise KeyError(f"Not a journal table: {table}")
+        state = self.state()
+        at = (at or datetime.now()).isoformat(sep=" ", timespec="seconds")
+        event = Event(state.seq + 1, at, op, table, key, values, source)
+        line = (json.dumps(asdict(event), separators=(",", ":")) + "\n").encode()
+        with open(self.path, "ab") as f:
+            if f.tell() > state.offset:
+                f.truncate(state.offset)    # drop a torn last line
+            f.write(line)
+        state.apply(event)
+        state.offset += len(line)
+        if self.snapshot_every and state.seq - self._snapshot_seq >= self.snapshot_every:
+            self.snapshot()
+        return event
+
+    def snapshot(self):
+        """Write the current tables to the snapshot file (atomically)."""
+        state = self.state()
+        tmp = self.snapshot_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"seq": state.seq, "offset": state.offset, "tables": state.tables}, f,
+                      separators=(",", ":"))
+        os.replace(tmp, self.snapshot_path)
+        self._snapshot_seq = state.seq
+
+
+def materialize(state: JournalState) -> Dict[str, ColumnarTable]:
+    """Typed tables of a journal state, tblDaily's Remaining chain recomputed."""
+    tables = {}
+    for name in JOURNAL_TABLES:
+        records = list(state.tables[name].values())
+        table = ColumnarTable(name, rows=len(records), sheet_rows=np.arange(2, len(records) + 2))
+        for column, kind in TABLE_SCHEMAS[name].items():
+            table.columns[column] = convert_column([r.get(column) for r in records], kind)
+        tables[name] = table
+    daily = tables["tblDaily"]
+    chain = compute_remaining(daily, ward_prev_year(tables["tblWardConfig"]))
+    daily.columns["PrevRemaining"] = chain.prev_remaining
+    daily.columns["Remaining"] = chain.remaining
+    return tables
+
+
+def import_workbook(path: str, journal: Journal, source: str = "import") -> Dict[str, int]:
+    """
+    Bring the journal in line with a workbook's tables.
+
+    Records that are new or differ from the journal's current version are
+    put, and journaled records the workbook no longer has are deleted, so
+    importing an unchanged workbook appends nothing. Rows without a key are
+    skipped, and so are later rows with a key already seen (the VBA reads the
+    first tblDaily row of a date and ward).
+
+    Returns:
+        Table -> rows skipped
+    """
+    loaded = load_tables(path, JOURNAL_TABLES)
+    skipped = {}
+    for name in JOURNAL_TABLES:
+        table = loaded[name]
+        schema = TABLE_SCHEMAS[name]
+        columns = [column_values(table[c], kind) for c, kind in schema.items()]
+        current = journal.state().tables[name]
+        seen = set()
+        skipped[name] = 0
+        for row in zip(*columns):
+            values = journal_values(name, dict(zip(schema, row)))
+            try:
+                key = record_key(name, values)
+            except ValueError:
+                skipped[name] += 1
+                continue
+            if key in seen:
+                skipped[name] += 1
+                continue
+            seen.add(key)
+            if current.get(key) != values:
+                journal.put(name, values, source)
+        for key in [k for k in current if k not in seen]:
+            journal.delete(name, key, source)
+    return skipped
+
+
+def table_records(table: ColumnarTable) -> List[Record]:
+    """Rows of a materialized table as dicts of date/datetime/number/text values."""
+    schema = TABLE_SCHEMAS[table.name]
+    columns = [column_values(table[c], kind) for c, kind in schema.items()]
+    records = []
+    for row in zip(*columns):
+        record = {}
+        for (column, kind), value in zip(schema.items(), row):
+            if value is not None and kind == DATE:
+                value = date.fromisoformat(value)
+            elif value is not None and kind == TIMESTAMP:
+                value = datetime.fromisoformat(value)
+            record[column] = value
+        records.append(record)
+    return records
+
+
+def materialize_workbook(journal: Journal, path: str, output_path: Optional[str] = None) -> Dict[str, int]:
+    """
+    Write the journal's tables into a workbook whose data tables are empty.
+
+    tblDaily, tblAdmissions, tblDeaths and tblTransfers are appended in full,
+    Remaining recomputed; tblWardConfig rows are updated by WardCode and
+    journaled wards the workbook lacks are appended.
+
+    Args:
+        journal: Journal to materialize
+        path: Workbook to fill, e.g. one just built by build_workbook.py
+        output_path: Destination (default: overwrite `path`)
+
+    Returns:
+        Table -> rows written
+
+    Raises:
+        ValueError: If a data table of the workbook already has rows
+    """
+    tables = journal.materialize()
+    existing = load_tables(path, JOURNAL_TABLES)
+    full = [name for name in JOURNAL_TABLES[:-1] if len(existing[name])]
+    if full:
+        raise ValueError(f"Workbook tables are not empty: {', '.join(full)}")
+
+    written = {}
+    target = path
+    for name in JOURNAL_TABLES:
+        records = table_records(tables[name])
+        updates = {}
+        if name == "tblWardConfig":
+            rows = dict(zip(column_values(existing[name]["WardCode"], TABLE_SCHEMAS[name]["WardCode"]),
+                            existing[name].sheet_rows.tolist()))
+            updates = {rows[r["WardCode"]]: r for r in records if r["WardCode"] in rows}
+            records = [r for r in records if r["WardCode"] not in rows]
+        if not records and not updates:
+            written[name] = 0
+            continue
+        formats = {c: DATE_FORMAT for c, kind in TABLE_SCHEMAS[name].items() if kind == DATE}
+        formats.update({c: TIMESTAMP_FORMAT for c, kind in TABLE_SCHEMAS[name].items() if kind == TIMESTAMP})
+        append_table_rows(target, name, records, output_path, updates=updates, number_formats=formats)
+        target = output_path = output_path or path
+        written[name] = len(records) + len(updates)
+    return written
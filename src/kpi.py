@@ -0,0 +1,383 @@
+"""
+Bed Utilization Workbook - KPI engine
+Computes the figures of the Monthly Summary, Quarterly Summary, Half-Year
+Summary and Statement of Inpatient sheets straight from tblDaily, for every
+ward and period at once, with the same definitions as the sheet formulas
+(phase1_structure.build_monthly_summary_sheet and friends):
+
+    Beginning     tblWardConfig[PrevYearRemaining] for periods starting in
+                  January, else the sum of Remaining on the last day of the
+                  previous month (0 when there is no entry)
+    Admissions    sum of Admissions, less DeathsUnder24Hrs when the
+                  subtract_deaths_under_24hrs_from_admissions preference is on
+    Patient Days  sum of Remaining
+    Avg Daily Occupancy = PD / days         ALOS = PD / (Disch + Deaths)
+    Turnover Interval = (BC * days - PD) / (Disch + Deaths)
+    Turnover Rate = (Disch + Deaths) / BC   % Occupancy = PD / (BC * days) * 100
+    Death Rate = Deaths / (Admissions + Beginning) * 100
+
+Ratios with a zero denominator are 0, as IFERROR makes them. Period sums
+select rows by tblDaily[Month] (the Statement takes every row of the ward),
+and the TOTAL and Emergency rows add up the ward rows before their KPIs are
+computed.
+
+All sums come from one pass: each tblDaily field is binned per (ward, month)
+with np.bincount, and every period is a difference of monthly prefix sums.
+DateRangeIndex does the same per day, for windows that are not whole months
+(rolling 7/30 days, outbreak periods, epidemiological weeks).
+"""
+import calendar
+import time
+import zipfile
+from datetime import date, timedelta
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .xlsx.columnar import ColumnarTable, load_tables
+from .xlsx.reader import iter_cells, shared_strings, sheet_parts
+
+
+@dataclass(frozen=True)
+class Period:
+    label: str
+    start_month: int
+    end_month: int
+
+
+# The sheets' periods; YEAR is the Statement of Inpatient
+MONTHS = [Period(calendar.month_name[m].upper(), m, m) for m in range(1, 13)]
+QUARTERS = [Period("Q1 (Jan-Mar)", 1, 3), Period("Q2 (Apr-Jun)", 4, 6),
+            Period("Q3 (Jul-Sep)", 7, 9), Period("Q4 (Oct-Dec)", 10, 12)]
+HALVES = [Period("H1 (Jan-Jun)", 1, 6), Period("H2 (Jul-Dec)", 7, 12)]
+YEAR = Period("YEAR", 1, 12)
+
+REPORTS = {
+    "Monthly Summary": MONTHS,
+    "Quarterly Summary": QUARTERS,
+    "Half-Year Summary": HALVES,
+    "Statement of Inpatient": [YEAR],
+}
+
+# Columns B:P of the summary sheets
+COUNT_COLUMNS = ["Beginning", "BedComplement", "Admissions", "Discharges", "Deaths",
+                 "DeathsUnder24Hrs", "PatientDays", "TransfersIn", "TransfersOut"]
+KPI_COLUMNS = ["AvgDailyOccupancy", "AvgLengthOfStay", "TurnoverInterval",
+               "TurnoverRate", "PercentOccupancy", "DeathRate"]
+COLUMNS = COUNT_COLUMNS + KPI_COLUMNS
+
+# tblDaily fields summed per (ward, month), in COUNT_COLUMNS order from Admissions
+_SUMMED = ["Admissions", "Discharges", "Deaths", "DeathsUnder24Hrs",
+           "Remaining", "TransfersIn", "TransfersOut"]
+
+
+@dataclass
+class KPISettings:
+    """What the sheet formulas were built with."""
+    year: int
+    subtract_deaths_under_24hrs_from_admissions: bool = False
+
+
+@dataclass
+class KPIReport:
+    """
+    values[p, r, c]: period (or DateRange) p, row r (the wards in tblWardConfig order, then
+    TOTAL, then Emergency), column COLUMNS[c].
+    """
+    periods: List[Period]
+    rows: List[str]
+    values: np.ndarray
+    days: np.ndarray                # days in each period
+    emergency_remaining: np.ndarray  # emergency wards' Remaining on each period's last day
+    seconds: float = 0.0
+
+    def value(self, period: str, row: str, column: str) -> float:
+        p = [x.label for x in self.periods].index(period)
+        return float(self.values[p, self.rows.index(row), COLUMNS.index(column)])
+
+    def records(self) -> List[dict]:
+        """One dict per (period, row), for CSV export."""
+        out = []
+        for p, period in enumerate(self.periods):
+            for r, row in enumerate(self.rows):
+                rec = {"Period": period.label, "Ward": row}
+                rec.update(zip(COLUMNS, self.values[p, r].tolist()))
+                out.append(rec)
+        return out
+
+
+def _ratio(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    """num / den, 0 where den is 0 (IFERROR(...,0))."""
+    out = np.zeros(np.broadcast(num, den).shape)
+    np.divide(num, den, out=out, where=den != 0)
+    return out
+
+
+def _kpis(counts: np.ndarray, days: np.ndarray) -> np.ndarray:
+    """KPI columns for count columns shaped (periods, rows, COUNT_COLUMNS)."""
+    beg, bc, adm, dis, dth, _, pd = (counts[..., i] for i in range(7))
+    days = days[:, None].astype(np.float64)
+    out = dis + dth
+    return np.stack([
+        _ratio(pd, days),
+        _ratio(pd, out),
+        _ratio(bc * days - pd, out),
+        _ratio(out, bc),
+        _ratio(pd, bc * days) * 100,
+        _ratio(dth, adm + beg) * 100,
+    ], axis=-1)
+
+
+@dataclass
+class _Wards:
+    """tblWardConfig in the sheets' terms, and each tblDaily row's ward."""
+    names: List[str]
+    prev_year: np.ndarray
+    beds: np.ndarray
+    emergency: np.ndarray
+    row_ward: np.ndarray   # ward index of each tblDaily row, -1 if not configured
+
+    def __len__(self):
+        return len(self.names)
+
+
+def _wards(daily: ColumnarTable, ward_config: ColumnarTable) -> _Wards:
+    codes = [c or "" for c in ward_config["WardCode"]]
+    # SUMIFS and MATCH compare text case-insensitively; first config row wins
+    index: Dict[str, int] = {}
+    for i, c in enumerate(codes):
+        index.setdefault(c.upper(), i)
+    first = np.array([index[c.upper()] for c in codes], dtype=np.int64)
+    wc = daily["WardCode"]
+    lookup = np.array([index.get(c.upper(), -1) for c in wc.categories] + [-1], dtype=np.int64)
+    return _Wards(
+        [name or code for name, code in zip(ward_config["WardName"], codes)],
+        np.asarray(ward_config["PrevYearRemaining"], dtype=np.float64)[first],
+        np.asarray(ward_config["BedComplement"], dtype=np.float64)[first],
+        np.asarray(ward_config["IsEmergency"], dtype=bool),
+        lookup[wc.codes],   # blank codes (-1) index the trailing -1
+    )
+
+
+def _summed(daily: ColumnarTable, settings: KPISettings) -> np.ndarray:
+    """The _SUMMED fields as one (rows, fields) array, Admissions adjusted."""
+    fields = np.stack([daily[f] for f in _SUMMED], axis=-1).astype(np.float64)
+    if settings.subtract_deaths_under_24hrs_from_admissions:
+        fields[:, 0] -= fields[:, 3]
+    return fields
+
+
+def _report(periods: list, wards: _Wards, beginning: np.ndarray, totals: np.ndarray,
+            days: np.ndarray, emergency_remaining: np.ndarray, start: float) -> KPIReport:
+    """
+    Assemble a KPIReport from per-ward figures.
+
+    beginning is (periods, wards), totals (periods, wards, _SUMMED); the
+    TOTAL and Emergency rows are sums of the ward rows, as on the sheets.
+    """
+    n, w = len(periods), len(wards)
+    counts = np.zeros((n, w + 2, len(COUNT_COLUMNS)))
+    counts[:, :w, 0] = beginning
+    counts[:, :w, 1] = wards.beds
+    counts[:, :w, 2:] = totals
+    counts[:, w] = counts[:, :w].sum(axis=1)
+    counts[:, w + 1] = counts[:, :w][:, wards.emergency].sum(axis=1)
+    values = np.concatenate([counts, _kpis(counts, days)], axis=-1)
+    return KPIReport(list(periods), wards.names + ["TOTAL", "Emergency"], values, days,
+                     emergency_remaining, time.perf_counter() - start)
+
+
+def compute_kpis(daily: ColumnarTable, ward_config: ColumnarTable, settings: KPISettings,
+                 periods: Sequence[Period] = tuple(MONTHS + QUARTERS + HALVES + [YEAR])) -> KPIReport:
+    """
+    Every summary figure for every ward and period.
+
+    Args:
+        daily: tblDaily as loaded by xlsx.columnar.load_tables
+        ward_config: tblWardConfig, which gives the wards and their order
+        settings: Report year and admissions preference
+        periods: Periods to compute (default: every month, quarter and
+                 half, then YEAR)
+
+    Returns:
+        KPIReport
+    """
+    start = time.perf_counter()
+    year = settings.year
+    wards = _wards(daily, ward_config)
+    n_wards = len(wards)
+    known = wards.row_ward >= 0
+    ward = wards.row_ward[known]
+    fields = _summed(daily, settings)[known]
+
+    # Sums per (ward, month): bin 0 stays empty so that a period is
+    # prefix[em] - prefix[sm - 1]; bin 13 holds rows whose Month is not 1..12,
+    # which only the Statement (every row of the ward) counts
+    month = daily["Month"][known]
+    month = np.where((month >= 1) & (month <= 12), month, 13)
+    bins = ward * 14 + month
+    sums = np.stack([np.bincount(bins, weights=fields[:, i], minlength=n_wards * 14)
+                     for i in range(len(_SUMMED))], axis=-1).reshape(n_wards, 14, len(_SUMMED))
+    prefix = np.cumsum(sums, axis=1)   # prefix[:, m] = months 0..m
+
+    # Remaining on each month's last day, per (ward, month)
+    dates = daily["EntryDate"][known]
+    month_end = np.zeros((n_wards, 13))
+    ok = ~np.isnat(dates)
+    ymd = dates[ok].astype("datetime64[M]")
+    next_day = (dates[ok] + np.timedelta64(1, "D")).astype("datetime64[M]")
+    is_end = (next_day != ymd) & (ymd.astype("datetime64[Y]").astype(np.int64) + 1970 == year)
+    m = ymd.astype(np.int64) % 12 + 1
+    np.add.at(month_end, (ward[ok][is_end], m[is_end]), fields[ok][is_end, 4])
+
+    days_in_year = 365 + (1 if year % 4 == 0 else 0)   # as the Statement sheet counts
+    n = len(periods)
+    beginning = np.zeros((n, n_wards))
+    totals = np.zeros((n, n_wards, len(_SUMMED)))
+    days = np.zeros(n, dtype=np.int64)
+    emergency_remaining = np.zeros(n)
+    for p, period in enumerate(periods):
+        sm, em = period.start_month, period.end_month
+        if period == YEAR:
+            # Statement of Inpatient: every row of the ward, whatever its month
+            totals[p] = prefix[:, 13]
+            days[p] = days_in_year
+        else:
+            totals[p] = prefix[:, em] - prefix[:, sm - 1]
+            days[p] = sum(calendar.monthrange(year, m)[1] for m in range(sm, em + 1))
+        beginning[p] = wards.prev_year if sm == 1 else month_end[:, sm - 1]
+        emergency_remaining[p] = month_end[wards.emergency, em].sum()
+    return _report(periods, wards, beginning, totals, days, emergency_remaining, start)
+
+
+@dataclass(frozen=True)
+class DateRange:
+    """Any window of days, both ends included."""
+    label: str
+    start: date
+    end: date
+
+
+def _check_window(label: str, start: date, end: date):
+    if start > end:
+        raise ValueError(f"Date range {label!r} starts after it ends ({start} > {end})")
+
+
+class DateRangeIndex:
+    """
+    Per-ward, per-day prefix sums of tblDaily for date-range queries.
+
+    prefix[w, d] holds ward w's sums over the days before first + d, so any
+    window is prefix[:, end + 1] - prefix[:, start]: two lookups per ward
+    whatever its length, and many windows are one fancy-indexing operation.
+    Rows are selected by EntryDate (the month sheets select by Month, which
+    agrees for every row the VBA writes). The beginning count is Remaining on
+    the day before the window, or PrevYearRemaining for a window starting on
+    1 January of the report year, as on the sheets.
+    """
+
+    def __init__(self, daily: ColumnarTable, ward_config: ColumnarTable, settings: KPISettings):
+        self.settings = settings
+        self.wards = _wards(daily, ward_config)
+        dates = daily["EntryDate"]
+        known = (self.wards.row_ward >= 0) & ~np.isnat(dates)
+        if known.any():
+            self.first = dates[known].min()
+            self.days = int((dates[known].max() - self.first).astype(np.int64)) + 1
+        else:
+            self.first = np.datetime64(date(settings.year, 1, 1), "D")
+            self.days = 0
+        n_wards, n_fields = len(self.wards), len(_SUMMED)
+        offset = (dates[known] - self.first).astype(np.int64)
+        bins = self.wards.row_ward[known] * self.days + offset
+        fields = _summed(daily, settings)[known]
+        per_day = np.stack([np.bincount(bins, weights=fields[:, i], minlength=n_wards * self.days)
+                            for i in range(n_fields)], axis=-1)
+        self.prefix = np.zeros((n_wards, self.days + 1, n_fields))
+        np.cumsum(per_day.reshape(n_wards, self.days, n_fields), axis=1, out=self.prefix[:, 1:])
+
+    def _offsets(self, days) -> np.ndarray:
+        """Prefix positions of dates, clipped to the indexed span."""
+        days = np.asarray(days, dtype="datetime64[D]")
+        return np.clip((days - self.first).astype(np.int64), 0, self.days)
+
+    def sums(self, start: date, end: date) -> Dict[str, np.ndarray]:
+        """
+        Per-ward sums of Admissions..TransfersOut (Remaining = patient days) over a window.
+
+        Raises:
+            ValueError: If start is after end
+        """
+        _check_window(f"{start} to {end}", start, end)
+        s, e = self._offsets([start, end + timedelta(days=1)])
+        window = self.prefix[:, max(e, s)] - self.prefix[:, s]
+        return dict(zip(_SUMMED, window.T))
+
+    def remaining_on(self, days) -> np.ndarray:
+        """Sum of Remaining per ward on each day: shape (days, wards)."""
+        s = self._offsets(days)
+        e = self._offsets(np.asarray(days, dtype="datetime64[D]") + np.timedelta64(1, "D"))
+        return (self.prefix[:, e, 4] - self.prefix[:, s, 4]).T
+
+    def query(self, ranges: Sequence[DateRange]) -> KPIReport:
+        """
+        The Monthly Summary figures for each window.
+
+        Raises:
+            ValueError: If a window starts after it ends
+        """
+        for r in ranges:
+            _check_window(r.label, r.start, r.end)
+        start = time.perf_counter()
+        starts = np.array([r.start for r in ranges], dtype="datetime64[D]")
+        ends = np.array([r.end for r in ranges], dtype="datetime64[D]") + np.timedelta64(1, "D")
+        s = self._offsets(starts)
+        e = np.maximum(self._offsets(ends), s)
+        totals = (self.prefix[:, e] - self.prefix[:, s]).transpose(1, 0, 2)
+
+        beginning = self.remaining_on(starts - np.timedelta64(1, "D"))
+        new_year = starts == np.datetime64(date(self.settings.year, 1, 1), "D")
+        beginning[new_year] = self.wards.prev_year
+        last_day = self.remaining_on(ends - np.timedelta64(1, "D"))
+        emergency_remaining = last_day[:, self.wards.emergency].sum(axis=1)
+        days = (ends - starts).astype(np.int64)
+        return _report(list(ranges), self.wards, beginning, totals, days,
+                       emergency_remaining, start)
+
+    def rolling(self, window: int) -> KPIReport:
+        """A window of `window` days ending on every indexed day."""
+        ends = self.first + np.arange(self.days)
+        return self.query([DateRange(f"{end.item()} ({window}d)", (end - window + 1).item(), end.item())
+                           for end in ends])
+
+
+def read_settings(path: str) -> KPISettings:
+    """Report year (Control!B5) and the admissions preference (tblPreferences)."""
+    with zipfile.ZipFile(path) as zf:
+        parts = {name: part for part, name in sheet_parts(zf).items()}
+        sst = shared_strings(zf)
+        year = None
+        for cell in iter_cells(zf.read(parts["Control"]), sst):
+            if (cell.row, cell.col) == (5, 2):
+                year = int(cell.value)
+                break
+    if year is None:
+        raise ValueError(f"No report year in Control!B5 of {path}")
+    prefs = load_tables(path, ["tblPreferences"])["tblPreferences"]
+    values = dict(zip(prefs["PreferenceKey"], prefs["PreferenceValue"]))
+    return KPISettings(year, bool(values.get("subtract_deaths_under_24hrs_from_admissions", False)))
+
+
+def workbook_kpis(path: str, periods: Optional[Sequence[Period]] = None) -> KPIReport:
+    """Load a workbook's tables and settings and compute its KPIs."""
+    settings = read_settings(path)
+    tables = load_tables(path, ["tblDaily", "tblWardConfig"])
+    args = (tables["tblDaily"], tables["tblWardConfig"], settings)
+    return compute_kpis(*args, periods) if periods is not None else compute_kpis(*args)
+
+
+def workbook_index(path: str) -> DateRangeIndex:
+    """Load a workbook's tables and settings and index them for date-range queries."""
+    tables = load_tables(path, ["tblDaily", "tblWardConfig"])
+    return DateRangeIndex(tables["tblDaily"], tables["tblWardConfig"], read_settings(path))
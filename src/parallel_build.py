@@ -0,0 +1,109 @@
+"""
+Bed Utilization Workbook - Parallel Phase 1 build
+Renders sheets in a process pool and assembles them into one .xlsx.
+"""
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+from openpyxl import Workbook
+
+from .build_cache import SheetCache
+from .config import WorkbookConfig
+from .phase1_structure import build_steps
+from .profiler import NULL_PROFILER
+from .xlsx import assemble_packages
+
+# Control + the four data sheets: cheap, and the Control builder must own the
+# workbook's default sheet, so they always render together as the first shard.
+_HEAD_STEPS = 5
+
+
+def _shards(config: WorkbookConfig) -> List[List[int]]:
+    """Group build step indices into independent render jobs, in workbook order."""
+    n = len(build_steps(config))
+    return [list(range(_HEAD_STEPS))] + [[i] for i in range(_HEAD_STEPS, n)]
+
+
+def render_shard(config: WorkbookConfig, step_indices: List[int]) -> bytes:
+    """
+    Run a subset of the build steps in a fresh Workbook (worker entry point).
+
+    Args:
+        config: Workbook configuration
+        step_indices: Indices into build_steps(config)
+
+    Returns:
+        The rendered sheets as a complete .xlsx package, or b"" when the
+        builders added no sheet (e.g. no Emergency sheet without MAE/FAE wards)
+    """
+    steps = build_steps(config)
+    wb = Workbook()
+    default = wb.active
+    for i in step_indices:
+        builder, args = steps[i]
+        builder(wb, config, *args)
+    # Only the Control builder claims the default sheet; drop it everywhere else
+    if default.title == "Sheet":
+        if len(wb.worksheets) == 1:
+            return b""
+        wb.remove(default)
+
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+def build_structure_parallel(config: WorkbookConfig, output_path: str,
+                             workers: Optional[int] = None,
+                             cache_dir: Optional[str] = None, profiler=None):
+    """
+    Parallel equivalent of phase1_structure.build_structure.
+
+    Args:
+        config: Workbook configuration
+        output_path: Destination .xlsx path
+        workers: Process count (default: os.cpu_count()); 1 renders in-process
+        cache_dir: Reuse unchanged shards from this directory (see build_cache.py);
+                   entries for this year that the build does not use are deleted
+        profiler: Optional profiler.BuildProfiler (cache lookup, render, assemble)
+    """
+    profiler = profiler or NULL_PROFILER
+    workers = workers or os.cpu_count() or 1
+    shards = _shards(config)
+    packages = [None] * len(shards)
+
+    keys = []
+    if cache_dir:
+        with profiler.phase("cache lookup", "cache"):
+            cache = SheetCache(os.path.join(cache_dir, str(config.year)))
+            steps = build_steps(config)
+            keys = [cache.key(config, [steps[i] for i in shard]) for shard in shards]
+            packages = [cache.get(k) for k in keys]
+
+    todo = [i for i, pkg in enumerate(packages) if pkg is None]
+    with profiler.phase("render shards", "build_sheet",
+                        shards=len(todo), workers=workers):
+        if workers == 1 or len(todo) <= 1:
+            rendered = [render_shard(config, shards[i]) for i in todo]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                rendered = list(pool.map(render_shard, [config] * len(todo),
+                                         [shards[i] for i in todo]))
+    for i, pkg in zip(todo, rendered):
+        packages[i] = pkg
+        if cache_dir:
+            cache.put(keys[i], pkg)
+    if cache_dir:
+        cache.prune(keys)
+
+    with profiler.phase("assemble", "save", shards=len(shards)) as record:
+        assemble_packages([pkg for pkg in packages if pkg], output_path)
+    if profiler.enabled:
+        record["bytes"] = os.path.getsize(output_path)
+    if cache_dir:
+        print(f"Phase 1 complete: {output_path} "
+              f"({len(todo)} of {len(shards)} shards rendered, {len(shards) - len(todo)} cached)")
+    else:
+        print(f"Phase 1 complete: {output_path} ({len(shards)} shards, {workers} workers)")
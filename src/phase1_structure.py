@@ -2,51 +2,62 @@
 Phase 1: Build workbook structure using openpyxl
 Creates all sheets, Excel Tables, formatting, formulas, and data validation.
 """
+import os
+from datetime import date
+from typing import List, Optional
+
 from openpyxl import Workbook
-from openpyxl.worksheet.table import Table, TableStyleInfo
-from openpyxl.styles import Font, Alignment, Border, Side, PatternFill, numbers
+from openpyxl.worksheet.table import Table, TableFormula
+from openpyxl.styles import Font, PatternFill
 from openpyxl.utils import get_column_letter
 from openpyxl.worksheet.datavalidation import DataValidation
+from .age_groups import AGE_GROUP_COLUMN, countifs, group_formula
 from .config import WorkbookConfig
+from .profiler import NULL_PROFILER, count_cells
+from .styles import (
+    styles_for, HEADER_FONT, SUBHEADER_FONT, LABEL_FONT, NORMAL_FONT, BOLD_FONT,
+    CENTER, THIN_BORDER, HEADER_FILL, HEADER_FONT_WHITE,
+    LIGHT_BLUE_FILL, LIGHT_GREEN_FILL, LIGHT_YELLOW_FILL, TOTAL_FILL, TABLE_STYLE,
+)
 
-# ── Style constants ──────────────────────────────────────────────────────────
 
-HEADER_FONT = Font(name="Calibri", bold=True, size=14)
-SUBHEADER_FONT = Font(name="Calibri", bold=True, size=12)
-LABEL_FONT = Font(name="Calibri", bold=True, size=10)
-NORMAL_FONT = Font(name="Calibri", size=10)
-BOLD_FONT = Font(name="Calibri", bold=True, size=10)
+def _apply_border_range(ws, min_row, max_row, min_col, max_col):
+    styles_for(ws.parent).apply_range(ws, min_row, max_row, min_col, max_col, "bu_bordered")
 
-CENTER = Alignment(horizontal="center", vertical="center")
-CENTER_WRAP = Alignment(horizontal="center", vertical="center", wrap_text=True)
-LEFT = Alignment(horizontal="left", vertical="center")
 
-THIN_BORDER = Border(
-    left=Side(style="thin"),
-    right=Side(style="thin"),
-    top=Side(style="thin"),
-    bottom=Side(style="thin"),
-)
+# ── tblDaily lookups ─────────────────────────────────────────────────────────
 
-HEADER_FILL = PatternFill(start_color="1F4E79", end_color="1F4E79", fill_type="solid")
-HEADER_FONT_WHITE = Font(name="Calibri", bold=True, size=10, color="FFFFFF")
-LIGHT_BLUE_FILL = PatternFill(start_color="D6E4F0", end_color="D6E4F0", fill_type="solid")
-LIGHT_GREEN_FILL = PatternFill(start_color="E2EFDA", end_color="E2EFDA", fill_type="solid")
-LIGHT_YELLOW_FILL = PatternFill(start_color="FFF2CC", end_color="FFF2CC", fill_type="solid")
-GRAY_FILL = PatternFill(start_color="F0F0F0", end_color="F0F0F0", fill_type="solid")
-TOTAL_FILL = PatternFill(start_color="B4C6E7", end_color="B4C6E7", fill_type="solid")
-
-TABLE_STYLE = TableStyleInfo(
-    name="TableStyleLight9",
-    showFirstColumn=False, showLastColumn=False,
-    showRowStripes=True, showColumnStripes=False,
+EXCEL_EPOCH = date(1899, 12, 30)
+
+# tblDaily[Key] (daily_lookup_key mode): "WardCode|date serial", one per entry
+DAILY_KEY_FORMULA = (
+    'IFERROR(tblDaily[[#This Row],[WardCode]]&"|"&'
+    'INT(tblDaily[[#This Row],[EntryDate]]),"")'
 )
 
 
-def _apply_border_range(ws, min_row, max_row, min_col, max_col):
-    for row in range(min_row, max_row + 1):
-        for col in range(min_col, max_col + 1):
-            ws.cell(row=row, column=col).border = THIN_BORDER
+def _daily_key(ward_code: str, year: int, month: int, day: int) -> str:
+    return f"{ward_code}|{(date(year, month, day) - EXCEL_EPOCH).days}"
+
+
+def _daily_value_formula(config: WorkbookConfig, ward_code: str, field_name: str,
+                         month: int, day: int, row: int) -> str:
+    """One tblDaily field for one ward/day, blank when there is no entry."""
+    if config.daily_lookup_key:
+        # Single exact match; zeros are hidden by ZERO_BLANK_FORMAT on the cell
+        key = _daily_key(ward_code, config.year, month, day)
+        return f'=IFERROR(INDEX(tblDaily[{field_name}],MATCH("{key}",tblDaily[Key],0)),"")'
+    # The day number comes from column A so the formula is the same down the
+    # month in R1C1 form (see xlsx/shared_formulas.py)
+    date_ref = f"DATE({config.year},{month},$A{row})"
+    return (
+        f'=IFERROR(IF(SUMIFS(tblDaily[{field_name}],'
+        f'tblDaily[EntryDate],{date_ref},'
+        f'tblDaily[WardCode],"{ward_code}")=0,"",'
+        f'SUMIFS(tblDaily[{field_name}],'
+        f'tblDaily[EntryDate],{date_ref},'
+        f'tblDaily[WardCode],"{ward_code}")),"")'
+    )
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -54,6 +65,7 @@ def _apply_border_range(ws, min_row, max_row, min_col, max_col):
 # ═══════════════════════════════════════════════════════════════════════════════
 
 def build_control_sheet(wb: Workbook, config: WorkbookConfig):
+    st = styles_for(wb)
     ws = wb.active
     ws.title = "Control"
     ws.sheet_properties.tabColor = "1F4E79"
@@ -155,21 +167,14 @@ def build_control_sheet(wb: Workbook, config: WorkbookConfig):
 
     headers = ["WardCode", "WardName", "BedComplement", "PrevYearRemaining", "IsEmergency", "DisplayOrder"]
     for col, h in enumerate(headers, 1):
-        c = ws.cell(row=config_start + 1, column=col, value=h)
-        c.font = HEADER_FONT_WHITE
-        c.fill = HEADER_FILL
-        c.alignment = CENTER
-        c.border = THIN_BORDER
+        st.cell(ws, config_start + 1, col, "bu_col_header_row", h)
 
     for i, ward in enumerate(config.WARDS):
         r = config_start + 2 + i
         vals = [ward.code, ward.name, ward.bed_complement,
                 ward.prev_year_remaining, ward.is_emergency, ward.display_order]
         for col, val in enumerate(vals, 1):
-            c = ws.cell(row=r, column=col, value=val)
-            c.font = NORMAL_FONT
-            c.alignment = CENTER
-            c.border = THIN_BORDER
+            st.cell(ws, r, col, "bu_cell", val)
 
     # Create the table
     end_row = config_start + 1 + len(config.WARDS)
@@ -191,11 +196,7 @@ def build_control_sheet(wb: Workbook, config: WorkbookConfig):
     # Headers
     pref_headers = ["PreferenceKey", "PreferenceValue", "Description"]
     for col, h in enumerate(pref_headers, 1):
-        c = ws.cell(row=prefs_start + 1, column=col, value=h)
-        c.font = HEADER_FONT_WHITE
-        c.fill = HEADER_FILL
-        c.alignment = CENTER
-        c.border = THIN_BORDER
+        st.cell(ws, prefs_start + 1, col, "bu_col_header_row", h)
 
     # Data rows
     pref_rows = [
@@ -211,12 +212,9 @@ def build_control_sheet(wb: Workbook, config: WorkbookConfig):
     ]
 
     for idx, (key, value, desc) in enumerate(pref_rows, prefs_start + 2):
-        ws.cell(row=idx, column=1, value=key).font = NORMAL_FONT
-        ws.cell(row=idx, column=2, value=value).font = NORMAL_FONT  # Boolean
-        ws.cell(row=idx, column=3, value=desc).font = NORMAL_FONT
-        for col in range(1, 4):
-            ws.cell(row=idx, column=col).alignment = CENTER
-            ws.cell(row=idx, column=col).border = THIN_BORDER
+        st.cell(ws, idx, 1, "bu_cell", key)
+        st.cell(ws, idx, 2, "bu_cell", value)  # Boolean
+        st.cell(ws, idx, 3, "bu_cell", desc)
 
     # Create table
     prefs_end = prefs_start + 1 + len(pref_rows)
@@ -231,20 +229,13 @@ def build_control_sheet(wb: Workbook, config: WorkbookConfig):
 
     month_headers = ["MonthNum", "MonthName", "DaysInMonth"]
     for col, h in enumerate(month_headers, 1):
-        c = ws.cell(row=month_start + 1, column=col, value=h)
-        c.font = HEADER_FONT_WHITE
-        c.fill = HEADER_FILL
-        c.alignment = CENTER
-        c.border = THIN_BORDER
+        st.cell(ws, month_start + 1, col, "bu_col_header_row", h)
 
     for m in range(1, 13):
         r = month_start + 1 + m
-        ws.cell(row=r, column=1, value=m).font = NORMAL_FONT
-        ws.cell(row=r, column=2, value=config.MONTH_NAMES[m - 1]).font = NORMAL_FONT
-        ws.cell(row=r, column=3, value=config.days_in_month(m)).font = NORMAL_FONT
-        for col in range(1, 4):
-            ws.cell(row=r, column=col).alignment = CENTER
-            ws.cell(row=r, column=col).border = THIN_BORDER
+        st.cell(ws, r, 1, "bu_cell", m)
+        st.cell(ws, r, 2, "bu_cell", config.MONTH_NAMES[m - 1])
+        st.cell(ws, r, 3, "bu_cell", config.days_in_month(m))
 
     month_end = month_start + 13
     tbl2 = Table(displayName="tblMonthDays", ref=f"A{month_start + 1}:C{month_end}")
@@ -274,6 +265,8 @@ def build_daily_data_sheet(wb: Workbook, config: WorkbookConfig):
         "Deaths", "DeathsUnder24Hrs", "TransfersIn", "TransfersOut",
         "PrevRemaining", "Remaining", "EntryTimestamp"
     ]
+    if config.daily_lookup_key:
+        headers.append("Key")
     for col, h in enumerate(headers, 1):
         ws.cell(row=1, column=col, value=h)
 
@@ -291,8 +284,17 @@ def build_daily_data_sheet(wb: Workbook, config: WorkbookConfig):
     ws.cell(row=2, column=11, value="")  # Remaining (VBA calculates)
     ws.cell(row=2, column=12, value="")  # EntryTimestamp (VBA fills)
 
-    tbl = Table(displayName="tblDaily", ref="A1:L2")
+    last_col = get_column_letter(len(headers))
+    tbl = Table(displayName="tblDaily", ref=f"A1:{last_col}2")
     tbl.tableStyleInfo = TABLE_STYLE
+    if config.daily_lookup_key:
+        # Calculated column: Excel fills it for every row VBA adds
+        ws.cell(row=2, column=13, value=f"={DAILY_KEY_FORMULA}")
+        tbl._initialise_columns()
+        for column, name in zip(tbl.tableColumns, headers):
+            column.name = name
+        tbl.tableColumns[-1].calculatedColumnFormula = TableFormula(attr_text=DAILY_KEY_FORMULA)
+        ws.column_dimensions["M"].width = 14
     ws.add_table(tbl)
 
     ws.column_dimensions["A"].width = 12
@@ -304,20 +306,33 @@ def build_daily_data_sheet(wb: Workbook, config: WorkbookConfig):
     ws.column_dimensions["L"].width = 18
 
 
+def _add_age_group_column(ws, tbl: Table, headers: List[str]):
+    """Make the last column AgeGroup, calculated once per record (see age_groups.py)."""
+    formula = group_formula(tbl.displayName)
+    ws.cell(row=2, column=len(headers), value=f"={formula}")
+    tbl._initialise_columns()
+    for column, name in zip(tbl.tableColumns, headers):
+        column.name = name
+    tbl.tableColumns[-1].calculatedColumnFormula = TableFormula(attr_text=formula)
+    ws.column_dimensions[get_column_letter(len(headers))].width = 10
+
+
 def build_admissions_sheet(wb: Workbook, config: WorkbookConfig):
     ws = wb.create_sheet("Admissions")
     ws.sheet_properties.tabColor = "808080"
 
     headers = [
         "AdmissionID", "AdmissionDate", "Month", "WardCode", "PatientID",
-        "PatientName", "Age", "AgeUnit", "Sex", "NHIS", "EntryTimestamp"
+        "PatientName", "Age", "AgeUnit", "Sex", "NHIS", "EntryTimestamp",
+        AGE_GROUP_COLUMN,
     ]
     for col, h in enumerate(headers, 1):
         ws.cell(row=1, column=col, value=h)
     ws.cell(row=2, column=1, value="")
 
-    tbl = Table(displayName="tblAdmissions", ref="A1:K2")
+    tbl = Table(displayName="tblAdmissions", ref="A1:L2")
     tbl.tableStyleInfo = TABLE_STYLE
+    _add_age_group_column(ws, tbl, headers)
     ws.add_table(tbl)
 
     ws.column_dimensions["A"].width = 14
@@ -340,14 +355,15 @@ def build_deaths_data_sheet(wb: Workbook, config: WorkbookConfig):
     headers = [
         "DeathID", "DateOfDeath", "Month", "WardCode", "FolderNumber",
         "NameOfDeceased", "Age", "AgeUnit", "Sex", "NHIS",
-        "CauseOfDeath", "DeathWithin24Hrs", "EntryTimestamp"
+        "CauseOfDeath", "DeathWithin24Hrs", "EntryTimestamp", AGE_GROUP_COLUMN,
     ]
     for col, h in enumerate(headers, 1):
         ws.cell(row=1, column=col, value=h)
     ws.cell(row=2, column=1, value="")
 
-    tbl = Table(displayName="tblDeaths", ref="A1:M2")
+    tbl = Table(displayName="tblDeaths", ref="A1:N2")
     tbl.tableStyleInfo = TABLE_STYLE
+    _add_age_group_column(ws, tbl, headers)
     ws.add_table(tbl)
 
     ws.column_dimensions["A"].width = 12
@@ -387,6 +403,7 @@ def build_transfers_sheet(wb: Workbook, config: WorkbookConfig):
 # ═══════════════════════════════════════════════════════════════════════════════
 
 def build_ward_sheet(wb: Workbook, config: WorkbookConfig, ward):
+    st = styles_for(wb)
     ws = wb.create_sheet(ward.name)
 
     # Tab colors: wards get distinct colors
@@ -405,34 +422,34 @@ def build_ward_sheet(wb: Workbook, config: WorkbookConfig, ward):
         # ── Header block ─────────────────────────────────────────────
         ws.merge_cells(start_row=current_row, start_column=1,
                        end_row=current_row, end_column=7)
-        c = ws.cell(row=current_row, column=1, value="GHANA HEALTH SERVICE")
-        c.font = HEADER_FONT
-        c.alignment = CENTER
+        st.cell(ws, current_row, 1, "bu_title", "GHANA HEALTH SERVICE")
         current_row += 1
 
         ws.merge_cells(start_row=current_row, start_column=1,
                        end_row=current_row, end_column=7)
-        c = ws.cell(row=current_row, column=1, value="DAILY BED UTILIZATION FORM")
-        c.font = SUBHEADER_FONT
-        c.alignment = CENTER
+        st.cell(ws, current_row, 1, "bu_subtitle", "DAILY BED UTILIZATION FORM")
         current_row += 1
 
         # Hospital / Ward / Month row
-        ws.cell(row=current_row, column=1, value="Hospital:").font = BOLD_FONT
-        ws.cell(row=current_row, column=2, value=config.hospital_name).font = NORMAL_FONT
-        ws.cell(row=current_row, column=4, value="Ward:").font = BOLD_FONT
-        ws.cell(row=current_row, column=5, value=ward.name.upper()).font = NORMAL_FONT
-        ws.cell(row=current_row, column=6, value="MONTH").font = BOLD_FONT
-        ws.cell(row=current_row, column=7, value=month_name).font = NORMAL_FONT
+        st.cell(ws, current_row, 1, "bu_bold", "Hospital:")
+        st.cell(ws, current_row, 2, "bu_normal", config.hospital_name)
+        st.cell(ws, current_row, 4, "bu_bold", "Ward:")
+        st.cell(ws, current_row, 5, "bu_normal", ward.name.upper())
+        st.cell(ws, current_row, 6, "bu_bold", "MONTH")
+        st.cell(ws, current_row, 7, "bu_normal", month_name)
         current_row += 1
 
         # Previous remaining
-        ws.cell(row=current_row, column=1, value="Number of patients remaining as at last day of previous month").font = LABEL_FONT
+        st.cell(ws, current_row, 1, "bu_label", "Number of patients remaining as at last day of previous month")
         if month_num == 1:
             formula = (
                 f'=IFERROR(INDEX(tblWardConfig[PrevYearRemaining],'
                 f'MATCH("{ward.code}",tblWardConfig[WardCode],0)),0)'
             )
+        elif config.daily_lookup_key:
+            prev_month = month_num - 1
+            key = _daily_key(ward.code, config.year, prev_month, config.days_in_month(prev_month))
+            formula = f'=IFERROR(INDEX(tblDaily[Remaining],MATCH("{key}",tblDaily[Key],0)),0)'
         else:
             prev_month = month_num - 1
             prev_last_day = config.days_in_month(prev_month)
@@ -441,23 +458,17 @@ def build_ward_sheet(wb: Workbook, config: WorkbookConfig, ward):
                 f'tblDaily[EntryDate],DATE({config.year},{prev_month},{prev_last_day}),'
                 f'tblDaily[WardCode],"{ward.code}"),0)'
             )
-        c = ws.cell(row=current_row, column=8, value=formula)
-        c.font = BOLD_FONT
-        c.fill = LIGHT_YELLOW_FILL
-        c.border = THIN_BORDER
+        st.cell(ws, current_row, 8, "bu_prev_remaining", formula)
         prev_remaining_row = current_row
         current_row += 1
 
         # Bed complement
-        ws.cell(row=current_row, column=1, value="Bed complement").font = LABEL_FONT
+        st.cell(ws, current_row, 1, "bu_label", "Bed complement")
         bed_formula = (
             f'=IFERROR(INDEX(tblWardConfig[BedComplement],'
             f'MATCH("{ward.code}",tblWardConfig[WardCode],0)),0)'
         )
-        c = ws.cell(row=current_row, column=8, value=bed_formula)
-        c.font = BOLD_FONT
-        c.fill = LIGHT_GREEN_FILL
-        c.border = THIN_BORDER
+        st.cell(ws, current_row, 8, "bu_bed_complement", bed_formula)
         current_row += 1
 
         # ── Column headers ───────────────────────────────────────────
@@ -467,52 +478,30 @@ def build_ward_sheet(wb: Workbook, config: WorkbookConfig, ward):
             "No. of Patients\nRemaining In\nWard"
         ]
         for col, header in enumerate(col_headers, 1):
-            c = ws.cell(row=current_row, column=col, value=header)
-            c.font = HEADER_FONT_WHITE
-            c.fill = HEADER_FILL
-            c.alignment = CENTER_WRAP
-            c.border = THIN_BORDER
+            st.cell(ws, current_row, col, "bu_col_header", header)
         header_row = current_row
         current_row += 1
 
         # ── Daily rows (1-31) ────────────────────────────────────────
         data_start = current_row
+        value_style = "bu_cell_hide0" if config.daily_lookup_key else "bu_cell"
         for day in range(1, 32):
-            ws.cell(row=current_row, column=1, value=day).font = NORMAL_FONT
-            ws.cell(row=current_row, column=1).alignment = CENTER
-            ws.cell(row=current_row, column=1).border = THIN_BORDER
+            st.cell(ws, current_row, 1, "bu_cell", day)
 
             if day <= days:
-                date_ref = f"DATE({config.year},{month_num},{day})"
                 fields = ["Admissions", "Discharges", "Deaths",
                            "DeathsUnder24Hrs", "TransfersIn", "TransfersOut", "Remaining"]
                 for col_idx, field_name in enumerate(fields, 2):
-                    formula = (
-                        f'=IFERROR(IF(SUMIFS(tblDaily[{field_name}],'
-                        f'tblDaily[EntryDate],{date_ref},'
-                        f'tblDaily[WardCode],"{ward.code}")=0,"",'
-                        f'SUMIFS(tblDaily[{field_name}],'
-                        f'tblDaily[EntryDate],{date_ref},'
-                        f'tblDaily[WardCode],"{ward.code}")),"")'
-                    )
-                    c = ws.cell(row=current_row, column=col_idx, value=formula)
-                    c.font = NORMAL_FONT
-                    c.alignment = CENTER
-                    c.border = THIN_BORDER
+                    formula = _daily_value_formula(config, ward.code, field_name, month_num, day,
+                                                   current_row)
+                    st.cell(ws, current_row, col_idx, value_style, formula)
             else:
-                for col_idx in range(2, 9):
-                    c = ws.cell(row=current_row, column=col_idx)
-                    c.fill = GRAY_FILL
-                    c.border = THIN_BORDER
+                st.apply_range(ws, current_row, current_row, 2, 8, "bu_blank_day")
 
             current_row += 1
 
         # ── TOTAL row ────────────────────────────────────────────────
-        c = ws.cell(row=current_row, column=1, value="TOTAL")
-        c.font = BOLD_FONT
-        c.alignment = CENTER
-        c.fill = TOTAL_FILL
-        c.border = THIN_BORDER
+        st.cell(ws, current_row, 1, "bu_total", "TOTAL")
 
         total_fields = ["Admissions", "Discharges", "Deaths",
                         "DeathsUnder24Hrs", "TransfersIn", "TransfersOut"]
@@ -533,11 +522,7 @@ def build_ward_sheet(wb: Workbook, config: WorkbookConfig, ward):
                     f'tblDaily[Month],{month_num},'
                     f'tblDaily[WardCode],"{ward.code}")'
                 )
-            c = ws.cell(row=current_row, column=col_idx, value=formula)
-            c.font = BOLD_FONT
-            c.alignment = CENTER
-            c.fill = TOTAL_FILL
-            c.border = THIN_BORDER
+            st.cell(ws, current_row, col_idx, "bu_total", formula)
 
         # Patient Days (sum of daily remaining) - column 8
         pd_formula = (
@@ -545,11 +530,7 @@ def build_ward_sheet(wb: Workbook, config: WorkbookConfig, ward):
             f'tblDaily[Month],{month_num},'
             f'tblDaily[WardCode],"{ward.code}")'
         )
-        c = ws.cell(row=current_row, column=8, value=pd_formula)
-        c.font = BOLD_FONT
-        c.alignment = CENTER
-        c.fill = TOTAL_FILL
-        c.border = THIN_BORDER
+        st.cell(ws, current_row, 8, "bu_total", pd_formula)
 
         current_row += 2  # spacer
 
@@ -586,6 +567,7 @@ def build_emergency_combined_sheet(wb: Workbook, config: WorkbookConfig):
         return
 
     # Create sheet
+    st = styles_for(wb)
     ws = wb.create_sheet("Emergency")
     ws.sheet_properties.tabColor = "FF6600"  # Bright orange
 
@@ -677,10 +659,7 @@ def build_emergency_combined_sheet(wb: Workbook, config: WorkbookConfig):
 
         # ── Column Headers (2 rows) ──
         # Row 1: Section headers
-        ws.cell(row=current_row, column=1, value="Day").font = HEADER_FONT_WHITE
-        ws.cell(row=current_row, column=1).fill = HEADER_FILL
-        ws.cell(row=current_row, column=1).alignment = CENTER
-        ws.cell(row=current_row, column=1).border = THIN_BORDER
+        st.cell(ws, current_row, 1, "bu_col_header_row", "Day")
 
         ws.merge_cells(f"B{current_row}:H{current_row}")
         c = ws.cell(row=current_row, column=2, value="MALE EMERGENCY")
@@ -719,51 +698,31 @@ def build_emergency_combined_sheet(wb: Workbook, config: WorkbookConfig):
         ]
 
         for col_num, header_text in field_headers:
-            c = ws.cell(row=current_row, column=col_num, value=header_text)
-            c.font = HEADER_FONT_WHITE
-            c.fill = HEADER_FILL
-            c.alignment = CENTER
-            c.border = THIN_BORDER
+            st.cell(ws, current_row, col_num, "bu_col_header_row", header_text)
 
         current_row += 1
 
         # ── Daily Rows (1-31) ──
         days_in_month = config.days_in_month(month_num)
+        value_style = "bu_cell_plain_hide0" if config.daily_lookup_key else "bu_cell_plain"
+        total_style = "bu_cell_bold_hide0" if config.daily_lookup_key else "bu_cell_bold"
 
         for day in range(1, 32):
             # Day number (col A)
-            c = ws.cell(row=current_row, column=1, value=day)
-            c.alignment = CENTER
-            c.border = THIN_BORDER
+            st.cell(ws, current_row, 1, "bu_cell_plain", day)
 
             if day <= days_in_month:
                 # MAE data (cols B-H)
                 for col_num, field_name in mae_fields.items():
-                    formula = (
-                        f'=IFERROR(IF(SUMIFS(tblDaily[{field_name}],'
-                        f'tblDaily[EntryDate],DATE({config.year},{month_num},{day}),'
-                        f'tblDaily[WardCode],"MAE")=0,"",'
-                        f'SUMIFS(tblDaily[{field_name}],'
-                        f'tblDaily[EntryDate],DATE({config.year},{month_num},{day}),'
-                        f'tblDaily[WardCode],"MAE")),"")'
-                    )
-                    c = ws.cell(row=current_row, column=col_num, value=formula)
-                    c.alignment = CENTER
-                    c.border = THIN_BORDER
+                    formula = _daily_value_formula(config, "MAE", field_name, month_num, day,
+                                                   current_row)
+                    st.cell(ws, current_row, col_num, value_style, formula)
 
                 # FAE data (cols I-O)
                 for col_num, field_name in fae_fields.items():
-                    formula = (
-                        f'=IFERROR(IF(SUMIFS(tblDaily[{field_name}],'
-                        f'tblDaily[EntryDate],DATE({config.year},{month_num},{day}),'
-                        f'tblDaily[WardCode],"FAE")=0,"",'
-                        f'SUMIFS(tblDaily[{field_name}],'
-                        f'tblDaily[EntryDate],DATE({config.year},{month_num},{day}),'
-                        f'tblDaily[WardCode],"FAE")),"")'
-                    )
-                    c = ws.cell(row=current_row, column=col_num, value=formula)
-                    c.alignment = CENTER
-                    c.border = THIN_BORDER
+                    formula = _daily_value_formula(config, "FAE", field_name, month_num, day,
+                                                   current_row)
+                    st.cell(ws, current_row, col_num, value_style, formula)
 
                 # Total Remaining (Col P = Col H + Col O)
                 # Check directly if cells have numbers to avoid summing text
@@ -777,26 +736,16 @@ def build_emergency_combined_sheet(wb: Workbook, config: WorkbookConfig):
                 # Let's use: =IF(AND(H="" , O=""), "", N(H)+N(O))
                 formula = f'=IF(AND({mae_rem}="", {fae_rem}=""), "", N({mae_rem}) + N({fae_rem}))'
 
-                c = ws.cell(row=current_row, column=16, value=formula)
-                c.alignment = CENTER
-                c.border = THIN_BORDER
-                c.font = BOLD_FONT
+                st.cell(ws, current_row, 16, total_style, formula)
 
             else:
-                # Gray out invalid days
-                for col_num in range(2, 17):  # Cols B-P
-                    c = ws.cell(row=current_row, column=col_num)
-                    c.fill = GRAY_FILL
-                    c.border = THIN_BORDER
+                # Gray out invalid days (cols B-P)
+                st.apply_range(ws, current_row, current_row, 2, 16, "bu_blank_day")
 
             current_row += 1
 
         # ── TOTAL Row ──
-        c = ws.cell(row=current_row, column=1, value="TOTAL")
-        c.font = BOLD_FONT
-        c.alignment = CENTER
-        c.fill = TOTAL_FILL
-        c.border = THIN_BORDER
+        st.cell(ws, current_row, 1, "bu_total", "TOTAL")
 
         # MAE totals (cols B-H)
         for col_num, field_name in mae_fields.items():
@@ -808,11 +757,7 @@ def build_emergency_combined_sheet(wb: Workbook, config: WorkbookConfig):
             else:
                 formula = f'=SUMIFS(tblDaily[{field_name}],tblDaily[Month],{month_num},tblDaily[WardCode],"MAE")'
 
-            c = ws.cell(row=current_row, column=col_num, value=formula)
-            c.font = BOLD_FONT
-            c.alignment = CENTER
-            c.fill = TOTAL_FILL
-            c.border = THIN_BORDER
+            st.cell(ws, current_row, col_num, "bu_total", formula)
 
         # FAE totals (cols I-O)
         for col_num, field_name in fae_fields.items():
@@ -824,11 +769,7 @@ def build_emergency_combined_sheet(wb: Workbook, config: WorkbookConfig):
             else:
                 formula = f'=SUMIFS(tblDaily[{field_name}],tblDaily[Month],{month_num},tblDaily[WardCode],"FAE")'
 
-            c = ws.cell(row=current_row, column=col_num, value=formula)
-            c.font = BOLD_FONT
-            c.alignment = CENTER
-            c.fill = TOTAL_FILL
-            c.border = THIN_BORDER
+            st.cell(ws, current_row, col_num, "bu_total", formula)
 
         # Total Remaining Sum (Col P)
         # It's sum of daily remainings (Patient Days)
@@ -836,11 +777,7 @@ def build_emergency_combined_sheet(wb: Workbook, config: WorkbookConfig):
         mae_rem_tot = f"H{current_row}"
         fae_rem_tot = f"O{current_row}"
         formula = f'={mae_rem_tot} + {fae_rem_tot}'
-        c = ws.cell(row=current_row, column=16, value=formula)
-        c.font = BOLD_FONT
-        c.alignment = CENTER
-        c.fill = TOTAL_FILL
-        c.border = THIN_BORDER
+        st.cell(ws, current_row, 16, "bu_total", formula)
 
         current_row += 2  # Spacer before next month
 
@@ -875,6 +812,7 @@ def build_emergency_combined_sheet(wb: Workbook, config: WorkbookConfig):
 def build_monthly_summary_sheet(wb: Workbook, config: WorkbookConfig):
     ws = wb.create_sheet("Monthly Summary")
     ws.sheet_properties.tabColor = "1F4E79"
+    st = styles_for(wb)
 
     current_row = 1
     for month_num in range(1, 13):
@@ -884,17 +822,14 @@ def build_monthly_summary_sheet(wb: Workbook, config: WorkbookConfig):
         # Header
         ws.merge_cells(start_row=current_row, start_column=1,
                        end_row=current_row, end_column=16)
-        c = ws.cell(row=current_row, column=1, value="GHANA HEALTH SERVICE")
-        c.font = HEADER_FONT
-        c.alignment = CENTER
+        st.cell(ws, current_row, 1, "bu_title", "GHANA HEALTH SERVICE")
         current_row += 1
 
         ws.merge_cells(start_row=current_row, start_column=1,
                        end_row=current_row, end_column=16)
         c = ws.cell(row=current_row, column=1,
                     value=f"MONTHLY BED UTILIZATION FORM - {month_name}, {config.year}")
-        c.font = SUBHEADER_FONT
-        c.alignment = CENTER
+        st.apply(c, "bu_subtitle")
         current_row += 1
 
         # Column headers
@@ -907,11 +842,7 @@ def build_monthly_summary_sheet(wb: Workbook, config: WorkbookConfig):
             "Percentage\nof\nOccupancy", "Death\nRate"
         ]
         for col, header in enumerate(col_headers, 1):
-            c = ws.cell(row=current_row, column=col, value=header)
-            c.font = HEADER_FONT_WHITE
-            c.fill = HEADER_FILL
-            c.alignment = CENTER_WRAP
-            c.border = THIN_BORDER
+            st.cell(ws, current_row, col, "bu_col_header", header)
         header_row = current_row
         current_row += 1
 
@@ -921,8 +852,7 @@ def build_monthly_summary_sheet(wb: Workbook, config: WorkbookConfig):
             wc = ward.code
 
             # Col A: Ward name
-            ws.cell(row=r, column=1, value=ward.name).font = BOLD_FONT
-            ws.cell(row=r, column=1).border = THIN_BORDER
+            st.cell(ws, r, 1, "bu_cell_bold", ward.name)
 
             # Col B: Patients at beginning of month
             if month_num == 1:
@@ -938,11 +868,11 @@ def build_monthly_summary_sheet(wb: Workbook, config: WorkbookConfig):
                     f'tblDaily[EntryDate],DATE({config.year},{pm},{pld}),'
                     f'tblDaily[WardCode],"{wc}"),0)'
                 )
-            ws.cell(row=r, column=2, value=f_beg).font = NORMAL_FONT
+            st.cell(ws, r, 2, "bu_cell", f_beg)
 
             # Col C: Bed Complement
             f_bc = f'=IFERROR(INDEX(tblWardConfig[BedComplement],MATCH("{wc}",tblWardConfig[WardCode],0)),0)'
-            ws.cell(row=r, column=3, value=f_bc).font = NORMAL_FONT
+            st.cell(ws, r, 3, "bu_cell", f_bc)
 
             # Col D-F,G: Admissions, Discharges, Deaths, Deaths<24Hrs
             daily_fields = {
@@ -955,53 +885,43 @@ def build_monthly_summary_sheet(wb: Workbook, config: WorkbookConfig):
                          f'SUMIFS(tblDaily[DeathsUnder24Hrs],tblDaily[Month],{month_num},tblDaily[WardCode],"{wc}")')
                 else:
                     f = f'=SUMIFS(tblDaily[{field}],tblDaily[Month],{month_num},tblDaily[WardCode],"{wc}")'
-                ws.cell(row=r, column=col_num, value=f).font = NORMAL_FONT
+                st.cell(ws, r, col_num, "bu_cell", f)
 
             # Col H: Patient Days
             f_pd = f'=SUMIFS(tblDaily[Remaining],tblDaily[Month],{month_num},tblDaily[WardCode],"{wc}")'
-            ws.cell(row=r, column=8, value=f_pd).font = NORMAL_FONT
+            st.cell(ws, r, 8, "bu_cell", f_pd)
 
             # Col I-J: Transfers In, Transfers Out
             f_ti = f'=SUMIFS(tblDaily[TransfersIn],tblDaily[Month],{month_num},tblDaily[WardCode],"{wc}")'
             f_to = f'=SUMIFS(tblDaily[TransfersOut],tblDaily[Month],{month_num},tblDaily[WardCode],"{wc}")'
-            ws.cell(row=r, column=9, value=f_ti).font = NORMAL_FONT
-            ws.cell(row=r, column=10, value=f_to).font = NORMAL_FONT
+            st.cell(ws, r, 9, "bu_cell", f_ti)
+            st.cell(ws, r, 10, "bu_cell", f_to)
 
             # Col K: Average Daily Bed Occupancy = Patient Days / Days
             bc = get_column_letter(8)
-            ws.cell(row=r, column=11, value=f'=IFERROR({bc}{r}/{days},0)').font = NORMAL_FONT
+            st.cell(ws, r, 11, "bu_kpi", f'=IFERROR({bc}{r}/{days},0)')
 
             # Col L: Average Length of Stay = Patient Days / (Discharges + Deaths)
-            ws.cell(row=r, column=12, value=f'=IFERROR({bc}{r}/(E{r}+F{r}),0)').font = NORMAL_FONT
+            st.cell(ws, r, 12, "bu_kpi", f'=IFERROR({bc}{r}/(E{r}+F{r}),0)')
 
             # Col M: Bed Turnover Interval = (BC*Days - PD) / (Disch + Deaths)
-            ws.cell(row=r, column=13, value=f'=IFERROR((C{r}*{days}-H{r})/(E{r}+F{r}),0)').font = NORMAL_FONT
+            st.cell(ws, r, 13, "bu_kpi", f'=IFERROR((C{r}*{days}-H{r})/(E{r}+F{r}),0)')
 
             # Col N: Bed Turnover Rate = (Disch + Deaths) / BC
-            ws.cell(row=r, column=14, value=f'=IFERROR((E{r}+F{r})/C{r},0)').font = NORMAL_FONT
+            st.cell(ws, r, 14, "bu_kpi", f'=IFERROR((E{r}+F{r})/C{r},0)')
 
             # Col O: % Occupancy = (PD / (BC * Days)) * 100
-            ws.cell(row=r, column=15, value=f'=IFERROR((H{r}/(C{r}*{days}))*100,0)').font = NORMAL_FONT
+            st.cell(ws, r, 15, "bu_kpi", f'=IFERROR((H{r}/(C{r}*{days}))*100,0)')
 
             # Col P: Death Rate = Deaths / (Admissions + Patients at beginning) * 100
-            ws.cell(row=r, column=16, value=f'=IFERROR((F{r}/(D{r}+B{r}))*100,0)').font = NORMAL_FONT
-
-            # Format numbers
-            for col in range(11, 17):
-                ws.cell(row=r, column=col).number_format = '0.00'
-
-            # Borders
-            for col in range(1, 17):
-                ws.cell(row=r, column=col).alignment = CENTER
-                ws.cell(row=r, column=col).border = THIN_BORDER
+            st.cell(ws, r, 16, "bu_kpi", f'=IFERROR((F{r}/(D{r}+B{r}))*100,0)')
 
             current_row += 1
 
         # ── EMERGENCY TOTAL REMAINING row ────────────────────────────
         if config.preferences.show_emergency_total_remaining:
             r = current_row
-            ws.cell(row=r, column=1, value="EMERGENCY TOTAL REMAINING").font = BOLD_FONT
-            ws.cell(row=r, column=1).fill = PatternFill(start_color="FFD966", end_color="FFD966", fill_type="solid")
+            st.cell(ws, r, 1, "bu_emergency", "EMERGENCY TOTAL REMAINING")
 
             # Calculate last day of month
             last_day = config.days_in_month(month_num)
@@ -1014,24 +934,17 @@ def build_monthly_summary_sheet(wb: Workbook, config: WorkbookConfig):
                 parts.append(f'SUMIFS(tblDaily[Remaining],tblDaily[EntryDate],{date_formula},tblDaily[WardCode],"{ew.code}")')
 
             # Column B: Total remaining at end of month
-            ws.cell(row=r, column=2, value=f'={"+".join(parts)}').font = BOLD_FONT
+            st.cell(ws, r, 2, "bu_cell_bold", f'={"+".join(parts)}')
 
             # Columns C-P: Empty
             for col in range(3, 17):
-                ws.cell(row=r, column=col, value="")
-                ws.cell(row=r, column=col).fill = PatternFill(start_color="FFD966", end_color="FFD966", fill_type="solid")
-
-            # Borders
-            for col in range(1, 17):
-                ws.cell(row=r, column=col).alignment = CENTER
-                ws.cell(row=r, column=col).border = THIN_BORDER
+                st.cell(ws, r, col, "bu_emergency_pad", "")
 
             current_row += 1
 
         # ── TOTAL row ────────────────────────────────────────────────
         r = current_row
-        ws.cell(row=r, column=1, value="TOTAL").font = BOLD_FONT
-        ws.cell(row=r, column=1).fill = TOTAL_FILL
+        st.cell(ws, r, 1, "bu_total", "TOTAL")
 
         # Sum columns B through J across the ward rows
         emergency_offset = 1 if config.preferences.show_emergency_total_remaining else 0
@@ -1039,29 +952,21 @@ def build_monthly_summary_sheet(wb: Workbook, config: WorkbookConfig):
         last_ward_row = r - 1 - emergency_offset
         for col in range(2, 11):
             cl = get_column_letter(col)
-            ws.cell(row=r, column=col,
-                    value=f'=SUM({cl}{first_ward_row}:{cl}{last_ward_row})').font = BOLD_FONT
+            st.cell(ws, r, col, "bu_total", f'=SUM({cl}{first_ward_row}:{cl}{last_ward_row})')
 
         # KPI totals use total values
-        ws.cell(row=r, column=11, value=f'=IFERROR(H{r}/{days},0)').font = BOLD_FONT
-        ws.cell(row=r, column=12, value=f'=IFERROR(H{r}/(E{r}+F{r}),0)').font = BOLD_FONT
-        ws.cell(row=r, column=13, value=f'=IFERROR((C{r}*{days}-H{r})/(E{r}+F{r}),0)').font = BOLD_FONT
-        ws.cell(row=r, column=14, value=f'=IFERROR((E{r}+F{r})/C{r},0)').font = BOLD_FONT
-        ws.cell(row=r, column=15, value=f'=IFERROR((H{r}/(C{r}*{days}))*100,0)').font = BOLD_FONT
-        ws.cell(row=r, column=16, value=f'=IFERROR((F{r}/(D{r}+B{r}))*100,0)').font = BOLD_FONT
-
-        for col in range(1, 17):
-            ws.cell(row=r, column=col).alignment = CENTER
-            ws.cell(row=r, column=col).border = THIN_BORDER
-            ws.cell(row=r, column=col).fill = TOTAL_FILL
-        for col in range(11, 17):
-            ws.cell(row=r, column=col).number_format = '0.00'
+        st.cell(ws, r, 11, "bu_total_kpi", f'=IFERROR(H{r}/{days},0)')
+        st.cell(ws, r, 12, "bu_total_kpi", f'=IFERROR(H{r}/(E{r}+F{r}),0)')
+        st.cell(ws, r, 13, "bu_total_kpi", f'=IFERROR((C{r}*{days}-H{r})/(E{r}+F{r}),0)')
+        st.cell(ws, r, 14, "bu_total_kpi", f'=IFERROR((E{r}+F{r})/C{r},0)')
+        st.cell(ws, r, 15, "bu_total_kpi", f'=IFERROR((H{r}/(C{r}*{days}))*100,0)')
+        st.cell(ws, r, 16, "bu_total_kpi", f'=IFERROR((F{r}/(D{r}+B{r}))*100,0)')
+
         current_row += 1
 
         # ── Emergency subtotal row ───────────────────────────────────
         r = current_row
-        ws.cell(row=r, column=1, value="Emergency").font = BOLD_FONT
-        ws.cell(row=r, column=1).fill = LIGHT_YELLOW_FILL
+        st.cell(ws, r, 1, "bu_subtotal", "Emergency")
 
         emer_wards = [w for w in config.WARDS if w.is_emergency]
         for col in range(2, 11):
@@ -1071,21 +976,15 @@ def build_monthly_summary_sheet(wb: Workbook, config: WorkbookConfig):
                 ew_idx = config.WARDS.index(ew)
                 ew_row = first_ward_row + ew_idx
                 parts.append(f'{get_column_letter(col)}{ew_row}')
-            ws.cell(row=r, column=col, value=f'={"+".join(parts)}').font = BOLD_FONT
-
-        ws.cell(row=r, column=11, value=f'=IFERROR(H{r}/{days},0)').font = BOLD_FONT
-        ws.cell(row=r, column=12, value=f'=IFERROR(H{r}/(E{r}+F{r}),0)').font = BOLD_FONT
-        ws.cell(row=r, column=13, value=f'=IFERROR((C{r}*{days}-H{r})/(E{r}+F{r}),0)').font = BOLD_FONT
-        ws.cell(row=r, column=14, value=f'=IFERROR((E{r}+F{r})/C{r},0)').font = BOLD_FONT
-        ws.cell(row=r, column=15, value=f'=IFERROR((H{r}/(C{r}*{days}))*100,0)').font = BOLD_FONT
-        ws.cell(row=r, column=16, value=f'=IFERROR((F{r}/(D{r}+B{r}))*100,0)').font = BOLD_FONT
-
-        for col in range(1, 17):
-            ws.cell(row=r, column=col).alignment = CENTER
-            ws.cell(row=r, column=col).border = THIN_BORDER
-            ws.cell(row=r, column=col).fill = LIGHT_YELLOW_FILL
-        for col in range(11, 17):
-            ws.cell(row=r, column=col).number_format = '0.00'
+            st.cell(ws, r, col, "bu_subtotal", f'={"+".join(parts)}')
+
+        st.cell(ws, r, 11, "bu_subtotal_kpi", f'=IFERROR(H{r}/{days},0)')
+        st.cell(ws, r, 12, "bu_subtotal_kpi", f'=IFERROR(H{r}/(E{r}+F{r}),0)')
+        st.cell(ws, r, 13, "bu_subtotal_kpi", f'=IFERROR((C{r}*{days}-H{r})/(E{r}+F{r}),0)')
+        st.cell(ws, r, 14, "bu_subtotal_kpi", f'=IFERROR((E{r}+F{r})/C{r},0)')
+        st.cell(ws, r, 15, "bu_subtotal_kpi", f'=IFERROR((H{r}/(C{r}*{days}))*100,0)')
+        st.cell(ws, r, 16, "bu_subtotal_kpi", f'=IFERROR((F{r}/(D{r}+B{r}))*100,0)')
+
 
         current_row += 2  # spacer before next month
 
@@ -1114,6 +1013,7 @@ def build_period_summary_sheet(wb: Workbook, config: WorkbookConfig,
     `periods` is a list of dicts: {"label", "start_month", "end_month"}.
     Used by Quarterly Summary (4 periods) and Half-Year Summary (2 periods).
     """
+    st = styles_for(wb)
     ws = wb.create_sheet(sheet_name)
     ws.sheet_properties.tabColor = tab_color
 
@@ -1128,17 +1028,14 @@ def build_period_summary_sheet(wb: Workbook, config: WorkbookConfig,
         # Header
         ws.merge_cells(start_row=current_row, start_column=1,
                        end_row=current_row, end_column=16)
-        c = ws.cell(row=current_row, column=1, value="GHANA HEALTH SERVICE")
-        c.font = HEADER_FONT
-        c.alignment = CENTER
+        st.cell(ws, current_row, 1, "bu_title", "GHANA HEALTH SERVICE")
         current_row += 1
 
         ws.merge_cells(start_row=current_row, start_column=1,
                        end_row=current_row, end_column=16)
         c = ws.cell(row=current_row, column=1,
                     value=f"PERIOD BED UTILIZATION FORM - {label}, {config.year}")
-        c.font = SUBHEADER_FONT
-        c.alignment = CENTER
+        st.apply(c, "bu_subtitle")
         current_row += 1
 
         # Column headers
@@ -1151,11 +1048,7 @@ def build_period_summary_sheet(wb: Workbook, config: WorkbookConfig,
             "Percentage\nof\nOccupancy", "Death\nRate"
         ]
         for col, header in enumerate(col_headers, 1):
-            c = ws.cell(row=current_row, column=col, value=header)
-            c.font = HEADER_FONT_WHITE
-            c.fill = HEADER_FILL
-            c.alignment = CENTER_WRAP
-            c.border = THIN_BORDER
+            st.cell(ws, current_row, col, "bu_col_header", header)
         current_row += 1
 
         # ── Ward rows ────────────────────────────────────────────────
@@ -1164,8 +1057,7 @@ def build_period_summary_sheet(wb: Workbook, config: WorkbookConfig,
             wc = ward.code
 
             # Col A: Ward name
-            ws.cell(row=r, column=1, value=ward.name).font = BOLD_FONT
-            ws.cell(row=r, column=1).border = THIN_BORDER
+            st.cell(ws, r, 1, "bu_cell_bold", ward.name)
 
             # Col B: Patients at beginning of period
             if sm == 1:
@@ -1181,11 +1073,11 @@ def build_period_summary_sheet(wb: Workbook, config: WorkbookConfig,
                     f'tblDaily[EntryDate],DATE({config.year},{pm},{pld}),'
                     f'tblDaily[WardCode],"{wc}"),0)'
                 )
-            ws.cell(row=r, column=2, value=f_beg).font = NORMAL_FONT
+            st.cell(ws, r, 2, "bu_cell", f_beg)
 
             # Col C: Bed Complement
             f_bc = f'=IFERROR(INDEX(tblWardConfig[BedComplement],MATCH("{wc}",tblWardConfig[WardCode],0)),0)'
-            ws.cell(row=r, column=3, value=f_bc).font = NORMAL_FONT
+            st.cell(ws, r, 3, "bu_cell", f_bc)
 
             # Col D-G: Admissions, Discharges, Deaths, Deaths<24Hrs (month-range criteria)
             daily_fields = {
@@ -1203,13 +1095,13 @@ def build_period_summary_sheet(wb: Workbook, config: WorkbookConfig,
                     f = (f'=SUMIFS(tblDaily[{field}],'
                          f'tblDaily[Month],">="&{sm},tblDaily[Month],"<="&{em},'
                          f'tblDaily[WardCode],"{wc}")')
-                ws.cell(row=r, column=col_num, value=f).font = NORMAL_FONT
+                st.cell(ws, r, col_num, "bu_cell", f)
 
             # Col H: Patient Days (Remaining summed over month range)
             f_pd = (f'=SUMIFS(tblDaily[Remaining],'
                     f'tblDaily[Month],">="&{sm},tblDaily[Month],"<="&{em},'
                     f'tblDaily[WardCode],"{wc}")')
-            ws.cell(row=r, column=8, value=f_pd).font = NORMAL_FONT
+            st.cell(ws, r, 8, "bu_cell", f_pd)
 
             # Col I-J: Transfers In/Out (month-range)
             f_ti = (f'=SUMIFS(tblDaily[TransfersIn],'
@@ -1218,35 +1110,28 @@ def build_period_summary_sheet(wb: Workbook, config: WorkbookConfig,
             f_to = (f'=SUMIFS(tblDaily[TransfersOut],'
                     f'tblDaily[Month],">="&{sm},tblDaily[Month],"<="&{em},'
                     f'tblDaily[WardCode],"{wc}")')
-            ws.cell(row=r, column=9, value=f_ti).font = NORMAL_FONT
-            ws.cell(row=r, column=10, value=f_to).font = NORMAL_FONT
+            st.cell(ws, r, 9, "bu_cell", f_ti)
+            st.cell(ws, r, 10, "bu_cell", f_to)
 
             # Col K: Average Daily Bed Occupancy = Patient Days / Days in period
-            ws.cell(row=r, column=11, value=f'=IFERROR(H{r}/{days},0)').font = NORMAL_FONT
+            st.cell(ws, r, 11, "bu_kpi", f'=IFERROR(H{r}/{days},0)')
             # Col L: Average Length of Stay = PD / (Disch + Deaths)
-            ws.cell(row=r, column=12, value=f'=IFERROR(H{r}/(E{r}+F{r}),0)').font = NORMAL_FONT
+            st.cell(ws, r, 12, "bu_kpi", f'=IFERROR(H{r}/(E{r}+F{r}),0)')
             # Col M: Bed Turnover Interval
-            ws.cell(row=r, column=13, value=f'=IFERROR((C{r}*{days}-H{r})/(E{r}+F{r}),0)').font = NORMAL_FONT
+            st.cell(ws, r, 13, "bu_kpi", f'=IFERROR((C{r}*{days}-H{r})/(E{r}+F{r}),0)')
             # Col N: Bed Turnover Rate
-            ws.cell(row=r, column=14, value=f'=IFERROR((E{r}+F{r})/C{r},0)').font = NORMAL_FONT
+            st.cell(ws, r, 14, "bu_kpi", f'=IFERROR((E{r}+F{r})/C{r},0)')
             # Col O: % Occupancy
-            ws.cell(row=r, column=15, value=f'=IFERROR((H{r}/(C{r}*{days}))*100,0)').font = NORMAL_FONT
+            st.cell(ws, r, 15, "bu_kpi", f'=IFERROR((H{r}/(C{r}*{days}))*100,0)')
             # Col P: Death Rate
-            ws.cell(row=r, column=16, value=f'=IFERROR((F{r}/(D{r}+B{r}))*100,0)').font = NORMAL_FONT
-
-            for col in range(11, 17):
-                ws.cell(row=r, column=col).number_format = '0.00'
-            for col in range(1, 17):
-                ws.cell(row=r, column=col).alignment = CENTER
-                ws.cell(row=r, column=col).border = THIN_BORDER
+            st.cell(ws, r, 16, "bu_kpi", f'=IFERROR((F{r}/(D{r}+B{r}))*100,0)')
 
             current_row += 1
 
         # ── EMERGENCY TOTAL REMAINING row ────────────────────────────
         if config.preferences.show_emergency_total_remaining:
             r = current_row
-            ws.cell(row=r, column=1, value="EMERGENCY TOTAL REMAINING").font = BOLD_FONT
-            ws.cell(row=r, column=1).fill = PatternFill(start_color="FFD966", end_color="FFD966", fill_type="solid")
+            st.cell(ws, r, 1, "bu_emergency", "EMERGENCY TOTAL REMAINING")
 
             date_formula = f'DATE({config.year},{em},{last_day})'
             emer_wards = [w for w in config.WARDS if w.is_emergency]
@@ -1254,50 +1139,36 @@ def build_period_summary_sheet(wb: Workbook, config: WorkbookConfig,
             for ew in emer_wards:
                 parts.append(f'SUMIFS(tblDaily[Remaining],tblDaily[EntryDate],{date_formula},tblDaily[WardCode],"{ew.code}")')
 
-            ws.cell(row=r, column=2, value=f'={"+".join(parts)}').font = BOLD_FONT
+            st.cell(ws, r, 2, "bu_cell_bold", f'={"+".join(parts)}')
 
             for col in range(3, 17):
-                ws.cell(row=r, column=col, value="")
-                ws.cell(row=r, column=col).fill = PatternFill(start_color="FFD966", end_color="FFD966", fill_type="solid")
-
-            for col in range(1, 17):
-                ws.cell(row=r, column=col).alignment = CENTER
-                ws.cell(row=r, column=col).border = THIN_BORDER
+                st.cell(ws, r, col, "bu_emergency_pad", "")
 
             current_row += 1
 
         # ── TOTAL row ────────────────────────────────────────────────
         r = current_row
-        ws.cell(row=r, column=1, value="TOTAL").font = BOLD_FONT
-        ws.cell(row=r, column=1).fill = TOTAL_FILL
+        st.cell(ws, r, 1, "bu_total", "TOTAL")
 
         emergency_offset = 1 if config.preferences.show_emergency_total_remaining else 0
         first_ward_row = r - len(config.WARDS) - emergency_offset
         last_ward_row = r - 1 - emergency_offset
         for col in range(2, 11):
             cl = get_column_letter(col)
-            ws.cell(row=r, column=col,
-                    value=f'=SUM({cl}{first_ward_row}:{cl}{last_ward_row})').font = BOLD_FONT
-
-        ws.cell(row=r, column=11, value=f'=IFERROR(H{r}/{days},0)').font = BOLD_FONT
-        ws.cell(row=r, column=12, value=f'=IFERROR(H{r}/(E{r}+F{r}),0)').font = BOLD_FONT
-        ws.cell(row=r, column=13, value=f'=IFERROR((C{r}*{days}-H{r})/(E{r}+F{r}),0)').font = BOLD_FONT
-        ws.cell(row=r, column=14, value=f'=IFERROR((E{r}+F{r})/C{r},0)').font = BOLD_FONT
-        ws.cell(row=r, column=15, value=f'=IFERROR((H{r}/(C{r}*{days}))*100,0)').font = BOLD_FONT
-        ws.cell(row=r, column=16, value=f'=IFERROR((F{r}/(D{r}+B{r}))*100,0)').font = BOLD_FONT
-
-        for col in range(1, 17):
-            ws.cell(row=r, column=col).alignment = CENTER
-            ws.cell(row=r, column=col).border = THIN_BORDER
-            ws.cell(row=r, column=col).fill = TOTAL_FILL
-        for col in range(11, 17):
-            ws.cell(row=r, column=col).number_format = '0.00'
+            st.cell(ws, r, col, "bu_total", f'=SUM({cl}{first_ward_row}:{cl}{last_ward_row})')
+
+        st.cell(ws, r, 11, "bu_total_kpi", f'=IFERROR(H{r}/{days},0)')
+        st.cell(ws, r, 12, "bu_total_kpi", f'=IFERROR(H{r}/(E{r}+F{r}),0)')
+        st.cell(ws, r, 13, "bu_total_kpi", f'=IFERROR((C{r}*{days}-H{r})/(E{r}+F{r}),0)')
+        st.cell(ws, r, 14, "bu_total_kpi", f'=IFERROR((E{r}+F{r})/C{r},0)')
+        st.cell(ws, r, 15, "bu_total_kpi", f'=IFERROR((H{r}/(C{r}*{days}))*100,0)')
+        st.cell(ws, r, 16, "bu_total_kpi", f'=IFERROR((F{r}/(D{r}+B{r}))*100,0)')
+
         current_row += 1
 
         # ── Emergency subtotal row ───────────────────────────────────
         r = current_row
-        ws.cell(row=r, column=1, value="Emergency").font = BOLD_FONT
-        ws.cell(row=r, column=1).fill = LIGHT_YELLOW_FILL
+        st.cell(ws, r, 1, "bu_subtotal", "Emergency")
 
         emer_wards = [w for w in config.WARDS if w.is_emergency]
         for col in range(2, 11):
@@ -1306,21 +1177,15 @@ def build_period_summary_sheet(wb: Workbook, config: WorkbookConfig,
                 ew_idx = config.WARDS.index(ew)
                 ew_row = first_ward_row + ew_idx
                 parts.append(f'{get_column_letter(col)}{ew_row}')
-            ws.cell(row=r, column=col, value=f'={"+".join(parts)}').font = BOLD_FONT
-
-        ws.cell(row=r, column=11, value=f'=IFERROR(H{r}/{days},0)').font = BOLD_FONT
-        ws.cell(row=r, column=12, value=f'=IFERROR(H{r}/(E{r}+F{r}),0)').font = BOLD_FONT
-        ws.cell(row=r, column=13, value=f'=IFERROR((C{r}*{days}-H{r})/(E{r}+F{r}),0)').font = BOLD_FONT
-        ws.cell(row=r, column=14, value=f'=IFERROR((E{r}+F{r})/C{r},0)').font = BOLD_FONT
-        ws.cell(row=r, column=15, value=f'=IFERROR((H{r}/(C{r}*{days}))*100,0)').font = BOLD_FONT
-        ws.cell(row=r, column=16, value=f'=IFERROR((F{r}/(D{r}+B{r}))*100,0)').font = BOLD_FONT
-
-        for col in range(1, 17):
-            ws.cell(row=r, column=col).alignment = CENTER
-            ws.cell(row=r, column=col).border = THIN_BORDER
-            ws.cell(row=r, column=col).fill = LIGHT_YELLOW_FILL
-        for col in range(11, 17):
-            ws.cell(row=r, column=col).number_format = '0.00'
+            st.cell(ws, r, col, "bu_subtotal", f'={"+".join(parts)}')
+
+        st.cell(ws, r, 11, "bu_subtotal_kpi", f'=IFERROR(H{r}/{days},0)')
+        st.cell(ws, r, 12, "bu_subtotal_kpi", f'=IFERROR(H{r}/(E{r}+F{r}),0)')
+        st.cell(ws, r, 13, "bu_subtotal_kpi", f'=IFERROR((C{r}*{days}-H{r})/(E{r}+F{r}),0)')
+        st.cell(ws, r, 14, "bu_subtotal_kpi", f'=IFERROR((E{r}+F{r})/C{r},0)')
+        st.cell(ws, r, 15, "bu_subtotal_kpi", f'=IFERROR((H{r}/(C{r}*{days}))*100,0)')
+        st.cell(ws, r, 16, "bu_subtotal_kpi", f'=IFERROR((F{r}/(D{r}+B{r}))*100,0)')
+
 
         current_row += 2  # spacer before next period
 
@@ -1361,6 +1226,7 @@ def build_halfyear_summary_sheet(wb: Workbook, config: WorkbookConfig):
 # ═══════════════════════════════════════════════════════════════════════════════
 
 def build_ages_summary_sheet(wb: Workbook, config: WorkbookConfig):
+    st = styles_for(wb)
     ws = wb.create_sheet("Ages Summary")
     ws.sheet_properties.tabColor = "7030A0"
 
@@ -1379,11 +1245,7 @@ def build_ages_summary_sheet(wb: Workbook, config: WorkbookConfig):
         start_col = 1 + (m - 1) * SECTION_WIDTH
         ws.merge_cells(start_row=1, start_column=start_col,
                        end_row=1, end_column=start_col + SECTION_WIDTH - 1)
-        c = ws.cell(row=1, column=start_col, value=config.MONTH_NAMES[m - 1])
-        c.font = SUBHEADER_FONT
-        c.alignment = CENTER
-        c.fill = HEADER_FILL
-        c.font = HEADER_FONT_WHITE
+        st.cell(ws, 1, start_col, "bu_section_header", config.MONTH_NAMES[m - 1])
 
     # Row 2: Category headers
     for m in range(1, 13):
@@ -1415,89 +1277,59 @@ def build_ages_summary_sheet(wb: Workbook, config: WorkbookConfig):
     # Row 3: Male/Female subheaders
     for m in range(1, 13):
         sc = 1 + (m - 1) * SECTION_WIDTH
-        ws.cell(row=3, column=sc, value="Age Group").font = BOLD_FONT
-        ws.cell(row=3, column=sc).alignment = CENTER
-        ws.cell(row=3, column=sc).border = THIN_BORDER
+        st.cell(ws, 3, sc, "bu_cell_bold", "Age Group")
         for offset, label in [(1, "Male"), (2, "FEMALE"),
                                (3, "MALE"), (4, "FRMALE"),
                                (5, "MALE"), (6, "FRMALE")]:
-            c = ws.cell(row=3, column=sc + offset, value=label)
-            c.font = BOLD_FONT
-            c.alignment = CENTER
-            c.border = THIN_BORDER
+            st.cell(ws, 3, sc + offset, "bu_cell_bold", label)
 
     # Rows 4-15: Age group data with COUNTIFS formulas
     for m in range(1, 13):
         sc = 1 + (m - 1) * SECTION_WIDTH
 
-        for ag_idx, (ag_label, age_unit, age_min, age_max) in enumerate(config.AGE_GROUPS):
+        for ag_idx, group in enumerate(config.AGE_GROUPS):
             r = 4 + ag_idx
-            ws.cell(row=r, column=sc, value=ag_label).font = NORMAL_FONT
-            ws.cell(row=r, column=sc).alignment = CENTER
-            ws.cell(row=r, column=sc).border = THIN_BORDER
-
-            # Build COUNTIFS for each combination
-            # Both ins and non-ins Male (col sc+1)
-            base = (
-                f'COUNTIFS(tblAdmissions[Month],{m},'
-                f'tblAdmissions[AgeUnit],"{age_unit}",'
-                f'tblAdmissions[Age],">="&{age_min},'
-                f'tblAdmissions[Age],"<="&{age_max},'
-            )
+            st.cell(ws, r, sc, "bu_cell", group.label)
+
+            # One COUNTIFS on the AgeGroup column (see age_groups.countifs)
+            month = f'tblAdmissions[Month],{m}'
             # Total Male
-            ws.cell(row=r, column=sc + 1,
-                    value=f'={base}tblAdmissions[Sex],"M")').font = NORMAL_FONT
+            st.cell(ws, r, sc + 1, "bu_cell",
+                    "=" + countifs("tblAdmissions", group, f'{month},tblAdmissions[Sex],"M"'))
             # Total Female
-            ws.cell(row=r, column=sc + 2,
-                    value=f'={base}tblAdmissions[Sex],"F")').font = NORMAL_FONT
+            st.cell(ws, r, sc + 2, "bu_cell",
+                    "=" + countifs("tblAdmissions", group, f'{month},tblAdmissions[Sex],"F"'))
             # Non-Insured Male
-            ws.cell(row=r, column=sc + 3,
-                    value=f'={base}tblAdmissions[Sex],"M",tblAdmissions[NHIS],"Non-Insured")').font = NORMAL_FONT
+            st.cell(ws, r, sc + 3, "bu_cell",
+                    "=" + countifs("tblAdmissions", group, f'{month},tblAdmissions[Sex],"M",tblAdmissions[NHIS],"Non-Insured"'))
             # Non-Insured Female
-            ws.cell(row=r, column=sc + 4,
-                    value=f'={base}tblAdmissions[Sex],"F",tblAdmissions[NHIS],"Non-Insured")').font = NORMAL_FONT
+            st.cell(ws, r, sc + 4, "bu_cell",
+                    "=" + countifs("tblAdmissions", group, f'{month},tblAdmissions[Sex],"F",tblAdmissions[NHIS],"Non-Insured"'))
             # Insured Male
-            ws.cell(row=r, column=sc + 5,
-                    value=f'={base}tblAdmissions[Sex],"M",tblAdmissions[NHIS],"Insured")').font = NORMAL_FONT
+            st.cell(ws, r, sc + 5, "bu_cell",
+                    "=" + countifs("tblAdmissions", group, f'{month},tblAdmissions[Sex],"M",tblAdmissions[NHIS],"Insured"'))
             # Insured Female
-            ws.cell(row=r, column=sc + 6,
-                    value=f'={base}tblAdmissions[Sex],"F",tblAdmissions[NHIS],"Insured")').font = NORMAL_FONT
-
-            for col_off in range(1, 7):
-                ws.cell(row=r, column=sc + col_off).alignment = CENTER
-                ws.cell(row=r, column=sc + col_off).border = THIN_BORDER
+            st.cell(ws, r, sc + 6, "bu_cell",
+                    "=" + countifs("tblAdmissions", group, f'{month},tblAdmissions[Sex],"F",tblAdmissions[NHIS],"Insured"'))
 
         # Uncategorized row
         uncat_row = 4 + len(config.AGE_GROUPS)
-        ws.cell(row=uncat_row, column=sc, value="Uncategorized").font = NORMAL_FONT
-        ws.cell(row=uncat_row, column=sc).alignment = CENTER
-        ws.cell(row=uncat_row, column=sc).border = THIN_BORDER
+        st.cell(ws, uncat_row, sc, "bu_cell", "Uncategorized")
         
         base_total = f'COUNTIFS(tblAdmissions[Month],{m},'
-        ws.cell(row=uncat_row, column=sc + 1, value=f'={base_total}tblAdmissions[Sex],"M")-SUM({get_column_letter(sc+1)}4:{get_column_letter(sc+1)}{uncat_row-1})').font = NORMAL_FONT
-        ws.cell(row=uncat_row, column=sc + 2, value=f'={base_total}tblAdmissions[Sex],"F")-SUM({get_column_letter(sc+2)}4:{get_column_letter(sc+2)}{uncat_row-1})').font = NORMAL_FONT
-        ws.cell(row=uncat_row, column=sc + 3, value=f'={base_total}tblAdmissions[Sex],"M",tblAdmissions[NHIS],"Non-Insured")-SUM({get_column_letter(sc+3)}4:{get_column_letter(sc+3)}{uncat_row-1})').font = NORMAL_FONT
-        ws.cell(row=uncat_row, column=sc + 4, value=f'={base_total}tblAdmissions[Sex],"F",tblAdmissions[NHIS],"Non-Insured")-SUM({get_column_letter(sc+4)}4:{get_column_letter(sc+4)}{uncat_row-1})').font = NORMAL_FONT
-        ws.cell(row=uncat_row, column=sc + 5, value=f'={base_total}tblAdmissions[Sex],"M",tblAdmissions[NHIS],"Insured")-SUM({get_column_letter(sc+5)}4:{get_column_letter(sc+5)}{uncat_row-1})').font = NORMAL_FONT
-        ws.cell(row=uncat_row, column=sc + 6, value=f'={base_total}tblAdmissions[Sex],"F",tblAdmissions[NHIS],"Insured")-SUM({get_column_letter(sc+6)}4:{get_column_letter(sc+6)}{uncat_row-1})').font = NORMAL_FONT
-
-        for col_off in range(1, 7):
-            ws.cell(row=uncat_row, column=sc + col_off).alignment = CENTER
-            ws.cell(row=uncat_row, column=sc + col_off).border = THIN_BORDER
+        st.cell(ws, uncat_row, sc + 1, "bu_cell", f'={base_total}tblAdmissions[Sex],"M")-SUM({get_column_letter(sc+1)}4:{get_column_letter(sc+1)}{uncat_row-1})')
+        st.cell(ws, uncat_row, sc + 2, "bu_cell", f'={base_total}tblAdmissions[Sex],"F")-SUM({get_column_letter(sc+2)}4:{get_column_letter(sc+2)}{uncat_row-1})')
+        st.cell(ws, uncat_row, sc + 3, "bu_cell", f'={base_total}tblAdmissions[Sex],"M",tblAdmissions[NHIS],"Non-Insured")-SUM({get_column_letter(sc+3)}4:{get_column_letter(sc+3)}{uncat_row-1})')
+        st.cell(ws, uncat_row, sc + 4, "bu_cell", f'={base_total}tblAdmissions[Sex],"F",tblAdmissions[NHIS],"Non-Insured")-SUM({get_column_letter(sc+4)}4:{get_column_letter(sc+4)}{uncat_row-1})')
+        st.cell(ws, uncat_row, sc + 5, "bu_cell", f'={base_total}tblAdmissions[Sex],"M",tblAdmissions[NHIS],"Insured")-SUM({get_column_letter(sc+5)}4:{get_column_letter(sc+5)}{uncat_row-1})')
+        st.cell(ws, uncat_row, sc + 6, "bu_cell", f'={base_total}tblAdmissions[Sex],"F",tblAdmissions[NHIS],"Insured")-SUM({get_column_letter(sc+6)}4:{get_column_letter(sc+6)}{uncat_row-1})')
 
         # Total row
         total_row = uncat_row + 1
-        ws.cell(row=total_row, column=sc, value="Total").font = BOLD_FONT
-        ws.cell(row=total_row, column=sc).alignment = CENTER
-        ws.cell(row=total_row, column=sc).fill = TOTAL_FILL
-        ws.cell(row=total_row, column=sc).border = THIN_BORDER
+        st.cell(ws, total_row, sc, "bu_total", "Total")
         for col_off in range(1, 7):
             cl = get_column_letter(sc + col_off)
-            ws.cell(row=total_row, column=sc + col_off,
-                    value=f'=SUM({cl}4:{cl}{total_row - 1})').font = BOLD_FONT
-            ws.cell(row=total_row, column=sc + col_off).alignment = CENTER
-            ws.cell(row=total_row, column=sc + col_off).fill = TOTAL_FILL
-            ws.cell(row=total_row, column=sc + col_off).border = THIN_BORDER
+            st.cell(ws, total_row, sc + col_off, "bu_total", f'=SUM({cl}4:{cl}{total_row - 1})')
 
     # Set column widths
     for m in range(1, 13):
@@ -1513,6 +1345,7 @@ def build_ages_summary_sheet(wb: Workbook, config: WorkbookConfig):
 
 def build_deaths_summary_sheet(wb: Workbook, config: WorkbookConfig):
     """Creates an age group summary for deaths, matching Ages Summary format"""
+    st = styles_for(wb)
     ws = wb.create_sheet("Deaths Summary")
     ws.sheet_properties.tabColor = "C00000"
 
@@ -1531,11 +1364,7 @@ def build_deaths_summary_sheet(wb: Workbook, config: WorkbookConfig):
         start_col = 1 + (m - 1) * SECTION_WIDTH
         ws.merge_cells(start_row=1, start_column=start_col,
                        end_row=1, end_column=start_col + SECTION_WIDTH - 1)
-        c = ws.cell(row=1, column=start_col, value=config.MONTH_NAMES[m - 1])
-        c.font = SUBHEADER_FONT
-        c.alignment = CENTER
-        c.fill = HEADER_FILL
-        c.font = HEADER_FONT_WHITE
+        st.cell(ws, 1, start_col, "bu_section_header", config.MONTH_NAMES[m - 1])
 
     # Row 2: Category headers
     for m in range(1, 13):
@@ -1565,88 +1394,59 @@ def build_deaths_summary_sheet(wb: Workbook, config: WorkbookConfig):
     # Row 3: Male/Female subheaders
     for m in range(1, 13):
         sc = 1 + (m - 1) * SECTION_WIDTH
-        ws.cell(row=3, column=sc, value="Age Group").font = BOLD_FONT
-        ws.cell(row=3, column=sc).alignment = CENTER
-        ws.cell(row=3, column=sc).border = THIN_BORDER
+        st.cell(ws, 3, sc, "bu_cell_bold", "Age Group")
         for offset, label in [(1, "Male"), (2, "FEMALE"),
                                (3, "MALE"), (4, "FRMALE"),
                                (5, "MALE"), (6, "FRMALE")]:
-            c = ws.cell(row=3, column=sc + offset, value=label)
-            c.font = BOLD_FONT
-            c.alignment = CENTER
-            c.border = THIN_BORDER
+            st.cell(ws, 3, sc + offset, "bu_cell_bold", label)
 
     # Rows 4-15: Age group data with COUNTIFS formulas
     for m in range(1, 13):
         sc = 1 + (m - 1) * SECTION_WIDTH
 
-        for ag_idx, (ag_label, age_unit, age_min, age_max) in enumerate(config.AGE_GROUPS):
+        for ag_idx, group in enumerate(config.AGE_GROUPS):
             r = 4 + ag_idx
-            ws.cell(row=r, column=sc, value=ag_label).font = NORMAL_FONT
-            ws.cell(row=r, column=sc).alignment = CENTER
-            ws.cell(row=r, column=sc).border = THIN_BORDER
-
-            # Build COUNTIFS for deaths
-            base = (
-                f'COUNTIFS(tblDeaths[Month],{m},'
-                f'tblDeaths[AgeUnit],"{age_unit}",'
-                f'tblDeaths[Age],">="&{age_min},'
-                f'tblDeaths[Age],"<="&{age_max},'
-            )
+            st.cell(ws, r, sc, "bu_cell", group.label)
+
+            # One COUNTIFS on the AgeGroup column (see age_groups.countifs)
+            month = f'tblDeaths[Month],{m}'
             # Total Male
-            ws.cell(row=r, column=sc + 1,
-                    value=f'={base}tblDeaths[Sex],"M")').font = NORMAL_FONT
+            st.cell(ws, r, sc + 1, "bu_cell",
+                    "=" + countifs("tblDeaths", group, f'{month},tblDeaths[Sex],"M"'))
             # Total Female
-            ws.cell(row=r, column=sc + 2,
-                    value=f'={base}tblDeaths[Sex],"F")').font = NORMAL_FONT
+            st.cell(ws, r, sc + 2, "bu_cell",
+                    "=" + countifs("tblDeaths", group, f'{month},tblDeaths[Sex],"F"'))
             # Non-Insured Male
-            ws.cell(row=r, column=sc + 3,
-                    value=f'={base}tblDeaths[Sex],"M",tblDeaths[NHIS],"Non-Insured")').font = NORMAL_FONT
+            st.cell(ws, r, sc + 3, "bu_cell",
+                    "=" + countifs("tblDeaths", group, f'{month},tblDeaths[Sex],"M",tblDeaths[NHIS],"Non-Insured"'))
             # Non-Insured Female
-            ws.cell(row=r, column=sc + 4,
-                    value=f'={base}tblDeaths[Sex],"F",tblDeaths[NHIS],"Non-Insured")').font = NORMAL_FONT
+            st.cell(ws, r, sc + 4, "bu_cell",
+                    "=" + countifs("tblDeaths", group, f'{month},tblDeaths[Sex],"F",tblDeaths[NHIS],"Non-Insured"'))
             # Insured Male
-            ws.cell(row=r, column=sc + 5,
-                    value=f'={base}tblDeaths[Sex],"M",tblDeaths[NHIS],"Insured")').font = NORMAL_FONT
+            st.cell(ws, r, sc + 5, "bu_cell",
+                    "=" + countifs("tblDeaths", group, f'{month},tblDeaths[Sex],"M",tblDeaths[NHIS],"Insured"'))
             # Insured Female
-            ws.cell(row=r, column=sc + 6,
-                    value=f'={base}tblDeaths[Sex],"F",tblDeaths[NHIS],"Insured")').font = NORMAL_FONT
-
-            for col_off in range(1, 7):
-                ws.cell(row=r, column=sc + col_off).alignment = CENTER
-                ws.cell(row=r, column=sc + col_off).border = THIN_BORDER
+            st.cell(ws, r, sc + 6, "bu_cell",
+                    "=" + countifs("tblDeaths", group, f'{month},tblDeaths[Sex],"F",tblDeaths[NHIS],"Insured"'))
 
         # Uncategorized row
         uncat_row = 4 + len(config.AGE_GROUPS)
-        ws.cell(row=uncat_row, column=sc, value="Uncategorized").font = NORMAL_FONT
-        ws.cell(row=uncat_row, column=sc).alignment = CENTER
-        ws.cell(row=uncat_row, column=sc).border = THIN_BORDER
+        st.cell(ws, uncat_row, sc, "bu_cell", "Uncategorized")
         
         base_total = f'COUNTIFS(tblDeaths[Month],{m},'
-        ws.cell(row=uncat_row, column=sc + 1, value=f'={base_total}tblDeaths[Sex],"M")-SUM({get_column_letter(sc+1)}4:{get_column_letter(sc+1)}{uncat_row-1})').font = NORMAL_FONT
-        ws.cell(row=uncat_row, column=sc + 2, value=f'={base_total}tblDeaths[Sex],"F")-SUM({get_column_letter(sc+2)}4:{get_column_letter(sc+2)}{uncat_row-1})').font = NORMAL_FONT
-        ws.cell(row=uncat_row, column=sc + 3, value=f'={base_total}tblDeaths[Sex],"M",tblDeaths[NHIS],"Non-Insured")-SUM({get_column_letter(sc+3)}4:{get_column_letter(sc+3)}{uncat_row-1})').font = NORMAL_FONT
-        ws.cell(row=uncat_row, column=sc + 4, value=f'={base_total}tblDeaths[Sex],"F",tblDeaths[NHIS],"Non-Insured")-SUM({get_column_letter(sc+4)}4:{get_column_letter(sc+4)}{uncat_row-1})').font = NORMAL_FONT
-        ws.cell(row=uncat_row, column=sc + 5, value=f'={base_total}tblDeaths[Sex],"M",tblDeaths[NHIS],"Insured")-SUM({get_column_letter(sc+5)}4:{get_column_letter(sc+5)}{uncat_row-1})').font = NORMAL_FONT
-        ws.cell(row=uncat_row, column=sc + 6, value=f'={base_total}tblDeaths[Sex],"F",tblDeaths[NHIS],"Insured")-SUM({get_column_letter(sc+6)}4:{get_column_letter(sc+6)}{uncat_row-1})').font = NORMAL_FONT
-
-        for col_off in range(1, 7):
-            ws.cell(row=uncat_row, column=sc + col_off).alignment = CENTER
-            ws.cell(row=uncat_row, column=sc + col_off).border = THIN_BORDER
+        st.cell(ws, uncat_row, sc + 1, "bu_cell", f'={base_total}tblDeaths[Sex],"M")-SUM({get_column_letter(sc+1)}4:{get_column_letter(sc+1)}{uncat_row-1})')
+        st.cell(ws, uncat_row, sc + 2, "bu_cell", f'={base_total}tblDeaths[Sex],"F")-SUM({get_column_letter(sc+2)}4:{get_column_letter(sc+2)}{uncat_row-1})')
+        st.cell(ws, uncat_row, sc + 3, "bu_cell", f'={base_total}tblDeaths[Sex],"M",tblDeaths[NHIS],"Non-Insured")-SUM({get_column_letter(sc+3)}4:{get_column_letter(sc+3)}{uncat_row-1})')
+        st.cell(ws, uncat_row, sc + 4, "bu_cell", f'={base_total}tblDeaths[Sex],"F",tblDeaths[NHIS],"Non-Insured")-SUM({get_column_letter(sc+4)}4:{get_column_letter(sc+4)}{uncat_row-1})')
+        st.cell(ws, uncat_row, sc + 5, "bu_cell", f'={base_total}tblDeaths[Sex],"M",tblDeaths[NHIS],"Insured")-SUM({get_column_letter(sc+5)}4:{get_column_letter(sc+5)}{uncat_row-1})')
+        st.cell(ws, uncat_row, sc + 6, "bu_cell", f'={base_total}tblDeaths[Sex],"F",tblDeaths[NHIS],"Insured")-SUM({get_column_letter(sc+6)}4:{get_column_letter(sc+6)}{uncat_row-1})')
 
         # Total row
         total_row = uncat_row + 1
-        ws.cell(row=total_row, column=sc, value="Total").font = BOLD_FONT
-        ws.cell(row=total_row, column=sc).alignment = CENTER
-        ws.cell(row=total_row, column=sc).fill = TOTAL_FILL
-        ws.cell(row=total_row, column=sc).border = THIN_BORDER
+        st.cell(ws, total_row, sc, "bu_total", "Total")
         for col_off in range(1, 7):
             cl = get_column_letter(sc + col_off)
-            ws.cell(row=total_row, column=sc + col_off,
-                    value=f'=SUM({cl}4:{cl}{total_row - 1})').font = BOLD_FONT
-            ws.cell(row=total_row, column=sc + col_off).alignment = CENTER
-            ws.cell(row=total_row, column=sc + col_off).fill = TOTAL_FILL
-            ws.cell(row=total_row, column=sc + col_off).border = THIN_BORDER
+            st.cell(ws, total_row, sc + col_off, "bu_total", f'=SUM({cl}4:{cl}{total_row - 1})')
 
     # Set column widths
     for m in range(1, 13):
@@ -1692,13 +1492,12 @@ def build_cod_summary_sheet(wb: Workbook, config: WorkbookConfig):
 # ═══════════════════════════════════════════════════════════════════════════════
 
 def build_statement_of_inpatient_sheet(wb: Workbook, config: WorkbookConfig):
+    st = styles_for(wb)
     ws = wb.create_sheet("Statement of Inpatient")
     ws.sheet_properties.tabColor = "0000FF"
 
     ws.merge_cells("A1:P1")
-    c = ws.cell(row=1, column=1, value="GHANA HEALTH SERVICE - STATEMENT OF INPATIENT (YEARLY SUMMARY)")
-    c.font = HEADER_FONT
-    c.alignment = CENTER
+    st.cell(ws, 1, 1, "bu_title", "GHANA HEALTH SERVICE - STATEMENT OF INPATIENT (YEARLY SUMMARY)")
 
     # Headers same as Monthly Summary
     col_headers = [
@@ -1710,11 +1509,7 @@ def build_statement_of_inpatient_sheet(wb: Workbook, config: WorkbookConfig):
         "Percentage\nof\nOccupancy", "Death\nRate"
     ]
     for col, header in enumerate(col_headers, 1):
-        c = ws.cell(row=3, column=col, value=header)
-        c.font = HEADER_FONT_WHITE
-        c.fill = HEADER_FILL
-        c.alignment = CENTER_WRAP
-        c.border = THIN_BORDER
+        st.cell(ws, 3, col, "bu_col_header", header)
     
     current_row = 4
     days_in_year = 365 + (1 if config.year % 4 == 0 else 0)
@@ -1724,18 +1519,18 @@ def build_statement_of_inpatient_sheet(wb: Workbook, config: WorkbookConfig):
         wc = ward.code
         
         # A: Name
-        ws.cell(row=r, column=1, value=ward.name).font = BOLD_FONT
+        st.cell(ws, r, 1, "bu_bordered_bold", ward.name)
         
         # B: Start of year
         f_beg = (
             f'=IFERROR(INDEX(tblWardConfig[PrevYearRemaining],'
             f'MATCH("{wc}",tblWardConfig[WardCode],0)),0)'
         )
-        ws.cell(row=r, column=2, value=f_beg).font = NORMAL_FONT
+        st.cell(ws, r, 2, "bu_bordered_normal", f_beg)
         
         # C: BC
         f_bc = f'=IFERROR(INDEX(tblWardConfig[BedComplement],MATCH("{wc}",tblWardConfig[WardCode],0)),0)'
-        ws.cell(row=r, column=3, value=f_bc).font = NORMAL_FONT
+        st.cell(ws, r, 3, "bu_bordered_normal", f_bc)
         
         # D-G, I-J: Sums
         if config.preferences.subtract_deaths_under_24hrs_from_admissions:
@@ -1775,11 +1570,9 @@ def build_statement_of_inpatient_sheet(wb: Workbook, config: WorkbookConfig):
         current_row += 1
 
     # Format
-    for r in range(4, current_row):
-        for c in range(1, 17):
-            ws.cell(row=r, column=c).border = THIN_BORDER
-        for c in range(11, 17):
-            ws.cell(row=r, column=c).number_format = '0.00'
+    if current_row > 4:
+        st.apply_range(ws, 4, current_row - 1, 4, 10, "bu_bordered")
+        st.apply_range(ws, 4, current_row - 1, 11, 16, "bu_bordered_kpi")
             
     ws.column_dimensions["A"].width = 18
     for i in range(2, 17):
@@ -1826,6 +1619,7 @@ def build_non_insured_report_sheet(wb: Workbook, config: WorkbookConfig):
 # ═══════════════════════════════════════════════════════════════════════════════
 
 def build_dhims_summary_sheet(wb: Workbook, config: WorkbookConfig):
+    st = styles_for(wb)
     ws = wb.create_sheet("DHIMS Summary")
     ws.sheet_properties.tabColor = "008000"
 
@@ -1893,56 +1687,35 @@ def build_dhims_summary_sheet(wb: Workbook, config: WorkbookConfig):
         ws.cell(row=6, column=col).border = THIN_BORDER
         ws.cell(row=6, column=col).font = BOLD_FONT
         
-    def _dhims_formula(table, age_units, age_mins, age_maxs, sex, nhis):
-        parts = []
-        for i in range(len(age_units)):
-            conds = []
-            conds.append(f'{table}[WardCode], IF($B$2="All Wards", "*", $B$2)')
-            conds.append(f'{table}[Month], IF($B$3="All Months", "<>", $B$3)')
-            conds.append(f'{table}[Sex], "{sex}"')
-            conds.append(f'{table}[NHIS], "{nhis}"')
-            conds.append(f'{table}[AgeUnit], "{age_units[i]}"')
-            if age_mins[i] is not None:
-                conds.append(f'{table}[Age], ">={age_mins[i]}"')
-            if age_maxs[i] is not None:
-                conds.append(f'{table}[Age], "<={age_maxs[i]}"')
-            parts.append(f'COUNTIFS({ ", ".join(conds) })')
-        return "=IFERROR(" + " + ".join(parts) + ", 0)"
-
-    age_groups = [
-        ("0-28 Days", ["Days"], [None], [28]),
-        ("1-11 Months", ["Days", "Months"], [29, None], [None, 11]),
-        ("1-4", ["Months", "Years"], [12, 1], [None, 4]),
-        ("5-9", ["Years"], [5], [9]),
-        ("10-14", ["Years"], [10], [14]),
-        ("15-17", ["Years"], [15], [17]),
-        ("18-19", ["Years"], [18], [19]),
-        ("20-34", ["Years"], [20], [34]),
-        ("35-49", ["Years"], [35], [49]),
-        ("50-59", ["Years"], [50], [59]),
-        ("60-69", ["Years"], [60], [69]),
-        ("70 & Above", ["Years"], [70], [None])
-    ]
-    
+    def _dhims_formula(table, group, sex, nhis):
+        conds = [
+            f'{table}[WardCode], IF($B$2="All Wards", "*", $B$2)',
+            f'{table}[Month], IF($B$3="All Months", "<>", $B$3)',
+            f'{table}[Sex], "{sex}"',
+            f'{table}[NHIS], "{nhis}"',
+        ]
+        return "=IFERROR(" + countifs(table, group, ", ".join(conds)) + ", 0)"
+
     current_row = 8
-    for idx, (label, units, mins, maxs) in enumerate(age_groups, 1):
+    for idx, group in enumerate(config.AGE_GROUPS, 1):
         ws.cell(row=current_row, column=1, value=idx).alignment = CENTER
-        ws.cell(row=current_row, column=2, value=label).font = BOLD_FONT
-        ws.cell(row=current_row, column=3, value=_dhims_formula("tblAdmissions", units, mins, maxs, "M", "Insured"))
-        ws.cell(row=current_row, column=4, value=_dhims_formula("tblAdmissions", units, mins, maxs, "F", "Insured"))
-        ws.cell(row=current_row, column=5, value=_dhims_formula("tblDeaths", units, mins, maxs, "M", "Insured"))
-        ws.cell(row=current_row, column=6, value=_dhims_formula("tblDeaths", units, mins, maxs, "F", "Insured"))
-        ws.cell(row=current_row, column=7, value=_dhims_formula("tblAdmissions", units, mins, maxs, "M", "Non-Insured"))
-        ws.cell(row=current_row, column=8, value=_dhims_formula("tblAdmissions", units, mins, maxs, "F", "Non-Insured"))
-        ws.cell(row=current_row, column=9, value=_dhims_formula("tblDeaths", units, mins, maxs, "M", "Non-Insured"))
-        ws.cell(row=current_row, column=10, value=_dhims_formula("tblDeaths", units, mins, maxs, "F", "Non-Insured"))
+        ws.cell(row=current_row, column=2, value=group.dhims_label).font = BOLD_FONT
+        ws.cell(row=current_row, column=3, value=_dhims_formula("tblAdmissions", group, "M", "Insured"))
+        ws.cell(row=current_row, column=4, value=_dhims_formula("tblAdmissions", group, "F", "Insured"))
+        ws.cell(row=current_row, column=5, value=_dhims_formula("tblDeaths", group, "M", "Insured"))
+        ws.cell(row=current_row, column=6, value=_dhims_formula("tblDeaths", group, "F", "Insured"))
+        ws.cell(row=current_row, column=7, value=_dhims_formula("tblAdmissions", group, "M", "Non-Insured"))
+        ws.cell(row=current_row, column=8, value=_dhims_formula("tblAdmissions", group, "F", "Non-Insured"))
+        ws.cell(row=current_row, column=9, value=_dhims_formula("tblDeaths", group, "M", "Non-Insured"))
+        ws.cell(row=current_row, column=10, value=_dhims_formula("tblDeaths", group, "F", "Non-Insured"))
         
         r = current_row
         ws.cell(row=r, column=11, value=f'=C{r}+E{r}+G{r}+I{r}')
         ws.cell(row=r, column=12, value=f'=D{r}+F{r}+H{r}+J{r}')
         
-        for c in range(1, 13):
-            ws.cell(row=r, column=c).border = THIN_BORDER
+        st.apply_range(ws, r, r, 1, 12, "bu_bordered")
+        st.apply(ws.cell(row=r, column=1), "bu_cell_plain")
+        st.apply(ws.cell(row=r, column=2), "bu_bordered_bold")
         
         current_row += 1
         
@@ -1966,52 +1739,88 @@ def build_dhims_summary_sheet(wb: Workbook, config: WorkbookConfig):
 # MAIN BUILD FUNCTION
 # ═══════════════════════════════════════════════════════════════════════════════
 
-def build_structure(config: WorkbookConfig, output_path: str):
-    wb = Workbook()
-
-    # 1. Control sheet (landing page)
-    build_control_sheet(wb, config)
+def build_steps(config: WorkbookConfig):
+    """
+    The sheet builders in workbook order, as (builder, extra_args) pairs.
 
-    # 2. Data sheets (hidden tables)
-    build_daily_data_sheet(wb, config)
-    build_admissions_sheet(wb, config)
-    build_deaths_data_sheet(wb, config)
-    build_transfers_sheet(wb, config)
+    Each builder is called as builder(wb, config, *extra_args). Shared by the
+    sequential build below and the parallel build in parallel_build.py.
+    """
+    steps = [
+        # 1. Control sheet (landing page)
+        (build_control_sheet, ()),
+
+        # 2. Data sheets (hidden tables)
+        (build_daily_data_sheet, ()),
+        (build_admissions_sheet, ()),
+        (build_deaths_data_sheet, ()),
+        (build_transfers_sheet, ()),
+    ]
 
     # 3. Ward report sheets (9 wards)
-    for ward in config.WARDS:
-        build_ward_sheet(wb, config, ward)
+    steps += [(build_ward_sheet, (ward,)) for ward in config.WARDS]
 
-    # 3b. Combined Emergency sheet (MAE + FAE side-by-side)
-    build_emergency_combined_sheet(wb, config)
+    steps += [
+        # 3b. Combined Emergency sheet (MAE + FAE side-by-side)
+        (build_emergency_combined_sheet, ()),
 
-    # 4. Monthly Summary
-    build_monthly_summary_sheet(wb, config)
+        # 4. Monthly Summary
+        (build_monthly_summary_sheet, ()),
 
-    # 4a. Quarterly Summary (Q1..Q4)
-    build_quarterly_summary_sheet(wb, config)
+        # 4a. Quarterly Summary (Q1..Q4)
+        (build_quarterly_summary_sheet, ()),
 
-    # 4b. Half-Year Summary (H1..H2)
-    build_halfyear_summary_sheet(wb, config)
+        # 4b. Half-Year Summary (H1..H2)
+        (build_halfyear_summary_sheet, ()),
 
-    # 5. Ages Summary
-    build_ages_summary_sheet(wb, config)
+        # 5. Ages Summary
+        (build_ages_summary_sheet, ()),
 
-    # 6. Deaths Summary (age-grouped, formula-driven)
-    build_deaths_summary_sheet(wb, config)
+        # 6. Deaths Summary (age-grouped, formula-driven)
+        (build_deaths_summary_sheet, ()),
 
-    # 7. COD Summary
-    build_cod_summary_sheet(wb, config)
-    
-    # 8. Statement of Inpatient
-    build_statement_of_inpatient_sheet(wb, config)
-    
-    # 8b. DHIMS Summary
-    build_dhims_summary_sheet(wb, config)
-    
-    # 9. Non-Insured Report
-    build_non_insured_report_sheet(wb, config)
+        # 7. COD Summary
+        (build_cod_summary_sheet, ()),
+
+        # 8. Statement of Inpatient
+        (build_statement_of_inpatient_sheet, ()),
+
+        # 8b. DHIMS Summary
+        (build_dhims_summary_sheet, ()),
+
+        # 9. Non-Insured Report
+        (build_non_insured_report_sheet, ()),
+    ]
+    return steps
+
+
+def build_structure(config: WorkbookConfig, output_path: str,
+                    cache_dir: Optional[str] = None, profiler=None):
+    profiler = profiler or NULL_PROFILER
+    if cache_dir:
+        # Incremental: render only sheets whose inputs changed, reuse the rest
+        from .parallel_build import build_structure_parallel
+        build_structure_parallel(config, output_path, workers=1, cache_dir=cache_dir,
+                                 profiler=profiler)
+        return
+
+    wb = Workbook()
+
+    for builder, args in build_steps(config):
+        before = {id(ws): ws.title for ws in wb.worksheets}
+        label = f"{builder.__name__}({args[0].code})" if args else builder.__name__
+        with profiler.phase(label, "build_sheet") as record:
+            builder(wb, config, *args)
+        if profiler.enabled:
+            # Sheets this builder created (or, for Control, renamed from the default)
+            touched = [ws for ws in wb.worksheets if before.get(id(ws)) != ws.title]
+            record["sheets"] = [ws.title for ws in touched]
+            record.update(count_cells(touched))
 
     # Save
-    wb.save(output_path)
+    with profiler.phase("wb.save", "save") as record:
+        wb.save(output_path)
+    if profiler.enabled:
+        record.update(count_cells(wb.worksheets))
+        record["bytes"] = os.path.getsize(output_path)
     print(f"Phase 1 complete: {output_path}")
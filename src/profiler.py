@@ -0,0 +1,160 @@
+"""
+Bed Utilization Workbook - Build profiler
+Times build phases and writes JSON and Chrome-trace reports.
+
+Each phase records wall time, CPU time, the process peak RSS at the end of
+the phase (a high-water mark, so it never decreases) and any counters the
+caller attaches (cells, formulas, bytes, ...). Open the .trace.json file in
+chrome://tracing or https://ui.perfetto.dev.
+"""
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Peak resident set size of this process, or None if it cannot be read."""
+    try:
+        import resource
+    except ImportError:
+        return _windows_peak_rss()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # Linux reports KiB
+
+
+def _windows_peak_rss() -> Optional[int]:
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD),
+                ("PageFaultCount", wintypes.DWORD),
+                ("PeakWorkingSetSize", ctypes.c_size_t),
+                ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t),
+                ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        ok = ctypes.windll.psapi.GetProcessMemoryInfo(
+            ctypes.windll.kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb)
+        return counters.PeakWorkingSetSize if ok else None
+    except Exception:
+        return None
+
+
+def count_cells(sheets) -> Dict[str, int]:
+    """Cell and formula counts for a set of openpyxl worksheets."""
+    cells = formulas = 0
+    for ws in sheets:
+        cells += len(ws._cells)
+        formulas += sum(1 for c in ws._cells.values() if c.data_type == "f")
+    return {"cells": cells, "formulas": formulas}
+
+
+class BuildProfiler:
+    """Collects timed phases for one build."""
+
+    enabled = True
+
+    def __init__(self, **metadata):
+        self.metadata = metadata
+        self.phases: List[dict] = []
+        self._t0 = time.perf_counter()
+        self._open = None
+
+    @contextmanager
+    def phase(self, name: str, category: str = "build", **counters):
+        """
+        Time the enclosed block.
+
+        Yields the phase record; counters added to it (inside or after the
+        block) are reported with the phase but not timed.
+        """
+        record = {"name": name, "category": category, **counters}
+        wall0, cpu0 = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            wall1, cpu1 = time.perf_counter(), time.process_time()
+            rss = peak_rss_bytes()
+            record.update({
+                "start_ms": round((wall0 - self._t0) * 1000, 3),
+                "wall_ms": round((wall1 - wall0) * 1000, 3),
+                "cpu_ms": round((cpu1 - cpu0) * 1000, 3),
+                "peak_rss_mb": round(rss / 2**20, 1) if rss is not None else None,
+            })
+            self.phases.append(record)
+
+    def stage(self, name: Optional[str], category: str):
+        """
+        Sequential stages without nesting: ends the open stage, starts `name`.
+
+        Call with name=None to end the last stage.
+        """
+        if self._open is not None:
+            self._open.__exit__(None, None, None)
+            self._open = None
+        if name is not None:
+            self._open = self.phase(name, category)
+            self._open.__enter__()
+
+    def to_dict(self) -> dict:
+        return {
+            "generated": datetime.now().isoformat(timespec="seconds"),
+            **self.metadata,
+            "total_wall_ms": round((time.perf_counter() - self._t0) * 1000, 3),
+            "phases": sorted(self.phases, key=lambda p: p["start_ms"]),
+        }
+
+    def to_chrome_trace(self) -> dict:
+        pid = os.getpid()
+        events = []
+        for p in self.phases:
+            args = {k: v for k, v in p.items() if k not in ("name", "category", "start_ms", "wall_ms")}
+            events.append({
+                "name": p["name"], "cat": p["category"], "ph": "X",
+                "ts": round(p["start_ms"] * 1000), "dur": max(1, round(p["wall_ms"] * 1000)),
+                "pid": pid, "tid": 1, "args": args,
+            })
+            if p["peak_rss_mb"] is not None:
+                events.append({
+                    "name": "peak_rss_mb", "ph": "C", "pid": pid,
+                    "ts": round((p["start_ms"] + p["wall_ms"]) * 1000),
+                    "args": {"peak_rss_mb": p["peak_rss_mb"]},
+                })
+        return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": self.metadata}
+
+    def write(self, json_path: str, trace_path: str):
+        """Write the JSON report and the Chrome trace."""
+        with open(json_path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        with open(trace_path, "w") as f:
+            json.dump(self.to_chrome_trace(), f)
+
+
+class NullProfiler:
+    """Drop-in BuildProfiler that records nothing."""
+
+    enabled = False
+
+    @contextmanager
+    def phase(self, name: str, category: str = "build", **counters):
+        yield {}
+
+    def stage(self, name: Optional[str], category: str):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
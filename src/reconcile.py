@@ -0,0 +1,182 @@
+"""
+Bed Utilization Workbook - Admissions/deaths reconciler
+Checks, for every ward and every day of the report year at once, that the
+tblDaily totals agree with the individual records, as modValidation does
+one date/ward pair at a time (and frmDeath's pending list for deaths):
+
+    tblDaily[Admissions]        = tblAdmissions rows of that date and ward
+    tblDaily[Deaths]            = tblDeaths rows with DeathWithin24Hrs FALSE
+    tblDaily[DeathsUnder24Hrs]  = tblDeaths rows with DeathWithin24Hrs TRUE
+
+Matching follows the VBA: dates compare without their time, ward codes
+compare trimmed and case-sensitively, records without a date are skipped,
+and a day with several tblDaily rows for a ward uses the first one. A
+(day, ward) with no tblDaily row is "NO ENTRY", OK when the totals agree
+and "MISMATCH" otherwise; the report lists every MISMATCH and every NO ENTRY
+that has records.
+
+Each table is reduced to a (day, ward) grid with one np.bincount, so the
+whole year is three bincounts and a comparison, not a table scan per pair.
+"""
+import time
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .kpi import read_settings
+from .xlsx.columnar import Categorical, ColumnarTable, load_tables
+
+CHECKS = ["Admissions", "Deaths", "DeathsUnder24Hrs"]
+OK = "OK"
+MISMATCH = "MISMATCH"
+NO_ENTRY = "NO ENTRY"
+
+
+@dataclass
+class Discrepancy:
+    date: date
+    ward: str
+    check: str            # one of CHECKS
+    status: str           # MISMATCH or NO_ENTRY
+    daily: int            # tblDaily total (0 for NO ENTRY)
+    records: int          # individual records
+
+    @property
+    def delta(self) -> int:
+        return self.daily - self.records
+
+
+@dataclass
+class Reconciliation:
+    """Daily totals and record counts as (check, day, ward) grids."""
+    year: int
+    wards: List[str]
+    daily: np.ndarray         # (checks, days, wards)
+    records: np.ndarray       # (checks, days, wards)
+    has_entry: np.ndarray     # (days, wards)
+    discrepancies: List[Discrepancy] = field(default_factory=list)
+    load_s: float = 0.0
+    compute_s: float = 0.0
+
+    @property
+    def start(self) -> date:
+        return date(self.year, 1, 1)
+
+    def status_counts(self) -> Dict[str, Dict[str, int]]:
+        """OK / MISMATCH / NO ENTRY day-ward pairs per check (GetValidationSummary)."""
+        no_entry = int((~self.has_entry).sum())
+        result = {}
+        for c, check in enumerate(CHECKS):
+            differ = int(((self.daily[c] != self.records[c]) & self.has_entry).sum())
+            result[check] = {OK: self.has_entry.size - no_entry - differ,
+                             MISMATCH: differ, NO_ENTRY: no_entry}
+        return result
+
+    def format(self, limit: Optional[int] = 20) -> str:
+        lines = [f"{self.year}: {len(self.wards)} wards x {self.has_entry.shape[0]} days, "
+                 f"{len(self.discrepancies)} discrepancies "
+                 f"(load {self.load_s:.2f}s, compute {self.compute_s * 1000:.1f} ms)"]
+        for check, counts in self.status_counts().items():
+            lines.append(f"  {check:<18}" + "  ".join(f"{k} {v}" for k, v in counts.items()))
+        if self.discrepancies:
+            lines.append(f"{'Date':<12}{'Ward':<8}{'Check':<18}{'Status':<10}"
+                         f"{'Daily':>7}{'Records':>9}{'Delta':>7}")
+            for d in self.discrepancies[:limit]:
+                lines.append(f"{d.date.isoformat():<12}{d.ward:<8}{d.check:<18}{d.status:<10}"
+                             f"{d.daily:>7}{d.records:>9}{d.delta:>7}")
+            if limit is not None and len(self.discrepancies) > limit:
+                lines.append(f"  ... {len(self.discrepancies) - limit} more")
+        return "\n".join(lines)
+
+
+def _ward_axis(ward_config: Optional[ColumnarTable], columns: List[Categorical]) -> List[str]:
+    """Configured ward codes in order, then any other codes found in the tables."""
+    wards: List[str] = []
+    if ward_config is not None:
+        for code in ward_config["WardCode"]:
+            if code and code.strip() and code.strip() not in wards:
+                wards.append(code.strip())
+    seen = {c.strip() for column in columns for c in column.categories if c.strip()}
+    return wards + sorted(seen - set(wards))
+
+
+def _keys(dates: np.ndarray, wards: Categorical, axis: List[str], start: date, days: int) -> np.ndarray:
+    """day * len(axis) + ward of every row; -1 for rows outside the grid."""
+    index = {w: i for i, w in enumerate(axis)}
+    lookup = np.array([index.get(c.strip(), -1) for c in wards.categories] + [-1], dtype=np.int64)
+    ward = lookup[wards.codes]
+    day = (dates.astype("datetime64[D]") - np.datetime64(start, "D")).astype(np.int64)
+    keep = ~np.isnat(dates) & (ward >= 0) & (day >= 0) & (day < days)
+    return np.where(keep, day * len(axis) + ward, -1)
+
+
+def _grid(keys: np.ndarray, size: int, weights: Optional[np.ndarray] = None) -> np.ndarray:
+    keep = keys >= 0
+    w = None if weights is None else weights[keep]
+    return np.bincount(keys[keep], weights=w, minlength=size).astype(np.int64)
+
+
+def reconcile(daily: ColumnarTable, admissions: ColumnarTable, deaths: ColumnarTable, year: int,
+              ward_config: Optional[ColumnarTable] = None) -> Reconciliation:
+    """
+    Compare the tblDaily totals of one year with the individual records.
+
+    Args:
+        daily, admissions, deaths: Tables as loaded by xlsx.columnar.load_tables
+        year: Report year
+        ward_config: tblWardConfig, for the ward order (optional)
+
+    Returns:
+        Reconciliation with its discrepancies in date, ward, check order
+    """
+    start = date(year, 1, 1)
+    days = (date(year + 1, 1, 1) - start).days
+    axis = _ward_axis(ward_config, [daily["WardCode"], admissions["WardCode"], deaths["WardCode"]])
+    shape = (days, len(axis))
+    size = days * len(axis)
+
+    # First tblDaily row of each (day, ward)
+    daily_keys = _keys(daily["EntryDate"], daily["WardCode"], axis, start, days)
+    rows = np.flatnonzero(daily_keys >= 0)
+    present, first = np.unique(daily_keys[rows], return_index=True)
+    first_rows = rows[first]
+    has_entry = np.zeros(size, dtype=bool)
+    has_entry[present] = True
+    daily_totals = np.zeros((len(CHECKS), size), dtype=np.int64)
+    for c, check in enumerate(CHECKS):
+        daily_totals[c, present] = daily[check][first_rows]
+
+    adm_keys = _keys(admissions["AdmissionDate"], admissions["WardCode"], axis, start, days)
+    death_keys = _keys(deaths["DateOfDeath"], deaths["WardCode"], axis, start, days)
+    under24 = deaths["DeathWithin24Hrs"]
+    records = np.stack([
+        _grid(adm_keys, size),
+        _grid(np.where(under24, -1, death_keys), size),
+        _grid(np.where(under24, death_keys, -1), size),
+    ])
+
+    result = Reconciliation(year, axis, daily_totals.reshape(len(CHECKS), *shape),
+                            records.reshape(len(CHECKS), *shape), has_entry.reshape(shape))
+    differ = (result.daily != result.records) | (~result.has_entry & (result.records > 0))
+    # np.nonzero walks (day, ward, check) in order
+    for d, w, c in zip(*np.nonzero(differ.transpose(1, 2, 0))):
+        entered = bool(result.has_entry[d, w])
+        result.discrepancies.append(Discrepancy(
+            start + timedelta(days=int(d)), axis[w], CHECKS[c], MISMATCH if entered else NO_ENTRY,
+            int(result.daily[c, d, w]), int(result.records[c, d, w])))
+    return result
+
+
+def reconcile_workbook(path: str, year: Optional[int] = None) -> Reconciliation:
+    """Load a workbook's tables and reconcile its report year (Control!B5 by default)."""
+    start = time.perf_counter()
+    year = year or read_settings(path).year
+    tables = load_tables(path, ["tblDaily", "tblAdmissions", "tblDeaths", "tblWardConfig"])
+    loaded = time.perf_counter()
+    result = reconcile(tables["tblDaily"], tables["tblAdmissions"], tables["tblDeaths"], year,
+                       tables["tblWardConfig"])
+    result.load_s = loaded - start
+    result.compute_s = time.perf_counter() - loaded
+    return result
@@ -0,0 +1,153 @@
+"""
+Bed Utilization Workbook - PrevRemaining/Remaining engine
+Recomputes the tblDaily patient-count chain for every ward at once, with the
+same rules as the VBA (modDataAccess.CalculateRemainingForRow and
+GetLastRemainingForWard):
+
+    Remaining = PrevRemaining + Admissions + TransfersIn
+                - Discharges - Deaths - TransfersOut - DeathsUnder24Hrs
+
+    PrevRemaining = Remaining of the ward's row with the latest EntryDate
+                    strictly before this row's date (ties: first in table
+                    order), else tblWardConfig[PrevYearRemaining], else 0
+
+Rows without a date or ward code are left alone, as the VBA skips them.
+Two rows for the same ward and date both take the previous day's Remaining;
+only the first carries forward.
+
+The chain is a grouped cumulative sum: rows are stably sorted by ward then
+date, and each (ward, date) group's first-row delta is accumulated.
+"""
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .xlsx.columnar import ColumnarTable, load_tables
+
+
+@dataclass
+class RemainingResult:
+    """Computed values in tblDaily row order."""
+    prev_remaining: np.ndarray
+    remaining: np.ndarray
+    computed: np.ndarray      # rows with a date and ward code
+    mismatched: np.ndarray    # computed rows whose stored values differ
+
+
+def compute_remaining(daily: ColumnarTable, prev_year: Dict[str, int]) -> RemainingResult:
+    """
+    Recompute PrevRemaining and Remaining for every row of tblDaily.
+
+    Args:
+        daily: tblDaily as loaded by xlsx.columnar.load_tables
+        prev_year: WardCode -> PrevYearRemaining (tblWardConfig)
+
+    Returns:
+        RemainingResult; rows that are not computed keep their stored values
+    """
+    wards = daily["WardCode"]
+    dates = daily["EntryDate"]
+    delta = (daily["Admissions"] + daily["TransfersIn"] - daily["Discharges"]
+             - daily["Deaths"] - daily["TransfersOut"] - daily["DeathsUnder24Hrs"])
+    stored_prev = daily["PrevRemaining"]
+    stored_rem = daily["Remaining"]
+
+    computed = (wards.codes >= 0) & ~np.isnat(dates)
+    prev = stored_prev.copy()
+    rem = stored_rem.copy()
+    idx = np.flatnonzero(computed)
+    if len(idx):
+        # Stable: rows sharing ward and date stay in table order
+        day = dates[idx].astype(np.int64)
+        order = idx[np.lexsort((day, wards.codes[idx]))]
+        w = wards.codes[order]
+        d = dates[order].astype(np.int64)
+        dl = delta[order]
+
+        new_ward = np.ones(len(order), dtype=bool)
+        new_ward[1:] = w[1:] != w[:-1]
+        new_day = new_ward.copy()
+        new_day[1:] |= d[1:] != d[:-1]
+
+        # Each (ward, date) group's first delta, broadcast to the whole group
+        group = np.cumsum(new_day) - 1
+        first_delta = dl[new_day][group]
+
+        # Cumulative sum of first deltas, restarted at each ward
+        carried_delta = np.where(new_day, dl, 0)
+        carried = np.cumsum(carried_delta)
+        ward_start = np.flatnonzero(new_ward)
+        before_ward = carried[ward_start] - carried_delta[ward_start]
+        carried -= before_ward[np.cumsum(new_ward) - 1]
+
+        seeds = np.array([int(prev_year.get(c, 0)) for c in wards.categories], dtype=np.int64)
+        p = seeds[w] + carried - first_delta
+        prev[order] = p
+        rem[order] = p + dl
+
+    mismatched = computed & ((prev != stored_prev) | (rem != stored_rem))
+    return RemainingResult(prev, rem, computed, mismatched)
+
+
+def ward_prev_year(config: ColumnarTable) -> Dict[str, int]:
+    """WardCode -> PrevYearRemaining from tblWardConfig (first row wins, as in VBA)."""
+    result = {}
+    for code, value in zip(config["WardCode"], config["PrevYearRemaining"]):
+        if code is not None and code not in result:
+            result[code] = int(value)
+    return result
+
+
+@dataclass
+class RemainingMismatch:
+    sheet_row: int
+    ward: str
+    date: str
+    stored_prev: int
+    stored_remaining: int
+    prev: int
+    remaining: int
+
+
+@dataclass
+class RemainingAudit:
+    rows: int = 0
+    computed: int = 0
+    mismatches: List[RemainingMismatch] = field(default_factory=list)
+    load_s: float = 0.0
+    compute_s: float = 0.0
+
+    def format(self, limit: Optional[int] = 20) -> str:
+        lines = [f"tblDaily: {self.rows} rows, {self.computed} checked, "
+                 f"{len(self.mismatches)} disagree with the recomputed chain "
+                 f"(load {self.load_s:.2f}s, compute {self.compute_s * 1000:.1f} ms)"]
+        if self.mismatches:
+            lines.append(f"{'Row':>7}  {'Ward':<8}{'Date':<12}"
+                         f"{'Prev':>8}{'should':>8}{'Remain':>8}{'should':>8}")
+            for m in self.mismatches[:limit]:
+                lines.append(f"{m.sheet_row:>7}  {m.ward:<8}{m.date:<12}{m.stored_prev:>8}{m.prev:>8}"
+                             f"{m.stored_remaining:>8}{m.remaining:>8}")
+            if limit is not None and len(self.mismatches) > limit:
+                lines.append(f"  ... {len(self.mismatches) - limit} more")
+        return "\n".join(lines)
+
+
+def audit_remaining(path: str) -> RemainingAudit:
+    """Load a workbook's tblDaily and tblWardConfig and list rows whose stored chain is wrong."""
+    start = time.perf_counter()
+    tables = load_tables(path, ["tblDaily", "tblWardConfig"])
+    daily = tables["tblDaily"]
+    loaded = time.perf_counter()
+    result = compute_remaining(daily, ward_prev_year(tables["tblWardConfig"]))
+    done = time.perf_counter()
+
+    audit = RemainingAudit(len(daily), int(result.computed.sum()),
+                           load_s=loaded - start, compute_s=done - loaded)
+    for i in np.flatnonzero(result.mismatched):
+        audit.mismatches.append(RemainingMismatch(
+            int(daily.sheet_rows[i]), daily["WardCode"][i], str(daily["EntryDate"][i]),
+            int(daily["PrevRemaining"][i]), int(daily["Remaining"][i]),
+            int(result.prev_remaining[i]), int(result.remaining[i])))
+    return audit
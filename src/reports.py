@@ -0,0 +1,234 @@
+"""
+Bed Utilization Workbook - Report sheets
+Headless versions of the modReports refresh macros. Each report is built in
+one pass over its table's columns and written into the sheet laid out by
+phase1_structure with xlsx.cell_writer, so the VBA project is copied as is.
+
+COD Summary (RefreshCODSummary): one row per distinct tblDeaths[CauseOfDeath]
+in order of first appearance, with the deaths per month and a TOTAL. Causes
+are matched ignoring case and runs of whitespace ("Malaria", " MALARIA ",
+"malaria  ") and shown as first written, with whitespace collapsed; blank
+and "0" causes are skipped, as in the VBA. The VBA compared every cause with
+every row for every month; here each row's (cause, month) pair is one
+np.bincount key.
+
+Non-Insured Report (RefreshNonInsuredReport): tblAdmissions rows whose NHIS
+is "Non-Insured" (trimmed, any case), sorted by admission date then ward
+(table order within a day and ward; undated rows last), one S/N...Status
+row each. Columns are taken by name; the macro still reads the positions of
+the table's layout before AgeUnit moved next to Age, which puts the month in
+"Ward" and the ward code in "Patient ID".
+"""
+import calendar
+import csv
+import zipfile
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .xlsx.cell_writer import write_cells
+from .xlsx.columnar import ColumnarTable, load_tables
+from .xlsx.reader import iter_cells, shared_strings, sheet_parts
+
+# Sheet layout (phase1_structure.build_cod_summary_sheet)
+COD_SHEET = "COD Summary"
+COD_FIRST_ROW = 3
+COD_COLUMNS = 14          # cause, 12 months, TOTAL
+NO_DEATHS = "(No death records found)"
+NO_CAUSES = "(No causes recorded)"
+
+# Sheet layout (phase1_structure.build_non_insured_report_sheet)
+NON_INSURED_SHEET = "Non-Insured Report"
+NON_INSURED_FIRST_ROW = 3
+NON_INSURED_HEADERS = ["S/N", "Date", "Month", "Ward", "Patient ID", "Name", "Age", "Sex",
+                       "Amount", "Status"]
+NO_NON_INSURED = "(No non-insured patients found)"
+NO_ADMISSIONS = "(No admission records found)"
+NON_INSURED = "NON-INSURED"
+
+_SKIPPED_CAUSES = {"", "0"}
+
+
+def normalize_cause(cause: str) -> str:
+    """Matching key of a cause: upper case, whitespace runs collapsed."""
+    return " ".join(cause.split()).upper()
+
+
+@dataclass
+class CODMatrix:
+    """Deaths per cause and month."""
+    causes: List[str]     # row labels, in order of first appearance
+    counts: np.ndarray    # (causes, 12)
+    deaths: int = 0       # tblDeaths rows
+
+    @property
+    def totals(self) -> np.ndarray:
+        return self.counts.sum(axis=1)
+
+
+def cod_matrix(deaths: ColumnarTable) -> CODMatrix:
+    """Count tblDeaths by normalized cause and month."""
+    cause = deaths["CauseOfDeath"]
+    keys: Dict[str, int] = {}
+    key_of = np.full(len(cause.categories) + 1, -1, dtype=np.int64)
+    for i, category in enumerate(cause.categories):
+        key = normalize_cause(category)
+        if key in _SKIPPED_CAUSES:
+            continue
+        if key not in keys:
+            keys[key] = len(keys)
+        key_of[i] = keys[key]
+
+    row_key = key_of[cause.codes]
+    counted = np.flatnonzero(row_key >= 0)
+    if not len(counted):
+        return CODMatrix([], np.zeros((0, 12), dtype=np.int64), len(deaths))
+
+    # Rows ordered by first appearance; the label is that row's spelling
+    present, first = np.unique(row_key[counted], return_index=True)
+    order = present[np.argsort(first, kind="stable")]
+    rank = np.empty(len(keys), dtype=np.int64)
+    rank[order] = np.arange(len(order))
+    first_category = cause.codes[counted[np.sort(first)]]
+    causes = [" ".join(cause.categories[c].split()) for c in first_category]
+
+    month = deaths["Month"][counted]
+    month = np.where((month >= 1) & (month <= 12), month - 1, 12)
+    counts = np.bincount(rank[row_key[counted]] * 13 + month, minlength=len(order) * 13)
+    return CODMatrix(causes, counts.reshape(len(order), 13)[:, :12], len(deaths))
+
+
+def _sheet_cells(path: str, sheets: List[str]) -> Dict[str, Dict[Tuple[int, int], object]]:
+    """Non-empty cells of some worksheets."""
+    with zipfile.ZipFile(path) as zf:
+        parts = {name: part for part, name in sheet_parts(zf).items()}
+        missing = [s for s in sheets if s not in parts]
+        if missing:
+            raise KeyError(f"Sheets not found in {path}: {', '.join(missing)}")
+        sst = shared_strings(zf)
+        return {sheet: {(c.row, c.col): c.value for c in iter_cells(zf.read(parts[sheet]), sst)}
+                for sheet in sheets}
+
+
+def _clear(existing: Dict[Tuple[int, int], object], first_row: int, columns: int) -> Dict[Tuple[int, int], object]:
+    """Blank the old report cells, as the VBA's ClearContents below the headers."""
+    return {(r, c): None for r, c in existing if r >= first_row and c <= columns}
+
+
+def cod_cells(matrix: CODMatrix) -> Dict[Tuple[int, int], object]:
+    """COD Summary cells from row COD_FIRST_ROW down."""
+    if not matrix.deaths:
+        return {(COD_FIRST_ROW, 1): NO_DEATHS}
+    if not matrix.causes:
+        return {(COD_FIRST_ROW, 1): NO_CAUSES}
+    cells: Dict[Tuple[int, int], object] = {}
+    for i, (cause, counts, total) in enumerate(zip(matrix.causes, matrix.counts, matrix.totals)):
+        r = COD_FIRST_ROW + i
+        cells[(r, 1)] = cause
+        for m, count in enumerate(counts):
+            cells[(r, 2 + m)] = int(count)
+        cells[(r, COD_COLUMNS)] = int(total)
+    return cells
+
+
+def write_cod_summary(path: str, output_path: Optional[str] = None) -> CODMatrix:
+    """
+    Refresh the COD Summary sheet from tblDeaths.
+
+    TOTAL is written as a value rather than the VBA's =SUM(B:M) formula.
+
+    Args:
+        path: Workbook to update (.xlsx/.xlsm)
+        output_path: Destination (default: overwrite `path`)
+
+    Returns:
+        The matrix that was written
+    """
+    matrix = cod_matrix(load_tables(path, ["tblDeaths"])["tblDeaths"])
+    cells = _clear(_sheet_cells(path, [COD_SHEET])[COD_SHEET], COD_FIRST_ROW, COD_COLUMNS)
+    cells.update(cod_cells(matrix))
+    write_cells(path, {COD_SHEET: cells}, output_path)
+    return matrix
+
+
+@dataclass
+class NonInsuredReport:
+    """Non-Insured Report rows, in NON_INSURED_HEADERS order."""
+    rows: List[list]
+    admissions: int = 0   # tblAdmissions rows
+
+
+def _age_text(age: float, unit: Optional[str]) -> str:
+    if np.isnan(age):
+        return ""
+    text = str(int(age)) if float(age).is_integer() else repr(float(age))
+    return f"{text} {unit}" if unit else text
+
+
+def non_insured_report(admissions: ColumnarTable) -> NonInsuredReport:
+    """Select, sort and lay out the non-insured admissions."""
+    nhis = admissions["NHIS"]
+    is_non_insured = np.array([c.strip().upper() == NON_INSURED for c in nhis.categories] + [False])
+    selected = np.flatnonzero(is_non_insured[nhis.codes])
+
+    dates = admissions["AdmissionDate"][selected]
+    day = np.where(np.isnat(dates), np.iinfo(np.int64).max, dates.astype(np.int64))
+    ward_codes = admissions["WardCode"].codes[selected]
+    ward = np.where(ward_codes < 0, len(admissions["WardCode"].categories), ward_codes)
+    order = selected[np.lexsort((ward, day))]
+
+    columns = [admissions[name] for name in
+               ("AdmissionDate", "WardCode", "PatientID", "PatientName", "Age", "AgeUnit", "Sex")]
+    rows = []
+    for sn, i in enumerate(order, 1):
+        admitted, ward_code, patient_id, name, age, unit, sex = (c[i] for c in columns)
+        admitted = None if np.isnat(admitted) else admitted.astype(object)
+        rows.append([sn, admitted, calendar.month_name[admitted.month] if admitted else None,
+                     ward_code, patient_id, name, _age_text(age, unit), sex, None,
+                     nhis[i].strip()])
+    return NonInsuredReport(rows, len(admissions))
+
+
+def non_insured_cells(report: NonInsuredReport) -> Dict[Tuple[int, int], object]:
+    """Non-Insured Report cells from row NON_INSURED_FIRST_ROW down."""
+    if not report.admissions:
+        return {(NON_INSURED_FIRST_ROW, 1): NO_ADMISSIONS}
+    if not report.rows:
+        return {(NON_INSURED_FIRST_ROW, 1): NO_NON_INSURED}
+    return {(NON_INSURED_FIRST_ROW + r, 1 + c): value
+            for r, row in enumerate(report.rows) for c, value in enumerate(row)}
+
+
+def write_non_insured_csv(report: NonInsuredReport, path: str):
+    """The report rows as CSV, dates as dd/mm/yyyy."""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(NON_INSURED_HEADERS)
+        for row in report.rows:
+            admitted = row[1].strftime("%d/%m/%Y") if row[1] else ""
+            writer.writerow(["" if v is None else v for v in row[:1] + [admitted] + row[2:]])
+
+
+def write_reports(path: str, output_path: Optional[str] = None) -> Tuple[CODMatrix, NonInsuredReport]:
+    """
+    Refresh the COD Summary and Non-Insured Report sheets in one rewrite of
+    the package (RefreshAllReports without the message box).
+
+    Args:
+        path: Workbook to update (.xlsx/.xlsm)
+        output_path: Destination (default: overwrite `path`)
+
+    Returns:
+        The COD matrix and Non-Insured Report that were written
+    """
+    tables = load_tables(path, ["tblDeaths", "tblAdmissions"])
+    matrix = cod_matrix(tables["tblDeaths"])
+    report = non_insured_report(tables["tblAdmissions"])
+    existing = _sheet_cells(path, [COD_SHEET, NON_INSURED_SHEET])
+    cod = _clear(existing[COD_SHEET], COD_FIRST_ROW, COD_COLUMNS)
+    cod.update(cod_cells(matrix))
+    non_insured = _clear(existing[NON_INSURED_SHEET], NON_INSURED_FIRST_ROW, len(NON_INSURED_HEADERS))
+    non_insured.update(non_insured_cells(report))
+    write_cells(path, {COD_SHEET: cod, NON_INSURED_SHEET: non_insured}, output_path)
+    return matrix, report
@@ -0,0 +1,166 @@
+"""
+Bed Utilization Workbook - SQLite mirror
+Copies tblDaily, tblAdmissions, tblDeaths, tblTransfers and tblWardConfig
+into a SQLite database, one SQL table per workbook table with the columns of
+xlsx.columnar.TABLE_SCHEMAS, so ad-hoc questions can be answered with
+indexed SQL instead of workbook formulas:
+
+    SELECT WardCode, SUM(Admissions) FROM tblDaily
+    WHERE EntryDate BETWEEN '2026-03-01' AND '2026-03-31' GROUP BY WardCode
+
+Dates are stored as ISO text (yyyy-mm-dd, timestamps yyyy-mm-dd hh:mm:ss) so
+SQLite's date functions and range comparisons work on them; flags are 0/1,
+blanks NULL. Indexes cover (WardCode, date), (Month, WardCode) and the ID
+columns.
+
+Each row is identified by a hash of its values (plus its occurrence number
+among identical rows), so a re-sync inserts the rows that are new or whose
+values changed and deletes the rows that are gone; every other row is left
+alone. The VBA re-sorts tblDaily after each save and updates Remaining
+further down the chain without touching EntryTimestamp, so neither the row
+position nor the timestamp can tell which rows changed; the hash can. The
+latest EntryTimestamp of each table is kept in sync_state with the time of
+the sync.
+"""
+import hashlib
+import os
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .xlsx.columnar import (CODE, COUNT, DATE, FLAG, NUMBER, TABLE_SCHEMAS, TIMESTAMP,
+                            ColumnarTable, column_values, load_tables)
+
+MIRROR_TABLES = ["tblDaily", "tblAdmissions", "tblDeaths", "tblTransfers", "tblWardConfig"]
+
+_SQL_TYPES = {DATE: "TEXT", TIMESTAMP: "TEXT", COUNT: "INTEGER", NUMBER: "REAL", FLAG: "INTEGER",
+              CODE: "TEXT"}
+
+# Table -> indexed column lists
+INDEXES: Dict[str, List[List[str]]] = {
+    "tblDaily": [["WardCode", "EntryDate"], ["Month", "WardCode"]],
+    "tblAdmissions": [["WardCode", "AdmissionDate"], ["Month", "WardCode"], ["AdmissionID"]],
+    "tblDeaths": [["WardCode", "DateOfDeath"], ["Month", "WardCode"], ["DeathID"]],
+    "tblTransfers": [["FromWardCode", "TransferDate"], ["ToWardCode", "TransferDate"],
+                     ["Month", "FromWardCode"], ["TransferID"]],
+    "tblWardConfig": [["WardCode"]],
+}
+
+
+@dataclass
+class TableSync:
+    table: str
+    rows: int = 0          # rows in the workbook table
+    inserted: int = 0      # new or changed rows
+    deleted: int = 0       # rows gone or changed
+    latest_entry: Optional[str] = None   # highest EntryTimestamp
+
+
+@dataclass
+class SyncResult:
+    database: str
+    tables: List[TableSync] = field(default_factory=list)
+    load_s: float = 0.0
+    sync_s: float = 0.0
+
+    def format(self) -> str:
+        lines = [f"{self.database}: load {self.load_s:.2f}s, sync {self.sync_s:.2f}s",
+                 f"{'Table':<16}{'Rows':>8}{'Inserted':>10}{'Deleted':>9}  Latest entry"]
+        for t in self.tables:
+            lines.append(f"{t.table:<16}{t.rows:>8}{t.inserted:>10}{t.deleted:>9}  {t.latest_entry or '-'}")
+        return "\n".join(lines)
+
+
+def table_rows(table: ColumnarTable) -> List[tuple]:
+    """Rows of a loaded table in schema column order, as SQLite values."""
+    schema = TABLE_SCHEMAS[table.name]
+    columns = [column_values(table[name], kind) for name, kind in schema.items()]
+    return list(zip(*columns)) if columns else []
+
+
+def row_keys(rows: List[tuple]) -> List[str]:
+    """Content hash of each row, with ":n" for the n-th repeat of identical rows."""
+    keys, seen = [], {}
+    for row in rows:
+        digest = hashlib.blake2b(repr(row).encode(), digest_size=16).hexdigest()
+        n = seen.get(digest, 0)
+        seen[digest] = n + 1
+        keys.append(f"{digest}:{n}")
+    return keys
+
+
+def _create(db: sqlite3.Connection, table: str):
+    schema = TABLE_SCHEMAS[table]
+    columns = ", ".join(f'"{name}" {_SQL_TYPES.get(kind, "TEXT")}' for name, kind in schema.items())
+    db.execute(f'CREATE TABLE IF NOT EXISTS "{table}" (row_key TEXT PRIMARY KEY, {columns})')
+    for columns in INDEXES.get(table, []):
+        name = f"ix_{table}_{'_'.join(columns)}"
+        quoted = ", ".join(f'"{c}"' for c in columns)
+        db.execute(f'CREATE INDEX IF NOT EXISTS "{name}" ON "{table}" ({quoted})')
+
+
+def _sync_table(db: sqlite3.Connection, table: ColumnarTable) -> TableSync:
+    schema = TABLE_SCHEMAS[table.name]
+    rows = table_rows(table)
+    keys = row_keys(rows)
+    result = TableSync(table.name, len(rows))
+
+    stored = {k for (k,) in db.execute(f'SELECT row_key FROM "{table.name}"')}
+    current = dict(zip(keys, rows))
+    gone = stored - current.keys()
+    new = [k for k in keys if k not in stored]
+    db.executemany(f'DELETE FROM "{table.name}" WHERE row_key = ?', ((k,) for k in gone))
+    placeholders = ", ".join("?" * (len(schema) + 1))
+    db.executemany(f'INSERT INTO "{table.name}" VALUES ({placeholders})',
+                   ((k,) + current[k] for k in new))
+    result.inserted, result.deleted = len(new), len(gone)
+
+    if "EntryTimestamp" in schema:
+        stamps = table["EntryTimestamp"]
+        stamps = stamps[~np.isnat(stamps)]
+        if len(stamps):
+            result.latest_entry = str(stamps.max()).replace("T", " ")
+    return result
+
+
+def sync_workbook(path: str, database: Optional[str] = None,
+                  tables: Optional[List[str]] = None) -> SyncResult:
+    """
+    Mirror a workbook's data tables into SQLite, changing only what changed.
+
+    Args:
+        path: Workbook to read (.xlsx/.xlsm)
+        database: SQLite file (default: the workbook's path with .sqlite)
+        tables: Tables to mirror (default: MIRROR_TABLES)
+
+    Returns:
+        Rows inserted and deleted per table
+    """
+    database = database or os.path.splitext(path)[0] + ".sqlite"
+    tables = tables or MIRROR_TABLES
+    start = time.perf_counter()
+    loaded = load_tables(path, tables)
+    result = SyncResult(database, load_s=time.perf_counter() - start)
+
+    start = time.perf_counter()
+    db = sqlite3.connect(database)
+    try:
+        with db:
+            db.execute("CREATE TABLE IF NOT EXISTS sync_state "
+                       "(table_name TEXT PRIMARY KEY, workbook TEXT, synced_at TEXT, "
+                       "rows INTEGER, latest_entry TEXT)")
+            synced_at = datetime.now().isoformat(sep=" ", timespec="seconds")
+            for name in tables:
+                _create(db, name)
+                sync = _sync_table(db, loaded[name])
+                db.execute("INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?, ?, ?)",
+                           (name, os.path.abspath(path), synced_at, sync.rows, sync.latest_entry))
+                result.tables.append(sync)
+    finally:
+        db.close()
+    result.sync_s = time.perf_counter() - start
+    return result
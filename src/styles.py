@@ -0,0 +1,155 @@
+"""
+Bed Utilization Workbook - Shared styles
+Style constants and the named-style registry used by the Phase 1 builders.
+
+Assigning Font/Alignment/Border/PatternFill to a cell one attribute at a time
+costs four style-table lookups per cell. The builders stamp hundreds of
+thousands of cells, so the common combinations are registered once per
+workbook as NamedStyles and applied with a single style-array copy.
+"""
+import weakref
+from copy import copy
+
+from openpyxl import Workbook
+from openpyxl.styles import Font, Alignment, Border, Side, PatternFill, NamedStyle
+from openpyxl.styles.borders import DEFAULT_BORDER
+from openpyxl.styles.fills import DEFAULT_EMPTY_FILL
+from openpyxl.styles.fonts import DEFAULT_FONT
+from openpyxl.worksheet.table import TableStyleInfo
+
+# ── Style constants ──────────────────────────────────────────────────────────
+
+HEADER_FONT = Font(name="Calibri", bold=True, size=14)
+SUBHEADER_FONT = Font(name="Calibri", bold=True, size=12)
+LABEL_FONT = Font(name="Calibri", bold=True, size=10)
+NORMAL_FONT = Font(name="Calibri", size=10)
+BOLD_FONT = Font(name="Calibri", bold=True, size=10)
+
+CENTER = Alignment(horizontal="center", vertical="center")
+CENTER_WRAP = Alignment(horizontal="center", vertical="center", wrap_text=True)
+LEFT = Alignment(horizontal="left", vertical="center")
+
+THIN_BORDER = Border(
+    left=Side(style="thin"),
+    right=Side(style="thin"),
+    top=Side(style="thin"),
+    bottom=Side(style="thin"),
+)
+
+HEADER_FILL = PatternFill(start_color="1F4E79", end_color="1F4E79", fill_type="solid")
+HEADER_FONT_WHITE = Font(name="Calibri", bold=True, size=10, color="FFFFFF")
+LIGHT_BLUE_FILL = PatternFill(start_color="D6E4F0", end_color="D6E4F0", fill_type="solid")
+LIGHT_GREEN_FILL = PatternFill(start_color="E2EFDA", end_color="E2EFDA", fill_type="solid")
+LIGHT_YELLOW_FILL = PatternFill(start_color="FFF2CC", end_color="FFF2CC", fill_type="solid")
+GRAY_FILL = PatternFill(start_color="F0F0F0", end_color="F0F0F0", fill_type="solid")
+TOTAL_FILL = PatternFill(start_color="B4C6E7", end_color="B4C6E7", fill_type="solid")
+EMERGENCY_FILL = PatternFill(start_color="FFD966", end_color="FFD966", fill_type="solid")
+
+KPI_FORMAT = "0.00"
+ZERO_BLANK_FORMAT = "0;-0;;@"  # zero displays as an empty cell
+
+TABLE_STYLE = TableStyleInfo(
+    name="TableStyleLight9",
+    showFirstColumn=False, showLastColumn=False,
+    showRowStripes=True, showColumnStripes=False,
+)
+
+# ── Named styles ─────────────────────────────────────────────────────────────
+# name -> (font, fill, alignment, border, number_format); None keeps the default
+
+NAMED_STYLES = {
+    "bu_title":          (HEADER_FONT,       None,              CENTER,      None,        None),
+    "bu_subtitle":       (SUBHEADER_FONT,    None,              CENTER,      None,        None),
+    "bu_label":          (LABEL_FONT,        None,              None,        None,        None),
+    "bu_normal":         (NORMAL_FONT,       None,              None,        None,        None),
+    "bu_bold":           (BOLD_FONT,         None,              None,        None,        None),
+    "bu_col_header":     (HEADER_FONT_WHITE, HEADER_FILL,       CENTER_WRAP, THIN_BORDER, None),
+    "bu_col_header_row": (HEADER_FONT_WHITE, HEADER_FILL,       CENTER,      THIN_BORDER, None),
+    "bu_section_header": (HEADER_FONT_WHITE, HEADER_FILL,       CENTER,      None,        None),
+    "bu_cell":           (NORMAL_FONT,       None,              CENTER,      THIN_BORDER, None),
+    "bu_cell_plain":     (None,              None,              CENTER,      THIN_BORDER, None),
+    "bu_cell_bold":      (BOLD_FONT,         None,              CENTER,      THIN_BORDER, None),
+    "bu_kpi":            (NORMAL_FONT,       None,              CENTER,      THIN_BORDER, KPI_FORMAT),
+    "bu_cell_hide0":     (NORMAL_FONT,       None,              CENTER,      THIN_BORDER, ZERO_BLANK_FORMAT),
+    "bu_cell_plain_hide0": (None,            None,              CENTER,      THIN_BORDER, ZERO_BLANK_FORMAT),
+    "bu_cell_bold_hide0": (BOLD_FONT,        None,              CENTER,      THIN_BORDER, ZERO_BLANK_FORMAT),
+    "bu_total":          (BOLD_FONT,         TOTAL_FILL,        CENTER,      THIN_BORDER, None),
+    "bu_total_kpi":      (BOLD_FONT,         TOTAL_FILL,        CENTER,      THIN_BORDER, KPI_FORMAT),
+    "bu_subtotal":       (BOLD_FONT,         LIGHT_YELLOW_FILL, CENTER,      THIN_BORDER, None),
+    "bu_subtotal_kpi":   (BOLD_FONT,         LIGHT_YELLOW_FILL, CENTER,      THIN_BORDER, KPI_FORMAT),
+    "bu_emergency":      (BOLD_FONT,         EMERGENCY_FILL,    CENTER,      THIN_BORDER, None),
+    "bu_emergency_pad":  (None,              EMERGENCY_FILL,    CENTER,      THIN_BORDER, None),
+    "bu_blank_day":      (None,              GRAY_FILL,         None,        THIN_BORDER, None),
+    "bu_bordered":       (None,              None,              None,        THIN_BORDER, None),
+    "bu_bordered_kpi":   (None,              None,              None,        THIN_BORDER, KPI_FORMAT),
+    "bu_bordered_bold":  (BOLD_FONT,         None,              None,        THIN_BORDER, None),
+    "bu_bordered_normal": (NORMAL_FONT,      None,              None,        THIN_BORDER, None),
+    "bu_prev_remaining": (BOLD_FONT,         LIGHT_YELLOW_FILL, None,        THIN_BORDER, None),
+    "bu_bed_complement": (BOLD_FONT,         LIGHT_GREEN_FILL,  None,        THIN_BORDER, None),
+}
+
+
+def _make_named_style(name: str) -> NamedStyle:
+    font, fill, alignment, border, number_format = NAMED_STYLES[name]
+    # Unset slots fall back to the workbook defaults, not NamedStyle's bare Font()
+    style = NamedStyle(
+        name=name,
+        font=font or DEFAULT_FONT,
+        fill=fill or DEFAULT_EMPTY_FILL,
+        border=border or DEFAULT_BORDER,
+    )
+    if alignment is not None:
+        style.alignment = alignment
+    if number_format is not None:
+        style.number_format = number_format
+    return style
+
+
+class StyleRegistry:
+    """
+    The NAMED_STYLES of one workbook, registered once and cached as style arrays.
+
+    Use styles_for(wb) rather than constructing this directly so every builder
+    working on the same workbook shares one registry.
+    """
+
+    def __init__(self, wb: Workbook):
+        self._arrays = {}
+        registered = {s.name: s for s in wb._named_styles}
+        for name in NAMED_STYLES:
+            style = registered.get(name)
+            if style is None:
+                style = _make_named_style(name)
+                wb.add_named_style(style)
+            self._arrays[name] = style.as_tuple()
+
+    def apply(self, cell, name: str):
+        """Stamp `cell` with a registered style (one array copy, no lookups)."""
+        cell._style = copy(self._arrays[name])
+        return cell
+
+    def cell(self, ws, row: int, column: int, name: str, value=None):
+        """ws.cell() followed by apply(); returns the cell."""
+        c = ws.cell(row=row, column=column, value=value)
+        c._style = copy(self._arrays[name])
+        return c
+
+    def apply_range(self, ws, min_row: int, max_row: int,
+                    min_col: int, max_col: int, name: str):
+        """Apply one style to every cell in a rectangular range."""
+        array = self._arrays[name]
+        for row in range(min_row, max_row + 1):
+            for col in range(min_col, max_col + 1):
+                ws.cell(row=row, column=col)._style = copy(array)
+
+
+_registries = weakref.WeakKeyDictionary()
+
+
+def styles_for(wb: Workbook) -> StyleRegistry:
+    """Return the StyleRegistry for `wb`, registering the named styles on first use."""
+    registry = _registries.get(wb)
+    if registry is None:
+        registry = StyleRegistry(wb)
+        _registries[wb] = registry
+    return registry
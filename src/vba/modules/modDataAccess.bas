@@ -35,6 +35,7 @@ Public Const COL_ADM_AGE_UNIT As Integer = 8
 Public Const COL_ADM_SEX As Integer = 9
 Public Const COL_ADM_NHIS As Integer = 10
 Public Const COL_ADM_TIMESTAMP As Integer = 11
+Public Const COL_ADM_AGE_GROUP As Integer = 12    ' Calculated column, filled by Excel
 
 ' tblDeaths columns
 Public Const COL_DEATH_ID As Integer = 1
@@ -50,6 +51,7 @@ Public Const COL_DEATH_NHIS As Integer = 10       ' Moved from 9
 Public Const COL_DEATH_CAUSE As Integer = 11      ' Moved from 10
 Public Const COL_DEATH_WITHIN_24HR As Integer = 12 ' Moved from 11
 Public Const COL_DEATH_TIMESTAMP As Integer = 13
+Public Const COL_DEATH_AGE_GROUP As Integer = 14  ' Calculated column, filled by Excel
 
 '===================================================================
 ' REMAINING CALCULATION SYSTEM
@@ -989,8 +991,12 @@ Public Sub ImportFromOldWorkbook()
 
     importCount = validCount
 
-    ' Resize new table to fit all rows at once (instead of 860 individual .Add calls)
+    ' Resize new table to fit all rows at once (instead of 860 individual .Add calls).
+    ' The table keeps all its columns: a calculated Key column after the 12
+    ' copied ones (--lookup-key builds) is filled down rather than imported.
     If validCount > 0 Then
+        Dim dailyColumns As Integer
+        dailyColumns = newTbl.ListColumns.Count
         ' If seed row exists, we need validCount rows total; otherwise add validCount
         Dim startRow As Long
         If useSeedRow Then
@@ -1002,14 +1008,14 @@ Public Sub ImportFromOldWorkbook()
                 ' Bulk add rows by resizing the table range
                 Dim lastTableRow As Long
                 lastTableRow = newTbl.Range.Row + newTbl.Range.Rows.Count - 1
-                newTbl.Resize newTbl.Range.Resize(validCount + 1, 12)  ' +1 for header
+                newTbl.Resize newTbl.Range.Resize(validCount + 1, dailyColumns)  ' +1 for header
             End If
             startRow = newTbl.DataBodyRange.Row
         Else
             ' Table already has data, add rows by resizing
             Dim existingRows As Long
             existingRows = newTbl.ListRows.Count
-            newTbl.Resize newTbl.Range.Resize(existingRows + validCount + 1, 12)  ' +1 header
+            newTbl.Resize newTbl.Range.Resize(existingRows + validCount + 1, dailyColumns)  ' +1 header
             startRow = newTbl.DataBodyRange.Row + existingRows
         End If
 
@@ -1020,6 +1026,13 @@ Public Sub ImportFromOldWorkbook()
         ' Format date column
         newWS.Range(newWS.Cells(startRow, newTbl.Range.Column), _
                      newWS.Cells(startRow + validCount - 1, newTbl.Range.Column)).NumberFormat = "yyyy-mm-dd"
+
+        Dim dailyCalcCol As Integer
+        For dailyCalcCol = 13 To dailyColumns
+            If newTbl.ListColumns(dailyCalcCol).DataBodyRange.Cells(1, 1).HasFormula Then
+                newTbl.ListColumns(dailyCalcCol).DataBodyRange.FillDown
+            End If
+        Next dailyCalcCol
     End If
 
     ' Import individual death records BEFORE closing workbook
@@ -1288,21 +1301,32 @@ Private Function BulkImportRecords(oldWB As Workbook, _
         End If
     End If
 
-    ' Resize table and write all data in one shot
+    ' Resize table and write all data in one shot. The table keeps all its
+    ' columns: calculated columns after the copied ones (AgeGroup) are
+    ' filled down from the first row rather than imported.
+    Dim tableColumns As Integer
+    tableColumns = newTbl.ListColumns.Count
     Dim writeStartRow As Long
     If hasSeedRow Then
-        newTbl.Resize newTbl.Range.Resize(validCount + 1, columnCount)
+        newTbl.Resize newTbl.Range.Resize(validCount + 1, tableColumns)
         writeStartRow = newTbl.DataBodyRange.Row
     Else
         Dim existingRowCount As Long
         existingRowCount = newTbl.ListRows.Count
-        newTbl.Resize newTbl.Range.Resize(existingRowCount + validCount + 1, columnCount)
+        newTbl.Resize newTbl.Range.Resize(existingRowCount + validCount + 1, tableColumns)
         writeStartRow = newTbl.DataBodyRange.Row + existingRowCount
     End If
 
     newWS.Range(newWS.Cells(writeStartRow, newTbl.Range.Column), _
                  newWS.Cells(writeStartRow + validCount - 1, newTbl.Range.Column + columnCount - 1)).Value = outData
 
+    Dim calcCol As Integer
+    For calcCol = columnCount + 1 To tableColumns
+        If newTbl.ListColumns(calcCol).DataBodyRange.Cells(1, 1).HasFormula Then
+            newTbl.ListColumns(calcCol).DataBodyRange.FillDown
+        End If
+    Next calcCol
+
     resultMsg = oldTableName & ": " & validCount & " records"
     If duplicateCount > 0 Then
         resultMsg = resultMsg & " (" & duplicateCount & " IDs renamed)"
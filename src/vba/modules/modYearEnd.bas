@@ -277,6 +277,21 @@ Private Function CheckRebuildPrerequisites() As String
     CheckRebuildPrerequisites = ""
 End Function
 
+Private Function DailyHasLookupKey() As Boolean
+    ' True when tblDaily carries the calculated Key column (--lookup-key build)
+    Dim tbl As ListObject
+    Set tbl = ThisWorkbook.Sheets("DailyData").ListObjects("tblDaily")
+
+    Dim col As ListColumn
+    For Each col In tbl.ListColumns
+        If col.Name = "Key" Then
+            DailyHasLookupKey = True
+            Exit Function
+        End If
+    Next col
+    DailyHasLookupKey = False
+End Function
+
 Public Sub RebuildWorkbookWithPreferences()
     ' Automated workbook rebuild with data preservation
     On Error GoTo ErrorHandler
@@ -326,7 +341,12 @@ Public Sub RebuildWorkbookWithPreferences()
     Dim buildCmd As String
     Dim yearVal As String
     yearVal = CStr(GetReportYear())
-    buildCmd = "cmd /c cd /d """ & ThisWorkbook.Path & """ && python build_workbook.py --year " & yearVal
+    buildCmd = "cmd /c cd /d """ & ThisWorkbook.Path & """ && python build_workbook.py --year " & yearVal & _
+               " --cache-dir .build_cache"
+    ' Keep the tblDaily[Key] lookup mode the current workbook was built with
+    If DailyHasLookupKey() Then
+        buildCmd = buildCmd & " --lookup-key"
+    End If
 
     ' Create a log file for the build process
     Dim logFile As String
@@ -3,9 +3,11 @@ VBA Injection Package for Bed Utilization System
 
 This package handles the injection of VBA code into Excel workbooks using win32com.
 It creates UserForms, standard modules, navigation buttons, and saves as .xlsm format.
+inject_vba_offline writes the modules without Excel (see offline.py).
 """
 
 from .core import inject_vba, initialize_date_formats
+from .offline import inject_vba_offline
 
-__all__ = ["inject_vba", "initialize_date_formats"]
+__all__ = ["inject_vba", "inject_vba_offline", "initialize_date_formats"]
 __version__ = "2.0.0"
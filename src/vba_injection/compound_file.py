@@ -0,0 +1,263 @@
+"""
+Compound File (OLE2) Writer and Reader
+
+vbaProject.bin is a [MS-CFB] compound file: a small FAT file system of
+storages (directories) and streams. write_compound_file lays out a version 3
+file (512-byte sectors) from a flat {"VBA/dir": bytes, ...} mapping; streams
+under 4096 bytes go to the mini stream, as Office writes them.
+read_compound_file parses any v3/v4 compound file back into the same mapping
+and is used to verify the writer's output.
+"""
+import struct
+from typing import Dict, List
+
+SIGNATURE = b"\xD0\xCF\x11\xE0\xA1\xB1\x1A\xE1"
+SECTOR = 512
+MINI_SECTOR = 64
+MINI_CUTOFF = 4096
+ENTRIES_PER_SECTOR = SECTOR // 128
+IDS_PER_SECTOR = SECTOR // 4
+
+FREESECT = 0xFFFFFFFF
+ENDOFCHAIN = 0xFFFFFFFE
+FATSECT = 0xFFFFFFFD
+DIFSECT = 0xFFFFFFFC
+NOSTREAM = 0xFFFFFFFF
+
+STORAGE, STREAM, ROOT = 1, 2, 5
+BLACK = 1
+
+
+class _Entry:
+    def __init__(self, name: str, kind: int):
+        self.name = name
+        self.kind = kind
+        self.children: List["_Entry"] = []
+        self.data = b""
+        self.start = ENDOFCHAIN
+        self.size = 0
+        self.sid = 0
+        self.left = self.right = self.child = NOSTREAM
+
+
+def _sort_key(name: str):
+    # [MS-CFB] 2.6.4: shorter names first, then case-insensitive comparison
+    return len(name), name.upper()
+
+
+def _tree(entries: List["_Entry"]) -> int:
+    """Link a sorted sibling list as a balanced binary tree; returns the root sid."""
+    if not entries:
+        return NOSTREAM
+    mid = len(entries) // 2
+    root = entries[mid]
+    root.left = _tree(entries[:mid])
+    root.right = _tree(entries[mid + 1:])
+    return root.sid
+
+
+def _chain(fat: List[int], start: int, count: int):
+    for i in range(count):
+        fat[start + i] = start + i + 1 if i < count - 1 else ENDOFCHAIN
+
+
+def _pad(data: bytes, size: int) -> bytes:
+    return data + b"\0" * (-len(data) % size)
+
+
+def write_compound_file(streams: Dict[str, bytes]) -> bytes:
+    """
+    Build a compound file holding `streams`.
+
+    Args:
+        streams: "storage/substorage/stream" path -> stream bytes
+
+    Returns:
+        The file contents
+    """
+    root = _Entry("Root Entry", ROOT)
+    storages = {"": root}
+    for path, data in streams.items():
+        parts = path.split("/")
+        parent = root
+        for depth in range(1, len(parts)):
+            key = "/".join(parts[:depth])
+            if key not in storages:
+                storages[key] = _Entry(parts[depth - 1], STORAGE)
+                parent.children.append(storages[key])
+            parent = storages[key]
+        stream = _Entry(parts[-1], STREAM)
+        stream.data = data
+        stream.size = len(data)
+        parent.children.append(stream)
+
+    # Directory order: depth-first, so every entry has a stable sid
+    entries = []
+
+    def number(entry):
+        entry.sid = len(entries)
+        entries.append(entry)
+        entry.children.sort(key=lambda e: _sort_key(e.name))
+        for child in entry.children:
+            number(child)
+    number(root)
+    for entry in entries:
+        entry.child = _tree(entry.children)
+
+    small = [e for e in entries if e.kind == STREAM and 0 < e.size < MINI_CUTOFF]
+    large = [e for e in entries if e.kind == STREAM and e.size >= MINI_CUTOFF]
+
+    mini_fat: List[int] = []
+    mini_stream = bytearray()
+    for e in small:
+        e.start = len(mini_fat)
+        count = -(-e.size // MINI_SECTOR)
+        mini_fat.extend([0] * count)
+        _chain(mini_fat, e.start, count)
+        mini_stream += _pad(e.data, MINI_SECTOR)
+
+    dir_sectors = -(-len(entries) // ENTRIES_PER_SECTOR)
+    mini_fat_sectors = -(-len(mini_fat) // IDS_PER_SECTOR)
+    mini_stream_sectors = -(-len(mini_stream) // SECTOR)
+    data_sectors = dir_sectors + mini_fat_sectors + mini_stream_sectors + \
+        sum(-(-e.size // SECTOR) for e in large)
+    fat_sectors = 1
+    while fat_sectors * IDS_PER_SECTOR < data_sectors + fat_sectors:
+        fat_sectors += 1
+    if fat_sectors > 109:
+        raise ValueError("Compound file too large for a header-only DIFAT (over ~7 MB)")
+
+    fat = [FREESECT] * (fat_sectors * IDS_PER_SECTOR)
+    for i in range(fat_sectors):
+        fat[i] = FATSECT
+    next_sector = fat_sectors
+
+    def allocate(count):
+        nonlocal next_sector
+        if count == 0:
+            return ENDOFCHAIN
+        start = next_sector
+        _chain(fat, start, count)
+        next_sector += count
+        return start
+
+    dir_start = allocate(dir_sectors)
+    mini_fat_start = allocate(mini_fat_sectors)
+    root.start = allocate(mini_stream_sectors)
+    root.size = len(mini_stream)
+    for e in large:
+        e.start = allocate(-(-e.size // SECTOR))
+
+    header = struct.pack(
+        "<8s16sHHHHH6sIIIIIIIII",
+        SIGNATURE, b"\0" * 16, 0x003E, 0x0003, 0xFFFE, 9, 6, b"\0" * 6,
+        0, fat_sectors, dir_start, 0, MINI_CUTOFF,
+        mini_fat_start, mini_fat_sectors, ENDOFCHAIN, 0,
+    )
+    difat = list(range(fat_sectors)) + [FREESECT] * (109 - fat_sectors)
+    header += struct.pack("<109I", *difat)
+
+    directory = bytearray()
+    for e in entries:
+        name = e.name.encode("utf-16-le")
+        if len(name) > 62:
+            raise ValueError(f"Compound file entry name too long: {e.name}")
+        directory += struct.pack(
+            "<64sHBBIII16sIQQIQ",
+            name, len(name) + 2, e.kind, BLACK, e.left, e.right, e.child,
+            b"\0" * 16, 0, 0, 0, e.start, e.size,
+        )
+    while len(directory) % SECTOR:
+        directory += struct.pack("<64sHBBIII16sIQQIQ", b"", 0, 0, 0,
+                                 NOSTREAM, NOSTREAM, NOSTREAM, b"\0" * 16, 0, 0, 0, 0, 0)
+
+    out = [header, struct.pack(f"<{len(fat)}I", *fat), bytes(directory)]
+    if mini_fat:
+        mini_fat += [FREESECT] * (-len(mini_fat) % IDS_PER_SECTOR)
+        out.append(struct.pack(f"<{len(mini_fat)}I", *mini_fat))
+    out.append(_pad(bytes(mini_stream), SECTOR))
+    for e in large:
+        out.append(_pad(e.data, SECTOR))
+    return b"".join(out)
+
+
+def read_compound_file(data: bytes) -> Dict[str, bytes]:
+    """
+    Every stream of a compound file.
+
+    Returns:
+        "storage/stream" path -> bytes (the root storage is not part of the path)
+
+    Raises:
+        ValueError: If the data is not a compound file
+    """
+    if data[:8] != SIGNATURE:
+        raise ValueError("Not a compound file (bad signature)")
+    (major, sector_shift, mini_shift, fat_count, dir_start, cutoff,
+     mini_fat_start, mini_fat_count, difat_start, difat_count) = \
+        struct.unpack_from("<26xHxxHH10xIIxxxxIIIII", data, 0)
+    sector_size = 1 << sector_shift
+    mini_size = 1 << mini_shift
+    ids_per_sector = sector_size // 4
+
+    def sector(sid):
+        offset = (sid + 1) * sector_size
+        return data[offset:offset + sector_size]
+
+    fat_sids = [s for s in struct.unpack_from("<109I", data, 76) if s != FREESECT]
+    sid = difat_start
+    for _ in range(difat_count):
+        ids = struct.unpack(f"<{ids_per_sector}I", sector(sid))
+        fat_sids.extend(s for s in ids[:-1] if s != FREESECT)
+        sid = ids[-1]
+    fat = []
+    for s in fat_sids[:fat_count]:
+        fat.extend(struct.unpack(f"<{ids_per_sector}I", sector(s)))
+
+    def chain(start, table):
+        seen = set()
+        while start not in (ENDOFCHAIN, FREESECT):
+            if start in seen or start >= len(table):
+                raise ValueError("Corrupt sector chain")
+            seen.add(start)
+            yield start
+            start = table[start]
+
+    directory = b"".join(sector(s) for s in chain(dir_start, fat))
+    entries = []
+    for offset in range(0, len(directory), 128):
+        (name, name_len, kind, _color, left, right, child,
+         start, size) = struct.unpack_from("<64sHBBIII36xIQ", directory, offset)
+        if major == 3:
+            size &= 0xFFFFFFFF
+        entries.append((name[:max(name_len - 2, 0)].decode("utf-16-le"), kind,
+                        left, right, child, start, size))
+
+    mini_fat = []
+    for s in chain(mini_fat_start, fat):
+        mini_fat.extend(struct.unpack(f"<{ids_per_sector}I", sector(s)))
+    root = entries[0]
+    mini_stream = b"".join(sector(s) for s in chain(root[5], fat))
+
+    def stream(start, size):
+        if size < cutoff:
+            parts = [mini_stream[s * mini_size:(s + 1) * mini_size] for s in chain(start, mini_fat)]
+        else:
+            parts = [sector(s) for s in chain(start, fat)]
+        return b"".join(parts)[:size]
+
+    streams = {}
+
+    def walk(sid, prefix):
+        if sid == NOSTREAM:
+            return
+        name, kind, left, right, child, start, size = entries[sid]
+        walk(left, prefix)
+        if kind == STREAM:
+            streams[prefix + name] = stream(start, size)
+        elif kind == STORAGE:
+            walk(child, prefix + name + "/")
+        walk(right, prefix)
+
+    walk(root[4], "")
+    return streams
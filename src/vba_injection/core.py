@@ -12,6 +12,7 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from ..config import WorkbookConfig
 
+from ..profiler import NULL_PROFILER
 from .utils import get_vba_path, read_vba_file
 from .userform_builder import (
     create_daily_entry_form,
@@ -26,6 +27,20 @@ from .userform_builder import (
 from .calendar_form_builder import create_calendar_picker_form
 from .navigation import create_nav_buttons
 
+# Standard modules injected into every workbook: (module name, file in src/vba/modules)
+STANDARD_MODULES = [
+    ("modConfig", "modConfig.bas"),
+    ("modDataAccess", "modDataAccess.bas"),
+    ("modDateUtils", "modDateUtils.bas"),
+    ("modValidation", "modValidation.bas"),
+    ("modReports", "modReports.bas"),
+    ("modNavigation", "modNavigation.bas"),
+    ("modYearEnd", "modYearEnd.bas"),
+]
+
+# Data sheets hidden from users
+HIDDEN_SHEETS = ["DailyData", "Admissions", "DeathsData", "TransfersData"]
+
 
 def initialize_date_formats(wb) -> None:
     """
@@ -70,7 +85,8 @@ def initialize_date_formats(wb) -> None:
         print(f"    Warning: Could not format TransfersData columns: {e}")
 
 
-def inject_vba(xlsx_path: str, xlsm_path: str, config: "WorkbookConfig") -> None:
+def inject_vba(xlsx_path: str, xlsm_path: str, config: "WorkbookConfig",
+               profiler=None) -> None:
     """
     Open xlsx in Excel via COM, inject VBA, save as xlsm.
     
@@ -87,6 +103,7 @@ def inject_vba(xlsx_path: str, xlsm_path: str, config: "WorkbookConfig") -> None
         xlsx_path: Path to source .xlsx file
         xlsm_path: Path to output .xlsm file
         config: WorkbookConfig object with configuration settings
+        profiler: Optional profiler.BuildProfiler; each stage below is timed
         
     Raises:
         FileNotFoundError: If xlsx file doesn't exist
@@ -94,6 +111,8 @@ def inject_vba(xlsx_path: str, xlsm_path: str, config: "WorkbookConfig") -> None
     """
     import win32com.client
 
+    stage = (profiler or NULL_PROFILER).stage
+
     abs_xlsx = os.path.abspath(xlsx_path)
     abs_xlsm = os.path.abspath(xlsm_path)
 
@@ -109,6 +128,7 @@ def inject_vba(xlsx_path: str, xlsm_path: str, config: "WorkbookConfig") -> None
         os.remove(abs_xlsm)
 
     # Pre-flight checks
+    stage("pre-flight checks", "vba")
     print("Performing pre-flight checks...")
     
     # Check if file is already open in Excel
@@ -135,6 +155,7 @@ def inject_vba(xlsx_path: str, xlsm_path: str, config: "WorkbookConfig") -> None
     wb = None
     
     try:
+        stage("start Excel", "vba")
         excel = win32com.client.Dispatch("Excel.Application")
         excel.Visible = False
         excel.DisplayAlerts = False
@@ -144,6 +165,7 @@ def inject_vba(xlsx_path: str, xlsm_path: str, config: "WorkbookConfig") -> None
         
         # Use standard Windows paths (backslashes) which are reliable for local files
         xlsx_path_normalized = abs_xlsx
+        stage("open workbook", "vba")
         print(f"Opening workbook: {xlsx_path_normalized}")
         
         # Try opening with retry logic (sometimes COM needs a moment)
@@ -174,29 +196,23 @@ def inject_vba(xlsx_path: str, xlsm_path: str, config: "WorkbookConfig") -> None
         vbproj = wb.VBProject
 
         # 1. Inject standard modules
+        stage("inject modules", "vba")
         print("  Injecting VBA modules...")
-        modules = [
-            ("modConfig", "modConfig.bas"),
-            ("modDataAccess", "modDataAccess.bas"),
-            ("modDateUtils", "modDateUtils.bas"),
-            ("modValidation", "modValidation.bas"),
-            ("modReports", "modReports.bas"),
-            ("modNavigation", "modNavigation.bas"),
-            ("modYearEnd", "modYearEnd.bas"),
-        ]
-        for mod_name, filename in modules:
+        for mod_name, filename in STANDARD_MODULES:
             module = vbproj.VBComponents.Add(1)  # vbext_ct_StdModule
             module.Name = mod_name
             code_path = get_vba_path(filename, "modules")
             module.CodeModule.AddFromString(read_vba_file(code_path))
 
         # 2. Inject ThisWorkbook code
+        stage("inject ThisWorkbook", "vba")
         print("  Injecting ThisWorkbook code...")
         tb = vbproj.VBComponents("ThisWorkbook")
         tb_code_path = get_vba_path("ThisWorkbook.cls", "workbook")
         tb.CodeModule.AddFromString(read_vba_file(tb_code_path))
 
         # 2.5. Inject DailyData worksheet change event
+        stage("inject DailyData event", "vba")
         print("  Injecting DailyData worksheet event...")
         daily_data_injected = False
         
@@ -223,6 +239,7 @@ def inject_vba(xlsx_path: str, xlsm_path: str, config: "WorkbookConfig") -> None
             raise ValueError("CRITICAL: Failed to inject Worksheet_Change event into DailyData sheet!")
 
         # 3. Create UserForms
+        stage("create UserForms", "vba")
         print("  Creating UserForms...")
         create_calendar_picker_form(vbproj)  # Create calendar picker first (used by other forms)
         create_daily_entry_form(vbproj)
@@ -235,15 +252,15 @@ def inject_vba(xlsx_path: str, xlsm_path: str, config: "WorkbookConfig") -> None
         create_age_fixer_form(vbproj)
 
         # 4. Add navigation buttons to Control sheet
+        stage("navigation buttons", "vba")
         print("  Adding navigation buttons...")
         create_nav_buttons(wb)
 
         # 5. Hide data sheets
+        stage("hide sheets", "vba")
         print("  Hiding data sheets...")
-        wb.Sheets("DailyData").Visible = 0       # xlSheetHidden
-        wb.Sheets("Admissions").Visible = 0
-        wb.Sheets("DeathsData").Visible = 0
-        wb.Sheets("TransfersData").Visible = 0
+        for name in HIDDEN_SHEETS:
+            wb.Sheets(name).Visible = 0  # xlSheetHidden
 
         # Hide individual emergency sheets by default
         try:
@@ -254,10 +271,12 @@ def inject_vba(xlsx_path: str, xlsm_path: str, config: "WorkbookConfig") -> None
 
 
         # 5.5. Initialize date column formats
+        stage("date formats", "vba")
         print("  Initializing date column formats...")
         initialize_date_formats(wb)
 
         # 6. Save as .xlsm (FileFormat 52)
+        stage("save xlsm", "vba")
         print(f"  Saving as {abs_xlsm}...")
         wb.SaveAs(abs_xlsm, FileFormat=52)
         wb.Close(SaveChanges=False)
@@ -292,6 +311,8 @@ def inject_vba(xlsx_path: str, xlsm_path: str, config: "WorkbookConfig") -> None
             pass
         raise
     finally:
+        stage("quit Excel", "vba")
         if excel:
             excel.Quit()
             time.sleep(1)
+        stage(None, "vba")
@@ -0,0 +1,265 @@
+"""
+Offline VBA Injection
+
+Produces the .xlsm without Excel: the VBA sources are compiled into a
+vbaProject.bin (see vba_project.py) and added to the package, with the
+content types, relationship and code names Excel expects. Data sheets are
+hidden through workbook.xml.
+
+Covered: the standard modules, ThisWorkbook, the DailyData Worksheet_Change
+event and sheet visibility. UserForms (MS-Forms designer storages and the
+DTPicker ActiveX control), the Control sheet shape buttons and the table
+date formats are still created by the Excel path in core.py. Procedures
+that use a UserForm (and procedures calling those) are left out of the
+project, since under Option Explicit they would not compile.
+"""
+import os
+import re
+import time
+import zipfile
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple
+
+if TYPE_CHECKING:
+    from ..config import WorkbookConfig
+
+from ..profiler import NULL_PROFILER
+from ..xlsx.assembler import CT_WORKBOOK
+from ..xlsx.package import rewrite_package
+from ..xlsx.reader import sheet_parts
+from .core import HIDDEN_SHEETS, STANDARD_MODULES
+from .utils import get_vba_path, read_vba_file
+from .vba_project import DOCUMENT, WORKBOOK_BASE, WORKSHEET_BASE, VBAModule, build_vba_project
+
+CT_WORKBOOK_MACRO = "application/vnd.ms-excel.sheet.macroEnabled.main+xml"
+CT_VBA_PROJECT = "application/vnd.ms-office.vbaProject"
+REL_VBA_PROJECT = "http://schemas.microsoft.com/office/2006/relationships/vbaProject"
+VBA_PART = "xl/vbaProject.bin"
+
+# Emergency sheets start hidden too (when the workbook has them)
+HIDDEN_IF_PRESENT = ["Male Emergency", "Female Emergency"]
+
+# Parts of the Excel build the offline writer does not produce
+NOT_INCLUDED = ["UserForms", "Control sheet buttons", "table date formats"]
+
+_WORKBOOK_PR = re.compile(rb"<(workbookPr)\b([^>]*?)\s*(/?)>")
+_SHEET_PR = re.compile(rb"<(sheetPr)\b([^>]*?)\s*(/?)>")
+_WORKSHEET_OPEN = re.compile(rb"<worksheet\b[^>]*>")
+_CODE_NAME = re.compile(rb'\s*\bcodeName="[^"]*"')
+_SHEET_TAG = re.compile(rb'<sheet\b[^>]*?\bname="([^"]*)"[^>]*?/>')
+_STATE = re.compile(rb'\s*\bstate="\w+"')
+
+_PROC_START = re.compile(r"^\s*(?:(?:Public|Private|Friend)\s+)?(?:Static\s+)?"
+                         r"(?:Sub|Function|Property\s+(?:Get|Let|Set))\s+(\w+)", re.I)
+_PROC_END = re.compile(r"^\s*End\s+(?:Sub|Function|Property)\b", re.I)
+_STRING_LITERAL = re.compile(r'"[^"]*"')
+# Bare names only: "ws.Name" references Name as a member, not a project symbol
+_IDENTIFIER = re.compile(r"(?<![.\w])[A-Za-z_]\w*")
+
+
+@dataclass
+class OfflineVBAReport:
+    modules: List[str] = field(default_factory=list)
+    hidden: List[str] = field(default_factory=list)
+    vba_bytes: int = 0
+    seconds: float = 0.0
+    left_out: List[str] = field(default_factory=list)
+
+    def format(self) -> str:
+        lines = [
+            f"vbaProject.bin: {len(self.modules)} modules, {self.vba_bytes / 1024:.0f} KB "
+            f"in {self.seconds:.2f}s",
+            f"  Hidden sheets: {', '.join(self.hidden)}",
+            f"  Not included (need the Excel build): {', '.join(NOT_INCLUDED)}",
+        ]
+        if self.left_out:
+            lines.append(f"  Procedures left out (use UserForms): {', '.join(self.left_out)}")
+        return "\n".join(lines)
+
+
+def _with_code_name(xml: bytes, pattern: re.Pattern, code_name: str) -> Optional[bytes]:
+    """Set codeName on the first element matching pattern; None if there is none."""
+    m = pattern.search(xml)
+    if m is None:
+        return None
+    attrs = _CODE_NAME.sub(b"", m.group(2)) + b' codeName="%s"' % code_name.encode()
+    return xml[:m.start()] + b"<" + m.group(1) + attrs + m.group(3) + b">" + xml[m.end():]
+
+
+def _workbook_xml(xml: bytes, hidden: List[str]) -> bytes:
+    new = _with_code_name(xml, _WORKBOOK_PR, "ThisWorkbook")
+    if new is None:
+        new = xml.replace(b"<sheets>", b'<workbookPr codeName="ThisWorkbook"/><sheets>', 1)
+
+    def sheet(m):
+        tag = m.group(0)
+        if m.group(1).decode() in hidden:
+            tag = _STATE.sub(b"", tag)
+            tag = tag[:-2].rstrip() + b' state="hidden"/>'
+        return tag
+    return _SHEET_TAG.sub(sheet, new)
+
+
+def _worksheet_xml(xml: bytes, code_name: str) -> bytes:
+    new = _with_code_name(xml, _SHEET_PR, code_name)
+    if new is None:
+        m = _WORKSHEET_OPEN.search(xml)
+        new = xml[:m.end()] + b'<sheetPr codeName="%s"/>' % code_name.encode() + xml[m.end():]
+    return new
+
+
+def _content_types(xml: bytes) -> bytes:
+    xml = xml.replace(CT_WORKBOOK.encode(), CT_WORKBOOK_MACRO.encode())
+    if b'Extension="bin"' not in xml:
+        default = b'<Default Extension="bin" ContentType="%s"/>' % CT_VBA_PROJECT.encode()
+        xml = re.sub(rb"(<Types\b[^>]*>)", lambda m: m.group(1) + default, xml, count=1)
+    return xml
+
+
+def _workbook_rels(xml: bytes) -> bytes:
+    if REL_VBA_PROJECT.encode() in xml:
+        return xml
+    rel = b'<Relationship Id="rIdVBA1" Type="%s" Target="vbaProject.bin"/>' % REL_VBA_PROJECT.encode()
+    return xml.replace(b"</Relationships>", rel + b"</Relationships>", 1)
+
+
+def identifiers(code: str) -> Set[str]:
+    """Names referenced by VBA code outside strings and comments, lowercased."""
+    names = set()
+    for line in code.splitlines():
+        line = _STRING_LITERAL.sub('""', line).split("'", 1)[0]
+        names.update(n.lower() for n in _IDENTIFIER.findall(line))
+    return names
+
+
+def procedures(code: str) -> List[Tuple[str, int, int]]:
+    """(name, first line, last line) of every procedure in VBA code."""
+    found = []
+    start = name = None
+    for i, line in enumerate(code.splitlines()):
+        if start is None:
+            m = _PROC_START.match(line)
+            if m:
+                start, name = i, m.group(1)
+        elif _PROC_END.match(line):
+            found.append((name, start, i))
+            start = None
+    return found
+
+
+def form_names() -> Set[str]:
+    """UserForms of the Excel build (src/vba/forms), lowercased."""
+    forms_dir = os.path.dirname(get_vba_path("", "forms"))
+    return {os.path.splitext(f)[0].lower() for f in os.listdir(forms_dir)}
+
+
+def without_form_procedures(modules: List[VBAModule],
+                            forms: Set[str]) -> Tuple[List[VBAModule], List[str]]:
+    """
+    Drop the procedures that reference a form in forms, then the procedures
+    calling a dropped one, until nothing left refers to what was removed.
+
+    Returns:
+        (modules with those procedures removed, "module.procedure" names dropped)
+    """
+    procs: Dict[Tuple[str, str], Tuple[int, int, Set[str]]] = {}
+    for m in modules:
+        lines = m.code.splitlines()
+        for name, first, last in procedures(m.code):
+            refs = identifiers("\n".join(lines[first:last + 1])) - {name.lower()}
+            procs[(m.name, name)] = (first, last, refs)
+
+    missing = set(forms)
+    dropped = set()
+    while True:
+        newly = {key for key, (_, _, refs) in procs.items() if key not in dropped and refs & missing}
+        if not newly:
+            break
+        dropped |= newly
+        kept = {name.lower() for mod, name in procs if (mod, name) not in dropped}
+        missing |= {name.lower() for _, name in newly} - kept
+
+    result = []
+    for m in modules:
+        spans = [(first, last) for (mod, name), (first, last, _) in procs.items()
+                 if mod == m.name and (mod, name) in dropped]
+        if not spans:
+            result.append(m)
+            continue
+        lines = m.code.splitlines()
+        for first, last in sorted(spans, reverse=True):
+            if last + 1 < len(lines) and not lines[last + 1].strip():
+                last += 1  # the blank line separating it from the next procedure
+            del lines[first:last + 1]
+        result.append(VBAModule(m.name, "\n".join(lines) + "\n", m.kind, m.base))
+    return result, [f"{mod}.{name}" for mod, name in procs if (mod, name) in dropped]
+
+
+def project_modules(sheet_names: List[str]) -> List[VBAModule]:
+    """
+    Every module of the workbook's VBA project.
+
+    Standard modules in STANDARD_MODULES order, then ThisWorkbook, then one
+    document module per worksheet (code names Sheet1..SheetN in workbook
+    order); the DailyData module carries the Worksheet_Change event.
+    """
+    modules = [VBAModule(name, read_vba_file(get_vba_path(filename, "modules")))
+               for name, filename in STANDARD_MODULES]
+    modules.append(VBAModule("ThisWorkbook",
+                             read_vba_file(get_vba_path("ThisWorkbook.cls", "workbook")),
+                             DOCUMENT, WORKBOOK_BASE))
+    daily_code = read_vba_file(get_vba_path("Sheet_DailyData.cls", "workbook"))
+    for i, name in enumerate(sheet_names, 1):
+        modules.append(VBAModule(f"Sheet{i}", daily_code if name == "DailyData" else "",
+                                 DOCUMENT, WORKSHEET_BASE))
+    return modules
+
+
+def inject_vba_offline(xlsx_path: str, xlsm_path: str, config: "WorkbookConfig" = None,
+                       profiler=None) -> OfflineVBAReport:
+    """
+    Write xlsm_path: the .xlsx with a generated vbaProject.bin.
+
+    Args:
+        xlsx_path: Path to source .xlsx file
+        xlsm_path: Path to output .xlsm file
+        config: WorkbookConfig (unused; kept for signature parity with inject_vba)
+        profiler: Optional profiler.BuildProfiler
+
+    Raises:
+        FileNotFoundError: If the xlsx file or a VBA source file doesn't exist
+        ValueError: If the workbook has no DailyData sheet
+    """
+    stage = (profiler or NULL_PROFILER).stage
+    start = time.perf_counter()
+    if not os.path.exists(xlsx_path):
+        raise FileNotFoundError(f"Cannot find xlsx file: {os.path.abspath(xlsx_path)}")
+
+    stage("build vbaProject.bin", "vba")
+    with zipfile.ZipFile(xlsx_path) as zf:
+        parts = sheet_parts(zf)
+    sheet_names = list(parts.values())
+    if "DailyData" not in sheet_names:
+        raise ValueError("CRITICAL: Workbook has no DailyData sheet for the Worksheet_Change event!")
+    code_names = {part: f"Sheet{i}" for i, part in enumerate(parts, 1)}
+    modules, left_out = without_form_procedures(project_modules(sheet_names), form_names())
+    vba = build_vba_project(modules)
+    hidden = [n for n in HIDDEN_SHEETS + HIDDEN_IF_PRESENT if n in sheet_names]
+
+    stage("write xlsm", "vba")
+
+    def transform(src, name, data):
+        if name == "[Content_Types].xml":
+            return _content_types(data)
+        if name == "xl/_rels/workbook.xml.rels":
+            return _workbook_rels(data)
+        if name == "xl/workbook.xml":
+            return _workbook_xml(data, hidden)
+        if name in code_names:
+            return _worksheet_xml(data, code_names[name])
+        return data
+
+    rewrite_package(xlsx_path, xlsm_path, transform, added={VBA_PART: vba})
+    stage(None, "vba")
+    return OfflineVBAReport([m.name for m in modules], hidden, len(vba),
+                            time.perf_counter() - start, left_out)
@@ -0,0 +1,365 @@
+"""
+vbaProject.bin Writer
+
+Builds the VBA project storage of an .xlsm from source text, following
+[MS-OVBA]:
+
+    VBA/_VBA_PROJECT   version stub; 0xFFFF tells Office there is no
+                       compiled p-code, so it compiles from source on open
+    VBA/dir            project information, references and module records
+                       (compressed)
+    VBA/<module>       module source (compressed, text offset 0)
+    PROJECT            text project properties
+    PROJECTwm          module name map
+
+No Excel instance is involved, so the build can run on any platform.
+read_vba_project parses a project back to its module sources and is the
+verification path for the writer.
+"""
+import random
+import re
+import struct
+import uuid
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+from .compound_file import read_compound_file, write_compound_file
+
+CODEPAGE = 1252
+ENCODING = "cp1252"
+LCID = 0x0409
+
+# Module types ([MS-OVBA] 2.3.4.2.3.2.8)
+PROCEDURAL = 0x0021
+DOCUMENT = 0x0022
+
+# VB_Base class ids of the Excel document modules
+WORKBOOK_BASE = "0{00020819-0000-0000-C000-000000000046}"
+WORKSHEET_BASE = "0{00020820-0000-0000-C000-000000000046}"
+
+# References every new Excel project carries (VBA and Excel are implicit)
+REFERENCES = [
+    ("stdole", "*\\G{00020430-0000-0000-C000-000000000046}#2.0#0#"
+               "C:\\Windows\\System32\\stdole2.tlb#OLE Automation"),
+    ("Office", "*\\G{2DF8D04C-5BFA-101B-BDE5-00AA0044DE52}#2.0#0#"
+               "C:\\Program Files\\Common Files\\Microsoft Shared\\OFFICE16\\MSO.DLL"
+               "#Microsoft Office 16.0 Object Library"),
+]
+
+# [Host Extender Info] line Excel writes for the VBE host
+HOST_EXTENDER = "&H00000001={3832D640-CF90-11CF-8E43-00A0C911005A};VBE;&H00000000"
+
+_ATTRIBUTE_LINE = re.compile(r"^Attribute VB_\w+ = .*$\n?", re.M)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# COMPRESSION ([MS-OVBA] 2.4.1)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+CHUNK = 4096
+
+
+def _copy_token_layout(position: int) -> Tuple[int, int]:
+    """(bit_count, maximum_length) of a CopyToken at a decompressed chunk position."""
+    bit_count = max((position - 1).bit_length(), 4)
+    return bit_count, (0xFFFF >> bit_count) + 3
+
+
+def _compress_chunk(chunk: bytes) -> bytes:
+    out = bytearray()
+    pos = 0
+    heads: Dict[bytes, List[int]] = {}
+    while pos < len(chunk):
+        flag_index = len(out)
+        out.append(0)
+        flags = 0
+        for bit in range(8):
+            if pos >= len(chunk):
+                break
+            bit_count, max_length = _copy_token_layout(pos)
+            best_len = best_off = 0
+            key = chunk[pos:pos + 3]
+            if len(key) == 3:
+                limit = min(max_length, len(chunk) - pos)
+                # Most recent candidates first; 64 is plenty for source text
+                for start in reversed(heads.get(key, [])[-64:]):
+                    length = 3
+                    while length < limit and chunk[start + length] == chunk[pos + length]:
+                        length += 1
+                    if length > best_len:
+                        best_len, best_off = length, pos - start
+                        if length == limit:
+                            break
+            if best_len >= 3:
+                token = ((best_off - 1) << (16 - bit_count)) | (best_len - 3)
+                out += struct.pack("<H", token)
+                flags |= 1 << bit
+                step = best_len
+            else:
+                out.append(chunk[pos])
+                step = 1
+            for p in range(pos, min(pos + step, len(chunk) - 2)):
+                heads.setdefault(chunk[p:p + 3], []).append(p)
+            pos += step
+        out[flag_index] = flags
+
+    if len(out) > CHUNK:
+        # Incompressible: store the raw chunk (always 4096 bytes)
+        header = (CHUNK - 1) | 0x3000
+        return struct.pack("<H", header) + chunk.ljust(CHUNK, b"\0")
+    header = (len(out) + 2 - 3) | 0x3000 | 0x8000
+    return struct.pack("<H", header) + bytes(out)
+
+
+def compress(data: bytes) -> bytes:
+    """Compress bytes into an MS-OVBA CompressedContainer."""
+    return b"\x01" + b"".join(_compress_chunk(data[i:i + CHUNK])
+                               for i in range(0, len(data), CHUNK))
+
+
+def decompress(data: bytes) -> bytes:
+    """Decompress an MS-OVBA CompressedContainer."""
+    if not data or data[0] != 1:
+        raise ValueError("Not a compressed VBA container (bad signature byte)")
+    out = bytearray()
+    pos = 1
+    while pos < len(data):
+        header, = struct.unpack_from("<H", data, pos)
+        size = (header & 0x0FFF) + 3
+        end = min(pos + size, len(data))
+        pos += 2
+        chunk_start = len(out)
+        if not header & 0x8000:
+            out += data[pos:pos + CHUNK]
+            pos += CHUNK
+            continue
+        while pos < end:
+            flags = data[pos]
+            pos += 1
+            for bit in range(8):
+                if pos >= end:
+                    break
+                if flags & (1 << bit):
+                    token, = struct.unpack_from("<H", data, pos)
+                    pos += 2
+                    bit_count, _ = _copy_token_layout(len(out) - chunk_start)
+                    length = (token & (0xFFFF >> bit_count)) + 3
+                    offset = (token >> (16 - bit_count)) + 1
+                    for _ in range(length):
+                        out.append(out[-offset])
+                else:
+                    out.append(data[pos])
+                    pos += 1
+    return bytes(out)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# PROJECT PROTECTION ([MS-OVBA] 2.4.3 Data Encryption)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def encrypt(data: bytes, project_id: str, seed: int) -> str:
+    """Encrypt a PROJECT stream value (CMG, DPB, GC) as hex text."""
+    version = 2
+    proj_key = sum(project_id.encode(ENCODING)) & 0xFF
+    out = [seed, seed ^ version, seed ^ proj_key]
+    unencrypted_1, encrypted_1, encrypted_2 = proj_key, out[2], out[1]
+    ignored = [0] * ((seed & 6) // 2)
+    for byte in ignored + list(struct.pack("<I", len(data))) + list(data):
+        enc = byte ^ ((encrypted_2 + unencrypted_1) & 0xFF)
+        out.append(enc)
+        encrypted_2, encrypted_1, unencrypted_1 = encrypted_1, enc, byte
+    return bytes(out).hex().upper()
+
+
+def decrypt(text: str) -> bytes:
+    """Inverse of encrypt()."""
+    raw = bytes.fromhex(text)
+    seed, version_enc, proj_key_enc = raw[:3]
+    proj_key = seed ^ proj_key_enc
+    unencrypted_1, encrypted_1, encrypted_2 = proj_key, proj_key_enc, version_enc
+    plain = []
+    for enc in raw[3:]:
+        byte = enc ^ ((encrypted_2 + unencrypted_1) & 0xFF)
+        plain.append(byte)
+        encrypted_2, encrypted_1, unencrypted_1 = encrypted_1, enc, byte
+    ignored = (seed & 6) // 2
+    length, = struct.unpack("<I", bytes(plain[ignored:ignored + 4]))
+    return bytes(plain[ignored + 4:ignored + 4 + length])
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# PROJECT STREAMS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@dataclass
+class VBAModule:
+    """One module of the project."""
+    name: str
+    code: str
+    kind: int = PROCEDURAL
+    base: str = ""  # VB_Base of document modules
+
+    def source(self) -> bytes:
+        """Module text as stored: attribute header, then the code (CRLF, cp1252)."""
+        lines = [f'Attribute VB_Name = "{self.name}"']
+        if self.kind == DOCUMENT:
+            lines += [
+                f'Attribute VB_Base = "{self.base}"',
+                "Attribute VB_GlobalNameSpace = False",
+                "Attribute VB_Creatable = False",
+                "Attribute VB_PredeclaredId = True",
+                "Attribute VB_Exposed = True",
+                "Attribute VB_TemplateDerived = False",
+                "Attribute VB_Customizable = True",
+            ]
+        code = _ATTRIBUTE_LINE.sub("", self.code.replace("\r\n", "\n"))
+        text = "\r\n".join(lines) + "\r\n" + code.replace("\n", "\r\n")
+        # Characters outside the code page become "?", as the VBE does on import
+        return text.encode(ENCODING, errors="replace")
+
+
+def _record(record_id: int, payload: bytes) -> bytes:
+    return struct.pack("<HI", record_id, len(payload)) + payload
+
+
+def _text_records(record_id: int, unicode_id: int, text: str) -> bytes:
+    return _record(record_id, text.encode(ENCODING)) + \
+        _record(unicode_id, text.encode("utf-16-le"))
+
+
+def dir_stream(modules: List[VBAModule], project_name: str = "VBAProject") -> bytes:
+    """The uncompressed VBA/dir stream."""
+    out = [
+        _record(0x0001, struct.pack("<I", 1)),              # PROJECTSYSKIND: Win32
+        _record(0x0002, struct.pack("<I", LCID)),           # PROJECTLCID
+        _record(0x0014, struct.pack("<I", LCID)),           # PROJECTLCIDINVOKE
+        _record(0x0003, struct.pack("<H", CODEPAGE)),       # PROJECTCODEPAGE
+        _record(0x0004, project_name.encode(ENCODING)),     # PROJECTNAME
+        _text_records(0x0005, 0x0040, ""),                  # PROJECTDOCSTRING
+        _text_records(0x0006, 0x003D, ""),                  # PROJECTHELPFILEPATH
+        _record(0x0007, struct.pack("<I", 0)),              # PROJECTHELPCONTEXT
+        _record(0x0008, struct.pack("<I", 0)),              # PROJECTLIBFLAGS
+        struct.pack("<HIIH", 0x0009, 4, 1, 0),              # PROJECTVERSION
+        _text_records(0x000C, 0x003C, ""),                  # PROJECTCONSTANTS
+    ]
+    for name, libid in REFERENCES:
+        out.append(_text_records(0x0016, 0x003E, name))     # REFERENCENAME
+        lib = libid.encode(ENCODING)
+        out.append(_record(0x000D, struct.pack("<I", len(lib)) + lib + b"\0" * 6))
+    out.append(_record(0x000F, struct.pack("<H", len(modules))))   # PROJECTMODULES
+    out.append(_record(0x0013, struct.pack("<H", 0xFFFF)))         # PROJECTCOOKIE
+    for m in modules:
+        out += [
+            _record(0x0019, m.name.encode(ENCODING)),                  # MODULENAME
+            _record(0x0047, m.name.encode("utf-16-le")),               # MODULENAMEUNICODE
+            _text_records(0x001A, 0x0032, m.name),                     # MODULESTREAMNAME
+            _text_records(0x001C, 0x0048, ""),                         # MODULEDOCSTRING
+            _record(0x0031, struct.pack("<I", 0)),                     # MODULEOFFSET
+            _record(0x001E, struct.pack("<I", 0)),                     # MODULEHELPCONTEXT
+            _record(0x002C, struct.pack("<H", 0xFFFF)),                # MODULECOOKIE
+            _record(m.kind, b""),                                      # MODULETYPE
+            _record(0x002B, b""),                                      # module terminator
+        ]
+    out.append(_record(0x0010, b""))                                   # dir terminator
+    return b"".join(out)
+
+
+def project_stream(modules: List[VBAModule], project_id: str,
+                   project_name: str = "VBAProject", seed: int = 0) -> bytes:
+    """The PROJECT stream: unprotected, visible, no password."""
+    protection = encrypt(struct.pack("<I", 0), project_id, seed)
+    password = encrypt(b"\0", project_id, (seed + 1) & 0xFF)
+    visibility = encrypt(b"\xFF", project_id, (seed + 2) & 0xFF)
+    lines = [f'ID="{project_id}"']
+    for m in modules:
+        if m.kind == DOCUMENT:
+            lines.append(f"Document={m.name}/&H00000000")
+        else:
+            lines.append(f"Module={m.name}")
+    lines += [
+        f'Name="{project_name}"',
+        'HelpContextID="0"',
+        'VersionCompatible32="393222000"',
+        f'CMG="{protection}"',
+        f'DPB="{password}"',
+        f'GC="{visibility}"',
+        "",
+        "[Host Extender Info]",
+        HOST_EXTENDER,
+        "",
+    ]
+    return "\r\n".join(lines).encode(ENCODING)
+
+
+def projectwm_stream(modules: List[VBAModule]) -> bytes:
+    """The PROJECTwm stream: each module name in MBCS and UTF-16."""
+    out = [m.name.encode(ENCODING) + b"\0" + m.name.encode("utf-16-le") + b"\0\0"
+           for m in modules]
+    return b"".join(out) + b"\0\0"
+
+
+def build_vba_project(modules: List[VBAModule], project_name: str = "VBAProject") -> bytes:
+    """
+    Assemble vbaProject.bin for the given modules.
+
+    The project id and encryption seeds derive from the module names, so the
+    same sources always produce the same bytes.
+    """
+    names = [m.name for m in modules]
+    if len(set(n.lower() for n in names)) != len(names):
+        raise ValueError(f"Duplicate VBA module names: {names}")
+    project_id = "{%s}" % str(uuid.uuid5(uuid.NAMESPACE_URL, "vba:" + "/".join(names))).upper()
+    seed = random.Random(project_id).randrange(256)
+
+    streams = {
+        "VBA/_VBA_PROJECT": struct.pack("<HHBH", 0x61CC, 0xFFFF, 0, 0),
+        "VBA/dir": compress(dir_stream(modules, project_name)),
+    }
+    for m in modules:
+        streams[f"VBA/{m.name}"] = compress(m.source())
+    streams["PROJECT"] = project_stream(modules, project_id, project_name, seed)
+    streams["PROJECTwm"] = projectwm_stream(modules)
+    return write_compound_file(streams)
+
+
+def _parse_dir(data: bytes) -> List[Tuple[str, str, int, int]]:
+    """(name, stream name, text offset, type) of every module in a dir stream."""
+    modules = []
+    pos = 0
+    current = None
+    while pos < len(data):
+        record_id, size = struct.unpack_from("<HI", data, pos)
+        pos += 6
+        if record_id == 0x0009:  # PROJECTVERSION: size field is a constant 4
+            pos += 6
+            continue
+        payload = data[pos:pos + size]
+        pos += size
+        if record_id == 0x0019:
+            current = [payload.decode(ENCODING), None, 0, PROCEDURAL]
+        elif record_id == 0x001A:
+            current[1] = payload.decode(ENCODING)
+        elif record_id == 0x0031:
+            current[2], = struct.unpack("<I", payload)
+        elif record_id in (PROCEDURAL, DOCUMENT):
+            current[3] = record_id
+        elif record_id == 0x002B:
+            modules.append(tuple(current))
+        elif record_id == 0x0010:
+            break
+    return modules
+
+
+def read_vba_project(data: bytes) -> Dict[str, Tuple[int, str]]:
+    """
+    Module sources of a vbaProject.bin.
+
+    Returns:
+        Module name -> (module type, source text with attribute lines)
+    """
+    streams = read_compound_file(data)
+    modules = {}
+    for name, stream_name, offset, kind in _parse_dir(decompress(streams["VBA/dir"])):
+        source = decompress(streams[f"VBA/{stream_name}"][offset:])
+        modules[name] = (kind, source.decode(ENCODING))
+    return modules
@@ -0,0 +1,14 @@
+"""
+OOXML package helpers for the Bed Utilization workbook.
+
+Low-level tools that work on the .xlsx/.xlsm zip package directly rather than
+through an openpyxl Workbook.
+"""
+
+from .assembler import assemble_packages
+from .cached_values import fill_cached_values
+from .columnar import load_tables
+from .shared_formulas import share_formulas
+from .table_append import append_table_rows
+
+__all__ = ["append_table_rows", "assemble_packages", "fill_cached_values", "load_tables", "share_formulas"]
@@ -0,0 +1,433 @@
+"""
+OOXML Package Assembler
+
+Stitches several .xlsx packages (each holding one or more worksheets) into a
+single workbook. Used by the parallel build: every worker renders its sheets
+into its own openpyxl Workbook, and the packages are merged here.
+
+Each package has its own styles.xml, so style indices are only meaningful
+inside the package that wrote them. The assembler merges fonts, fills,
+borders, number formats, named styles, cell formats and dxfs into one
+stylesheet and rewrites the s="", style="" and dxfId="" references in every
+worksheet. Tables are renumbered, shared strings (if any) are merged, and
+workbook.xml, its relationships and [Content_Types].xml are regenerated.
+"""
+import io
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+from typing import Dict, List, Tuple, Union
+
+NS_MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+NS_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+NS_PKG_REL = "http://schemas.openxmlformats.org/package/2006/relationships"
+NS_CT = "http://schemas.openxmlformats.org/package/2006/content-types"
+
+REL_WORKSHEET = NS_REL + "/worksheet"
+REL_TABLE = NS_REL + "/table"
+REL_STYLES = NS_REL + "/styles"
+REL_THEME = NS_REL + "/theme"
+REL_SHARED_STRINGS = NS_REL + "/sharedStrings"
+REL_OFFICE_DOCUMENT = NS_REL + "/officeDocument"
+REL_APP = NS_REL + "/extended-properties"
+REL_CORE = "http://schemas.openxmlformats.org/package/2006/relationships/metadata/core-properties"
+
+CT_WORKSHEET = "application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"
+CT_TABLE = "application/vnd.openxmlformats-officedocument.spreadsheetml.table+xml"
+CT_STYLES = "application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"
+CT_THEME = "application/vnd.openxmlformats-officedocument.theme+xml"
+CT_SHARED_STRINGS = "application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"
+CT_WORKBOOK = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"
+CT_CORE = "application/vnd.openxmlformats-package.core-properties+xml"
+CT_APP = "application/vnd.openxmlformats-officedocument.extended-properties+xml"
+CT_RELS = "application/vnd.openxmlformats-package.relationships+xml"
+
+FIRST_CUSTOM_NUMFMT = 164
+
+ET.register_namespace("", NS_MAIN)
+ET.register_namespace("r", NS_REL)
+
+_C_TAG = re.compile(rb'<c ([^>]*?)(/?)>(<v>(\d+)</v>)?')
+_ROW_TAG = re.compile(rb'<row ([^>]*?)(/?)>')
+_COL_TAG = re.compile(rb'<col ([^>]*?)/>')
+_S_ATTR = re.compile(rb'(?<=\s)s="(\d+)"|^s="(\d+)"')
+_STYLE_ATTR = re.compile(rb'\bstyle="(\d+)"')
+_DXF_ATTR = re.compile(rb'\bdxfId="(\d+)"')
+_TABLE_ID = re.compile(rb'(<table\b[^>]*?\sid=")(\d+)(")')
+
+
+def _q(tag: str) -> str:
+    return f"{{{NS_MAIN}}}{tag}"
+
+
+def _key(elem: ET.Element) -> bytes:
+    return ET.tostring(elem)
+
+
+class _Pool:
+    """An ordered, de-duplicated list of style elements."""
+
+    def __init__(self):
+        self.items: List[ET.Element] = []
+        self._index: Dict[bytes, int] = {}
+
+    def add(self, elem: ET.Element) -> int:
+        k = _key(elem)
+        idx = self._index.get(k)
+        if idx is None:
+            idx = len(self.items)
+            self.items.append(elem)
+            self._index[k] = idx
+        return idx
+
+
+class _StyleMerger:
+    """Merges the stylesheets of several packages into one."""
+
+    def __init__(self):
+        self.template = None
+        self.numfmts: Dict[str, int] = {}
+        self.fonts = _Pool()
+        self.fills = _Pool()
+        self.borders = _Pool()
+        self.style_xfs = _Pool()
+        self.cell_xfs = _Pool()
+        self.dxfs = _Pool()
+        self.cell_styles: Dict[str, ET.Element] = {}
+
+    def _numfmt_map(self, sheet: ET.Element) -> Dict[int, int]:
+        mapping = {}
+        node = sheet.find(_q("numFmts"))
+        if node is None:
+            return mapping
+        for fmt in node.findall(_q("numFmt")):
+            old = int(fmt.get("numFmtId"))
+            code = fmt.get("formatCode")
+            if code not in self.numfmts:
+                self.numfmts[code] = FIRST_CUSTOM_NUMFMT + len(self.numfmts)
+            mapping[old] = self.numfmts[code]
+        return mapping
+
+    @staticmethod
+    def _children(sheet: ET.Element, section: str) -> List[ET.Element]:
+        node = sheet.find(_q(section))
+        return list(node) if node is not None else []
+
+    def _remap_xf(self, xf: ET.Element, numfmt, font, fill, border, style_xf=None):
+        xf = _copy(xf)
+        n = int(xf.get("numFmtId", "0"))
+        xf.set("numFmtId", str(numfmt.get(n, n)))
+        xf.set("fontId", str(font[int(xf.get("fontId", "0"))]))
+        xf.set("fillId", str(fill[int(xf.get("fillId", "0"))]))
+        xf.set("borderId", str(border[int(xf.get("borderId", "0"))]))
+        if style_xf is not None and xf.get("xfId") is not None:
+            xf.set("xfId", str(style_xf[int(xf.get("xfId"))]))
+        return xf
+
+    def add(self, styles_xml: bytes) -> Tuple[List[int], List[int]]:
+        """Merge one package's styles.xml; return its (cellXfs, dxfs) index maps."""
+        sheet = ET.fromstring(styles_xml)
+        if self.template is None:
+            self.template = sheet
+
+        numfmt = self._numfmt_map(sheet)
+        font = [self.fonts.add(e) for e in self._children(sheet, "fonts")]
+        fill = [self.fills.add(e) for e in self._children(sheet, "fills")]
+        border = [self.borders.add(e) for e in self._children(sheet, "borders")]
+
+        # Named styles are identified by name; the first package to define one wins
+        style_xfs = self._children(sheet, "cellStyleXfs")
+        style_xf = [None] * len(style_xfs)
+        for cs in self._children(sheet, "cellStyles"):
+            old = int(cs.get("xfId"))
+            name = cs.get("name")
+            existing = self.cell_styles.get(name)
+            if existing is not None:
+                style_xf[old] = int(existing.get("xfId"))
+                continue
+            new = len(self.style_xfs.items)
+            self.style_xfs.items.append(
+                self._remap_xf(style_xfs[old], numfmt, font, fill, border))
+            style_xf[old] = new
+            cs = _copy(cs)
+            cs.set("xfId", str(new))
+            self.cell_styles[name] = cs
+        for i, xf in enumerate(style_xfs):
+            if style_xf[i] is None:
+                style_xf[i] = self.style_xfs.add(
+                    self._remap_xf(xf, numfmt, font, fill, border))
+
+        xf_map = [
+            self.cell_xfs.add(self._remap_xf(xf, numfmt, font, fill, border, style_xf))
+            for xf in self._children(sheet, "cellXfs")
+        ]
+        dxf_map = [self.dxfs.add(_copy(e)) for e in self._children(sheet, "dxfs")]
+        return xf_map, dxf_map
+
+    def to_xml(self) -> bytes:
+        out = ET.Element(_q("styleSheet"))
+        numfmts = ET.SubElement(out, _q("numFmts"), count=str(len(self.numfmts)))
+        for code, fid in self.numfmts.items():
+            ET.SubElement(numfmts, _q("numFmt"), numFmtId=str(fid), formatCode=code)
+        sections = [
+            ("fonts", self.fonts.items),
+            ("fills", self.fills.items),
+            ("borders", self.borders.items),
+            ("cellStyleXfs", self.style_xfs.items),
+            ("cellXfs", self.cell_xfs.items),
+            ("cellStyles", list(self.cell_styles.values())),
+            ("dxfs", self.dxfs.items),
+        ]
+        for tag, items in sections:
+            node = ET.SubElement(out, _q(tag), count=str(len(items)))
+            node.extend(items)
+        # Keep whatever trails the dxfs in the template (tableStyles, colors, ...)
+        if self.template is not None:
+            known = {_q(t) for t, _ in sections} | {_q("numFmts")}
+            out.extend(_copy(e) for e in self.template if e.tag not in known)
+        return ET.tostring(out, xml_declaration=False)
+
+
+def _copy(elem: ET.Element) -> ET.Element:
+    return ET.fromstring(ET.tostring(elem))
+
+
+def _remap_sheet(xml: bytes, xf_map: List[int], dxf_map: List[int],
+                 sst_map: List[int]) -> bytes:
+    """Rewrite style, dxf and shared-string indices in one worksheet part."""
+
+    def remap_s(attrs: bytes) -> bytes:
+        return _S_ATTR.sub(
+            lambda m: b's="%d"' % xf_map[int(m.group(1) or m.group(2))], attrs)
+
+    def cell(m):
+        attrs, close, v, idx = m.group(1), m.group(2), m.group(3), m.group(4)
+        attrs = remap_s(attrs)
+        if v is not None:
+            if sst_map and b't="s"' in attrs:
+                v = b"<v>%d</v>" % sst_map[int(idx)]
+            return b"<c " + attrs + close + b">" + v
+        return b"<c " + attrs + close + b">"
+
+    xml = _C_TAG.sub(cell, xml)
+    xml = _ROW_TAG.sub(lambda m: b"<row " + remap_s(m.group(1)) + m.group(2) + b">", xml)
+    xml = _COL_TAG.sub(
+        lambda m: b"<col " + _STYLE_ATTR.sub(
+            lambda s: b'style="%d"' % xf_map[int(s.group(1))], m.group(1)) + b"/>", xml)
+    if dxf_map:
+        xml = _DXF_ATTR.sub(lambda m: b'dxfId="%d"' % dxf_map[int(m.group(1))], xml)
+    return xml
+
+
+def _rels(xml: bytes) -> List[ET.Element]:
+    return list(ET.fromstring(xml))
+
+
+def _part_path(target: str, base: str = "xl") -> str:
+    """Resolve a relationship target to a zip member name."""
+    if target.startswith("/"):
+        return target[1:]
+    parts = base.split("/") + target.split("/")
+    resolved = []
+    for p in parts:
+        if p == "..":
+            resolved.pop()
+        elif p and p != ".":
+            resolved.append(p)
+    return "/".join(resolved)
+
+
+class _SharedStrings:
+    def __init__(self):
+        self.items: List[bytes] = []
+        self._index: Dict[bytes, int] = {}
+
+    def add(self, xml: bytes) -> List[int]:
+        mapping = []
+        for si in ET.fromstring(xml).findall(_q("si")):
+            k = ET.tostring(si)
+            idx = self._index.get(k)
+            if idx is None:
+                idx = len(self.items)
+                self.items.append(k)
+                self._index[k] = idx
+            mapping.append(idx)
+        return mapping
+
+    def to_xml(self) -> bytes:
+        n = len(self.items)
+        return (f'<sst xmlns="{NS_MAIN}" count="{n}" uniqueCount="{n}">'.encode()
+                + b"".join(self.items) + b"</sst>")
+
+
+def assemble_packages(packages: List[Union[bytes, str]],
+                      output_path: Union[str, io.IOBase]) -> List[str]:
+    """
+    Merge several .xlsx packages into one workbook.
+
+    Args:
+        packages: Packages in final sheet order, as bytes or file paths
+        output_path: Path (or writable binary file object) for the merged .xlsx
+
+    Returns:
+        The sheet names of the merged workbook, in order
+
+    Raises:
+        ValueError: On duplicate sheet names or parts the assembler cannot merge
+            (only worksheets, tables, styles, theme and shared strings are supported)
+    """
+    styles = _StyleMerger()
+    strings = _SharedStrings()
+    sheets = []        # (name, state, xml, [(rel_id, table_xml)])
+    defined_names = []
+    common = {}        # theme and docProps, taken from the first package
+    workbook_template = None
+
+    for pkg in packages:
+        src = io.BytesIO(pkg) if isinstance(pkg, (bytes, bytearray)) else pkg
+        with zipfile.ZipFile(src) as zf:
+            names = set(zf.namelist())
+            wb_xml = ET.fromstring(zf.read("xl/workbook.xml"))
+            if workbook_template is None:
+                workbook_template = wb_xml
+            wb_rels = {r.get("Id"): r for r in _rels(zf.read("xl/_rels/workbook.xml.rels"))}
+
+            xf_map, dxf_map = styles.add(zf.read("xl/styles.xml"))
+            sst_map = []
+            for rel in wb_rels.values():
+                path = _part_path(rel.get("Target"))
+                if rel.get("Type") == REL_SHARED_STRINGS:
+                    sst_map = strings.add(zf.read(path))
+                elif rel.get("Type") == REL_THEME and "theme" not in common:
+                    common["theme"] = zf.read(path)
+            for part in ("docProps/core.xml", "docProps/app.xml"):
+                if part in names and part not in common:
+                    common[part] = zf.read(part)
+
+            offset = len(sheets)
+            for sheet in wb_xml.find(_q("sheets")):
+                rel = wb_rels[sheet.get(f"{{{NS_REL}}}id")]
+                path = _part_path(rel.get("Target"))
+                xml = _remap_sheet(zf.read(path), xf_map, dxf_map, sst_map)
+
+                tables = []
+                folder, fname = path.rsplit("/", 1)
+                rels_path = f"{folder}/_rels/{fname}.rels"
+                if rels_path in names:
+                    for srel in _rels(zf.read(rels_path)):
+                        if srel.get("Type") != REL_TABLE:
+                            raise ValueError(
+                                f"Cannot merge {srel.get('Type')} part of sheet "
+                                f"'{sheet.get('name')}'")
+                        target = _part_path(srel.get("Target"), folder)
+                        tables.append((srel.get("Id"), zf.read(target)))
+                sheets.append((sheet.get("name"), sheet.get("state", "visible"), xml, tables))
+
+            dn = wb_xml.find(_q("definedNames"))
+            for name in (dn if dn is not None else []):
+                name = _copy(name)
+                if name.get("localSheetId") is not None:
+                    name.set("localSheetId", str(int(name.get("localSheetId")) + offset))
+                defined_names.append(name)
+
+    seen = set()
+    for name, *_ in sheets:
+        if name in seen:
+            raise ValueError(f"Duplicate sheet name '{name}'")
+        seen.add(name)
+
+    overrides = [
+        ("/xl/workbook.xml", CT_WORKBOOK),
+        ("/xl/styles.xml", CT_STYLES),
+    ]
+    files = {}
+    wb_rel_items = []
+    sheet_entries = []
+    table_no = 0
+    for i, (name, state, xml, tables) in enumerate(sheets, 1):
+        files[f"xl/worksheets/sheet{i}.xml"] = xml
+        overrides.append((f"/xl/worksheets/sheet{i}.xml", CT_WORKSHEET))
+        wb_rel_items.append((f"rId{i}", REL_WORKSHEET, f"/xl/worksheets/sheet{i}.xml"))
+        sheet_entries.append((name, i, state))
+        if tables:
+            rel_items = []
+            for rel_id, table_xml in tables:
+                table_no += 1
+                table_xml = _TABLE_ID.sub(
+                    lambda m: m.group(1) + str(table_no).encode() + m.group(3), table_xml, count=1)
+                files[f"xl/tables/table{table_no}.xml"] = table_xml
+                overrides.append((f"/xl/tables/table{table_no}.xml", CT_TABLE))
+                rel_items.append((rel_id, REL_TABLE, f"/xl/tables/table{table_no}.xml"))
+            files[f"xl/worksheets/_rels/sheet{i}.xml.rels"] = _rels_xml(rel_items)
+
+    n = len(sheets)
+    wb_rel_items.append((f"rId{n + 1}", REL_STYLES, "/xl/styles.xml"))
+    files["xl/styles.xml"] = styles.to_xml()
+    if "theme" in common:
+        wb_rel_items.append((f"rId{n + 2}", REL_THEME, "/xl/theme/theme1.xml"))
+        files["xl/theme/theme1.xml"] = common["theme"]
+        overrides.append(("/xl/theme/theme1.xml", CT_THEME))
+    if strings.items:
+        wb_rel_items.append((f"rId{n + 3}", REL_SHARED_STRINGS, "/xl/sharedStrings.xml"))
+        files["xl/sharedStrings.xml"] = strings.to_xml()
+        overrides.append(("/xl/sharedStrings.xml", CT_SHARED_STRINGS))
+    files["xl/_rels/workbook.xml.rels"] = _rels_xml(wb_rel_items)
+    files["xl/workbook.xml"] = _workbook_xml(workbook_template, sheet_entries, defined_names)
+
+    root_rels = [("rId1", REL_OFFICE_DOCUMENT, "/xl/workbook.xml")]
+    if "docProps/core.xml" in common:
+        files["docProps/core.xml"] = common["docProps/core.xml"]
+        overrides.append(("/docProps/core.xml", CT_CORE))
+        root_rels.append(("rId2", REL_CORE, "/docProps/core.xml"))
+    if "docProps/app.xml" in common:
+        files["docProps/app.xml"] = common["docProps/app.xml"]
+        overrides.append(("/docProps/app.xml", CT_APP))
+        root_rels.append(("rId3", REL_APP, "/docProps/app.xml"))
+    files["_rels/.rels"] = _rels_xml(root_rels)
+
+    ct = [f'<Types xmlns="{NS_CT}">',
+          f'<Default Extension="rels" ContentType="{CT_RELS}"/>',
+          '<Default Extension="xml" ContentType="application/xml"/>']
+    ct += [f'<Override PartName="{p}" ContentType="{t}"/>' for p, t in overrides]
+    ct.append("</Types>")
+
+    with zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED) as out:
+        out.writestr("[Content_Types].xml", "".join(ct))
+        for part, data in files.items():
+            out.writestr(part, data)
+
+    return [name for name, *_ in sheets]
+
+
+def _rels_xml(items) -> bytes:
+    body = "".join(
+        f'<Relationship Id="{rid}" Type="{typ}" Target="{target}"/>'
+        for rid, typ, target in items)
+    return f'<Relationships xmlns="{NS_PKG_REL}">{body}</Relationships>'.encode()
+
+
+def _workbook_xml(template: ET.Element, sheets, defined_names) -> bytes:
+    wb = _copy(template)
+    node = wb.find(_q("sheets"))
+    for child in list(node):
+        node.remove(child)
+    for name, idx, state in sheets:
+        ET.SubElement(node, _q("sheet"), {
+            "name": name, "sheetId": str(idx), "state": state,
+            f"{{{NS_REL}}}id": f"rId{idx}",
+        })
+    dn = wb.find(_q("definedNames"))
+    if dn is not None:
+        wb.remove(dn)
+    if defined_names:
+        # Schema order: definedNames follows sheets and the elements allowed in between
+        after = max(i for i, child in enumerate(wb)
+                    if child.tag in (_q("sheets"), _q("functionGroups"), _q("externalReferences")))
+        dn = ET.Element(_q("definedNames"))
+        dn.extend(defined_names)
+        wb.insert(after + 1, dn)
+    view = wb.find(f"{_q('bookViews')}/{_q('workbookView')}")
+    if view is not None:
+        view.set("activeTab", "0")
+        view.set("firstSheet", "0")
+    return ET.tostring(wb)
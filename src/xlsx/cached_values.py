@@ -0,0 +1,204 @@
+"""
+Cached Values Writer
+
+openpyxl saves formula cells with an empty <v/>, and marks the workbook
+fullCalcOnLoad, so Excel recalculates everything on first open and viewers
+without a calc engine show blanks. This pass evaluates every formula with
+formula_eval.Evaluator against the package's own table contents and stores
+the result as the cell's cached value.
+
+When every formula evaluated, fullCalcOnLoad is dropped and calcId is set to
+the current Excel calc engine, so Excel opens the file without recalculating.
+If any formula is outside the evaluator's subset, those cells keep an empty
+cached value and fullCalcOnLoad stays on.
+"""
+import re
+import time
+from dataclasses import dataclass, field
+from html import escape
+from typing import Dict, List, Optional, Tuple
+
+from openpyxl.formula.translate import Translator
+from openpyxl.utils import get_column_letter
+
+from ..formula_eval import Evaluator, ExcelError, UnsupportedFormula, to_text
+from .package import rewrite_package
+from .reader import iter_cells, read_tables, shared_strings, sheet_parts
+
+# Excel 2019 / Microsoft 365 calculation engine
+CALC_ID = "191029"
+
+_FORMULA_ELEM = re.compile(rb'<f[^>]*?(?:/>|>[^<]*</f>)')
+_C_OPEN = re.compile(rb'<c ([^>]*?)/?>')
+_T_ATTR = re.compile(rb'\s*\bt="\w+"')
+_CALC_PR = re.compile(rb'<calcPr\b[^>]*/>')
+
+
+@dataclass
+class SheetValues:
+    name: str
+    formula_cells: int
+    cached: int
+    unsupported: int
+
+
+@dataclass
+class CachedValueReport:
+    sheets: List[SheetValues] = field(default_factory=list)
+    full_calc_cleared: bool = False
+    seconds: float = 0.0
+    first_error: Optional[str] = None
+
+    @property
+    def unsupported(self) -> int:
+        return sum(s.unsupported for s in self.sheets)
+
+    def format(self) -> str:
+        cached = sum(s.cached for s in self.sheets)
+        total = sum(s.formula_cells for s in self.sheets)
+        lines = [f"Cached values: {cached} of {total} formula cells in {self.seconds:.2f}s"]
+        for s in self.sheets:
+            if s.unsupported:
+                lines.append(f"  {s.name}: {s.unsupported} cells left for Excel to calculate")
+        if self.first_error:
+            lines.append(f"  First unsupported formula: {self.first_error}")
+        lines.append("Excel will open without recalculating." if self.full_calc_cleared
+                     else "Excel will recalculate on open (fullCalcOnLoad kept).")
+        return "\n".join(lines)
+
+
+def _value_xml(value) -> Tuple[Optional[bytes], bytes]:
+    """(t attribute or None, <v> element) for a computed value."""
+    if isinstance(value, ExcelError):
+        return b"e", b"<v>%s</v>" % value.code.encode()
+    if isinstance(value, bool):
+        return b"b", b"<v>%d</v>" % value
+    if isinstance(value, str):
+        return b"str", b"<v>%s</v>" % escape(value, quote=False).encode()
+    if value is None:
+        value = 0.0
+    text = to_text(value) if float(value).is_integer() else repr(float(value))
+    return None, b"<v>%s</v>" % text.encode()
+
+
+def _cell_xml(original: bytes, value) -> bytes:
+    """The <c> element with its formula kept and the cached value replaced."""
+    attrs = _T_ATTR.sub(b"", _C_OPEN.match(original).group(1))
+    formula = _FORMULA_ELEM.search(original).group(0)
+    t, v = _value_xml(value)
+    if t:
+        attrs += b' t="%s"' % t
+    return b"<c %s>%s%s</c>" % (attrs, formula, v)
+
+
+def _table_cells(tables, sheet: str) -> Dict[Tuple[int, int], object]:
+    """Data cells of the tables on one sheet (calculated columns already filled)."""
+    cells = {}
+    for t in tables.values():
+        if t.sheet != sheet:
+            continue
+        for offset, name in enumerate(t.columns):
+            for i, v in enumerate(t.values[name]):
+                cells[(t.first_row + i, t.first_col + offset)] = v
+    return cells
+
+
+def fill_sheet(evaluator: Evaluator, xml: bytes, sst: List[str], tables, sheet: str,
+               report: CachedValueReport) -> Tuple[bytes, SheetValues]:
+    """Evaluate one worksheet part and write its cached values."""
+    cells = list(iter_cells(xml, sst))
+    table_cells = _table_cells(tables, sheet)
+    constants, formulas, spans = {}, {}, {}
+    masters = {}
+    for c in cells:
+        if c.shared and c.formula is not None:
+            masters[c.shared[0]] = c
+    for c in cells:
+        key = (c.row, c.col)
+        if key in table_cells:
+            continue
+        if c.formula is None and c.shared:
+            master = masters.get(c.shared[0])
+            if master is None:
+                continue
+            origin = f"{get_column_letter(master.col)}{master.row}"
+            dest = f"{get_column_letter(c.col)}{c.row}"
+            c.formula = Translator("=" + master.formula, origin).translate_formula(dest)[1:]
+        if c.formula is not None:
+            formulas[key] = c.formula
+            spans[key] = c.span
+        else:
+            constants[key] = c.value
+    constants.update(table_cells)
+    evaluator.set_sheet(constants, formulas)
+
+    edits = []
+    unsupported = 0
+    for key in formulas:
+        try:
+            value = evaluator.value(*key)
+        except (UnsupportedFormula, RecursionError) as e:
+            unsupported += 1
+            if report.first_error is None:
+                report.first_error = f"{sheet}!{get_column_letter(key[1])}{key[0]}: {e}"
+            continue
+        start, end = spans[key]
+        edits.append((start, end, _cell_xml(xml[start:end], value)))
+
+    edits.sort()
+    out, pos = [], 0
+    for start, end, replacement in edits:
+        out.append(xml[pos:start])
+        out.append(replacement)
+        pos = end
+    out.append(xml[pos:])
+    return b"".join(out), SheetValues(sheet, len(formulas), len(edits), unsupported)
+
+
+def _calc_pr(workbook_xml: bytes, clear: bool) -> bytes:
+    if not clear:
+        return workbook_xml
+    new = b'<calcPr calcId="%s"/>' % CALC_ID.encode()
+    if _CALC_PR.search(workbook_xml):
+        return _CALC_PR.sub(new, workbook_xml, count=1)
+    return workbook_xml.replace(b"</workbook>", new + b"</workbook>", 1)
+
+
+def fill_cached_values(path: str, output_path: Optional[str] = None) -> CachedValueReport:
+    """
+    Store the computed value of every formula cell as its cached value.
+
+    Args:
+        path: Package to process (.xlsx/.xlsm)
+        output_path: Destination (default: overwrite `path`)
+
+    Returns:
+        Per-sheet counts of cached and unsupported formula cells
+    """
+    report = CachedValueReport()
+    start = time.perf_counter()
+    state = {}
+
+    def transform(src, name, data):
+        if not state:
+            state["sst"] = shared_strings(src)
+            state["tables"] = read_tables(src, state["sst"])
+            state["parts"] = sheet_parts(src)
+            state["evaluator"] = Evaluator(state["tables"])
+            state["evaluator"].fill_calculated_columns()
+            # Worksheets first, so workbook.xml knows whether every formula evaluated
+            for part, sheet in state["parts"].items():
+                new, stats = fill_sheet(state["evaluator"], src.read(part), state["sst"],
+                                        state["tables"], sheet, report)
+                state[part] = new
+                report.sheets.append(stats)
+        if name in state["parts"]:
+            return state.pop(name)
+        if name == "xl/workbook.xml":
+            return _calc_pr(data, clear=report.unsupported == 0)
+        return data
+
+    rewrite_package(path, output_path, transform)
+    report.full_calc_cleared = report.unsupported == 0
+    report.seconds = time.perf_counter() - start
+    return report
@@ -0,0 +1,239 @@
+"""
+Static Cell Writer
+
+Writes constant values into the worksheets of a saved package, for reports
+computed in Python rather than by formulas or VBA. Each written cell keeps
+its style; a formula it held is removed unless a Formula is written in its
+place. Missing cells and rows are inserted in order, so report areas that
+VBA used to fill can be written too.
+
+Because formulas may disappear, xl/calcChain.xml (Excel's list of formula
+cells, absent from openpyxl output) is dropped; Excel rebuilds it on save.
+Dates written into unstyled cells get a dd/mm/yyyy cell format, added to
+xl/styles.xml when the workbook has none. Everything else in the package,
+including vbaProject.bin, is copied as is.
+"""
+import re
+import zipfile
+from dataclasses import dataclass
+from datetime import date, datetime
+from html import escape
+from typing import Dict, Optional, Tuple
+
+from openpyxl.utils import column_index_from_string, get_column_letter
+
+from .package import rewrite_package
+from .reader import sheet_parts
+
+CALC_CHAIN = "xl/calcChain.xml"
+STYLES = "xl/styles.xml"
+WORKBOOK_RELS = "xl/_rels/workbook.xml.rels"
+CONTENT_TYPES = "[Content_Types].xml"
+DATE_FORMAT = "dd/mm/yyyy"
+
+_SHEET_DATA = re.compile(rb"<sheetData\s*/>|<sheetData>(.*?)</sheetData>", re.S)
+_ROW = re.compile(rb'<row\b([^>]*?)(?:/>|>(.*?)</row>)', re.S)
+_ROW_NUM = re.compile(rb'\br="(\d+)"')
+_SPANS = re.compile(rb'\s*\bspans="[^"]*"')
+_CELL = re.compile(rb'<c r="([A-Z]{1,3})\d+"([^>]*?)(?:/>|>.*?</c>)', re.S)
+_STYLE = re.compile(rb'\bs="(\d+)"')
+_CALC_CHAIN_REL = re.compile(rb'<Relationship\b[^>]*?Target="[^"]*calcChain\.xml"[^>]*/>')
+_CALC_CHAIN_CT = re.compile(rb'<Override\b[^>]*?PartName="/xl/calcChain\.xml"[^>]*/>')
+_NUM_FMTS = re.compile(rb'<numFmts\b[^>]*?(?:/>|>(.*?)</numFmts>)', re.S)
+_NUM_FMT = re.compile(rb'<numFmt\b[^>]*?numFmtId="(\d+)"[^>]*?formatCode="([^"]*)"')
+_CELL_XFS = re.compile(rb'<cellXfs\b[^>]*>(.*?)</cellXfs>', re.S)
+_XF = re.compile(rb'<xf\b([^>]*?)(?:/>|>.*?</xf>)', re.S)
+_XF_NUM_FMT = re.compile(rb'\bnumFmtId="(\d+)"')
+
+_EPOCH = datetime(1899, 12, 30)
+
+Cells = Dict[Tuple[int, int], object]
+
+
+@dataclass(frozen=True)
+class Formula:
+    """A formula cell: text without "=", and its cached result."""
+    text: str
+    value: object = None
+
+
+def add_date_format(styles: bytes, number_format: str = DATE_FORMAT) -> Tuple[bytes, int]:
+    """
+    Styles part with a plain cell format for a date number format, and that
+    format's index.
+
+    An existing format with no font, fill or border of its own is reused.
+    """
+    fmt_id = None
+    custom = _NUM_FMTS.search(styles)
+    codes = _NUM_FMT.findall(custom.group(1) or b"") if custom else []
+    for num_id, code in codes:
+        if code.decode().lower() == number_format.lower():
+            fmt_id = int(num_id)
+    xfs = _CELL_XFS.search(styles)
+    entries = list(_XF.finditer(xfs.group(1)))
+    if fmt_id is not None:
+        for i, xf in enumerate(entries):
+            attrs = xf.group(1)
+            num = _XF_NUM_FMT.search(attrs)
+            if (num and int(num.group(1)) == fmt_id and b'fontId="0"' in attrs
+                    and b'fillId="0"' in attrs and b'borderId="0"' in attrs):
+                return styles, i
+    if fmt_id is None:
+        # Custom number formats start at 164
+        fmt_id = max([163] + [int(n) for n, _ in codes]) + 1
+        num_fmt = b'<numFmt numFmtId="%d" formatCode="%s"/>' % (fmt_id, escape(number_format).encode())
+        if custom:
+            body = (custom.group(1) or b"") + num_fmt
+            styles = (styles[:custom.start()] + b'<numFmts count="%d">%s</numFmts>' % (len(codes) + 1, body)
+                      + styles[custom.end():])
+        else:
+            at = styles.index(b"<fonts")
+            styles = styles[:at] + b'<numFmts count="1">%s</numFmts>' % num_fmt + styles[at:]
+        xfs = _CELL_XFS.search(styles)
+    xf = (b'<xf numFmtId="%d" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+          % fmt_id)
+    body = xfs.group(1) + xf
+    styles = (styles[:xfs.start()] + b'<cellXfs count="%d">%s</cellXfs>' % (len(entries) + 1, body)
+              + styles[xfs.end():])
+    return styles, len(entries)
+
+
+def excel_serial(value: date) -> float:
+    """Excel serial number of a date or datetime."""
+    if not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    delta = value - _EPOCH
+    return delta.days + delta.seconds / 86400
+
+
+def _cell_xml(row: int, col: int, value, style: Optional[bytes]) -> bytes:
+    ref = f"{get_column_letter(col)}{row}".encode()
+    attrs = b'r="%s"' % ref + (b' s="%s"' % style if style else b"")
+    if isinstance(value, Formula):
+        f = b"<f>%s</f>" % escape(value.text, quote=False).encode()
+        cached = value.value
+        if cached is None or cached == "":
+            return b"<c %s>%s</c>" % (attrs, f)
+        if isinstance(cached, bool):
+            return b'<c %s t="b">%s<v>%d</v></c>' % (attrs, f, cached)
+        if isinstance(cached, str):
+            return b'<c %s t="str">%s<v>%s</v></c>' % (attrs, f, escape(cached, quote=False).encode())
+        return b"<c %s>%s<v>%s</v></c>" % (attrs, f, _number(float(cached)))
+    if value is None or value == "":
+        return b"<c %s/>" % attrs
+    if isinstance(value, bool):
+        return b'<c %s t="b"><v>%d</v></c>' % (attrs, value)
+    if isinstance(value, (datetime, date)):
+        value = excel_serial(value)
+    if isinstance(value, str):
+        text = escape(value, quote=False).encode()
+        space = b' xml:space="preserve"' if value != value.strip() else b""
+        return b'<c %s t="inlineStr"><is><t%s>%s</t></is></c>' % (attrs, space, text)
+    return b"<c %s><v>%s</v></c>" % (attrs, _number(float(value)))
+
+
+def _number(value: float) -> bytes:
+    return (str(int(value)) if value.is_integer() else repr(value)).encode()
+
+
+def _row_xml(row: int, attrs: bytes, cells: Dict[int, bytes]) -> bytes:
+    body = b"".join(cells[c] for c in sorted(cells))
+    if not body:
+        return b"<row%s/>" % attrs
+    return b"<row%s>%s</row>" % (attrs, body)
+
+
+def set_cells(xml: bytes, values: Cells, date_style: Optional[int] = None,
+              column_styles: Optional[Dict[int, int]] = None) -> bytes:
+    """
+    Worksheet XML with `values` written: (row, col) -> number, text, bool,
+    date/datetime, Formula, or None for an empty (styled) cell.
+
+    A written cell without a style of its own gets the cell format
+    `column_styles[col]`, or `date_style` if it is a date, when given.
+    """
+    column_styles = {c: str(s).encode() for c, s in (column_styles or {}).items()}
+    date_style = None if date_style is None else str(date_style).encode()
+
+    def default_style(col, value):
+        if col in column_styles:
+            return column_styles[col]
+        return date_style if isinstance(value, (datetime, date)) else None
+
+    def new_row(row, values):
+        return _row_xml(row, b' r="%d"' % row,
+                        {c: _cell_xml(row, c, v, default_style(c, v)) for c, v in values.items()})
+
+    by_row: Dict[int, Dict[int, object]] = {}
+    for (row, col), value in values.items():
+        by_row.setdefault(row, {})[col] = value
+
+    m = _SHEET_DATA.search(xml)
+    body = m.group(1) or b""
+    out = []
+    pos = 0
+    for rm in _ROW.finditer(body):
+        row = int(_ROW_NUM.search(rm.group(1)).group(1))
+        out.append(body[pos:rm.start()])
+        pos = rm.end()
+        # New rows that come before this one
+        for new in sorted(r for r in by_row if r < row):
+            out.append(new_row(new, by_row.pop(new)))
+        if row not in by_row:
+            out.append(rm.group(0))
+            continue
+        cells = {}
+        styles = {}
+        for cm in _CELL.finditer(rm.group(2) or b""):
+            col = column_index_from_string(cm.group(1).decode())
+            cells[col] = cm.group(0)
+            style = _STYLE.search(cm.group(2))
+            styles[col] = style.group(1) if style else None
+        for col, value in by_row.pop(row).items():
+            cells[col] = _cell_xml(row, col, value, styles.get(col) or default_style(col, value))
+        # spans is only a hint and may no longer cover the row's cells
+        out.append(_row_xml(row, _SPANS.sub(b"", rm.group(1)), cells))
+    out.append(body[pos:])
+    for new in sorted(by_row):
+        out.append(new_row(new, by_row[new]))
+    return xml[:m.start()] + b"<sheetData>" + b"".join(out) + b"</sheetData>" + xml[m.end():]
+
+
+def write_cells(path: str, sheets: Dict[str, Cells], output_path: Optional[str] = None):
+    """
+    Write static values into named worksheets of a package.
+
+    Args:
+        path: Package to update (.xlsx/.xlsm)
+        sheets: Sheet name -> {(row, col): value}
+        output_path: Destination (default: overwrite `path`)
+
+    Raises:
+        KeyError: If a sheet is not in the workbook
+    """
+    with zipfile.ZipFile(path) as zf:
+        parts = {sheet: part for part, sheet in sheet_parts(zf).items()}
+        missing = [s for s in sheets if s not in parts]
+        if missing:
+            raise KeyError(f"Sheets not found in {path}: {', '.join(missing)}")
+        styles, date_style = None, None
+        if any(isinstance(v, (datetime, date)) for cells in sheets.values() for v in cells.values()):
+            styles, date_style = add_date_format(zf.read(STYLES))
+    by_part = {parts[s]: cells for s, cells in sheets.items()}
+
+    def transform(src, name, data):
+        if name in by_part:
+            return set_cells(data, by_part[name], date_style)
+        if name == STYLES and styles is not None:
+            return styles
+        if name == CALC_CHAIN:
+            return None
+        if name == WORKBOOK_RELS:
+            return _CALC_CHAIN_REL.sub(b"", data)
+        if name == CONTENT_TYPES:
+            return _CALC_CHAIN_CT.sub(b"", data)
+        return data
+
+    touched = set(by_part) | {STYLES, CALC_CHAIN, WORKBOOK_RELS, CONTENT_TYPES}
+    rewrite_package(path, output_path, transform, touches=touched.__contains__)
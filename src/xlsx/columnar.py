@@ -0,0 +1,339 @@
+"""
+Columnar Table Loader
+
+Loads the four data tables (tblDaily, tblAdmissions, tblDeaths,
+tblTransfers), and the Control sheet tables on request, from a saved workbook as NumPy
+arrays, without openpyxl's object model. Only the worksheets that hold those
+tables are read, each as an iterparse stream whose rows are discarded as soon
+as they are read, and only the cells inside the table's range are kept.
+
+Columns are typed from TABLE_SCHEMAS: dates become datetime64[D],
+timestamps datetime64[s], counts int64 (blank = 0, as SUMIFS sees them),
+measures float64 (blank = NaN), flags bool, and codes (wards, sex, NHIS)
+Categorical. Columns not in the schema, e.g. tblDaily[Key], load as numbers
+when every value is numeric and as object arrays of text otherwise. Blank
+rows, such as the seed row a new workbook starts with, are dropped.
+"""
+import xml.etree.ElementTree as ET
+import zipfile
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from openpyxl.utils import column_index_from_string, range_boundaries
+
+from .assembler import REL_SHARED_STRINGS, _part_path, _q, _rels
+from .reader import sheet_parts, table_parts
+
+EXCEL_EPOCH = np.datetime64("1899-12-30", "D")
+EXCEL_EPOCH_S = EXCEL_EPOCH.astype("datetime64[s]")
+
+DATE, TIMESTAMP, COUNT, NUMBER, FLAG, CODE, TEXT = (
+    "date", "timestamp", "count", "number", "flag", "code", "text")
+
+TABLE_SCHEMAS: Dict[str, Dict[str, str]] = {
+    "tblDaily": {
+        "EntryDate": DATE, "Month": COUNT, "WardCode": CODE,
+        "Admissions": COUNT, "Discharges": COUNT, "Deaths": COUNT,
+        "DeathsUnder24Hrs": COUNT, "TransfersIn": COUNT, "TransfersOut": COUNT,
+        "PrevRemaining": COUNT, "Remaining": COUNT, "EntryTimestamp": TIMESTAMP,
+    },
+    "tblAdmissions": {
+        "AdmissionID": TEXT, "AdmissionDate": DATE, "Month": COUNT, "WardCode": CODE,
+        "PatientID": TEXT, "PatientName": TEXT, "Age": NUMBER, "AgeUnit": CODE,
+        "Sex": CODE, "NHIS": CODE, "EntryTimestamp": TIMESTAMP,
+    },
+    "tblDeaths": {
+        "DeathID": TEXT, "DateOfDeath": DATE, "Month": COUNT, "WardCode": CODE,
+        "FolderNumber": TEXT, "NameOfDeceased": TEXT, "Age": NUMBER, "AgeUnit": CODE,
+        "Sex": CODE, "NHIS": CODE, "CauseOfDeath": CODE, "DeathWithin24Hrs": FLAG,
+        "EntryTimestamp": TIMESTAMP,
+    },
+    "tblTransfers": {
+        "TransferID": TEXT, "TransferDate": DATE, "Month": COUNT,
+        "FromWardCode": CODE, "ToWardCode": CODE, "PatientID": TEXT,
+        "PatientName": TEXT, "EntryTimestamp": TIMESTAMP,
+    },
+    "tblWardConfig": {
+        "WardCode": TEXT, "WardName": TEXT, "BedComplement": COUNT,
+        "PrevYearRemaining": COUNT, "IsEmergency": FLAG, "DisplayOrder": COUNT,
+    },
+    "tblPreferences": {
+        "PreferenceKey": TEXT, "PreferenceValue": FLAG, "Description": TEXT,
+    },
+}
+DATA_TABLES = ("tblDaily", "tblAdmissions", "tblDeaths", "tblTransfers")
+
+_TRUE_TEXT = {"TRUE", "YES", "Y", "1"}
+_C, _V, _T, _IS, _ROW, _SI = _q("c"), _q("v"), _q("t"), _q("is"), _q("row"), _q("si")
+
+
+@dataclass
+class Categorical:
+    """Codes into a sorted list of categories; -1 marks a blank."""
+    codes: np.ndarray
+    categories: List[str]
+
+    @classmethod
+    def from_values(cls, values: Iterable[Optional[str]]) -> "Categorical":
+        values = list(values)
+        categories = sorted({v for v in values if v is not None})
+        lookup = {c: i for i, c in enumerate(categories)}
+        codes = np.fromiter((lookup.get(v, -1) for v in values), dtype=np.int32, count=len(values))
+        return cls(codes, categories)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            code = self.codes[index]
+            return self.categories[code] if code >= 0 else None
+        return Categorical(self.codes[index], self.categories)
+
+    def code(self, value: str) -> int:
+        """Code of a category (-1 if it does not occur)."""
+        try:
+            return self.categories.index(value)
+        except ValueError:
+            return -1
+
+    def mask(self, value: str) -> np.ndarray:
+        """Boolean mask of the rows equal to value."""
+        code = self.code(value)
+        if code < 0:
+            return np.zeros(len(self.codes), dtype=bool)
+        return self.codes == code
+
+    def to_numpy(self) -> np.ndarray:
+        """Object array of the values (None for blanks)."""
+        lookup = np.array(self.categories + [None], dtype=object)
+        return lookup[self.codes]
+
+
+@dataclass
+class ColumnarTable:
+    """One table's columns, all of the same length."""
+    name: str
+    columns: Dict[str, object] = field(default_factory=dict)
+    rows: int = 0
+    sheet_rows: np.ndarray = None  # worksheet row number of each row
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, column: str):
+        return self.columns[column]
+
+    def __contains__(self, column: str):
+        return column in self.columns
+
+
+def _text(value) -> Optional[str]:
+    if value is None or value == "":
+        return None
+    if isinstance(value, float):
+        return str(int(value)) if value.is_integer() else repr(value)
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    return str(value)
+
+
+def _serial(value) -> float:
+    """Excel serial of a cell value (text dates are parsed as ISO 8601)."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, str) and value:
+        try:
+            parsed = datetime.fromisoformat(value.strip())
+        except ValueError:
+            return np.nan
+        delta = parsed - datetime(1899, 12, 30)
+        return delta.days + delta.seconds / 86400
+    return np.nan
+
+
+def _number(value) -> float:
+    if isinstance(value, bool):
+        return float(value)
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return np.nan
+    return np.nan
+
+
+def _flag(value) -> bool:
+    if isinstance(value, str):
+        return value.strip().upper() in _TRUE_TEXT
+    return bool(value) if value is not None else False
+
+
+def convert_column(values: list, kind: Optional[str]):
+    """Typed array for one column's raw cell values."""
+    if kind == CODE:
+        return Categorical.from_values(_text(v) for v in values)
+    if kind == TEXT:
+        return np.array([_text(v) for v in values], dtype=object)
+    if kind == FLAG:
+        return np.fromiter((_flag(v) for v in values), dtype=bool, count=len(values))
+    if kind in (DATE, TIMESTAMP):
+        serials = np.fromiter((_serial(v) for v in values), dtype=np.float64, count=len(values))
+        blank = np.isnan(serials)
+        if kind == DATE:
+            out = EXCEL_EPOCH + np.floor(np.where(blank, 0, serials)).astype("timedelta64[D]")
+        else:
+            out = EXCEL_EPOCH_S + np.round(np.where(blank, 0, serials) * 86400).astype("timedelta64[s]")
+        out[blank] = np.datetime64("NaT")
+        return out
+    numbers = np.fromiter((_number(v) for v in values), dtype=np.float64, count=len(values))
+    if kind == COUNT:
+        # Half-to-even, like VBA's CLng
+        return np.rint(np.nan_to_num(numbers, nan=0.0)).astype(np.int64)
+    if kind == NUMBER:
+        return numbers
+    # Not in the schema: numbers if every non-blank cell is numeric, else text
+    if all(v is None or v == "" or isinstance(v, (int, float)) for v in values):
+        return numbers
+    return np.array([_text(v) for v in values], dtype=object)
+
+
+def column_values(column, kind: Optional[str]) -> list:
+    """A typed column as plain Python values: ISO text dates, None for blanks."""
+    if kind == CODE:
+        return list(column.to_numpy())
+    if kind in (DATE, TIMESTAMP):
+        text = np.datetime_as_string(column, unit="D" if kind == DATE else "s")
+        return [None if t == "NaT" else t.replace("T", " ") for t in text]
+    if kind == NUMBER:
+        return [None if np.isnan(v) else float(v) for v in column]
+    if kind in (COUNT, FLAG):
+        return column.tolist()
+    return list(column)
+
+
+def _shared_strings(zf: zipfile.ZipFile) -> List[str]:
+    """Shared string table, streamed (Excel-saved workbooks keep all text here)."""
+    for rel in _rels(zf.read("xl/_rels/workbook.xml.rels")):
+        if rel.get("Type") == REL_SHARED_STRINGS:
+            strings = []
+            with zf.open(_part_path(rel.get("Target"))) as f:
+                for _, elem in ET.iterparse(f):
+                    if elem.tag == _SI:
+                        strings.append("".join(t.text or "" for t in elem.iter(_T)))
+                        elem.clear()
+            return strings
+    return []
+
+
+def _cell_value(c, sst: List[str]):
+    t = c.get("t", "n")
+    if t == "inlineStr":
+        node = c.find(_IS)
+        return "".join(x.text or "" for x in node.iter(_T)) if node is not None else None
+    v = c.find(_V)
+    if v is None or v.text is None:
+        return None
+    if t == "s":
+        return sst[int(v.text)]
+    if t == "b":
+        return v.text == "1"
+    if t in ("str", "e", "d"):
+        return v.text
+    return float(v.text)
+
+
+@dataclass
+class _TableRange:
+    name: str
+    columns: List[str]
+    first_row: int
+    last_row: int
+    first_col: int
+    values: List[list] = field(default_factory=list)
+    sheet_rows: List[int] = field(default_factory=list)
+
+
+def _stream_sheet(zf: zipfile.ZipFile, part: str, ranges: List[_TableRange], sst: List[str]):
+    """Fill each range's row values from one worksheet part."""
+    first = min(r.first_row for r in ranges)
+    last = max(r.last_row for r in ranges)
+    columns: Dict[str, int] = {}
+    with zf.open(part) as f:
+        for _, elem in ET.iterparse(f):
+            if elem.tag != _ROW:
+                continue
+            row = int(elem.get("r"))
+            if row > last:
+                break
+            if row >= first:
+                cells = {}
+                for c in elem.iter(_C):
+                    letters = c.get("r").rstrip("0123456789")
+                    col = columns.get(letters)
+                    if col is None:
+                        col = columns[letters] = column_index_from_string(letters)
+                    cells[col] = _cell_value(c, sst)
+                for r in ranges:
+                    if r.first_row <= row <= r.last_row:
+                        values = [cells.get(r.first_col + i) for i in range(len(r.columns))]
+                        if any(v is not None and v != "" for v in values):
+                            r.values.append(values)
+                            r.sheet_rows.append(row)
+            # Drop the row's cells; only an empty <row> shell stays attached
+            elem.clear()
+
+
+def load_tables(path: str, tables: Iterable[str] = DATA_TABLES) -> Dict[str, ColumnarTable]:
+    """
+    Load data tables from a workbook as typed columns.
+
+    Args:
+        path: .xlsx/.xlsm to read
+        tables: Table names to load (default: the four data tables)
+
+    Returns:
+        Table name -> ColumnarTable
+
+    Raises:
+        KeyError: If a requested table is not in the workbook
+    """
+    wanted = set(tables)
+    with zipfile.ZipFile(path) as zf:
+        by_part: Dict[str, List[_TableRange]] = {}
+        for part in sheet_parts(zf):
+            for tpart in table_parts(zf, part):
+                root = ET.fromstring(zf.read(tpart))
+                name = root.get("displayName")
+                if name not in wanted:
+                    continue
+                min_col, min_row, _, max_row = range_boundaries(root.get("ref"))
+                header_rows = int(root.get("headerRowCount", "1"))
+                totals_rows = int(root.get("totalsRowCount", "0"))
+                columns = [tc.get("name") for tc in root.iter(_q("tableColumn"))]
+                by_part.setdefault(part, []).append(_TableRange(
+                    name, columns, min_row + header_rows, max_row - totals_rows, min_col))
+        found = {r.name for ranges in by_part.values() for r in ranges}
+        missing = wanted - found
+        if missing:
+            raise KeyError(f"Tables not found in {path}: {', '.join(sorted(missing))}")
+
+        sst = _shared_strings(zf)
+        for part, ranges in by_part.items():
+            _stream_sheet(zf, part, ranges, sst)
+
+    result = {}
+    for ranges in by_part.values():
+        for r in ranges:
+            schema = TABLE_SCHEMAS.get(r.name, {})
+            columns = list(zip(*r.values)) if r.values else [()] * len(r.columns)
+            table = ColumnarTable(r.name, rows=len(r.values),
+                                  sheet_rows=np.array(r.sheet_rows, dtype=np.int64))
+            for name, values in zip(r.columns, columns):
+                table.columns[name] = convert_column(list(values), schema.get(name))
+            result[r.name] = table
+    return result
@@ -0,0 +1,111 @@
+"""
+Package rewriting
+
+Copies a workbook package part by part, letting a callback replace (or drop)
+selected parts, and swaps the result into place atomically.
+
+Only the parts the callback changes are compressed again. Every other zip
+member, vbaProject.bin included, is copied as its stored compressed bytes
+with its original CRC, so a save costs in proportion to what changed rather
+than to the size of the workbook, and untouched parts cannot be altered by
+the round trip. Parts the callback does not want to see (`touches`) are not
+even decompressed.
+"""
+import os
+import shutil
+import struct
+import tempfile
+import zipfile
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+# Local file header: signature ... file name length, extra field length
+_LOCAL_HEADER = struct.Struct("<4s5H3L2H")
+_DATA_DESCRIPTOR = 0x08
+
+
+@dataclass
+class RewriteResult:
+    """What a rewrite did with each part."""
+    changed: List[str] = field(default_factory=list)   # recompressed with new content
+    dropped: List[str] = field(default_factory=list)
+    added: List[str] = field(default_factory=list)
+    copied: int = 0                                    # members copied compressed as is
+
+
+def _copy_raw(src: zipfile.ZipFile, dst: zipfile.ZipFile, info: zipfile.ZipInfo):
+    """Copy one member's compressed bytes and header without decompressing them."""
+    src.fp.seek(info.header_offset)
+    header = _LOCAL_HEADER.unpack(src.fp.read(_LOCAL_HEADER.size))
+    src.fp.seek(header[-2] + header[-1], os.SEEK_CUR)
+    raw = src.fp.read(info.compress_size)
+
+    copied = zipfile.ZipInfo(info.filename, info.date_time)
+    for attr in ("compress_type", "comment", "create_system", "create_version", "extract_version",
+                 "flag_bits", "volume", "internal_attr", "external_attr", "CRC",
+                 "compress_size", "file_size"):
+        setattr(copied, attr, getattr(info, attr))
+    # Sizes and CRC go in the local header, so no trailing data descriptor
+    copied.flag_bits &= ~_DATA_DESCRIPTOR
+    # ZipFile writes its own zip64 extra when one is needed
+    copied.extra = zipfile._strip_extra(info.extra, (1,))
+    copied.header_offset = dst.fp.tell()
+    dst.fp.write(copied.FileHeader())
+    dst.fp.write(raw)
+    dst.filelist.append(copied)
+    dst.NameToInfo[copied.filename] = copied
+    dst.start_dir = dst.fp.tell()
+    dst._didModify = True
+
+
+def rewrite_package(path: str, output_path: Optional[str],
+                    transform: Callable[[zipfile.ZipFile, str, bytes], bytes],
+                    added: Optional[Dict[str, bytes]] = None,
+                    touches: Optional[Callable[[str], bool]] = None) -> RewriteResult:
+    """
+    Copy `path` to `output_path` (default: `path`), passing every part through `transform`.
+
+    Args:
+        path: Source .xlsx/.xlsm
+        output_path: Destination; written to a temp file first, then renamed
+        transform: fn(source_zip, part_name, data) -> new data, or None to drop the part;
+                   returning `data` unchanged keeps the stored member as is
+        added: New parts appended after the copied ones (part name -> bytes)
+        touches: fn(part_name) -> whether `transform` needs to see the part
+                 (default: every part); the others are copied without reading
+
+    Returns:
+        The parts that were changed, dropped, added and copied
+    """
+    output_path = output_path or path
+    result = RewriteResult()
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(output_path)), suffix=".tmp")
+    os.close(fd)
+    try:
+        with zipfile.ZipFile(path) as src, \
+                zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED) as dst:
+            for info in src.infolist():
+                if touches is not None and not touches(info.filename):
+                    _copy_raw(src, dst, info)
+                    result.copied += 1
+                    continue
+                data = src.read(info.filename)
+                new = transform(src, info.filename, data)
+                if new is None:
+                    result.dropped.append(info.filename)
+                elif new is data or new == data:
+                    _copy_raw(src, dst, info)
+                    result.copied += 1
+                else:
+                    dst.writestr(info, new, compress_type=info.compress_type)
+                    result.changed.append(info.filename)
+            for name, data in (added or {}).items():
+                dst.writestr(name, data)
+                result.added.append(name)
+        # mkstemp creates the file 0600; keep the permissions of the file it replaces
+        shutil.copymode(output_path if os.path.exists(output_path) else path, tmp)
+        os.replace(tmp, output_path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+    return result
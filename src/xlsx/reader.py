@@ -0,0 +1,157 @@
+"""
+OOXML Package Reader
+
+Minimal read access to a saved workbook package without loading it through
+openpyxl: sheet part names, shared strings, cells (value plus formula) and
+Excel Table contents. Cells are matched with regular expressions over the
+worksheet XML bytes, which is several times faster than a DOM parse and lets
+writers patch cells in place by their byte span.
+"""
+import re
+import xml.etree.ElementTree as ET
+import zipfile
+from dataclasses import dataclass, field
+from html import unescape
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from openpyxl.utils import column_index_from_string, range_boundaries
+
+from .assembler import NS_REL, REL_SHARED_STRINGS, REL_TABLE, REL_WORKSHEET, _part_path, _q, _rels
+
+_CELL = re.compile(rb'<c r="([A-Z]{1,3})(\d+)"([^>]*?)(?:/>|>(.*?)</c>)', re.S)
+_T_ATTR = re.compile(rb'\bt="(\w+)"')
+_FORMULA = re.compile(rb'<f([^>]*?)(?:/>|>([^<]*)</f>)')
+_VALUE = re.compile(rb'<v>([^<]*)</v>')
+_TEXT = re.compile(rb'<t(?:\s[^>]*)?>([^<]*)</t>')
+_ATTR = re.compile(rb'(\w+)="([^"]*)"')
+
+
+@dataclass
+class Cell:
+    row: int
+    col: int
+    value: object                 # float, str, bool, None, or "#N/A"-style error text
+    formula: Optional[str] = None  # text without "=", None for constants
+    shared: Optional[Tuple[int, Optional[str]]] = None  # (si, ref) of a shared formula
+    span: Tuple[int, int] = (0, 0)  # byte span of the <c> element
+    error: bool = False
+
+
+def sheet_parts(zf: zipfile.ZipFile) -> Dict[str, str]:
+    """Worksheet part name -> sheet name, in workbook order."""
+    rels = {r.get("Id"): _part_path(r.get("Target"))
+            for r in _rels(zf.read("xl/_rels/workbook.xml.rels"))
+            if r.get("Type") == REL_WORKSHEET}
+    sheets = ET.fromstring(zf.read("xl/workbook.xml")).find(_q("sheets"))
+    return {rels[s.get(f"{{{NS_REL}}}id")]: s.get("name")
+            for s in sheets if s.get(f"{{{NS_REL}}}id") in rels}
+
+
+def shared_strings(zf: zipfile.ZipFile) -> List[str]:
+    """The shared string table (empty for openpyxl output, which writes inline strings)."""
+    for rel in _rels(zf.read("xl/_rels/workbook.xml.rels")):
+        if rel.get("Type") == REL_SHARED_STRINGS:
+            root = ET.fromstring(zf.read(_part_path(rel.get("Target"))))
+            return ["".join(t.text or "" for t in si.iter(_q("t"))) for si in root.findall(_q("si"))]
+    return []
+
+
+def iter_cells(xml: bytes, sst: List[str] = ()) -> Iterator[Cell]:
+    """Every non-empty <c> element of a worksheet part, in document order."""
+    for m in _CELL.finditer(xml):
+        attrs, inner = m.group(3), m.group(4)
+        if not inner:
+            continue
+        t = _T_ATTR.search(attrs)
+        t = t.group(1) if t else b"n"
+        cell = Cell(int(m.group(2)), column_index_from_string(m.group(1).decode()), None,
+                    span=m.span())
+
+        f = _FORMULA.search(inner)
+        if f:
+            fattrs = dict(_ATTR.findall(f.group(1)))
+            if f.group(2) is not None:
+                cell.formula = unescape(f.group(2).decode())
+            if fattrs.get(b"t") == b"shared":
+                ref = fattrs.get(b"ref")
+                cell.shared = (int(fattrs[b"si"]), ref.decode() if ref else None)
+
+        if t == b"inlineStr":
+            cell.value = unescape("".join(x.decode() for x in _TEXT.findall(inner)))
+        else:
+            v = _VALUE.search(inner)
+            raw = unescape(v.group(1).decode()) if v else None
+            if raw is None:
+                cell.value = None
+            elif t == b"s":
+                cell.value = sst[int(raw)]
+            elif t == b"b":
+                cell.value = raw == "1"
+            elif t in (b"str", b"e"):
+                cell.value = raw
+                cell.error = t == b"e"
+            else:
+                cell.value = float(raw) if raw else None
+        yield cell
+
+
+@dataclass
+class TableData:
+    """The data rows of one Excel Table, column by column."""
+    name: str
+    sheet: str
+    ref: str
+    columns: List[str]
+    values: Dict[str, list] = field(default_factory=dict)
+    first_row: int = 0   # worksheet row of the first data row
+    first_col: int = 0
+    formulas: Dict[str, str] = field(default_factory=dict)  # calculated columns
+
+    def __len__(self):
+        return len(self.values[self.columns[0]]) if self.columns else 0
+
+
+def table_parts(zf: zipfile.ZipFile, sheet_part: str) -> List[str]:
+    """Table part names attached to one worksheet part."""
+    base, _, fname = sheet_part.rpartition("/")
+    rels_path = f"{base}/_rels/{fname}.rels"
+    if rels_path not in zf.namelist():
+        return []
+    return [_part_path(r.get("Target"), base) for r in _rels(zf.read(rels_path))
+            if r.get("Type") == REL_TABLE]
+
+
+def read_tables(zf: zipfile.ZipFile, sst: Optional[List[str]] = None) -> Dict[str, TableData]:
+    """
+    Contents of every Excel Table in the package.
+
+    Cells holding formulas contribute their cached value (None if none was
+    stored); a table's calculated-column formulas are kept in .formulas.
+    """
+    sst = shared_strings(zf) if sst is None else sst
+    tables = {}
+    for part, sheet in sheet_parts(zf).items():
+        parts = table_parts(zf, part)
+        if not parts:
+            continue
+        cells = {(c.row, c.col): c for c in iter_cells(zf.read(part), sst)}
+        for tpart in parts:
+            root = ET.fromstring(zf.read(tpart))
+            min_col, min_row, max_col, max_row = range_boundaries(root.get("ref"))
+            header_rows = int(root.get("headerRowCount", "1"))
+            totals_rows = int(root.get("totalsRowCount", "0"))
+            columns = [tc.get("name") for tc in root.iter(_q("tableColumn"))]
+            table = TableData(root.get("displayName"), sheet, root.get("ref"), columns,
+                              first_row=min_row + header_rows, first_col=min_col)
+            for tc in root.iter(_q("tableColumn")):
+                calc = tc.find(_q("calculatedColumnFormula"))
+                if calc is not None and calc.text:
+                    table.formulas[tc.get("name")] = calc.text
+            for offset, name in enumerate(columns):
+                col = min_col + offset
+                table.values[name] = [
+                    cells[(r, col)].value if (r, col) in cells else None
+                    for r in range(min_row + header_rows, max_row - totals_rows + 1)
+                ]
+            tables[table.name] = table
+    return tables
@@ -0,0 +1,183 @@
+"""
+Shared-Formula Post-Processor
+
+openpyxl writes every formula cell in full. Down a column of a ward sheet the
+formulas differ only in their relative references, so Excel itself would
+store them once as a shared formula:
+
+    <c r="B7"><f t="shared" ref="B7:B37" si="0">SUM(A7)</f></c>
+    <c r="B8"><f t="shared" si="0"/></c>
+
+This pass rewrites a saved package that way. Two formulas can share when
+they are identical in R1C1 form, i.e. after relative A1 references are
+replaced by row/column offsets from their own cell. Only vertical runs of
+plain formulas are grouped; array formulas and existing shared groups are
+left alone. Worksheet parts are rewritten in place, everything else in the
+package (including vbaProject.bin) is copied unchanged.
+"""
+import os
+import re
+from dataclasses import dataclass, field
+from html import unescape
+from typing import Dict, List, Optional
+
+from openpyxl.utils import column_index_from_string
+
+from .package import rewrite_package
+from .reader import sheet_parts
+
+# A plain (non-array, non-shared) formula cell as openpyxl and Excel write it
+_F_CELL = re.compile(rb'<c r="([A-Z]{1,3})(\d+)"[^>]*><f>([^<]*)</f>')
+_SI_ATTR = re.compile(rb'\bsi="(\d+)"')
+
+# String literals and bracketed structured-reference parts are never rebased
+_LITERAL = re.compile(r'"(?:[^"]|"")*"|\[[^\]]*\]+')
+_A1_REF = re.compile(r"(?<![A-Za-z0-9_.$\]])(\$?)([A-Z]{1,3})(\$?)(\d+)(?![A-Za-z0-9_(\[])")
+
+
+def r1c1_key(formula: str, row: int, col: int) -> str:
+    """
+    The formula with relative A1 references rewritten as offsets from (row, col).
+
+    Two cells whose keys are equal hold the same formula copied to a new
+    position, e.g. "A7+$B$1" at C7 and "A8+$B$1" at C8.
+    """
+    def rebase(m):
+        col_abs, letters, row_abs, digits = m.groups()
+        c = column_index_from_string(letters)
+        r = int(digits)
+        return (f"R{digits}" if row_abs else f"R[{r - row}]") + \
+               (f"C{c}" if col_abs else f"C[{c - col}]")
+
+    out = []
+    pos = 0
+    for lit in _LITERAL.finditer(formula):
+        out.append(_A1_REF.sub(rebase, formula[pos:lit.start()]))
+        out.append(lit.group())
+        pos = lit.end()
+    out.append(_A1_REF.sub(rebase, formula[pos:]))
+    return "".join(out)
+
+
+def share_sheet_xml(xml: bytes, min_run: int = 2):
+    """
+    Rewrite vertical runs of equivalent formulas in one worksheet part.
+
+    Returns:
+        (new_xml, formula_cells, shared_cells, groups)
+    """
+    cells = [
+        (column_index_from_string(m.group(1).decode()), int(m.group(2)), m)
+        for m in _F_CELL.finditer(xml)
+    ]
+    if not cells:
+        return xml, 0, 0, 0
+
+    si_values = [int(v) for v in _SI_ATTR.findall(xml)]
+    next_si = max(si_values) + 1 if si_values else 0
+
+    keyed = {}
+    by_col: Dict[int, List] = {}
+    for col, row, m in cells:
+        keyed[(col, row)] = r1c1_key(unescape(m.group(3).decode()), row, col)
+        by_col.setdefault(col, []).append((row, m))
+
+    edits = []  # (start, end, replacement) of <f>...</f> spans
+    shared = groups = 0
+    for col, column in by_col.items():
+        column.sort(key=lambda item: item[0])
+        i = 0
+        while i < len(column):
+            j = i + 1
+            key = keyed[(col, column[i][0])]
+            while (j < len(column) and column[j][0] == column[j - 1][0] + 1
+                   and keyed[(col, column[j][0])] == key):
+                j += 1
+            m = column[i][1]
+            follower = b'<f t="shared" si="%d"/>' % next_si
+            # Very short formulas ("E6+F6") are already smaller than a shared tag
+            if j - i >= min_run and len(m.group(3)) + 7 > len(follower):
+                first, last = column[i], column[j - 1]
+                ref = b"%s%d:%s%d" % (m.group(1), first[0], m.group(1), last[0])
+                edits.append((m.start(3) - 3, m.end(3) + 4,
+                              b'<f t="shared" ref="%s" si="%d">%s</f>' % (ref, next_si, m.group(3))))
+                for _, fm in column[i + 1:j]:
+                    edits.append((fm.start(3) - 3, fm.end(3) + 4, follower))
+                next_si += 1
+                groups += 1
+                shared += j - i
+            i = j
+
+    edits.sort()
+    out = []
+    pos = 0
+    for start, end, replacement in edits:
+        out.append(xml[pos:start])
+        out.append(replacement)
+        pos = end
+    out.append(xml[pos:])
+    return b"".join(out), len(cells), shared, groups
+
+
+@dataclass
+class SheetShare:
+    name: str
+    formula_cells: int
+    shared_cells: int
+    groups: int
+    xml_before: int
+    xml_after: int
+
+
+@dataclass
+class SharedFormulaReport:
+    sheets: List[SheetShare] = field(default_factory=list)
+    file_before: int = 0
+    file_after: int = 0
+
+    def format(self) -> str:
+        lines = [f"{'Sheet':<24}{'formulas':>10}{'shared':>10}{'groups':>8}{'XML KB':>10}{'saved':>8}"]
+        for s in self.sheets:
+            if not s.formula_cells:
+                continue
+            saved = 1 - s.xml_after / s.xml_before
+            lines.append(f"{s.name:<24}{s.formula_cells:>10}{s.shared_cells:>10}{s.groups:>8}"
+                         f"{s.xml_after / 1024:>10.0f}{saved:>8.0%}")
+        xml_before = sum(s.xml_before for s in self.sheets)
+        xml_after = sum(s.xml_after for s in self.sheets)
+        lines.append(f"Sheet XML: {xml_before / 1e6:.2f} MB -> {xml_after / 1e6:.2f} MB "
+                     f"({1 - xml_after / max(xml_before, 1):.0%} smaller)")
+        lines.append(f"File:      {self.file_before / 1e6:.2f} MB -> {self.file_after / 1e6:.2f} MB "
+                     f"({1 - self.file_after / max(self.file_before, 1):.0%} smaller)")
+        return "\n".join(lines)
+
+
+def share_formulas(path: str, output_path: Optional[str] = None,
+                   min_run: int = 2) -> SharedFormulaReport:
+    """
+    Rewrite a saved .xlsx/.xlsm so repeated formulas are stored as shared formulas.
+
+    Args:
+        path: Package to process
+        output_path: Destination (default: overwrite `path`)
+        min_run: Shortest vertical run worth turning into a shared group
+
+    Returns:
+        Per-sheet counts and the sheet XML / file size before and after
+    """
+    output_path = output_path or path
+    report = SharedFormulaReport(file_before=os.path.getsize(path))
+    parts = {}
+
+    def transform(src, name, data):
+        if not parts:
+            parts.update(sheet_parts(src))
+        if name not in parts:
+            return data
+        new, formulas, shared, groups = share_sheet_xml(data, min_run)
+        report.sheets.append(SheetShare(parts[name], formulas, shared, groups, len(data), len(new)))
+        return new
+
+    rewrite_package(path, output_path, transform)
+    report.file_after = os.path.getsize(output_path)
+    return report
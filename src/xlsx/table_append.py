@@ -0,0 +1,231 @@
+"""
+Table Appender
+
+Appends rows to an Excel Table of a saved package by editing only the
+worksheet that holds the table and the table's definition part: the new
+cells are inserted after the last data row and the table's ref (and its
+autoFilter's) grows to cover them. Every other part, vbaProject.bin
+included, is copied as its stored zip member without being read, so
+macro-enabled workbooks can be loaded in bulk without Excel.
+xl/calcChain.xml is dropped only when an update overwrites a formula cell,
+as cell_writer does.
+
+Rows are placed the way modDataAccess.GetOrAddTableRow places them: a table
+whose only data row has a blank first cell (the seed row of a new workbook)
+is filled from that row, otherwise rows go below the table. New cells take
+the style of the same column in the table's last row; a column with no
+style there can be given a number format instead, which is added to
+xl/styles.xml only when the workbook does not have it yet. Calculated
+columns (tblDaily[Key]) are written as formulas, with cached values computed
+by formula_eval so readers that do not recalculate see them too.
+"""
+import re
+import xml.etree.ElementTree as ET
+import zipfile
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Dict, List, Optional
+
+from openpyxl.utils import column_index_from_string, get_column_letter, range_boundaries
+
+from .assembler import _q
+from .cell_writer import (CALC_CHAIN, CONTENT_TYPES, STYLES, WORKBOOK_RELS, _CALC_CHAIN_CT,
+                          _CALC_CHAIN_REL, Formula, add_date_format, excel_serial, set_cells)
+from .package import rewrite_package
+from .reader import _CELL, TableData, sheet_parts, table_parts
+
+_TABLE_REF = re.compile(rb'(<table\b[^>]*?\sref=")([^"]*)(")')
+_AUTO_FILTER_REF = re.compile(rb'(<autoFilter\b[^>]*?\sref=")([^"]*)(")')
+_DIMENSION_REF = re.compile(rb'(<dimension\b[^>]*?\sref=")([^"]*)(")')
+_STYLE = re.compile(rb'\bs="(\d+)"')
+
+Row = Dict[str, object]
+
+
+@dataclass
+class _Table:
+    name: str
+    sheet: str
+    sheet_part: str
+    table_part: str
+    min_col: int
+    min_row: int
+    max_col: int
+    max_row: int
+    first_row: int                  # worksheet row of the first data row
+    columns: List[str]
+    formulas: Dict[str, str] = field(default_factory=dict)
+
+    def col(self, column: str) -> int:
+        return self.min_col + self.columns.index(column)
+
+
+@dataclass
+class AppendResult:
+    table: str
+    sheet: str
+    first_row: int      # worksheet row of the first appended row
+    rows: int
+    ref: str            # the table's new ref
+
+
+def _find_table(zf: zipfile.ZipFile, name: str) -> _Table:
+    for part, sheet in sheet_parts(zf).items():
+        for tpart in table_parts(zf, part):
+            root = ET.fromstring(zf.read(tpart))
+            if root.get("displayName") != name:
+                continue
+            if int(root.get("totalsRowCount", "0")):
+                raise ValueError(f"{name} has a totals row; appending to it is not supported")
+            min_col, min_row, max_col, max_row = range_boundaries(root.get("ref"))
+            table = _Table(name, sheet, part, tpart, min_col, min_row, max_col, max_row,
+                           min_row + int(root.get("headerRowCount", "1")),
+                           [tc.get("name") for tc in root.iter(_q("tableColumn"))])
+            for tc in root.iter(_q("tableColumn")):
+                calc = tc.find(_q("calculatedColumnFormula"))
+                if calc is not None and calc.text:
+                    table.formulas[tc.get("name")] = calc.text
+            return table
+    raise KeyError(f"Table not found: {name}")
+
+
+def _cell_value(value):
+    """A value as reader.iter_cells would return it (for formula_eval)."""
+    if isinstance(value, date):
+        return excel_serial(value)
+    if isinstance(value, int) and not isinstance(value, bool):
+        return float(value)
+    return value
+
+
+def _calculated(table: _Table, rows: List[Row]) -> List[Row]:
+    """Calculated-column values of new rows, as Formula cells."""
+    if not table.formulas:
+        return rows
+    from ..formula_eval import Evaluator
+
+    data = TableData(table.name, table.sheet, "", table.columns, formulas=dict(table.formulas))
+    for column in table.columns:
+        data.values[column] = [None if column in table.formulas else _cell_value(r.get(column))
+                               for r in rows]
+    Evaluator({table.name: data}).fill_calculated_columns()
+    return [dict(row, **{c: Formula(f.lstrip("="), data.values[c][i])
+                         for c, f in table.formulas.items()})
+            for i, row in enumerate(rows)]
+
+
+def _grow(ref: bytes, max_col: int, max_row: int) -> bytes:
+    min_col, min_row, old_col, old_row = range_boundaries(ref.decode())
+    return (f"{get_column_letter(min_col)}{min_row}:"
+            f"{get_column_letter(max(old_col, max_col))}{max(old_row, max_row)}").encode()
+
+
+def append_table_rows(path: str, table: str, rows: List[Row], output_path: Optional[str] = None,
+                      updates: Optional[Dict[int, Row]] = None,
+                      number_formats: Optional[Dict[str, str]] = None) -> AppendResult:
+    """
+    Append rows to an Excel Table, editing only its worksheet and table parts.
+
+    Args:
+        path: Workbook to update (.xlsx/.xlsm)
+        table: Table name, e.g. "tblAdmissions"
+        rows: Column name -> value (number, text, bool, date/datetime, None);
+              missing columns are left blank, calculated columns are filled
+        output_path: Destination (default: overwrite `path`)
+        updates: Worksheet row of an existing data row -> column name -> new value
+        number_formats: Column name -> number format for new cells of columns
+                        whose last row has no style, e.g. {"EntryDate": "yyyy-mm-dd"}
+
+    Returns:
+        Where the rows went and the table's new ref
+
+    Raises:
+        KeyError: If the table is not in the workbook
+        ValueError: For unknown columns, update rows outside the table, or
+                    non-empty cells where the new rows would go
+    """
+    updates = updates or {}
+    number_formats = number_formats or {}
+    with zipfile.ZipFile(path) as zf:
+        info = _find_table(zf, table)
+        sheet_xml = zf.read(info.sheet_part)
+        styles_xml = zf.read(STYLES) if STYLES in zf.namelist() else None
+
+    unknown = sorted({c for row in rows + list(updates.values()) for c in row} - set(info.columns))
+    if unknown:
+        raise ValueError(f"Columns not in {table}: {', '.join(unknown)}")
+    outside = sorted(r for r in updates if not info.first_row <= r <= info.max_row)
+    if outside:
+        raise ValueError(f"Rows not in {table}'s data: {', '.join(map(str, outside))}")
+
+    # One pass over the sheet: what is filled, last-row styles, formulas being replaced
+    filled: Dict[int, set] = {}
+    template: Dict[int, bytes] = {}
+    formulas = set()
+    for m in _CELL.finditer(sheet_xml):
+        col = column_index_from_string(m.group(1).decode())
+        if not info.min_col <= col <= info.max_col:
+            continue
+        row = int(m.group(2))
+        if row == info.max_row:
+            style = _STYLE.search(m.group(3))
+            if style:
+                template[col] = style.group(1)
+        if m.group(4):
+            filled.setdefault(row, set()).add(col)
+            if b"<f" in m.group(4) and row in updates:
+                formulas.add((row, col))
+    formulas &= {(r, info.col(c)) for r, row in updates.items() for c in row}
+
+    # The seed row: the only data row, first cell blank
+    seed = info.max_row == info.first_row and info.min_col not in filled.get(info.first_row, ())
+    start = info.first_row if seed else info.max_row + 1
+    end = start + len(rows) - 1
+    taken = sorted(r for r in filled if r > info.max_row and r <= end)
+    if taken:
+        raise ValueError(f"Cells below {table} are not empty (row {taken[0]})")
+
+    column_styles = {col: int(style) for col, style in template.items()}
+    original_styles = styles_xml
+    for column, fmt in number_formats.items():
+        col = info.col(column)
+        if col not in column_styles and styles_xml is not None:
+            styles_xml, column_styles[col] = add_date_format(styles_xml, fmt)
+    styles_changed = styles_xml != original_styles
+
+    cells = {}
+    for i, row in enumerate(_calculated(info, rows)):
+        for column, value in row.items():
+            cells[(start + i, info.col(column))] = value
+    for r, row in updates.items():
+        for column, value in row.items():
+            cells[(r, info.col(column))] = value
+
+    max_row = max(end, info.max_row)
+    ref = f"{get_column_letter(info.min_col)}{info.min_row}:{get_column_letter(info.max_col)}{max_row}"
+
+    def transform(src, name, data):
+        if name == info.sheet_part:
+            data = set_cells(data, cells, column_styles=column_styles)
+            return _DIMENSION_REF.sub(lambda m: m.group(1) + _grow(m.group(2), info.max_col, max_row)
+                                      + m.group(3), data, count=1)
+        if name == info.table_part:
+            data = _TABLE_REF.sub(lambda m: m.group(1) + ref.encode() + m.group(3), data, count=1)
+            return _AUTO_FILTER_REF.sub(lambda m: m.group(1) + ref.encode() + m.group(3), data, count=1)
+        if name == STYLES and styles_changed:
+            return styles_xml
+        if formulas:
+            # Formulas were overwritten with values: the chain must go, as in write_cells
+            if name == CALC_CHAIN:
+                return None
+            if name == WORKBOOK_RELS:
+                return _CALC_CHAIN_REL.sub(b"", data)
+            if name == CONTENT_TYPES:
+                return _CALC_CHAIN_CT.sub(b"", data)
+        return data
+
+    touched = {info.sheet_part, info.table_part, STYLES}
+    if formulas:
+        touched |= {CALC_CHAIN, WORKBOOK_RELS, CONTENT_TYPES}
+    rewrite_package(path, output_path, transform, touches=touched.__contains__)
+    return AppendResult(table, info.sheet, start, len(rows), ref)
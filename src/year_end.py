@@ -0,0 +1,89 @@
+"""
+Bed Utilization Workbook - Year-end carry-forward
+Headless modYearEnd.ExportCarryForward: the Remaining of each ward's last
+tblDaily entry becomes next year's PrevYearRemaining.
+
+As in the VBA, a ward's last entry is its row with the latest EntryDate (the
+first such row on ties), ward codes match tblWardConfig exactly, and a ward
+without entries carries 0. The VBA scanned all of tblDaily once per ward;
+here the table is streamed once and one lexsort picks every ward's row.
+
+The output is the carry_forward_YYYY.json that
+WorkbookConfig(carry_forward_path=...) and build_workbook.py --carry-forward
+read.
+"""
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .kpi import read_settings
+from .remaining import compute_remaining, ward_prev_year
+from .xlsx.columnar import ColumnarTable, load_tables
+
+
+@dataclass
+class CarryForward:
+    year: int                                              # the year being closed
+    wards: Dict[str, int] = field(default_factory=dict)    # WardCode -> Remaining, config order
+
+    def to_json(self) -> str:
+        return json.dumps({"year": self.year, "wards": self.wards}, indent=2)
+
+
+def last_remaining(daily: ColumnarTable, ward_codes: List[str],
+                   remaining: Optional[np.ndarray] = None) -> Dict[str, int]:
+    """
+    Remaining of each ward's last tblDaily row.
+
+    Args:
+        daily: tblDaily as loaded by xlsx.columnar.load_tables
+        ward_codes: tblWardConfig codes, in order
+        remaining: Remaining per row to use instead of the stored column
+    """
+    remaining = daily["Remaining"] if remaining is None else remaining
+    wards = daily["WardCode"]
+    dates = daily["EntryDate"]
+    index = {code: i for i, code in enumerate(ward_codes)}
+    lookup = np.array([index.get(c, -1) for c in wards.categories] + [-1], dtype=np.int64)
+    ward = lookup[wards.codes]
+    rows = np.flatnonzero((ward >= 0) & ~np.isnat(dates))
+
+    result = {code: 0 for code in ward_codes}
+    if len(rows):
+        day = dates[rows].astype(np.int64)
+        # Per ward: latest date first, then table order
+        order = rows[np.lexsort((rows, -day, ward[rows]))]
+        present, first = np.unique(ward[order], return_index=True)
+        for w, i in zip(present, order[first]):
+            result[ward_codes[w]] = int(remaining[i])
+    return result
+
+
+def carry_forward(path: str, recompute: bool = False) -> CarryForward:
+    """
+    Carry-forward figures of a workbook.
+
+    Args:
+        path: Workbook to read (.xlsx/.xlsm)
+        recompute: Use the recomputed Remaining chain (remaining.compute_remaining)
+                   instead of the stored values, e.g. when tools/audit_remaining.py
+                   reports stale rows
+    """
+    year = read_settings(path).year
+    tables = load_tables(path, ["tblDaily", "tblWardConfig"])
+    daily, ward_config = tables["tblDaily"], tables["tblWardConfig"]
+    codes = list(dict.fromkeys(c for c in ward_config["WardCode"] if c is not None))
+    remaining = None
+    if recompute:
+        remaining = compute_remaining(daily, ward_prev_year(ward_config)).remaining
+    return CarryForward(year, last_remaining(daily, codes, remaining))
+
+
+def write_carry_forward(result: CarryForward, path: str):
+    """Write carry_forward_YYYY.json, creating its directory if needed."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(result.to_json() + "\n")
@@ -0,0 +1,90 @@
+"""
+Tests for the shared age-group classifier and its AgeGroup/COUNTIFS formulas
+
+Usage:
+    python -m pytest tests/test_age_groups.py -v
+"""
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.age_groups import AGE_GROUP_COLUMN, AGE_GROUPS, UNCATEGORIZED, classify, countifs, group_formula
+from src.formula_eval import Evaluator
+from src.xlsx.columnar import Categorical
+from src.xlsx.reader import TableData
+
+CASES = [
+    # (age, unit, expected label)
+    (0, "Days", "0-28"),
+    (28, "Days", "0-28"),
+    (29, "Days", "1-11"),
+    (35, "Days", "1-11"),
+    (0, "Months", "0-28"),
+    (1, "Months", "1-11"),
+    (11, "Months", "1-11"),
+    (12, "Months", "1-4"),
+    (0, "Years", "0-28"),
+    (1, "Years", "1-4"),
+    (4.5, "Years", "1-4"),
+    (5, "Years", "5-9"),
+    (17, "years", "15-17"),
+    (69.9, "Years", "60-69"),
+    (70, "YEARS", "70+"),
+    (120, "Years", "70+"),
+]
+
+UNCLASSIFIED = [(np.nan, "Years"), (-1, "Years"), (3, "Weeks"), (3, None)]
+
+
+def _columns(rows):
+    age = np.array([a for a, _ in rows], dtype=np.float64)
+    return age, Categorical.from_values(u for _, u in rows)
+
+
+class TestClassify(unittest.TestCase):
+
+    def test_boundaries(self):
+        age, unit = _columns([(a, u) for a, u, _ in CASES])
+        labels = [AGE_GROUPS[g].label for g in classify(age, unit)]
+        self.assertEqual(labels, [label for _, _, label in CASES])
+
+    def test_unclassified(self):
+        age, unit = _columns(UNCLASSIFIED)
+        self.assertEqual(list(classify(age, unit)), [UNCATEGORIZED] * len(UNCLASSIFIED))
+
+    def test_groups_are_contiguous(self):
+        for a, b in zip(AGE_GROUPS, AGE_GROUPS[1:]):
+            self.assertEqual(a.upper, b.lower)
+
+
+class TestCountifs(unittest.TestCase):
+    """The AgeGroup column and the sheet formulas agree with classify"""
+
+    def test_formulas_match_classify(self):
+        rows = [(a, u) for a, u, _ in CASES] + UNCLASSIFIED
+        age, unit = _columns(rows)
+        groups = classify(age, unit)
+        expected = np.bincount(groups, minlength=UNCATEGORIZED + 1)
+
+        columns = ["Age", "AgeUnit", AGE_GROUP_COLUMN]
+        table = TableData("tblT", "T", f"A1:C{len(rows) + 1}", columns, first_row=2, first_col=1,
+                          formulas={AGE_GROUP_COLUMN: group_formula("tblT")})
+        table.values = {"Age": [None if np.isnan(a) else float(a) for a, _ in rows],
+                        "AgeUnit": [u for _, u in rows],
+                        AGE_GROUP_COLUMN: [None] * len(rows)}
+        ev = Evaluator({"tblT": table})
+        ev.fill_calculated_columns()
+        self.assertEqual(table.values[AGE_GROUP_COLUMN],
+                         [0 if g == UNCATEGORIZED else g + 1 for g in groups])
+        counts = [ev.evaluate("=" + countifs("tblT", g)) for g in AGE_GROUPS]
+        self.assertEqual(counts, list(expected[:UNCATEGORIZED]))
+
+
+if __name__ == "__main__":
+    unittest.main()
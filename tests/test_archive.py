@@ -0,0 +1,79 @@
+"""
+Tests for the columnar multi-year archive
+
+Usage:
+    python -m pytest tests/test_archive.py -v
+"""
+import os
+import sys
+import tempfile
+import unittest
+from datetime import date, datetime
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.archive import archive_years, combine, export_year, open_archive
+from src.config import WorkbookConfig
+from src.data_entry import append_records
+from src.phase1_structure import build_structure
+from src.xlsx.columnar import load_tables
+
+NOW = datetime(2025, 4, 2, 8, 15)
+
+
+class TestArchive(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.archive = os.path.join(self.tmp.name, "archive")
+        self.books = {}
+        for year, sexes in ((2024, ["M", "F"]), (2025, ["F", None])):
+            path = os.path.join(self.tmp.name, f"book{year}.xlsx")
+            build_structure(WorkbookConfig(year=year), path)
+            append_records(path, "tblAdmissions", [
+                {"AdmissionDate": date(year, 3, 1), "WardCode": ward, "Sex": sex, "Age": 30,
+                 "PatientName": "Ama Mensah" if sex else None}
+                for ward, sex in zip(("MW", "NICU" if year == 2025 else "FW"), sexes)], now=NOW)
+            self.books[year] = path
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_export_and_open_year(self):
+        result = export_year(self.books[2024], self.archive)
+        self.assertEqual((result.year, result.rows["tblAdmissions"], result.rows["tblDaily"]), (2024, 2, 0))
+        loaded = load_tables(self.books[2024], ["tblAdmissions"])["tblAdmissions"]
+        opened = open_archive(self.archive)[2024]["tblAdmissions"]
+
+        self.assertIsInstance(opened["AdmissionDate"], np.memmap)
+        self.assertEqual(opened["AdmissionDate"].tolist(), loaded["AdmissionDate"].tolist())
+        self.assertEqual(opened["EntryTimestamp"].tolist(), loaded["EntryTimestamp"].tolist())
+        self.assertEqual(list(opened["WardCode"].to_numpy()), ["MW", "FW"])
+        self.assertEqual(opened["AdmissionID"].tolist(), ["A2024-00001", "A2024-00002"])
+        self.assertEqual(opened.sheet_rows.tolist(), loaded.sheet_rows.tolist())
+        self.assertEqual(len(open_archive(self.archive)[2024]["tblTransfers"]), 0)
+
+        # Re-exporting replaces the year
+        export_year(self.books[2025], self.archive, year=2024)
+        self.assertEqual(archive_years(self.archive), [2024])
+        self.assertEqual(open_archive(self.archive)[2024]["tblAdmissions"]["AdmissionID"][0], "A2025-00001")
+
+    def test_combine_years(self):
+        for path in self.books.values():
+            export_year(path, self.archive)
+        combined = combine(open_archive(self.archive), "tblAdmissions", ["WardCode", "Sex", "PatientName"])
+        self.assertEqual(combined["Year"].tolist(), [2024, 2024, 2025, 2025])
+        self.assertEqual(combined["WardCode"].categories, ["FW", "MW", "NICU"])
+        self.assertEqual(list(combined["WardCode"].to_numpy()), ["MW", "FW", "MW", "NICU"])
+        self.assertEqual(list(combined["Sex"].to_numpy()), ["M", "F", "F", None])
+        self.assertEqual(combined["PatientName"].tolist(), ["Ama Mensah"] * 3 + [""])
+        self.assertEqual(int(combined["WardCode"].mask("MW").sum()), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+"""
+Tests for the Phase 1 benchmark suite
+
+Usage:
+    python -m pytest tests/test_benchmark.py -v
+"""
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.benchmark import (
+    BenchCase, PREF_FLAGS, cases, compare, load_baseline, run_case, save_baseline, synthetic_wards,
+)
+
+
+class TestBenchCases(unittest.TestCase):
+    """Test the case matrix and synthetic configs"""
+
+    def test_full_matrix(self):
+        matrix = cases()
+        self.assertEqual(len(matrix), 4 * 2 ** len(PREF_FLAGS) * 2)
+        self.assertEqual(len({c.id for c in matrix}), len(matrix))
+
+    def test_synthetic_wards_keep_production_wards_first(self):
+        wards = synthetic_wards(30)
+        self.assertEqual(len(wards), 30)
+        self.assertEqual([w.code for w in wards[:2]], ["MW", "FW"])
+        self.assertEqual(sum(w.is_emergency for w in wards), 2)
+        self.assertEqual(len({w.code for w in wards}), 30)
+        self.assertEqual([w.display_order for w in wards], list(range(1, 31)))
+
+    def test_case_config_applies_prefs(self):
+        config = BenchCase(12, 2028, (False, True, False)).config()
+        self.assertEqual(len(config.WARDS), 12)
+        self.assertFalse(config.preferences.show_emergency_total_remaining)
+        self.assertTrue(config.preferences.subtract_deaths_under_24hrs_from_admissions)
+        self.assertEqual(config.days_in_month(2), 29)
+
+    def test_run_case_metrics(self):
+        result = run_case(BenchCase(9, 2027, (True, False, False)))
+        self.assertEqual(result["id"], "w9-y2027-p100")
+        for metric in ("build_s", "bytes", "cells", "formulas", "peak_rss_mb"):
+            self.assertGreater(result[metric], 0, metric)
+
+
+class TestBaselineCompare(unittest.TestCase):
+    """Test regression detection against a stored baseline"""
+
+    BASE = {"id": "w9-y2027-p000", "build_s": 2.0, "bytes": 100000, "cells": 500,
+            "formulas": 400, "peak_rss_mb": 60.0}
+
+    def test_within_tolerance(self):
+        result = dict(self.BASE, build_s=2.2, peak_rss_mb=65.0, bytes=101000)
+        self.assertEqual(compare([result], {self.BASE["id"]: self.BASE}), [])
+
+    def test_slow_and_bloated_build_fails(self):
+        result = dict(self.BASE, build_s=3.0, bytes=120000, cells=501)
+        regressions = compare([result], {self.BASE["id"]: self.BASE})
+        self.assertEqual(len(regressions), 3)
+        self.assertTrue(any("build_s" in r for r in regressions))
+
+    def test_small_absolute_change_ignored(self):
+        base = dict(self.BASE, build_s=0.2)
+        result = dict(base, build_s=0.4)  # +100% but only 0.2s
+        self.assertEqual(compare([result], {base["id"]: base}), [])
+
+    def test_unknown_case_not_compared(self):
+        self.assertEqual(compare([dict(self.BASE, id="w999")], {self.BASE["id"]: self.BASE}), [])
+
+    def test_save_baseline_merges(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "baseline.json")
+            save_baseline(path, [self.BASE])
+            save_baseline(path, [dict(self.BASE, id="w30-y2027-p000")])
+            self.assertEqual(set(load_baseline(path)), {"w9-y2027-p000", "w30-y2027-p000"})
+
+
+if __name__ == "__main__":
+    unittest.main()
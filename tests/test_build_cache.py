@@ -0,0 +1,142 @@
+"""
+Tests for the incremental per-sheet build cache
+
+Usage:
+    python -m pytest tests/test_build_cache.py -v
+"""
+import os
+import sys
+import tempfile
+import unittest
+from copy import copy
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from openpyxl import load_workbook
+
+from src.build_cache import SheetCache
+from src.config import WorkbookConfig
+from src.phase1_structure import build_steps, build_structure
+
+
+class TestSheetCacheKeys(unittest.TestCase):
+    """Test which steps a config change invalidates"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = SheetCache(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _keys(self, config):
+        return {
+            (builder.__name__, args[0].code if args else None): self.cache.key(config, [(builder, args)])
+            for builder, args in build_steps(config)
+        }
+
+    def _changed(self, before, after):
+        return {name for name, key in after.items() if before[name] != key}
+
+    def test_bed_complement_edit_touches_control_and_one_ward(self):
+        config = WorkbookConfig(year=2026)
+        before = self._keys(config)
+        config.WARDS[1].bed_complement += 4
+
+        self.assertEqual(
+            self._changed(before, self._keys(config)),
+            {("build_control_sheet", None), ("build_ward_sheet", config.WARDS[1].code)})
+
+    def test_emergency_total_pref_touches_period_summaries(self):
+        config = WorkbookConfig(year=2026)
+        before = self._keys(config)
+        config.preferences.show_emergency_total_remaining = \
+            not config.preferences.show_emergency_total_remaining
+
+        self.assertEqual(
+            {name for name, _ in self._changed(before, self._keys(config))},
+            {"build_control_sheet", "build_monthly_summary_sheet",
+             "build_quarterly_summary_sheet", "build_halfyear_summary_sheet"})
+
+    def test_year_change_touches_everything(self):
+        before = self._keys(WorkbookConfig(year=2026))
+        after = self._keys(WorkbookConfig(year=2027))
+        self.assertEqual(self._changed(before, after), set(after))
+
+
+class TestIncrementalBuild(unittest.TestCase):
+    """Test that a cached rebuild matches a fresh build"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.tmp.name, "cache")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_cached_rebuild_matches_fresh_build(self):
+        config = WorkbookConfig(year=2026)
+        build_structure(config, os.path.join(self.tmp.name, "first.xlsx"), cache_dir=self.cache_dir)
+        year_dir = os.path.join(self.cache_dir, "2026")
+        entries = set(os.listdir(year_dir))
+
+        config.WARDS[2].bed_complement = 99
+        config.preferences.subtract_deaths_under_24hrs_from_admissions = \
+            not config.preferences.subtract_deaths_under_24hrs_from_admissions
+        cached_path = os.path.join(self.tmp.name, "cached.xlsx")
+        fresh_path = os.path.join(self.tmp.name, "fresh.xlsx")
+        build_structure(config, cached_path, cache_dir=self.cache_dir)
+        build_structure(config, fresh_path)
+
+        # Superseded entries are pruned: same number of shards, some replaced
+        after = set(os.listdir(year_dir))
+        self.assertEqual(len(after), len(entries))
+        self.assertTrue(after - entries)
+        self.assertTrue(after & entries)
+        cached, fresh = load_workbook(cached_path), load_workbook(fresh_path)
+        self.assertEqual(cached.sheetnames, fresh.sheetnames)
+        for name in ("Control", "Monthly Summary", config.WARDS[2].name, config.WARDS[0].name):
+            for row_a, row_b in zip(cached[name].iter_rows(), fresh[name].iter_rows()):
+                for a, b in zip(row_a, row_b):
+                    self.assertEqual(a.value, b.value, f"{name}!{a.coordinate}")
+                    self.assertEqual(copy(a.font), copy(b.font), f"{name}!{a.coordinate}")
+
+    def test_other_years_entries_are_kept(self):
+        build_structure(WorkbookConfig(year=2026), os.path.join(self.tmp.name, "a.xlsx"),
+                        cache_dir=self.cache_dir)
+        entries = set(os.listdir(os.path.join(self.cache_dir, "2026")))
+        build_structure(WorkbookConfig(year=2027), os.path.join(self.tmp.name, "b.xlsx"),
+                        cache_dir=self.cache_dir)
+        self.assertEqual(set(os.listdir(os.path.join(self.cache_dir, "2026"))), entries)
+
+
+class TestSheetCachePrune(unittest.TestCase):
+    """Test that prune only deletes cache entries"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = SheetCache(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_foreign_files_survive(self):
+        keep, stale = "a" * 64, "b" * 64
+        self.cache.put(keep, b"keep")
+        self.cache.put(stale, b"stale")
+        for name in ("MyBackup.xlsx", "notes.tmp", "B" * 64 + ".xlsx"):
+            with open(os.path.join(self.tmp.name, name), "wb") as f:
+                f.write(b"mine")
+        leftover = os.path.join(self.tmp.name, "shard-abc123.tmp")
+        open(leftover, "wb").close()
+
+        self.assertEqual(self.cache.prune([keep]), 2)
+        self.assertEqual(sorted(os.listdir(self.tmp.name)),
+                         sorted([f"{keep}.xlsx", "MyBackup.xlsx", "notes.tmp", "B" * 64 + ".xlsx"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+"""
+Tests for the static cell writer
+
+Usage:
+    python -m pytest tests/test_cell_writer.py -v
+"""
+import os
+import sys
+import tempfile
+import unittest
+import zipfile
+from datetime import date
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from openpyxl import Workbook, load_workbook
+from openpyxl.styles import Font
+
+from src.xlsx.cell_writer import add_date_format, set_cells, write_cells
+
+
+class TestSetCells(unittest.TestCase):
+    """Test editing worksheet XML"""
+
+    def test_replaces_formulas_and_inserts_in_order(self):
+        xml = (b'<worksheet><sheetData><row r="2" spans="1:3"><c r="A2" s="3"><f>1+1</f><v>2</v></c>'
+               b'<c r="C2"><v>5</v></c></row><row r="5"/></sheetData></worksheet>')
+        out = set_cells(xml, {(2, 1): "a&b", (2, 2): 3.5, (1, 4): True, (5, 1): None, (7, 2): 4.0})
+        self.assertEqual(out, (
+            b'<worksheet><sheetData><row r="1"><c r="D1" t="b"><v>1</v></c></row>'
+            b'<row r="2"><c r="A2" s="3" t="inlineStr"><is><t>a&amp;b</t></is></c>'
+            b'<c r="B2"><v>3.5</v></c><c r="C2"><v>5</v></c></row>'
+            b'<row r="5"><c r="A5"/></row><row r="7"><c r="B7"><v>4</v></c></row>'
+            b'</sheetData></worksheet>'))
+
+    def test_empty_sheet(self):
+        self.assertEqual(set_cells(b"<worksheet><sheetData/></worksheet>", {(1, 1): date(2026, 1, 2)}),
+                         b'<worksheet><sheetData><row r="1"><c r="A1"><v>46024</v></c></row>'
+                         b'</sheetData></worksheet>')
+
+    def test_date_format(self):
+        styles = (b'<styleSheet><fonts count="1"><font/></fonts>'
+                  b'<cellXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/></cellXfs>'
+                  b'</styleSheet>')
+        added, index = add_date_format(styles)
+        self.assertEqual(index, 1)
+        self.assertIn(b'<numFmts count="1"><numFmt numFmtId="164" formatCode="dd/mm/yyyy"/></numFmts><fonts',
+                      added)
+        self.assertIn(b'<cellXfs count="2">', added)
+        self.assertEqual(add_date_format(added), (added, 1))   # reused, not added twice
+        self.assertEqual(set_cells(b"<worksheet><sheetData/></worksheet>", {(1, 1): date(2026, 1, 2)}, 1),
+                         b'<worksheet><sheetData><row r="1"><c r="A1" s="1"><v>46024</v></c></row>'
+                         b'</sheetData></worksheet>')
+
+
+class TestWriteCells(unittest.TestCase):
+    """Test writing into a saved package"""
+
+    def test_write_into_workbook(self):
+        wb = Workbook()
+        ws = wb.active
+        ws.title = "Report"
+        ws["A1"] = "=1+2"
+        ws["A1"].font = Font(bold=True)
+        wb.create_sheet("Other")["B2"] = "keep"
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "book.xlsx")
+            wb.save(path)
+            write_cells(path, {"Report": {(1, 1): 3, (10, 3): "new"}})
+            with zipfile.ZipFile(path) as zf:
+                self.assertIsNone(zf.testzip())
+            wb = load_workbook(path)
+            with self.assertRaises(KeyError):
+                write_cells(path, {"Missing": {(1, 1): 1}})
+        self.assertEqual(wb["Report"]["A1"].value, 3)
+        self.assertTrue(wb["Report"]["A1"].font.b)
+        self.assertEqual(wb["Report"]["C10"].value, "new")
+        self.assertEqual(wb["Other"]["B2"].value, "keep")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,152 @@
+"""
+Tests for the streaming columnar table loader
+
+Usage:
+    python -m pytest tests/test_columnar.py -v
+"""
+import os
+import re
+import sys
+import tempfile
+import unittest
+import zipfile
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from openpyxl import load_workbook
+
+from src.config import WorkbookConfig
+from src.phase1_structure import build_structure
+from src.xlsx import load_tables
+from src.xlsx.columnar import DATE, FLAG, TIMESTAMP, Categorical, convert_column
+from src.xlsx.package import rewrite_package
+
+_INLINE = re.compile(rb'<c ([^>]*?)t="inlineStr"([^>]*)><is><t>([^<]*)</t></is></c>')
+
+
+def _to_shared_strings(path):
+    """Rewrite openpyxl's inline strings as a shared string table, as Excel saves them."""
+    strings = []
+
+    def share(m):
+        strings.append(m.group(3))
+        return b'<c %st="s"%s><v>%d</v></c>' % (m.group(1), m.group(2), len(strings) - 1)
+
+    def transform(src, name, data):
+        if name.startswith("xl/worksheets/sheet"):
+            return _INLINE.sub(share, data)
+        if name == "xl/_rels/workbook.xml.rels":
+            return data.replace(b"</Relationships>", (
+                b'<Relationship Id="rIdSST" Target="sharedStrings.xml" Type="http://schemas.'
+                b'openxmlformats.org/officeDocument/2006/relationships/sharedStrings"/></Relationships>'))
+        return data
+
+    rewrite_package(path, None, transform)
+    sst = b"".join(b"<si><t>%s</t></si>" % s for s in strings)
+    rewrite_package(path, None, lambda src, name, data: data, added={
+        "xl/sharedStrings.xml":
+            b'<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">%s</sst>' % sst})
+
+
+class TestLoadTables(unittest.TestCase):
+    """Test loading the data tables of a built workbook"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.tmp.name, "book.xlsx")
+        build_structure(WorkbookConfig(year=2026), cls.path)
+
+        wb = load_workbook(cls.path)
+        ws = wb["DailyData"]
+        rows = [
+            [datetime(2026, 1, 1), 1, "MW", 3, 1, 0, 0, 0, 0, 10, 12, datetime(2026, 1, 2, 8, 30)],
+            [datetime(2026, 1, 1), 1, "FW", 2, 2, 1, 1, 0, 1, 8, 6, datetime(2026, 1, 2, 9, 0)],
+            [datetime(2026, 1, 2), 1, "MW", None, 0, 0, 0, 1, 0, 12, 13, None],
+        ]
+        for i, row in enumerate(rows, 2):
+            for j, v in enumerate(row, 1):
+                ws.cell(row=i, column=j, value=v)
+        ws.tables["tblDaily"].ref = "A1:L4"
+        ws = wb["DeathsData"]
+        death = ["DTH2026-00001", datetime(2026, 3, 4), 3, "MW", "F1", "A & B", 71, "Years",
+                 "M", "Insured", "Stroke", True, datetime(2026, 3, 4, 12, 0)]
+        for j, v in enumerate(death, 1):
+            ws.cell(row=2, column=j, value=v)
+        wb.save(cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def _check(self, tables):
+        daily = tables["tblDaily"]
+        self.assertEqual(len(daily), 3)
+        self.assertEqual(daily["EntryDate"].dtype, np.dtype("datetime64[D]"))
+        self.assertEqual(str(daily["EntryDate"][2]), "2026-01-02")
+        self.assertEqual(str(daily["EntryTimestamp"][0]), "2026-01-02T08:30:00")
+        self.assertTrue(np.isnat(daily["EntryTimestamp"][2]))
+        self.assertEqual(daily["WardCode"].categories, ["FW", "MW"])
+        self.assertEqual(daily["Admissions"].tolist(), [3, 2, 0])  # blank count reads as 0
+        self.assertEqual(int(daily["Admissions"][daily["WardCode"].mask("MW")].sum()), 3)
+
+        deaths = tables["tblDeaths"]
+        self.assertEqual(len(deaths), 1)
+        self.assertEqual(deaths["NameOfDeceased"][0], "A & B")
+        self.assertEqual(deaths["Age"][0], 71.0)
+        self.assertTrue(deaths["DeathWithin24Hrs"][0])
+        self.assertEqual(deaths["CauseOfDeath"][0], "Stroke")
+
+        # New workbooks hold only the blank seed row
+        self.assertEqual(len(tables["tblAdmissions"]), 0)
+        self.assertEqual(len(tables["tblTransfers"]["FromWardCode"]), 0)
+
+    def test_inline_strings(self):
+        self._check(load_tables(self.path))
+
+    def test_shared_strings(self):
+        path = os.path.join(self.tmp.name, "shared.xlsx")
+        with open(self.path, "rb") as src, open(path, "wb") as dst:
+            dst.write(src.read())
+        _to_shared_strings(path)
+        with zipfile.ZipFile(path) as zf:
+            self.assertNotIn(b"inlineStr", zf.read("xl/worksheets/sheet2.xml"))
+        self._check(load_tables(path))
+
+    def test_subset_and_missing_table(self):
+        self.assertEqual(list(load_tables(self.path, ["tblDeaths"])), ["tblDeaths"])
+        with self.assertRaises(KeyError):
+            load_tables(self.path, ["tblNope"])
+
+
+class TestConvertColumn(unittest.TestCase):
+    """Test typing raw cell values"""
+
+    def test_text_dates_and_flags(self):
+        dates = convert_column([46023.0, "2026-01-02", "not a date", None], DATE)
+        self.assertEqual([str(d) for d in dates], ["2026-01-01", "2026-01-02", "NaT", "NaT"])
+        stamps = convert_column([46023.75], TIMESTAMP)
+        self.assertEqual(str(stamps[0]), "2026-01-01T18:00:00")
+        self.assertEqual(convert_column([True, "Yes", "no", 0.0, None], FLAG).tolist(),
+                         [True, True, False, False, False])
+
+    def test_unknown_columns(self):
+        self.assertEqual(convert_column([1.0, None], None).dtype, np.float64)
+        self.assertEqual(convert_column(["MW|46023", None], None).tolist(), ["MW|46023", None])
+
+    def test_categorical(self):
+        cat = Categorical.from_values(["MW", None, "FW", "MW"])
+        self.assertEqual(cat.codes.tolist(), [1, -1, 0, 1])
+        self.assertEqual(cat.to_numpy().tolist(), ["MW", None, "FW", "MW"])
+        self.assertEqual(cat.mask("XX").tolist(), [False] * 4)
+        self.assertEqual(cat[2], "FW")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+"""
+Tests for the age/sex/insurance cube against the COUNTIFS summary sheets
+
+Usage:
+    python -m pytest tests/test_demographics.py -v
+"""
+import os
+import random
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from openpyxl import load_workbook
+
+from src.config import WorkbookConfig
+from src.demographics import (ages_summary, build_cubes, dhims_summary,
+                              write_demographic_summaries)
+from src.phase1_structure import build_structure
+from src.xlsx import fill_cached_values, load_tables
+
+
+def _random_record(rng, config):
+    """Month, ward, age, unit, sex, NHIS -- including blanks, odd case and boundary ages."""
+    return (
+        rng.choice(list(range(1, 13)) + [None]),
+        rng.choice([w.code for w in config.WARDS] + ["mw", None]),
+        rng.choice([rng.randint(0, 95), rng.randint(0, 40) + 0.5, None, 28, 29, 11, 12, 35, 70, -1]),
+        rng.choice(["Years"] * 6 + ["Months", "Days", "days", "Weeks", None]),
+        rng.choice(["M", "F", "m", None, "X"]),
+        rng.choice(["Insured", "Non-Insured", "insured", None]),
+    )
+
+
+def _build(path, config, ward="All Wards", month=None):
+    build_structure(config, path)
+    wb = load_workbook(path)
+    rng = random.Random(5)
+    for sheet, table, ref_end, rows in [("Admissions", "tblAdmissions", "L", 600),
+                                        ("DeathsData", "tblDeaths", "N", 300)]:
+        ws = wb[sheet]
+        for r in range(2, rows + 2):
+            ws.cell(row=r, column=1, value=f"{sheet[0]}{r}")
+            for col, v in zip([3, 4, 7, 8, 9, 10], _random_record(rng, config)):
+                ws.cell(row=r, column=col, value=v)
+        ws.tables[table].ref = f"A1:{ref_end}{rows + 1}"
+    wb["DHIMS Summary"]["B2"] = ward
+    if month is not None:
+        wb["DHIMS Summary"]["B3"] = month
+    wb.save(path)
+
+
+def _ages_sheet(ws):
+    return np.array([[[ws.cell(row=4 + r, column=1 + m * 7 + 1 + c).value for c in range(6)]
+                      for r in range(14)] for m in range(12)])
+
+
+def _dhims_sheet(ws):
+    return np.array([[ws.cell(row=8 + r, column=3 + c).value for c in range(10)] for r in range(13)])
+
+
+class TestDemographicCube(unittest.TestCase):
+    """Every summary cell equals the evaluated COUNTIFS formula"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.config = WorkbookConfig(year=2024)
+
+    def _evaluated(self, ward="All Wards", month=None):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "book.xlsx")
+            _build(path, self.config, ward, month)
+            fill_cached_values(path)
+            cubes = build_cubes(load_tables(path, ["tblAdmissions", "tblDeaths"]))
+            return cubes, load_workbook(path, data_only=True)
+
+    def test_ages_deaths_and_dhims_all_wards(self):
+        cubes, wb = self._evaluated()
+        np.testing.assert_array_equal(ages_summary(cubes["tblAdmissions"]), _ages_sheet(wb["Ages Summary"]))
+        np.testing.assert_array_equal(ages_summary(cubes["tblDeaths"]), _ages_sheet(wb["Deaths Summary"]))
+        np.testing.assert_array_equal(dhims_summary(cubes["tblAdmissions"], cubes["tblDeaths"]),
+                                      _dhims_sheet(wb["DHIMS Summary"]))
+
+    def test_dhims_ward_and_month_filter(self):
+        cubes, wb = self._evaluated("MW", 3)
+        np.testing.assert_array_equal(dhims_summary(cubes["tblAdmissions"], cubes["tblDeaths"], "MW", 3),
+                                      _dhims_sheet(wb["DHIMS Summary"]))
+
+    def test_write_static_values(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "book.xlsx")
+            _build(path, self.config)
+            cubes = write_demographic_summaries(path, ward="FW", month=7)
+            wb = load_workbook(path)
+        ages = _ages_sheet(wb["Ages Summary"])
+        self.assertEqual(ages.dtype.kind, "i")   # numbers, not formula strings
+        np.testing.assert_array_equal(ages, ages_summary(cubes["tblAdmissions"]))
+        ws = wb["DHIMS Summary"]
+        self.assertEqual((ws["B2"].value, ws["B3"].value), ("FW", 7))
+        np.testing.assert_array_equal(_dhims_sheet(ws), dhims_summary(
+            cubes["tblAdmissions"], cubes["tblDeaths"], "FW", 7))
+        # Styles survive the rewrite
+        self.assertTrue(wb["Ages Summary"].cell(row=17, column=2).font.b)
+
+
+if __name__ == "__main__":
+    unittest.main()
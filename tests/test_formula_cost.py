@@ -0,0 +1,99 @@
+"""
+Tests for the static formula-cost analyzer
+
+Usage:
+    python -m pytest tests/test_formula_cost.py -v
+"""
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from openpyxl import Workbook
+from openpyxl.worksheet.table import Table
+
+from src.formula_cost import analyze_formula, analyze_workbook, table_row_counts
+
+
+class TestAnalyzeFormula(unittest.TestCase):
+    """Test per-formula scan counting"""
+
+    def test_double_sumifs(self):
+        cost = analyze_formula(
+            '=IFERROR(IF(SUMIFS(tblDaily[Admissions],tblDaily[EntryDate],DATE(2026,1,1),'
+            'tblDaily[WardCode],"MW")=0,"",SUMIFS(tblDaily[Admissions],'
+            'tblDaily[EntryDate],DATE(2026,1,1),tblDaily[WardCode],"MW")),"")')
+        self.assertEqual(cost.functions["SUMIFS"], 2)
+        self.assertEqual(cost.column_scans[("tblDaily", "Admissions")], 2)
+        self.assertEqual(cost.column_scans[("tblDaily", "WardCode")], 2)
+        self.assertEqual(sum(cost.column_scans.values()), 6)
+
+    def test_index_match_scans_lookup_column_only(self):
+        cost = analyze_formula(
+            '=IFERROR(INDEX(tblDaily[Admissions],MATCH("MW|46023",tblDaily[Key],0)),"")')
+        self.assertEqual(cost.functions["INDEX/MATCH"], 1)
+        self.assertEqual(dict(cost.column_scans), {("tblDaily", "Key"): 1})
+
+    def test_countifs_with_concatenated_criteria(self):
+        cost = analyze_formula(
+            '=COUNTIFS(tblAdmissions[Month],1,tblAdmissions[Age],">="&1,'
+            'tblAdmissions[Sex],"M")')
+        self.assertEqual(cost.functions["COUNTIFS"], 1)
+        self.assertEqual(sum(cost.column_scans.values()), 3)
+
+    def test_parenthesised_ranges_and_plain_refs(self):
+        cost = analyze_formula('=SUMPRODUCT((tblDeaths[Month]=1)*1)+SUM(B8:B20)')
+        self.assertEqual(dict(cost.column_scans), {("tblDeaths", "Month"): 1})
+
+    def test_this_row_reference_not_a_scan(self):
+        cost = analyze_formula('=tblDaily[[#This Row],[WardCode]]&"|"')
+        self.assertEqual(sum(cost.column_scans.values()), 0)
+
+
+class TestAnalyzeWorkbook(unittest.TestCase):
+    """Test workbook-level aggregation"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "cost.xlsx")
+
+        wb = Workbook()
+        data = wb.active
+        data.title = "DailyData"
+        data.append(["WardCode", "Admissions"])
+        for i in range(10):
+            data.append(["MW", i])
+        data.add_table(Table(displayName="tblDaily", ref="A1:B11"))
+
+        report = wb.create_sheet("Report")
+        for r in range(1, 4):
+            report.cell(row=r, column=1,
+                        value='=SUMIFS(tblDaily[Admissions],tblDaily[WardCode],"MW")')
+        report["B1"] = "=A1+A2"
+        wb.save(self.path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_table_row_counts(self):
+        self.assertEqual(table_row_counts(self.path), {"tblDaily": 10})
+
+    def test_sheet_totals_and_cost(self):
+        sheets = {s.name: s for s in analyze_workbook(self.path)}
+        report = sheets["Report"]
+
+        self.assertEqual(sheets["DailyData"].formula_cells, 0)
+        self.assertEqual(report.formula_cells, 4)
+        self.assertEqual(report.functions["SUMIFS"], 3)
+        self.assertEqual(report.scans_per_row(), {"tblDaily": 6})
+        self.assertEqual(report.estimated_cost({"tblDaily": 10}), 60)
+        self.assertEqual(report.estimated_cost({"tblDaily": 1000}), 6000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,149 @@
+"""
+Tests for the formula evaluator and the cached-value writer
+
+Usage:
+    python -m pytest tests/test_formula_eval.py -v
+"""
+import os
+import sys
+import tempfile
+import unittest
+import zipfile
+from datetime import date
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from openpyxl import Workbook, load_workbook
+from openpyxl.worksheet.table import Table
+
+from src.formula_eval import Evaluator, ExcelError, UnsupportedFormula, date_serial
+from src.xlsx import fill_cached_values
+from src.xlsx.reader import TableData
+
+
+def _daily_table():
+    t = TableData("tblDaily", "DailyData", "A1:D5", ["EntryDate", "Month", "WardCode", "Admissions"],
+                  first_row=2, first_col=1)
+    t.values = {
+        "EntryDate": [date_serial(2026, 1, 1), date_serial(2026, 1, 1),
+                      date_serial(2026, 1, 2), date_serial(2026, 2, 1)],
+        "Month": [1.0, 1.0, 1.0, 2.0],
+        "WardCode": ["MW", "FW", "MW", "MW"],
+        "Admissions": [3.0, 4.0, 5.0, 7.0],
+    }
+    return {"tblDaily": t}
+
+
+class TestEvaluator(unittest.TestCase):
+    """Test the supported formula subset"""
+
+    def setUp(self):
+        self.ev = Evaluator(_daily_table())
+        self.ev.set_sheet({(1, 1): 2.0, (2, 1): "MW"}, {(3, 1): "A1*10"})
+
+    def test_sumifs_and_countifs(self):
+        self.assertEqual(self.ev.evaluate('SUMIFS(tblDaily[Admissions],tblDaily[WardCode],"MW")'), 15)
+        self.assertEqual(self.ev.evaluate(
+            'SUMIFS(tblDaily[Admissions],tblDaily[WardCode],$A$2,tblDaily[Month],1)'), 8)
+        self.assertEqual(self.ev.evaluate(
+            'SUMIFS(tblDaily[Admissions],tblDaily[EntryDate],DATE(2026,1,A1))'), 5)
+        self.assertEqual(self.ev.evaluate('COUNTIFS(tblDaily[Admissions],">4")'), 2)
+        self.assertEqual(self.ev.evaluate('COUNTIFS(tblDaily[WardCode],"<>MW")'), 1)
+        # "<>" alone counts non-blank cells
+        self.assertEqual(self.ev.evaluate('COUNTIFS(A1:A4,"<>")'), 3)
+
+    def test_index_match_and_iferror(self):
+        self.assertEqual(self.ev.evaluate(
+            'INDEX(tblDaily[Admissions],MATCH("FW",tblDaily[WardCode],0))'), 4)
+        self.assertIsInstance(self.ev.evaluate('MATCH("XX",tblDaily[WardCode],0)'), ExcelError)
+        self.assertEqual(self.ev.evaluate('IFERROR(MATCH("XX",tblDaily[WardCode],0),-1)'), -1)
+        self.assertEqual(self.ev.evaluate('IFERROR(1/0,"none")'), "none")
+        # One index into a single row picks the column
+        self.ev.set_sheet({(1, 1): 1.0, (1, 2): 2.0, (1, 3): 3.0}, {})
+        self.assertEqual(self.ev.evaluate("INDEX(A1:C1,3)"), 3)
+        self.assertEqual(self.ev.evaluate("INDEX(A1:C1,1,2)"), 2)
+        # Array constants
+        self.assertEqual(self.ev.evaluate("MATCH(30,{0,29,365.25},1)"), 2)
+        self.assertEqual(self.ev.evaluate('INDEX({1,30.4375},MATCH("months",{"Days","Months"},0))'), 30.4375)
+        self.assertEqual(self.ev.evaluate("SUM({1,-2;3,4})"), 6)
+
+    def test_operators_and_cell_formulas(self):
+        self.assertEqual(self.ev.evaluate("A3+1"), 21)
+        self.assertEqual(self.ev.evaluate('A2&"-"&A1'), "MW-2")
+        self.assertIs(self.ev.evaluate("A1>=2"), True)
+        self.assertEqual(self.ev.evaluate("IF(AND(A1>1,A2=\"mw\"),SUM(A1,A3),0)"), 22)
+        self.assertEqual(self.ev.evaluate("DATE(2026,1,1)"), date_serial(2026, 1, 1))
+        self.assertEqual(date_serial(1900, 3, 1), 61)
+
+    def test_unsupported_function_raises(self):
+        with self.assertRaises(UnsupportedFormula):
+            self.ev.evaluate("VLOOKUP(A1,B1:C3,2,FALSE)")
+
+
+class TestFillCachedValues(unittest.TestCase):
+    """Test writing cached values into a saved package"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "book.xlsx")
+        self.out = os.path.join(self.tmp.name, "cached.xlsx")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _build(self, extra_formula=None):
+        wb = Workbook()
+        data = wb.active
+        data.title = "DailyData"
+        data.append(["EntryDate", "WardCode", "Admissions"])
+        for d, ward, n in [(date(2026, 1, 1), "MW", 3), (date(2026, 1, 1), "FW", 4),
+                           (date(2026, 1, 2), "MW", 5)]:
+            data.append([d, ward, n])
+        data.add_table(Table(displayName="tblDaily", ref="A1:C4"))
+
+        ward = wb.create_sheet("Male Medical")
+        for day in (1, 2, 3):
+            row = day + 6
+            ward.cell(row=row, column=1, value=day)
+            ward.cell(row=row, column=2, value=(
+                f'=SUMIFS(tblDaily[Admissions],tblDaily[WardCode],"MW",'
+                f'tblDaily[EntryDate],DATE(2026,1,$A{row}))'))
+        ward["B10"] = "=SUM(B7:B9)"
+        if extra_formula:
+            ward["C1"] = extra_formula
+        wb.save(self.path)
+
+    def test_values_cached_and_full_calc_cleared(self):
+        self._build()
+        report = fill_cached_values(self.path, self.out)
+        self.assertEqual(report.unsupported, 0)
+        self.assertTrue(report.full_calc_cleared)
+
+        ws = load_workbook(self.out, data_only=True)["Male Medical"]
+        self.assertEqual([ws[f"B{r}"].value for r in range(7, 11)], [3, 5, 0, 8])
+        # Formulas are kept
+        self.assertEqual(load_workbook(self.out)["Male Medical"]["B10"].value, "=SUM(B7:B9)")
+        with zipfile.ZipFile(self.out) as zf:
+            workbook_xml = zf.read("xl/workbook.xml")
+        self.assertNotIn(b"fullCalcOnLoad", workbook_xml)
+        self.assertIn(b'calcId="191029"', workbook_xml)
+
+    def test_unsupported_formula_keeps_full_calc(self):
+        self._build(extra_formula="=VLOOKUP(A7,A7:B9,2,FALSE)")
+        report = fill_cached_values(self.path, self.out)
+        self.assertEqual(report.unsupported, 1)
+        self.assertFalse(report.full_calc_cleared)
+        self.assertIn("VLOOKUP", report.first_error)
+
+        ws = load_workbook(self.out, data_only=True)["Male Medical"]
+        self.assertEqual(ws["B10"].value, 8)
+        self.assertIsNone(ws["C1"].value)
+        with zipfile.ZipFile(self.out) as zf:
+            self.assertIn(b"fullCalcOnLoad", zf.read("xl/workbook.xml"))
+
+
+if __name__ == "__main__":
+    unittest.main()
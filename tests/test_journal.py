@@ -0,0 +1,157 @@
+"""
+Tests for the entry journal and its replay
+
+Usage:
+    python -m pytest tests/test_journal.py -v
+"""
+import os
+import sys
+import tempfile
+import unittest
+from datetime import date, datetime
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.config import WorkbookConfig
+from src.data_entry import append_records
+from src.journal import Journal, import_workbook, materialize_workbook
+from src.phase1_structure import build_structure
+from src.xlsx.columnar import load_tables
+from src.xlsx.table_append import append_table_rows
+
+AT = datetime(2025, 3, 5, 9, 0)
+
+
+class TestJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "entries.jsonl")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _daily(self, journal, day, ward, admissions, discharges=0):
+        return journal.put("tblDaily", {"EntryDate": date(2025, 3, day), "WardCode": ward,
+                                        "Admissions": admissions, "Discharges": discharges}, at=AT)
+
+    def test_replay_corrections_and_remaining(self):
+        journal = Journal(self.path)
+        journal.put("tblWardConfig", {"WardCode": "MW", "PrevYearRemaining": 10}, at=AT)
+        self._daily(journal, 1, "MW", 3)
+        self._daily(journal, 2, "MW", 2, 1)
+        self._daily(journal, 1, "FW", 4)
+        self._daily(journal, 1, "MW", 5)                     # correction of 1 March
+        journal.put("tblAdmissions", {"AdmissionID": "A2025-00001", "WardCode": "MW"}, at=AT)
+        journal.delete("tblAdmissions", "A2025-00001", at=AT)
+
+        tables = Journal(self.path).materialize()
+        daily = tables["tblDaily"]
+        self.assertEqual(list(daily["WardCode"]), ["MW", "MW", "FW"])
+        self.assertEqual(daily["Admissions"].tolist(), [5, 2, 4])
+        self.assertEqual(daily["PrevRemaining"].tolist(), [10, 15, 0])
+        self.assertEqual(daily["Remaining"].tolist(), [15, 16, 4])
+        self.assertEqual(len(tables["tblAdmissions"]), 0)
+        history = journal.history("tblDaily", "MW|2025-03-01")
+        self.assertEqual([e.values["Admissions"] for e in history], [3, 5])
+
+        with self.assertRaises(ValueError):
+            journal.put("tblDaily", {"WardCode": "MW"})
+        with self.assertRaises(KeyError):
+            journal.delete("tblDeaths", "D2025-00001")
+
+    def test_snapshot_and_torn_last_line(self):
+        journal = Journal(self.path, snapshot_every=3)
+        for day in range(1, 8):
+            self._daily(journal, day, "MW", day)
+        self.assertEqual(Journal(self.path).state().seq, 7)
+        self.assertTrue(os.path.exists(journal.snapshot_path))
+
+        # Only the events after the snapshot are read on replay: blank out the
+        # ones before it and leave half an event at the end
+        with open(self.path, "rb") as f:
+            lines = f.readlines()
+        with open(self.path, "wb") as f:
+            f.write(b"".join(b"x" * (len(line) - 1) + b"\n" for line in lines[:6]))
+            f.write(lines[6] + b'{"seq": 8, "op"')
+        reopened = Journal(self.path)
+        self.assertEqual(reopened.state().seq, 7)
+        self.assertEqual(len(reopened.state().tables["tblDaily"]), 7)
+
+        # The torn line is dropped before the next event
+        self._daily(reopened, 8, "MW", 8)
+        with open(self.path, "rb") as f:
+            self.assertEqual(f.read().count(b'"seq":8'), 1)
+        self.assertEqual(Journal(self.path).materialize()["tblDaily"]["Remaining"].tolist()[-1], 36)
+
+
+class TestWorkbookRoundTrip(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.book = os.path.join(self.tmp.name, "book.xlsx")
+        build_structure(WorkbookConfig(year=2025), self.book)
+        self.empty = os.path.join(self.tmp.name, "empty.xlsx")
+        build_structure(WorkbookConfig(year=2025), self.empty)
+        append_records(self.book, "tblDaily", [
+            {"EntryDate": date(2025, 3, d), "WardCode": w, "Admissions": d}
+            for d in (1, 2) for w in ("MW", "FW")], now=AT)
+        append_records(self.book, "tblAdmissions", [
+            {"AdmissionDate": date(2025, 3, 1), "WardCode": "MW", "Age": 40, "Sex": "F"}], now=AT)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_import_and_materialize(self):
+        journal = Journal(os.path.join(self.tmp.name, "entries.jsonl"))
+        skipped = import_workbook(self.book, journal)
+        self.assertEqual(sum(skipped.values()), 0)
+        self.assertEqual(len(journal.state().tables["tblWardConfig"]), 9)
+
+        out = os.path.join(self.tmp.name, "out.xlsx")
+        written = materialize_workbook(journal, self.empty, out)
+        self.assertEqual((written["tblDaily"], written["tblAdmissions"]), (4, 1))
+        before = load_tables(self.book, ["tblDaily", "tblAdmissions"])
+        after = load_tables(out, ["tblDaily", "tblAdmissions"])
+        for column in ("EntryDate", "Admissions", "Remaining", "EntryTimestamp"):
+            self.assertEqual(after["tblDaily"][column].tolist(), before["tblDaily"][column].tolist())
+        self.assertEqual(list(after["tblAdmissions"]["AdmissionID"]), ["A2025-00001"])
+
+        with self.assertRaises(ValueError):
+            materialize_workbook(journal, out)
+
+    def test_reimport_journals_only_corrections(self):
+        journal = Journal(os.path.join(self.tmp.name, "entries.jsonl"))
+        import_workbook(self.book, journal)
+        seq = journal.state().seq
+        import_workbook(self.book, journal)
+        self.assertEqual(journal.state().seq, seq)
+
+        # One edited cell (Remaining is derived, so its stale value is ignored)
+        append_table_rows(self.book, "tblDaily", [], updates={2: {"Admissions": 7}})
+        journal.put("tblDeaths", {"DeathID": "D2025-00009", "WardCode": "MW"}, at=AT)
+        import_workbook(self.book, journal)
+        events = [e for e in (journal.history("tblDaily", "MW|2025-03-01") +
+                              journal.history("tblDeaths", "D2025-00009")) if e.seq > seq + 1]
+        self.assertEqual(journal.state().seq, seq + 3)
+        self.assertEqual([(e.op, e.values and e.values["Admissions"]) for e in events],
+                         [("put", 7), ("delete", None)])
+        self.assertEqual(len(journal.history("tblDaily", "MW|2025-03-01")), 2)
+
+    def test_append_records_are_journaled(self):
+        journal = Journal(os.path.join(self.tmp.name, "entries.jsonl"))
+        import_workbook(self.book, journal)
+        append_records(self.book, "tblAdmissions", [
+            {"AdmissionDate": date(2025, 3, 2), "WardCode": "FW", "Age": 3, "Sex": "M"}],
+            now=AT, journal=journal)
+        self.assertIn("A2025-00002", journal.state().tables["tblAdmissions"])
+        seq = journal.state().seq
+        import_workbook(self.book, journal)
+        self.assertEqual(journal.state().seq, seq)
+
+
+if __name__ == "__main__":
+    unittest.main()
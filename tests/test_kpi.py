@@ -0,0 +1,161 @@
+"""
+Tests for the KPI engine against the summary-sheet formulas
+
+Usage:
+    python -m pytest tests/test_kpi.py -v
+"""
+import os
+import random
+import sys
+import tempfile
+import unittest
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from openpyxl import load_workbook
+
+from src.config import WorkbookConfig
+from src.kpi import (COLUMNS, MONTHS, QUARTERS, REPORTS, YEAR, DateRange, Period, read_settings,
+                     workbook_index, workbook_kpis)
+from src.phase1_structure import build_structure
+from src.xlsx import fill_cached_values
+
+
+def _build(path, subtract, odd_rows=True):
+    """Workbook with three months of random tblDaily rows and cached formula values."""
+    config = WorkbookConfig(year=2024)
+    config.preferences.subtract_deaths_under_24hrs_from_admissions = subtract
+    build_structure(config, path)
+    wb = load_workbook(path)
+    ws = wb["DailyData"]
+    rng = random.Random(11)
+    row = 2
+    day = date(2024, 1, 1)
+    while day < date(2024, 4, 1):
+        for ward in config.WARDS:
+            if rng.random() < 0.2:
+                continue
+            # A few lower-case codes and blank months, which SUMIFS treats specially
+            odd = odd_rows and rng.random() < 0.07
+            code = ward.code.lower() if odd else ward.code
+            month = None if odd and rng.random() < 0.3 else day.month
+            values = [day, month, code] + [rng.randint(0, 4) for _ in range(6)] + \
+                [rng.randint(0, 20), rng.randint(0, 20)]
+            for col, v in enumerate(values, 1):
+                ws.cell(row=row, column=col, value=v)
+            row += 1
+        day += timedelta(days=1)
+    ws.tables["tblDaily"].ref = f"A1:L{row - 1}"
+    wb.save(path)
+    fill_cached_values(path)
+
+
+class TestKPIEngine(unittest.TestCase):
+    """Compare every ward/TOTAL/Emergency row with the evaluated sheet formulas"""
+
+    def _check(self, subtract):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "book.xlsx")
+            _build(path, subtract)
+            self.assertEqual(read_settings(path).subtract_deaths_under_24hrs_from_admissions, subtract)
+            report = workbook_kpis(path)
+            wb = load_workbook(path, data_only=True)
+
+        labels = {p.label: i for i, p in enumerate(report.periods)}
+        checked = 0
+        for sheet, periods in REPORTS.items():
+            period = 0 if sheet == "Statement of Inpatient" else -1
+            for cells in wb[sheet].iter_rows(max_col=16):
+                name = cells[0].value
+                if isinstance(name, str) and "FORM -" in name:
+                    period += 1
+                if name in report.rows and period >= 0:
+                    p = labels[periods[period].label]
+                    got = [c.value or 0 for c in cells[1:]]
+                    np.testing.assert_allclose(report.values[p, report.rows.index(name)], got,
+                                               err_msg=f"{sheet} {periods[period].label} {name}")
+                    checked += 1
+        # 12 months, 4 quarters, 2 halves x (9 wards + TOTAL + Emergency), 9 Statement rows
+        self.assertEqual(checked, 18 * 11 + 9)
+
+    def test_matches_sheet_formulas(self):
+        self._check(subtract=False)
+
+    def test_matches_sheet_formulas_subtracting_deaths_under_24hrs(self):
+        self._check(subtract=True)
+
+    def test_custom_periods(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "book.xlsx")
+            build_structure(WorkbookConfig(year=2024), path)
+            report = workbook_kpis(path, [Period("Jan-Feb", 1, 2), YEAR])
+        self.assertEqual(report.days.tolist(), [60, 366])
+        self.assertEqual(report.values.shape, (2, len(report.rows), 15))
+        self.assertFalse(report.values[:, :, 2:].any())
+
+
+class TestDateRangeIndex(unittest.TestCase):
+    """Test date-range queries against the month-based engine and plain sums"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.tmp.name, "book.xlsx")
+        _build(cls.path, subtract=True, odd_rows=False)
+        cls.index = workbook_index(cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_whole_months_match_the_summary_sheets(self):
+        periods = MONTHS[:3] + QUARTERS[:1]
+        expected = workbook_kpis(self.path, periods)
+        ranges = [DateRange(p.label, date(2024, p.start_month, 1),
+                            date(2024, p.end_month + 1, 1) - timedelta(days=1)) for p in periods]
+        got = self.index.query(ranges)
+        np.testing.assert_allclose(got.values, expected.values)
+        np.testing.assert_allclose(got.emergency_remaining, expected.emergency_remaining)
+        self.assertEqual(got.days.tolist(), expected.days.tolist())
+
+    def test_arbitrary_window(self):
+        n = len(self.index.wards)
+        got = self.index.query([DateRange("outbreak", date(2024, 2, 10), date(2024, 2, 23))])
+        self.assertEqual(got.days.tolist(), [14])
+        sums = self.index.sums(date(2024, 2, 10), date(2024, 2, 23))
+        np.testing.assert_allclose(got.values[0, :n, COLUMNS.index("PatientDays")], sums["Remaining"])
+        np.testing.assert_allclose(got.values[0, :n, 0],
+                                   self.index.remaining_on([date(2024, 2, 9)])[0])
+
+        # Brute force over the raw rows
+        wb = load_workbook(self.path, data_only=True)
+        ws = wb["DailyData"]
+        pd = 0
+        for row in ws.iter_rows(min_row=2, values_only=True):
+            if row[0] is not None and date(2024, 2, 10) <= row[0].date() <= date(2024, 2, 23):
+                pd += row[10]
+        self.assertEqual(got.value("outbreak", "TOTAL", "PatientDays"), pd)
+
+    def test_windows_outside_the_data(self):
+        got = self.index.query([DateRange("before", date(2023, 1, 1), date(2023, 1, 31)),
+                                DateRange("after", date(2025, 1, 1), date(2025, 1, 7))])
+        self.assertFalse(got.values[:, :, 2:9].any())
+        self.assertEqual(len(self.index.rolling(7).periods), self.index.days)
+
+    def test_reversed_window_rejected(self):
+        with self.assertRaises(ValueError):
+            self.index.query([DateRange("reversed", date(2024, 3, 5), date(2024, 3, 1))])
+        with self.assertRaises(ValueError):
+            self.index.sums(date(2024, 3, 5), date(2024, 3, 1))
+        got = self.index.query([DateRange("one day", date(2024, 3, 1), date(2024, 3, 1))])
+        self.assertEqual(got.days.tolist(), [1])
+
+
+if __name__ == "__main__":
+    unittest.main()
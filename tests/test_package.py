@@ -0,0 +1,137 @@
+"""
+Tests for differential package rewriting
+
+Usage:
+    python -m pytest tests/test_package.py -v
+"""
+import io
+import os
+import random
+import sys
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.xlsx.package import rewrite_package
+
+SHEET = "xl/worksheets/sheet1.xml"
+VBA = "xl/vbaProject.bin"
+
+
+class _Unseekable(io.RawIOBase):
+    """A write-only stream, so ZipFile writes data descriptors."""
+
+    def __init__(self):
+        self.buffer = io.BytesIO()
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        return self.buffer.write(data)
+
+
+def _raw(path):
+    """Name -> (CRC, compress_type, compressed bytes) of every member."""
+    with zipfile.ZipFile(path) as zf:
+        result = {}
+        for info in zf.infolist():
+            zf.fp.seek(info.header_offset + 26)
+            lengths = zf.fp.read(4)
+            zf.fp.seek(int.from_bytes(lengths[:2], "little") + int.from_bytes(lengths[2:], "little"),
+                       os.SEEK_CUR)
+            result[info.filename] = (info.CRC, info.compress_type, zf.fp.read(info.compress_size))
+        return result
+
+
+class TestRewritePackage(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "book.xlsm")
+        rng = random.Random(3)
+        self.parts = {
+            "[Content_Types].xml": b"<Types/>",
+            SHEET: b"<worksheet>" + b"<row/>" * 5000 + b"</worksheet>",
+            "xl/calcChain.xml": b"<calcChain/>",
+            VBA: bytes(rng.randrange(256) for _ in range(20000)),
+        }
+        with zipfile.ZipFile(self.path, "w", zipfile.ZIP_DEFLATED) as zf:
+            for name, data in self.parts.items():
+                # Binary parts are often stored uncompressed
+                zf.writestr(name, data, compress_type=zipfile.ZIP_STORED if name == VBA else None)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_unchanged_members_are_copied_as_stored(self):
+        out = os.path.join(self.tmp.name, "out.xlsm")
+        before = _raw(self.path)
+
+        def transform(src, name, data):
+            if name == SHEET:
+                return data.replace(b"<row/>", b"<row></row>", 1)
+            if name == "xl/calcChain.xml":
+                return None
+            return data
+
+        result = rewrite_package(self.path, out, transform, added={"xl/new.xml": b"<new/>"})
+        self.assertEqual((result.changed, result.dropped, result.added, result.copied),
+                         ([SHEET], ["xl/calcChain.xml"], ["xl/new.xml"], 2))
+        after = _raw(out)
+        self.assertEqual(after["[Content_Types].xml"], before["[Content_Types].xml"])
+        self.assertEqual(after[VBA], before[VBA])
+        self.assertEqual(after[VBA][1], zipfile.ZIP_STORED)
+        with zipfile.ZipFile(out) as zf:
+            self.assertIsNone(zf.testzip())
+            self.assertEqual(zf.namelist(), ["[Content_Types].xml", SHEET, VBA, "xl/new.xml"])
+            self.assertEqual(zf.read(VBA), self.parts[VBA])
+            self.assertTrue(zf.read(SHEET).startswith(b"<worksheet><row></row><row/>"))
+
+    def test_untouched_parts_are_not_read(self):
+        seen = []
+
+        def transform(src, name, data):
+            seen.append(name)
+            return data + b" "
+
+        result = rewrite_package(self.path, None, transform, touches=lambda name: name == SHEET)
+        self.assertEqual(seen, [SHEET])
+        self.assertEqual(result.changed, [SHEET])
+        with zipfile.ZipFile(self.path) as zf:
+            self.assertIsNone(zf.testzip())
+            self.assertEqual(zf.read(VBA), self.parts[VBA])
+
+    @unittest.skipIf(os.name == "nt", "POSIX permission bits")
+    def test_file_mode_is_kept(self):
+        os.chmod(self.path, 0o664)
+        rewrite_package(self.path, None, lambda src, name, data: data + b" ")
+        self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o664)
+
+        out = os.path.join(self.tmp.name, "out.xlsm")
+        rewrite_package(self.path, out, lambda src, name, data: data)
+        self.assertEqual(os.stat(out).st_mode & 0o777, 0o664)
+
+    def test_members_with_data_descriptors(self):
+        stream = _Unseekable()
+        with zipfile.ZipFile(stream, "w", zipfile.ZIP_DEFLATED) as zf:
+            for name, data in self.parts.items():
+                zf.writestr(name, data)
+        with open(self.path, "wb") as f:
+            f.write(stream.buffer.getvalue())
+        with zipfile.ZipFile(self.path) as zf:
+            self.assertTrue(all(i.flag_bits & 0x08 for i in zf.infolist()))
+
+        rewrite_package(self.path, None, lambda src, name, data: data)
+        with zipfile.ZipFile(self.path) as zf:
+            self.assertIsNone(zf.testzip())
+            self.assertEqual({n: zf.read(n) for n in zf.namelist()}, self.parts)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+"""
+Tests for Phase 1 workbook structure build modes
+
+Usage:
+    python -m pytest tests/test_phase1_structure.py -v
+"""
+import sys
+import unittest
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from openpyxl import Workbook
+
+from src.config import WorkbookConfig
+from src.phase1_structure import (
+    _daily_key, build_daily_data_sheet, build_emergency_combined_sheet, build_ward_sheet,
+)
+from src.styles import ZERO_BLANK_FORMAT
+
+
+class TestDailyLookupKey(unittest.TestCase):
+    """Test the tblDaily[Key] exact-match build mode"""
+
+    def _config(self, lookup_key):
+        return WorkbookConfig(year=2026, daily_lookup_key=lookup_key)
+
+    def test_key_uses_excel_date_serial(self):
+        self.assertEqual(_daily_key("MW", 2026, 1, 1), "MW|46023")
+        self.assertEqual(_daily_key("NICU", 2024, 2, 29), "NICU|45351")
+
+    def test_daily_table_gains_calculated_key_column(self):
+        wb = Workbook()
+        build_daily_data_sheet(wb, self._config(True))
+        ws = wb["DailyData"]
+        tbl = ws.tables["tblDaily"]
+
+        self.assertEqual(tbl.ref, "A1:M2")
+        self.assertEqual(ws["M1"].value, "Key")
+        self.assertEqual(tbl.tableColumns[-1].name, "Key")
+        self.assertIn("[#This Row],[WardCode]",
+                      tbl.tableColumns[-1].calculatedColumnFormula.attr_text)
+        self.assertEqual(tbl.tableColumns[2].name, "WardCode")
+
+    def test_default_mode_keeps_twelve_columns(self):
+        wb = Workbook()
+        build_daily_data_sheet(wb, self._config(False))
+        self.assertEqual(wb["DailyData"].tables["tblDaily"].ref, "A1:L2")
+
+    def test_ward_sheet_uses_single_match(self):
+        config = self._config(True)
+        wb = Workbook()
+        build_ward_sheet(wb, config, config.WARDS[0])
+        cell = wb[config.WARDS[0].name]["B7"]  # Admissions, 1 January
+
+        self.assertEqual(
+            cell.value,
+            f'=IFERROR(INDEX(tblDaily[Admissions],'
+            f'MATCH("{config.WARDS[0].code}|46023",tblDaily[Key],0)),"")')
+        self.assertNotIn("SUMIFS", cell.value)
+        self.assertEqual(cell.number_format, ZERO_BLANK_FORMAT)
+
+    def test_ward_sheet_default_mode_unchanged(self):
+        config = self._config(False)
+        wb = Workbook()
+        build_ward_sheet(wb, config, config.WARDS[0])
+        cell = wb[config.WARDS[0].name]["B7"]
+
+        self.assertEqual(cell.value.count("SUMIFS"), 2)
+        self.assertEqual(cell.number_format, "General")
+
+    def test_emergency_sheet_uses_single_match(self):
+        wb = Workbook()
+        build_emergency_combined_sheet(wb, self._config(True))
+        formulas = [c.value for row in wb["Emergency"].iter_rows() for c in row
+                    if isinstance(c.value, str) and "tblDaily[Key]" in c.value]
+
+        self.assertTrue(formulas)
+        self.assertTrue(all("SUMIFS" not in f for f in formulas))
+
+
+if __name__ == "__main__":
+    unittest.main()
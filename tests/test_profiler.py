@@ -0,0 +1,108 @@
+"""
+Tests for the build profiler
+
+Usage:
+    python -m pytest tests/test_profiler.py -v
+"""
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from openpyxl import load_workbook
+
+from src.config import WorkbookConfig
+from src.phase1_structure import build_steps, build_structure
+from src.profiler import NULL_PROFILER, BuildProfiler
+
+
+class TestBuildProfiler(unittest.TestCase):
+    """Test phase recording and report formats"""
+
+    def test_phase_records_timings_and_counters(self):
+        profiler = BuildProfiler(year=2026)
+        with profiler.phase("step", "build_sheet", rows=3) as record:
+            record["cells"] = 10
+        phase, = profiler.phases
+        self.assertEqual(phase["name"], "step")
+        self.assertEqual(phase["rows"], 3)
+        self.assertEqual(phase["cells"], 10)
+        self.assertGreaterEqual(phase["wall_ms"], 0)
+        self.assertIn("cpu_ms", phase)
+        self.assertIn("peak_rss_mb", phase)
+
+    def test_stages_close_in_sequence(self):
+        profiler = BuildProfiler()
+        profiler.stage("open", "vba")
+        profiler.stage("inject", "vba")
+        profiler.stage(None, "vba")
+        self.assertEqual([p["name"] for p in profiler.phases], ["open", "inject"])
+        first, second = profiler.phases
+        self.assertLessEqual(first["start_ms"] + first["wall_ms"], second["start_ms"] + 0.001)
+
+    def test_chrome_trace_events(self):
+        profiler = BuildProfiler(year=2026)
+        with profiler.phase("step", "build_sheet"):
+            pass
+        trace = profiler.to_chrome_trace()
+        complete = [e for e in trace["traceEvents"] if e["ph"] == "X"]
+        self.assertEqual(len(complete), 1)
+        self.assertEqual(complete[0]["name"], "step")
+        self.assertEqual(complete[0]["cat"], "build_sheet")
+        self.assertGreaterEqual(complete[0]["dur"], 1)
+        self.assertEqual(trace["otherData"], {"year": 2026})
+
+    def test_null_profiler_records_nothing(self):
+        with NULL_PROFILER.phase("step") as record:
+            record["cells"] = 1
+        NULL_PROFILER.stage("open", "vba")
+        self.assertFalse(NULL_PROFILER.enabled)
+
+
+class TestProfiledBuild(unittest.TestCase):
+    """Test profiling a full Phase 1 build"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_every_builder_and_save_is_profiled(self):
+        config = WorkbookConfig(year=2026)
+        output = os.path.join(self.tmp.name, "profiled.xlsx")
+        profiler = BuildProfiler(year=2026)
+        build_structure(config, output, profiler=profiler)
+
+        builders = [p for p in profiler.phases if p["category"] == "build_sheet"]
+        save, = [p for p in profiler.phases if p["category"] == "save"]
+        self.assertEqual(len(builders), len(build_steps(config)))
+        self.assertEqual(builders[0]["sheets"], ["Control"])
+        # Later builders may touch (empty) cells on earlier sheets, so only bound cells
+        self.assertLessEqual(sum(p["cells"] for p in builders), save["cells"])
+        self.assertEqual(sum(p["formulas"] for p in builders), save["formulas"])
+        self.assertEqual(save["bytes"], os.path.getsize(output))
+
+        wb = load_workbook(output)
+        ward = config.WARDS[0]
+        phase, = [p for p in builders if p["name"] == f"build_ward_sheet({ward.code})"]
+        self.assertEqual(phase["sheets"], [ward.name])
+        self.assertEqual(phase["cells"], len(wb[ward.name]._cells))
+
+        json_path = os.path.join(self.tmp.name, "profile.json")
+        trace_path = os.path.join(self.tmp.name, "profile.trace.json")
+        profiler.write(json_path, trace_path)
+        with open(json_path) as f:
+            self.assertEqual(len(json.load(f)["phases"]), len(profiler.phases))
+        with open(trace_path) as f:
+            self.assertIn("traceEvents", json.load(f))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+"""
+Tests for the admissions/deaths reconciler
+
+Usage:
+    python -m pytest tests/test_reconcile.py -v
+"""
+import random
+import sys
+import unittest
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.formula_eval import date_serial
+from src.reconcile import CHECKS, MISMATCH, NO_ENTRY, OK, reconcile
+from src.xlsx.columnar import TABLE_SCHEMAS, ColumnarTable, convert_column
+
+
+def _table(name, rows):
+    """ColumnarTable from dicts of raw cell values."""
+    table = ColumnarTable(name, rows=len(rows), sheet_rows=np.arange(2, len(rows) + 2))
+    for column, kind in TABLE_SCHEMAS[name].items():
+        table.columns[column] = convert_column([r.get(column) for r in rows], kind)
+    return table
+
+
+def _serial(d, hour=0):
+    return date_serial(d.year, d.month, d.day) + hour / 24
+
+
+def _vba_reference(daily, admissions, deaths, year, wards):
+    """GetMonthlyValidationReport / frmDeath counts for every ward and day."""
+    out = {}
+    day = date(year, 1, 1)
+    while day.year == year:
+        for ward in wards:
+            entry = next((r for r in daily if r.get("EntryDate") is not None
+                          and int(r["EntryDate"]) == _serial(day)
+                          and (r.get("WardCode") or "").strip() == ward), None)
+
+            def count(rows, column, under24=None):
+                return sum(1 for r in rows if r.get(column) is not None
+                           and int(r[column]) == _serial(day)
+                           and (r.get("WardCode") or "").strip() == ward
+                           and (under24 is None or bool(r.get("DeathWithin24Hrs")) == under24))
+
+            records = {"Admissions": count(admissions, "AdmissionDate"),
+                       "Deaths": count(deaths, "DateOfDeath", False),
+                       "DeathsUnder24Hrs": count(deaths, "DateOfDeath", True)}
+            for check, n in records.items():
+                if entry is None:
+                    if n:
+                        out[(day, ward, check)] = (NO_ENTRY, 0, n)
+                elif entry.get(check, 0) != n:
+                    out[(day, ward, check)] = (MISMATCH, entry.get(check, 0), n)
+        day += timedelta(days=1)
+    return out
+
+
+class TestReconcile(unittest.TestCase):
+
+    def test_matches_per_pair_reference(self):
+        rng = random.Random(11)
+        year, wards = 2024, ["MW", "FW", "CW"]
+
+        def some_day():
+            return date(year, 1, 1) + timedelta(days=rng.randint(0, 60))
+
+        daily = [{"EntryDate": _serial(some_day()), "WardCode": rng.choice(wards + [" MW", "mw"]),
+                  "Admissions": rng.randint(0, 3), "Deaths": rng.randint(0, 1),
+                  "DeathsUnder24Hrs": rng.randint(0, 1)} for _ in range(150)]
+        admissions = [{"AdmissionDate": rng.choice([_serial(some_day(), rng.randint(0, 23)), None]),
+                       "WardCode": rng.choice(wards + [None])} for _ in range(300)]
+        deaths = [{"DateOfDeath": _serial(some_day()), "WardCode": rng.choice(wards),
+                   "DeathWithin24Hrs": rng.choice([True, False, None])} for _ in range(80)]
+        # Records and entries outside the year are not checked
+        admissions.append({"AdmissionDate": _serial(date(year + 1, 1, 1)), "WardCode": "MW"})
+
+        result = reconcile(_table("tblDaily", daily), _table("tblAdmissions", admissions),
+                           _table("tblDeaths", deaths), year)
+        got = {(d.date, d.ward, d.check): (d.status, d.daily, d.records) for d in result.discrepancies}
+        # "mw" is its own ward code to the VBA's exact comparison
+        expected = _vba_reference(daily, admissions, deaths, year, result.wards)
+        self.assertEqual(result.wards, ["CW", "FW", "MW", "mw"])
+        self.assertEqual(got, expected)
+        order = [(d.date, result.wards.index(d.ward), CHECKS.index(d.check)) for d in result.discrepancies]
+        self.assertEqual(order, sorted(order))
+
+        counts = result.status_counts()["Admissions"]
+        self.assertEqual(sum(counts.values()), 366 * len(result.wards))
+        self.assertEqual(counts[MISMATCH], sum(1 for k in expected if k[2] == "Admissions"
+                                               and expected[k][0] == MISMATCH))
+
+    def test_ward_order_and_clean_year(self):
+        ward_config = _table("tblWardConfig", [{"WardCode": "MW"}, {"WardCode": "FW"}])
+        day = _serial(date(2026, 3, 1))
+        result = reconcile(
+            _table("tblDaily", [{"EntryDate": day, "WardCode": "FW", "Admissions": 2},
+                                {"EntryDate": day, "WardCode": "FW", "Admissions": 9}]),
+            _table("tblAdmissions", [{"AdmissionDate": day, "WardCode": "FW"}] * 2),
+            _table("tblDeaths", []), 2026, ward_config)
+        self.assertEqual(result.wards, ["MW", "FW"])
+        self.assertEqual(result.discrepancies, [])   # the first daily row counts
+        self.assertEqual(result.status_counts()["Admissions"][OK], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
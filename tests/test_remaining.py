@@ -0,0 +1,132 @@
+"""
+Tests for the vectorized PrevRemaining/Remaining engine
+
+Usage:
+    python -m pytest tests/test_remaining.py -v
+"""
+import os
+import random
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from openpyxl import load_workbook
+
+from src.config import WorkbookConfig
+from src.phase1_structure import build_structure
+from src.remaining import audit_remaining, compute_remaining
+from src.xlsx.columnar import TABLE_SCHEMAS, ColumnarTable, convert_column
+
+COUNTS = ["Admissions", "Discharges", "Deaths", "DeathsUnder24Hrs", "TransfersIn", "TransfersOut"]
+
+
+def _daily(rows):
+    """ColumnarTable from dicts of raw cell values (dates as Excel serials)."""
+    schema = TABLE_SCHEMAS["tblDaily"]
+    table = ColumnarTable("tblDaily", rows=len(rows), sheet_rows=np.arange(2, len(rows) + 2))
+    for name, kind in schema.items():
+        table.columns[name] = convert_column([r.get(name) for r in rows], kind)
+    return table
+
+
+def _vba_reference(rows, prev_year):
+    """Row-by-row port of CalculateRemainingForRow over a sorted table."""
+    order = sorted((i for i, r in enumerate(rows) if r.get("WardCode") and r.get("EntryDate")),
+                   key=lambda i: (rows[i]["WardCode"], rows[i]["EntryDate"]))
+    remaining = {}
+    prev_out, rem_out = {}, {}
+    for i in order:
+        ward, day = rows[i]["WardCode"], rows[i]["EntryDate"]
+        # GetLastRemainingForWard: latest earlier date, ties keep first seen
+        found, found_day = None, -1
+        for j in order:
+            if rows[j]["WardCode"] == ward and found_day < rows[j]["EntryDate"] < day:
+                found, found_day = remaining[j], rows[j]["EntryDate"]
+        prev = found if found is not None else prev_year.get(ward, 0)
+        r = rows[i]
+        remaining[i] = (prev + r["Admissions"] + r["TransfersIn"] - r["Discharges"]
+                        - r["Deaths"] - r["TransfersOut"] - r["DeathsUnder24Hrs"])
+        prev_out[i], rem_out[i] = prev, remaining[i]
+    return prev_out, rem_out
+
+
+class TestComputeRemaining(unittest.TestCase):
+    """Test the chain against the VBA rules"""
+
+    def test_matches_row_by_row_reference(self):
+        rng = random.Random(7)
+        rows = []
+        for _ in range(400):
+            row = {name: rng.randint(0, 4) for name in COUNTS}
+            row["WardCode"] = rng.choice(["MW", "FW", "CW", "NEW"])
+            row["EntryDate"] = 46023 + rng.randint(0, 40)  # duplicates on purpose
+            row["PrevRemaining"] = row["Remaining"] = 0
+            rows.append(row)
+        rows[5]["WardCode"] = None
+        rows[9]["EntryDate"] = None
+        prev_year = {"MW": 12, "FW": 3, "CW": 0}
+
+        result = compute_remaining(_daily(rows), prev_year)
+        prev, rem = _vba_reference(rows, prev_year)
+        for i in range(len(rows)):
+            if i in prev:
+                self.assertEqual((result.prev_remaining[i], result.remaining[i]), (prev[i], rem[i]), i)
+            else:
+                self.assertFalse(result.computed[i])
+        self.assertEqual(int(result.computed.sum()), len(prev))
+
+    def test_deaths_under_24_hours_reduce_remaining(self):
+        rows = [dict(WardCode="MW", EntryDate=46023, Admissions=5, Discharges=1, Deaths=1,
+                     DeathsUnder24Hrs=1, TransfersIn=2, TransfersOut=1, PrevRemaining=10, Remaining=13)]
+        result = compute_remaining(_daily(rows), {"MW": 10})
+        self.assertEqual(result.remaining.tolist(), [13])
+        self.assertFalse(result.mismatched.any())
+
+    def test_stored_disagreement_is_flagged(self):
+        base = dict(Discharges=0, Deaths=0, DeathsUnder24Hrs=0, TransfersIn=0, TransfersOut=0)
+        rows = [dict(base, WardCode="MW", EntryDate=46023, Admissions=2, PrevRemaining=0, Remaining=2),
+                dict(base, WardCode="MW", EntryDate=46024, Admissions=1, PrevRemaining=2, Remaining=4)]
+        result = compute_remaining(_daily(rows), {})
+        self.assertEqual(result.mismatched.tolist(), [False, True])
+        self.assertEqual(result.remaining.tolist(), [2, 3])
+
+
+class TestAuditRemaining(unittest.TestCase):
+    """Test auditing a saved workbook"""
+
+    def test_audit_reports_sheet_rows(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "book.xlsx")
+            config = WorkbookConfig(year=2026)
+            build_structure(config, path)
+            wb = load_workbook(path)
+            ward = config.WARDS[0]
+            seed = wb["Control"].cell(row=4, column=4).value or 0
+            ws = wb["DailyData"]
+            rows = [
+                [datetime(2026, 1, 1), 1, ward.code, 3, 1, 0, 0, 0, 0, seed, seed + 2],
+                [datetime(2026, 1, 2), 1, ward.code, 1, 0, 0, 0, 0, 0, seed + 2, seed + 9],
+            ]
+            for i, row in enumerate(rows, 2):
+                for j, v in enumerate(row, 1):
+                    ws.cell(row=i, column=j, value=v)
+            ws.tables["tblDaily"].ref = "A1:L3"
+            wb.save(path)
+
+            audit = audit_remaining(path)
+        self.assertEqual((audit.rows, audit.computed), (2, 2))
+        mismatch, = audit.mismatches
+        self.assertEqual((mismatch.sheet_row, mismatch.remaining), (3, seed + 3))
+        self.assertIn("1 disagree", audit.format())
+
+
+if __name__ == "__main__":
+    unittest.main()
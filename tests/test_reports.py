@@ -0,0 +1,190 @@
+"""
+Tests for the headless report sheets
+
+Usage:
+    python -m pytest tests/test_reports.py -v
+"""
+import csv
+import os
+import random
+import sys
+import tempfile
+import unittest
+from datetime import date, datetime
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from openpyxl import load_workbook
+
+from src.config import WorkbookConfig
+from src.phase1_structure import build_structure
+from src.reports import (NO_ADMISSIONS, NO_CAUSES, NO_DEATHS, NO_NON_INSURED, NON_INSURED_HEADERS,
+                         cod_matrix, normalize_cause, write_cod_summary, write_non_insured_csv,
+                         write_reports)
+from src.xlsx import load_tables
+
+CAUSES = ["Malaria", " malaria", "MALARIA  ", "Severe  anaemia", "severe anaemia",
+          "Sepsis", "0", "", None, 0, "Birth asphyxia"]
+
+
+def _build(path, rows):
+    """Workbook with tblDeaths rows of (month, cause)."""
+    build_structure(WorkbookConfig(year=2024), path)
+    wb = load_workbook(path)
+    ws = wb["DeathsData"]
+    for r, (month, cause) in enumerate(rows, 2):
+        ws.cell(row=r, column=1, value=f"D{r}")
+        ws.cell(row=r, column=3, value=month)
+        ws.cell(row=r, column=11, value=cause)
+    ws.tables["tblDeaths"].ref = f"A1:M{max(len(rows), 1) + 1}"
+    wb.save(path)
+
+
+def _add_admissions(path, rows):
+    """Append tblAdmissions rows of (date, ward, id, name, age, unit, sex, nhis)."""
+    wb = load_workbook(path)
+    ws = wb["Admissions"]
+    for r, (admitted, *values) in enumerate(rows, 2):
+        ws.cell(row=r, column=1, value=f"A{r}")
+        ws.cell(row=r, column=2, value=admitted)
+        ws.cell(row=r, column=3, value=admitted.month if admitted else None)
+        for col, v in zip(range(4, 11), values):
+            ws.cell(row=r, column=col, value=v)
+    ws.tables["tblAdmissions"].ref = f"A1:K{max(len(rows), 1) + 1}"
+    wb.save(path)
+
+
+def _vba_cod(rows):
+    """RefreshCODSummary's loops, with causes compared by normalize_cause."""
+    labels = {}
+    for _, cause in rows:
+        text = "" if cause is None else str(cause)
+        key = normalize_cause(text)
+        if key not in ("", "0") and key not in labels:
+            labels[key] = " ".join(text.split())
+    return [[label] + [sum(1 for m, c in rows if m == month and c is not None
+                           and normalize_cause(str(c)) == key) for month in range(1, 13)]
+            for key, label in labels.items()]
+
+
+def _cod_sheet(ws):
+    return [[ws.cell(row=r, column=c).value for c in range(1, 14)]
+            for r in range(3, ws.max_row + 1) if ws.cell(row=r, column=1).value is not None]
+
+
+class TestCODSummary(unittest.TestCase):
+
+    def test_matches_vba_loops(self):
+        rng = random.Random(3)
+        rows = [(rng.choice(list(range(1, 13)) + [None, 13]), rng.choice(CAUSES)) for _ in range(400)]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "book.xlsx")
+            _build(path, rows)
+            matrix = cod_matrix(load_tables(path, ["tblDeaths"])["tblDeaths"])
+            write_cod_summary(path)
+            wb = load_workbook(path)
+        expected = _vba_cod(rows)
+        self.assertEqual(len(expected), 4)   # Malaria, Severe anaemia, Sepsis, Birth asphyxia
+        self.assertEqual(matrix.causes, [row[0] for row in expected])
+        self.assertEqual(_cod_sheet(wb["COD Summary"]), expected)
+        ws = wb["COD Summary"]
+        for r, row in enumerate(expected, 3):
+            self.assertEqual(ws.cell(row=r, column=14).value, sum(row[1:]))
+        self.assertTrue(ws["A2"].font.b)   # headers untouched
+        np.testing.assert_array_equal(matrix.counts, np.array([row[1:] for row in expected]))
+
+    def test_rewrite_clears_old_rows(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "book.xlsx")
+            _build(path, [(1, f"Cause {i}") for i in range(10)])
+            write_cod_summary(path)
+            _build(path, [(2, "Sepsis")])
+            wb = load_workbook(path)
+            wb["COD Summary"]["A8"] = "stale"
+            wb.save(path)
+            write_cod_summary(path)
+            ws = load_workbook(path)["COD Summary"]
+        self.assertEqual(_cod_sheet(ws), [["Sepsis", 0, 1] + [0] * 10])
+
+    def test_no_records_and_no_causes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "book.xlsx")
+            _build(path, [])
+            write_cod_summary(path)
+            self.assertEqual(load_workbook(path)["COD Summary"]["A3"].value, NO_DEATHS)
+            _build(path, [(1, ""), (2, "0")])
+            write_cod_summary(path)
+            self.assertEqual(load_workbook(path)["COD Summary"]["A3"].value, NO_CAUSES)
+
+
+class TestNonInsuredReport(unittest.TestCase):
+
+    def _admissions(self):
+        rng = random.Random(8)
+        rows = []
+        for i in range(300):
+            admitted = rng.choice([date(2024, rng.randint(1, 12), rng.randint(1, 28)), None])
+            rows.append((admitted, rng.choice(["MW", "FW", "CW", None]), f"P{i}", f"Name {i}",
+                         rng.choice([30, 2.5, None]), rng.choice(["Years", "Months", None]),
+                         rng.choice(["M", "F"]),
+                         rng.choice(["Insured", "Non-Insured", " non-insured ", "NON-INSURED", None])))
+        return rows
+
+    def test_filter_sort_and_layout(self):
+        rows = self._admissions()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "book.xlsx")
+            _build(path, [])
+            _add_admissions(path, rows)
+            _, report = write_reports(path)
+            write_non_insured_csv(report, os.path.join(tmp, "report.csv"))
+            with open(os.path.join(tmp, "report.csv"), newline="", encoding="utf-8") as f:
+                lines = list(csv.reader(f))
+            ws = load_workbook(path)["Non-Insured Report"]
+
+        selected = [r for r in rows if r[7] and r[7].strip().upper() == "NON-INSURED"]
+        # Stable sort: date, then ward code, undated and ward-less rows last
+        expected = sorted(selected, key=lambda r: (r[0] is None, r[0] or date.max,
+                                                   r[1] is None, r[1] or ""))
+        self.assertEqual([row[4] for row in report.rows], [r[2] for r in expected])
+        self.assertEqual(len(report.rows), ws.max_row - 2)
+
+        first = [ws.cell(row=3, column=c).value for c in range(1, 11)]
+        admitted, ward, pid, name, age, unit, sex, nhis = expected[0]
+        age_text = "" if age is None else f"{age:g} {unit}" if unit else f"{age:g}"
+        self.assertEqual(first, [1, datetime.combine(admitted, datetime.min.time()),
+                                 admitted.strftime("%B"), ward, pid, name, age_text or None, sex,
+                                 None, nhis.strip()])
+        self.assertEqual(ws["B3"].number_format, "dd/mm/yyyy")
+        self.assertEqual(lines[0], NON_INSURED_HEADERS)
+        self.assertEqual(lines[1][:3], ["1", admitted.strftime("%d/%m/%Y"), admitted.strftime("%B")])
+        self.assertEqual(len(lines), len(report.rows) + 1)
+
+    def test_none_found(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "book.xlsx")
+            _build(path, [])
+            _add_admissions(path, [(date(2024, 1, 2), "MW", "P1", "A", 3, "Years", "M", "Insured")])
+            write_reports(path)
+            ws = load_workbook(path)["Non-Insured Report"]
+        self.assertEqual(ws["A3"].value, NO_NON_INSURED)
+        self.assertEqual(ws.max_row, 3)
+
+    def test_no_admissions(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "book.xlsx")
+            _build(path, [])
+            _, report = write_reports(path)
+            ws = load_workbook(path)["Non-Insured Report"]
+        self.assertEqual(report.rows, [])
+        self.assertEqual(ws["A3"].value, NO_ADMISSIONS)
+        self.assertEqual(ws.max_row, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
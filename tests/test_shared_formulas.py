@@ -0,0 +1,108 @@
+"""
+Tests for the shared-formula post-processor
+
+Usage:
+    python -m pytest tests/test_shared_formulas.py -v
+"""
+import os
+import sys
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from openpyxl import Workbook, load_workbook
+
+from src.config import WorkbookConfig
+from src.phase1_structure import build_ward_sheet
+from src.xlsx import share_formulas
+from src.xlsx.shared_formulas import r1c1_key, share_sheet_xml
+
+
+class TestR1C1Key(unittest.TestCase):
+    """Test formula normalisation"""
+
+    def test_relative_refs_follow_the_cell(self):
+        self.assertEqual(r1c1_key("A7+$B$1", 7, 3), r1c1_key("A8+$B$1", 8, 3))
+        self.assertNotEqual(r1c1_key("A7+$B$1", 7, 3), r1c1_key("A7+$B$1", 8, 3))
+
+    def test_mixed_refs(self):
+        self.assertEqual(r1c1_key("DATE(2026,1,$A7)", 7, 2), "DATE(2026,1,R[0]C1)")
+        self.assertEqual(r1c1_key("SUM(B$4:B6)", 7, 2), "SUM(R4C[0]:R[-1]C[0])")
+
+    def test_literals_and_structured_refs_untouched(self):
+        formula = 'SUMIFS(tblDaily[Admissions],tblDaily[WardCode],"A1")+LOG10(2)'
+        self.assertEqual(r1c1_key(formula, 5, 5), formula)
+        self.assertEqual(r1c1_key("tblDaily[[#This Row],[WardCode]]", 2, 1),
+                         "tblDaily[[#This Row],[WardCode]]")
+
+
+class TestShareFormulas(unittest.TestCase):
+    """Test rewriting a saved package"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "book.xlsx")
+        self.out = os.path.join(self.tmp.name, "shared.xlsx")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _formulas(self, path):
+        wb = load_workbook(path)
+        return {(ws.title, c.coordinate): c.value
+                for ws in wb.worksheets for row in ws.iter_rows() for c in row
+                if c.value is not None}
+
+    def test_runs_become_shared_and_round_trip(self):
+        wb = Workbook()
+        ws = wb.active
+        for r in range(1, 11):
+            ws.cell(row=r, column=1, value=r)
+            ws.cell(row=r, column=2, value=f"=IFERROR(SUMIFS(tblDaily[Admissions],tblDaily[Month],$A{r}),0)")
+        ws["B5"] = "=SUM(A1:A4)"  # breaks the run
+        wb.save(self.path)
+
+        report = share_formulas(self.path, self.out)
+        sheet, = report.sheets
+        self.assertEqual(sheet.formula_cells, 10)
+        self.assertEqual(sheet.groups, 2)  # B1:B4 and B6:B10
+        self.assertEqual(sheet.shared_cells, 9)
+        self.assertLess(sheet.xml_after, sheet.xml_before)
+
+        with zipfile.ZipFile(self.out) as zf:
+            xml = zf.read("xl/worksheets/sheet1.xml")
+        self.assertIn(b'ref="B1:B4" si="0"', xml)
+        self.assertIn(b'ref="B6:B10" si="1"', xml)
+        self.assertEqual(self._formulas(self.out), self._formulas(self.path))
+
+    def test_existing_shared_ids_are_not_reused(self):
+        xml = (b'<row r="1"><c r="A1"><f t="shared" ref="A1:A2" si="4">B1</f></c></row>'
+               b'<row r="2"><c r="A2"><f t="shared" si="4"/></c>'
+               b'<c r="C2"><f>SUMIFS(tblX[Y],tblX[Z],D2)</f></c></row>'
+               b'<row r="3"><c r="C3"><f>SUMIFS(tblX[Y],tblX[Z],D3)</f></c></row>')
+        new, formulas, shared, groups = share_sheet_xml(xml)
+        self.assertEqual((formulas, shared, groups), (2, 2, 1))
+        self.assertIn(b'ref="C2:C3" si="5"', new)
+
+    def test_ward_sheet_months_share(self):
+        config = WorkbookConfig(year=2026)
+        wb = Workbook()
+        build_ward_sheet(wb, config, config.WARDS[0])
+        wb.remove(wb["Sheet"])
+        wb.save(self.path)
+
+        report = share_formulas(self.path, self.out)
+        sheet, = report.sheets
+        # Each month's daily block shares per column; totals stay unshared
+        self.assertGreater(sheet.shared_cells, 0.9 * sheet.formula_cells)
+        self.assertLess(sheet.xml_after, 0.5 * sheet.xml_before)
+        self.assertEqual(self._formulas(self.out), self._formulas(self.path))
+
+
+if __name__ == "__main__":
+    unittest.main()
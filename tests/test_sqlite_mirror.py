@@ -0,0 +1,94 @@
+"""
+Tests for the SQLite mirror of the data tables
+
+Usage:
+    python -m pytest tests/test_sqlite_mirror.py -v
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+from datetime import date, datetime
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.config import WorkbookConfig
+from src.data_entry import append_records
+from src.phase1_structure import build_structure
+from src.sqlite_mirror import row_keys, sync_workbook
+from src.xlsx.cell_writer import write_cells
+
+NOW = datetime(2025, 4, 2, 8, 15)
+
+
+class TestRowKeys(unittest.TestCase):
+
+    def test_repeats_get_their_own_key(self):
+        keys = row_keys([("MW", 1), ("FW", 1), ("MW", 1)])
+        self.assertEqual(len(set(keys)), 3)
+        self.assertEqual(keys[0].split(":")[0], keys[2].split(":")[0])
+        self.assertEqual(row_keys([("MW", 1)]), keys[:1])
+
+
+class TestSyncWorkbook(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "book.xlsx")
+        build_structure(WorkbookConfig(year=2025), self.path)
+        append_records(self.path, "tblDaily", [
+            {"EntryDate": date(2025, 3, d), "WardCode": w, "Admissions": d}
+            for d in (1, 2, 3) for w in ("MW", "FW")], now=NOW)
+        append_records(self.path, "tblAdmissions", [
+            {"AdmissionDate": date(2025, 3, 1), "WardCode": "MW", "Age": 40, "AgeUnit": "Years",
+             "Sex": "F", "NHIS": "Insured"}] * 3, now=NOW)
+        self.db = os.path.join(self.tmp.name, "mirror.sqlite")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _query(self, sql, *args):
+        db = sqlite3.connect(self.db)
+        try:
+            return db.execute(sql, args).fetchall()
+        finally:
+            db.close()
+
+    def test_mirror_and_incremental_resync(self):
+        first = {t.table: t for t in sync_workbook(self.path, self.db).tables}
+        self.assertEqual((first["tblDaily"].rows, first["tblDaily"].inserted), (6, 6))
+        self.assertEqual(first["tblAdmissions"].latest_entry, "2025-04-02 08:15:00")
+        self.assertEqual(first["tblWardConfig"].inserted, 9)
+
+        self.assertEqual(self._query("SELECT WardCode, SUM(Admissions), MAX(Remaining) FROM tblDaily "
+                                     "WHERE EntryDate BETWEEN '2025-03-01' AND '2025-03-31' "
+                                     "GROUP BY WardCode ORDER BY WardCode"),
+                         [("FW", 6, 6), ("MW", 6, 6)])
+        self.assertEqual(self._query("SELECT AdmissionID, Age, Sex FROM tblAdmissions ORDER BY AdmissionID"),
+                         [("A2025-00001", 40.0, "F"), ("A2025-00002", 40.0, "F"), ("A2025-00003", 40.0, "F")])
+        plan = self._query("EXPLAIN QUERY PLAN SELECT * FROM tblDaily WHERE WardCode = 'MW' "
+                           "AND EntryDate > '2025-03-01'")
+        self.assertIn("ix_tblDaily_WardCode_EntryDate", plan[0][-1])
+
+        # Nothing changed: nothing written
+        again = sync_workbook(self.path, self.db).tables
+        self.assertEqual(sum(t.inserted + t.deleted for t in again), 0)
+
+        # One new admission, one edited daily row
+        append_records(self.path, "tblAdmissions", [{"AdmissionDate": date(2025, 3, 4), "WardCode": "FW"}],
+                       now=NOW)
+        write_cells(self.path, {"DailyData": {(2, 5): 1}})   # Discharges of the first row
+        third = {t.table: t for t in sync_workbook(self.path, self.db).tables}
+        self.assertEqual((third["tblAdmissions"].inserted, third["tblAdmissions"].deleted), (1, 0))
+        self.assertEqual((third["tblDaily"].inserted, third["tblDaily"].deleted), (1, 1))
+        self.assertEqual(self._query("SELECT COUNT(*) FROM tblDaily"), [(6,)])
+        self.assertEqual(self._query("SELECT SUM(Discharges) FROM tblDaily"), [(1,)])
+        self.assertEqual(self._query("SELECT rows FROM sync_state WHERE table_name = 'tblAdmissions'"), [(4,)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,148 @@
+"""
+Tests for the in-place table appender and bulk data entry
+
+Usage:
+    python -m pytest tests/test_table_append.py -v
+"""
+import os
+import sys
+import tempfile
+import unittest
+import zipfile
+from datetime import date, datetime
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from openpyxl import load_workbook
+
+from src.config import WorkbookConfig
+from src.data_entry import append_records, next_ids
+from src.phase1_structure import build_structure
+from src.remaining import audit_remaining
+from src.xlsx.columnar import load_tables
+from src.xlsx.package import rewrite_package
+from src.xlsx.table_append import append_table_rows
+
+VBA_PROJECT = "xl/vbaProject.bin"
+NOW = datetime(2025, 3, 1, 9, 30)
+
+
+def _contents(path):
+    with zipfile.ZipFile(path) as zf:
+        return {name: zf.read(name) for name in zf.namelist()}
+
+
+class TestNextIds(unittest.TestCase):
+
+    def test_continues_highest_of_prefix_and_year(self):
+        existing = ["A2025-00007", "A2025-00003", "A2024-00090", "D2025-00050", "A2025-x", None, ""]
+        self.assertEqual(next_ids(existing, "A", 2025, 2), ["A2025-00008", "A2025-00009"])
+        self.assertEqual(next_ids([], "D", 2025, 1), ["D2025-00001"])
+
+
+class TestTableAppend(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.template = os.path.join(cls.tmp.name, "book.xlsm")
+        build_structure(WorkbookConfig(year=2025), cls.template)
+        # A stand-in VBA project: it must come through untouched
+        rewrite_package(cls.template, None, lambda src, name, data: data,
+                        added={VBA_PROJECT: bytes(range(256)) * 64})
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def setUp(self):
+        self.path = os.path.join(self.tmp.name, f"{self._testMethodName}.xlsm")
+        with open(self.template, "rb") as src, open(self.path, "wb") as dst:
+            dst.write(src.read())
+
+    def test_only_sheet_and_table_parts_change(self):
+        before = _contents(self.path)
+        append_records(self.path, "tblDeaths", [
+            {"DateOfDeath": date(2025, 2, 3), "WardCode": "MW", "CauseOfDeath": "Sepsis",
+             "DeathWithin24Hrs": True},
+            {"DateOfDeath": date(2025, 2, 3), "WardCode": "FW", "CauseOfDeath": "Malaria"}], now=NOW)
+        after = _contents(self.path)
+        changed = {name for name in before if before[name] != after.get(name)}
+        # styles.xml gains the yyyy-mm-dd formats the fresh workbook lacks
+        self.assertEqual(changed, {"xl/worksheets/sheet4.xml", "xl/tables/table6.xml", "xl/styles.xml"})
+        self.assertEqual(after[VBA_PROJECT], before[VBA_PROJECT])
+        self.assertEqual(set(after), set(before))
+
+        # Once the formats exist, later appends leave styles.xml alone
+        append_records(self.path, "tblDeaths", [{"DateOfDeath": date(2025, 2, 4), "WardCode": "FW"}], now=NOW)
+        again = _contents(self.path)
+        self.assertEqual({n for n in after if after[n] != again[n]},
+                         {"xl/worksheets/sheet4.xml", "xl/tables/table6.xml"})
+
+    def test_seed_row_then_below_table(self):
+        first = append_records(self.path, "tblAdmissions", [
+            {"AdmissionDate": date(2025, 1, 5), "WardCode": "MW", "Age": 30, "AgeUnit": "Years"},
+            {"AdmissionDate": date(2025, 2, 6), "WardCode": "FW", "Age": 2, "AgeUnit": "Months"}], now=NOW)
+        second = append_records(self.path, "tblAdmissions", [
+            {"AdmissionDate": None, "WardCode": "CW", "PatientName": "Ama & Co"}], now=NOW)
+        self.assertEqual((first.first_row, first.ref), (2, "A1:L3"))
+        self.assertEqual((second.first_row, second.ref), (4, "A1:L4"))
+
+        adm = load_tables(self.path, ["tblAdmissions"])["tblAdmissions"]
+        self.assertEqual(list(adm["AdmissionID"]), ["A2025-00001", "A2025-00002", "A2025-00003"])
+        self.assertEqual(list(adm["Month"]), [1, 2, 0])
+        self.assertEqual(adm["PatientName"][2], "Ama & Co")
+        self.assertEqual(str(adm["EntryTimestamp"][0]), "2025-03-01T09:30:00")
+        # Calculated AgeGroup: 20-34, 1-11 months, none
+        self.assertEqual(adm["AgeGroup"].tolist(), [8, 2, 0])
+
+        ws = load_workbook(self.path)["Admissions"]
+        self.assertEqual(ws.tables["tblAdmissions"].ref, "A1:L4")
+        self.assertEqual(ws.tables["tblAdmissions"].autoFilter.ref, "A1:L4")
+        self.assertEqual(ws["B2"].number_format, "yyyy-mm-dd")
+        self.assertEqual(ws["K2"].number_format, "yyyy-mm-dd hh:mm")
+
+    def test_daily_chain_and_cascade(self):
+        append_records(self.path, "tblDaily", [
+            {"EntryDate": date(2025, 1, 1), "WardCode": "MW", "Admissions": 5},
+            {"EntryDate": date(2025, 1, 3), "WardCode": "MW", "Discharges": 1},
+            {"EntryDate": date(2025, 1, 1), "WardCode": "FW", "Admissions": 2}], now=NOW)
+        # A back-dated entry: the later MW row must move with it
+        append_records(self.path, "tblDaily", [
+            {"EntryDate": date(2025, 1, 2), "WardCode": "MW", "Admissions": 3, "Deaths": 1}], now=NOW)
+
+        daily = load_tables(self.path, ["tblDaily"])["tblDaily"]
+        self.assertEqual(list(daily["PrevRemaining"]), [0, 7, 0, 5])
+        self.assertEqual(list(daily["Remaining"]), [5, 6, 2, 7])
+        self.assertEqual(audit_remaining(self.path).mismatches, [])
+
+        with self.assertRaises(ValueError):
+            append_records(self.path, "tblDaily", [{"EntryDate": date(2025, 1, 2), "WardCode": "MW"}])
+        with self.assertRaises(ValueError):
+            append_records(self.path, "tblDaily", [{"EntryDate": None, "WardCode": "MW"}])
+
+    def test_calculated_column(self):
+        path = os.path.join(self.tmp.name, "key.xlsx")
+        build_structure(WorkbookConfig(year=2025, daily_lookup_key=True), path)
+        append_records(path, "tblDaily", [
+            {"EntryDate": date(2025, 1, 1), "WardCode": "MW"},
+            {"EntryDate": date(2025, 1, 2), "WardCode": "FW"}], now=NOW)
+        ws = load_workbook(path)["DailyData"]
+        self.assertTrue(str(ws["M3"].value).startswith("=IFERROR(tblDaily[[#This Row],[WardCode]]"))
+        cached = load_workbook(path, data_only=True)["DailyData"]
+        self.assertEqual((cached["M2"].value, cached["M3"].value), ("MW|45658", "FW|45659"))
+
+    def test_rejects_bad_input(self):
+        with self.assertRaises(KeyError):
+            append_table_rows(self.path, "tblNope", [{}])
+        with self.assertRaises(ValueError):
+            append_table_rows(self.path, "tblDeaths", [{"NoSuchColumn": 1}])
+        with self.assertRaises(ValueError):
+            append_table_rows(self.path, "tblDeaths", [{}], updates={50: {"Age": 1}})
+
+
+if __name__ == "__main__":
+    unittest.main()
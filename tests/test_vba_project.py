@@ -0,0 +1,194 @@
+"""
+Tests for the offline vbaProject.bin writer
+
+Usage:
+    python -m pytest tests/test_vba_project.py -v
+"""
+import os
+import random
+import sys
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from openpyxl import Workbook, load_workbook
+
+from src.vba_injection import inject_vba_offline
+from src.vba_injection.offline import form_names, identifiers, procedures, without_form_procedures
+from src.vba_injection.compound_file import read_compound_file, write_compound_file
+from src.vba_injection.core import STANDARD_MODULES
+from src.vba_injection.vba_project import (
+    DOCUMENT, PROCEDURAL, WORKSHEET_BASE, VBAModule, build_vba_project,
+    compress, decompress, decrypt, encrypt, read_vba_project,
+)
+
+try:
+    import olefile
+except ImportError:
+    olefile = None
+
+
+class TestCompression(unittest.TestCase):
+    """Test the MS-OVBA compression algorithm"""
+
+    def test_spec_example_decompresses(self):
+        # [MS-OVBA] 3.2.3 "Example of Copy Tokens"
+        compressed = bytes.fromhex(
+            "012FB000236161616263646582660070616768696A01380861"
+            "6B6C00306D6E6F700671027004107273747576107778797A003C")
+        self.assertEqual(decompress(compressed),
+                         b"#aaabcdefaaaaghijaaaaaklaaamnopqaaaaaaaaaaaarstuvwxyzaaa")
+
+    def test_round_trip(self):
+        rng = random.Random(1)
+        samples = [b"", b"a", b"Attribute VB_Name = \"x\"\r\n" * 500,
+                   bytes(rng.getrandbits(8) for _ in range(9000))]
+        for data in samples:
+            self.assertEqual(decompress(compress(data)), data)
+
+    def test_source_text_compresses(self):
+        text = (project_root / "src" / "vba" / "modules" / "modDataAccess.bas").read_bytes()
+        self.assertLess(len(compress(text)), len(text) / 2)
+
+
+class TestCompoundFile(unittest.TestCase):
+    """Test the OLE2 writer against its reader"""
+
+    def test_round_trip_mini_and_regular_streams(self):
+        streams = {
+            "PROJECT": b"ID=\"{0}\"\r\n",
+            "VBA/dir": b"x" * 100,
+            "VBA/Big": bytes(range(256)) * 40,  # over the 4096-byte mini stream cutoff
+        }
+        streams.update({f"VBA/Sheet{i}": bytes([i]) * (i * 37) for i in range(1, 40)})
+        data = write_compound_file(streams)
+        self.assertEqual(len(data) % 512, 0)
+        self.assertEqual(read_compound_file(data), streams)
+
+    @unittest.skipIf(olefile is None, "olefile not installed")
+    def test_olefile_reads_output(self):
+        data = write_compound_file({"VBA/dir": b"d" * 10, "PROJECT": b"p" * 5000})
+        ole = olefile.OleFileIO(data)
+        self.assertEqual(ole.openstream("PROJECT").read(), b"p" * 5000)
+        self.assertEqual(ole.openstream("VBA/dir").read(), b"d" * 10)
+
+
+class TestVBAProject(unittest.TestCase):
+    """Test project assembly and read-back"""
+
+    def test_encryption_round_trip(self):
+        for seed in (0, 6, 0xFF):
+            self.assertEqual(decrypt(encrypt(b"\xFF", "{ABC}", seed)), b"\xFF")
+
+    def test_modules_read_back(self):
+        modules = [
+            VBAModule("modA", "Attribute VB_Name = \"old\"\nSub A()\n    MsgBox \"hi\"\nEnd Sub\n"),
+            VBAModule("Sheet1", "", DOCUMENT, WORKSHEET_BASE),
+        ]
+        data = build_vba_project(modules)
+        self.assertEqual(data, build_vba_project(modules))  # deterministic
+
+        read = read_vba_project(data)
+        kind, source = read["modA"]
+        self.assertEqual(kind, PROCEDURAL)
+        self.assertEqual(source, 'Attribute VB_Name = "modA"\r\nSub A()\r\n    MsgBox "hi"\r\nEnd Sub\r\n')
+        kind, source = read["Sheet1"]
+        self.assertEqual(kind, DOCUMENT)
+        self.assertIn(f'Attribute VB_Base = "{WORKSHEET_BASE}"', source)
+
+        project = read_compound_file(data)["PROJECT"].decode("cp1252")
+        self.assertIn("Module=modA\r\n", project)
+        self.assertIn("Document=Sheet1/&H00000000\r\n", project)
+
+    def test_duplicate_module_names_rejected(self):
+        with self.assertRaises(ValueError):
+            build_vba_project([VBAModule("modA", ""), VBAModule("MODA", "")])
+
+
+class TestInjectOffline(unittest.TestCase):
+    """Test producing an .xlsm without Excel"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.xlsx = os.path.join(self.tmp.name, "book.xlsx")
+        self.xlsm = os.path.join(self.tmp.name, "book.xlsm")
+        wb = Workbook()
+        wb.active.title = "Control"
+        for name in ("DailyData", "Admissions", "DeathsData", "TransfersData", "Male Medical"):
+            wb.create_sheet(name)
+        wb.save(self.xlsx)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_xlsm_package(self):
+        report = inject_vba_offline(self.xlsx, self.xlsm)
+        self.assertEqual(report.hidden, ["DailyData", "Admissions", "DeathsData", "TransfersData"])
+
+        with zipfile.ZipFile(self.xlsm) as zf:
+            types = zf.read("[Content_Types].xml")
+            rels = zf.read("xl/_rels/workbook.xml.rels")
+            modules = read_vba_project(zf.read("xl/vbaProject.bin"))
+        self.assertIn(b"application/vnd.ms-excel.sheet.macroEnabled.main+xml", types)
+        self.assertIn(b'Extension="bin"', types)
+        self.assertIn(b'Target="vbaProject.bin"', rels)
+
+        for name, _ in STANDARD_MODULES:
+            self.assertEqual(modules[name][0], PROCEDURAL)
+        self.assertIn("Workbook_Open", modules["ThisWorkbook"][1])
+        # DailyData is the second sheet, so its document module is Sheet2
+        self.assertIn("Worksheet_Change", modules["Sheet2"][1])
+        self.assertNotIn("Worksheet_Change", modules["Sheet1"][1])
+
+        wb = load_workbook(self.xlsm, keep_vba=True)
+        self.assertEqual(wb.code_name, "ThisWorkbook")
+        self.assertEqual(wb["DailyData"].sheet_properties.codeName, "Sheet2")
+        self.assertEqual(wb["DailyData"].sheet_state, "hidden")
+        self.assertEqual(wb["Male Medical"].sheet_state, "visible")
+
+    def test_references_resolve_within_project(self):
+        # Every form, module or procedure of src/vba a module names must be
+        # in the emitted project, or Option Explicit stops it compiling
+        vba_dir = project_root / "src" / "vba"
+        known = form_names()
+        for path in list((vba_dir / "modules").glob("*.bas")) + list((vba_dir / "workbook").glob("*.cls")):
+            known.add(path.stem.lower())
+            known |= {name.lower() for name, _, _ in procedures(path.read_text(encoding="utf-8"))}
+
+        report = inject_vba_offline(self.xlsx, self.xlsm)
+        with zipfile.ZipFile(self.xlsm) as zf:
+            modules = read_vba_project(zf.read("xl/vbaProject.bin"))
+        emitted = {name.lower() for name in modules}
+        for _, source in modules.values():
+            emitted |= {name.lower() for name, _, _ in procedures(source)}
+        for name, (_, source) in modules.items():
+            self.assertEqual(identifiers(source) & known - emitted, set(), name)
+        self.assertIn("modNavigation.ShowDailyEntry", report.left_out)
+        self.assertIn("ShowRefreshReports", modules["modNavigation"][1])
+
+    def test_form_procedures_dropped_with_callers(self):
+        modules = [
+            VBAModule("modA", "Sub ShowForm()\n    frmX.Show\nEnd Sub\n\n"
+                              "Sub Caller()\n    ShowForm\nEnd Sub\n\n"
+                              "Sub Other()\n    MsgBox \"frmX\" ' frmX\nEnd Sub\n"),
+            VBAModule("modB", "Sub UsesCaller()\n    Caller\nEnd Sub\n"),
+        ]
+        kept, dropped = without_form_procedures(modules, {"frmx"})
+        self.assertEqual(dropped, ["modA.ShowForm", "modA.Caller", "modB.UsesCaller"])
+        self.assertEqual(kept[0].code, "Sub Other()\n    MsgBox \"frmX\" ' frmX\nEnd Sub\n")
+        self.assertEqual(kept[1].code, "\n")
+
+    def test_missing_daily_data_sheet(self):
+        wb = Workbook()
+        wb.save(self.xlsx)
+        with self.assertRaises(ValueError):
+            inject_vba_offline(self.xlsx, self.xlsm)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,193 @@
+"""
+Tests for the OOXML package assembler and the parallel Phase 1 build
+
+Usage:
+    python -m pytest tests/test_xlsx_assembler.py -v
+"""
+import io
+import os
+import sys
+import tempfile
+import unittest
+import zipfile
+from copy import copy
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from openpyxl import Workbook, load_workbook
+from openpyxl.styles import Font, PatternFill
+from openpyxl.workbook.defined_name import DefinedName
+from openpyxl.worksheet.table import Table
+
+from src.config import WorkbookConfig
+from src.parallel_build import build_structure_parallel, render_shard
+from src.phase1_structure import build_structure
+from src.styles import styles_for
+from src.xlsx import assemble_packages
+
+
+def _package(wb: Workbook) -> bytes:
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+class TestAssemblePackages(unittest.TestCase):
+    """Test merging independently saved packages"""
+
+    def _two_packages(self):
+        wb1 = Workbook()
+        ws = wb1.active
+        ws.title = "First"
+        ws["A1"] = "red"
+        ws["A1"].font = Font(color="FF0000", bold=True)
+        ws["B1"] = 1.5
+        ws["B1"].number_format = "0.000"
+        ws["A3"], ws["B3"] = "Key", "Value"
+        ws["A4"], ws["B4"] = "a", 1
+        ws.add_table(Table(displayName="tblFirst", ref="A3:B4"))
+
+        wb2 = Workbook()
+        ws = wb2.active
+        ws.title = "Second"
+        # Different style order, so indices clash with wb1 unless remapped
+        ws["A1"] = "green"
+        ws["A1"].fill = PatternFill(start_color="00FF00", end_color="00FF00", fill_type="solid")
+        ws["A2"] = "red"
+        ws["A2"].font = Font(color="FF0000", bold=True)
+        ws["A3"] = 2.25
+        ws["A3"].number_format = "0.0%"
+        ws["C1"], ws["D1"] = "Key", "Value"
+        ws["C2"], ws["D2"] = "b", 2
+        ws.add_table(Table(displayName="tblSecond", ref="C1:D2"))
+        return _package(wb1), _package(wb2)
+
+    def test_sheet_order_and_values(self):
+        out = io.BytesIO()
+        names = assemble_packages(list(self._two_packages()), out)
+        self.assertEqual(names, ["First", "Second"])
+
+        wb = load_workbook(out)
+        self.assertEqual(wb.sheetnames, ["First", "Second"])
+        self.assertEqual(wb["First"]["B1"].value, 1.5)
+        self.assertEqual(wb["Second"]["A1"].value, "green")
+
+    def test_styles_are_remapped(self):
+        out = io.BytesIO()
+        assemble_packages(list(self._two_packages()), out)
+        wb = load_workbook(out)
+
+        self.assertTrue(wb["First"]["A1"].font.b)
+        self.assertEqual(wb["First"]["A1"].font.color.rgb, "00FF0000")
+        self.assertEqual(wb["First"]["B1"].number_format, "0.000")
+        self.assertEqual(wb["Second"]["A1"].fill.fgColor.rgb, "0000FF00")
+        self.assertFalse(wb["Second"]["A1"].font.b)
+        self.assertEqual(wb["Second"]["A2"].font.color.rgb, "00FF0000")
+        self.assertEqual(wb["Second"]["A3"].number_format, "0.0%")
+
+    def test_tables_are_renumbered(self):
+        out = io.BytesIO()
+        assemble_packages(list(self._two_packages()), out)
+        wb = load_workbook(out)
+
+        self.assertEqual(wb["First"].tables["tblFirst"].ref, "A3:B4")
+        self.assertEqual(wb["Second"].tables["tblSecond"].ref, "C1:D2")
+        ids = {wb["First"].tables["tblFirst"].id, wb["Second"].tables["tblSecond"].id}
+        self.assertEqual(len(ids), 2)
+
+    def test_named_styles_merged_by_name(self):
+        packages = []
+        for title in ("One", "Two"):
+            wb = Workbook()
+            wb.active.title = title
+            styles_for(wb).cell(wb.active, 1, 1, "bu_total", title)
+            packages.append(_package(wb))
+
+        out = io.BytesIO()
+        assemble_packages(packages, out)
+        wb = load_workbook(out)
+        self.assertEqual(wb.named_styles.count("bu_total"), 1)
+        self.assertEqual(wb["Two"]["A1"].style, "bu_total")
+
+    def test_defined_names_from_later_packages(self):
+        # openpyxl always writes <definedNames/>; other writers may leave it out
+        first, _ = self._two_packages()
+        src, dst = zipfile.ZipFile(io.BytesIO(first)), io.BytesIO()
+        with zipfile.ZipFile(dst, "w") as zf:
+            for item in src.infolist():
+                data = src.read(item)
+                if item.filename == "xl/workbook.xml":
+                    data = data.replace(b"<definedNames />", b"")
+                zf.writestr(item, data)
+        first = dst.getvalue()
+        self.assertNotIn(b"definedNames", zipfile.ZipFile(dst).read("xl/workbook.xml"))
+
+        wb = Workbook()
+        wb.active.title = "Named"
+        wb.defined_names["TotalBeds"] = DefinedName("TotalBeds", attr_text="Named!$A$1")
+        out = io.BytesIO()
+        assemble_packages([first, _package(wb)], out)
+
+        names = load_workbook(out).defined_names
+        self.assertEqual(names["TotalBeds"].attr_text, "Named!$A$1")
+
+    def test_duplicate_sheet_names_rejected(self):
+        wb = Workbook()
+        pkg = _package(wb)
+        with self.assertRaises(ValueError):
+            assemble_packages([pkg, pkg], io.BytesIO())
+
+
+class TestParallelBuild(unittest.TestCase):
+    """Test that the sharded build matches the sequential one"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.config = WorkbookConfig(year=2026)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_render_shard_drops_default_sheet(self):
+        wb = load_workbook(io.BytesIO(render_shard(self.config, [5])))
+        self.assertEqual(wb.sheetnames, [self.config.WARDS[0].name])
+
+    def test_no_emergency_wards(self):
+        self.config.WARDS = [w for w in self.config.WARDS if w.code not in ("MAE", "FAE")]
+        seq_path = os.path.join(self.tmp.name, "seq.xlsx")
+        par_path = os.path.join(self.tmp.name, "par.xlsx")
+        build_structure(self.config, seq_path)
+        build_structure_parallel(self.config, par_path, workers=1,
+                                 cache_dir=os.path.join(self.tmp.name, "cache"))
+
+        names = load_workbook(par_path).sheetnames
+        self.assertNotIn("Sheet", names)
+        self.assertEqual(names, load_workbook(seq_path).sheetnames)
+
+    def test_matches_sequential_build(self):
+        seq_path = os.path.join(self.tmp.name, "seq.xlsx")
+        par_path = os.path.join(self.tmp.name, "par.xlsx")
+        build_structure(self.config, seq_path)
+        build_structure_parallel(self.config, par_path, workers=1)
+
+        seq, par = load_workbook(seq_path), load_workbook(par_path)
+        self.assertEqual(seq.sheetnames, par.sheetnames)
+        for name in ("Control", "Monthly Summary", self.config.WARDS[0].name):
+            a, b = seq[name], par[name]
+            for row_a, row_b in zip(a.iter_rows(), b.iter_rows()):
+                for ca, cb in zip(row_a, row_b):
+                    self.assertEqual(ca.value, cb.value, ca.coordinate)
+                    self.assertEqual(copy(ca.font), copy(cb.font), ca.coordinate)
+                    self.assertEqual(copy(ca.fill), copy(cb.fill), ca.coordinate)
+                    self.assertEqual(copy(ca.border), copy(cb.border), ca.coordinate)
+                    self.assertEqual(ca.number_format, cb.number_format, ca.coordinate)
+        self.assertEqual(
+            sorted(t for ws in seq.worksheets for t in ws.tables),
+            sorted(t for ws in par.worksheets for t in ws.tables))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+"""
+Tests for the year-end carry-forward export
+
+Usage:
+    python -m pytest tests/test_year_end.py -v
+"""
+import os
+import random
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from openpyxl import load_workbook
+from openpyxl.utils import get_column_letter
+
+from src.config import WorkbookConfig
+from src.phase1_structure import build_structure
+from src.xlsx.columnar import TABLE_SCHEMAS, ColumnarTable, convert_column
+from src.year_end import carry_forward, last_remaining, write_carry_forward
+
+
+def _daily(rows):
+    """ColumnarTable from dicts of raw cell values (dates as Excel serials)."""
+    table = ColumnarTable("tblDaily", rows=len(rows), sheet_rows=np.arange(2, len(rows) + 2))
+    for name, kind in TABLE_SCHEMAS["tblDaily"].items():
+        table.columns[name] = convert_column([r.get(name) for r in rows], kind)
+    return table
+
+
+def _vba_reference(rows, codes):
+    """ExportCarryForward's scan, once per ward."""
+    result = {}
+    for code in codes:
+        last, last_date = 0, None
+        for r in rows:
+            if r.get("EntryDate") is not None and r.get("WardCode") == code:
+                if last_date is None or r["EntryDate"] > last_date:
+                    last, last_date = r["Remaining"], r["EntryDate"]
+        result[code] = last
+    return result
+
+
+class TestLastRemaining(unittest.TestCase):
+
+    def test_matches_vba_scan(self):
+        rng = random.Random(4)
+        codes = ["MW", "FW", "CW", "NICU"]
+        rows = [{"EntryDate": rng.choice([46300 + rng.randint(0, 30), None]),   # ties on purpose
+                 "WardCode": rng.choice(["MW", "FW", "CW", "mw", "XX", None]),
+                 "Remaining": rng.randint(0, 40)} for _ in range(500)]
+        self.assertEqual(last_remaining(_daily(rows), codes), _vba_reference(rows, codes))
+        self.assertEqual(last_remaining(_daily(rows), codes)["NICU"], 0)
+
+    def test_workbook_round_trip(self):
+        config = WorkbookConfig(year=2025)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "book.xlsx")
+            build_structure(config, path)
+            wb = load_workbook(path)
+            ws = wb["DailyData"]
+            headers = [c.value for c in ws[1]]
+            for r, (day, ward, remaining) in enumerate([(46000, "MW", 5), (46010, "MW", 7),
+                                                        (46005, "FW", 3)], 2):
+                for name, value in [("EntryDate", day), ("WardCode", ward), ("Remaining", remaining)]:
+                    ws.cell(row=r, column=headers.index(name) + 1, value=value)
+            ws.tables["tblDaily"].ref = f"A1:{get_column_letter(len(headers))}4"
+            wb.save(path)
+
+            result = carry_forward(path)
+            json_path = os.path.join(tmp, "config", "carry_forward_2025.json")
+            write_carry_forward(result, json_path)
+            next_year = WorkbookConfig(year=2026, carry_forward_path=json_path)
+
+        self.assertEqual(result.year, 2025)
+        self.assertEqual(list(result.wards), [w.code for w in config.WARDS])
+        self.assertEqual((result.wards["MW"], result.wards["FW"], result.wards["CW"]), (7, 3, 0))
+        self.assertEqual({w.code: w.prev_year_remaining for w in next_year.WARDS}, result.wards)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+"""
+Append records to a workbook's tblDaily, tblAdmissions or tblDeaths
+
+Loads many forms at once (back-entered or scanned) without Excel: the rows
+are added to the table inside the .xlsm package, leaving the VBA project
+untouched. IDs, Month, EntryTimestamp and, for tblDaily, PrevRemaining and
+Remaining are filled in as the VBA Save routines fill them.
+
+The input is a CSV file with a header row of table column names, or a JSON
+list of objects with the same keys. Dates may be yyyy-mm-dd or dd/mm/yyyy.
+
+Usage:
+    python tools/append_records.py Bed_Utilization_2026.xlsm tblAdmissions march.csv
+    python tools/append_records.py Bed_Utilization_2026.xlsm tblDaily daily.json
+    python tools/append_records.py Bed_Utilization_2026.xlsm tblDeaths deaths.csv -o out.xlsm
+    python tools/append_records.py Bed_Utilization_2026.xlsm tblDaily daily.json --journal entries.jsonl
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.data_entry import ENTRY_TABLES, append_records
+from src.journal import Journal
+from src.xlsx.columnar import COUNT, DATE, FLAG, NUMBER, TABLE_SCHEMAS, TIMESTAMP
+
+_DATE_FORMATS = ["%Y-%m-%d", "%d/%m/%Y", "%Y-%m-%d %H:%M", "%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S"]
+
+
+def _parse(value, kind):
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    if not isinstance(value, str):
+        return value
+    value = value.strip()
+    if kind in (DATE, TIMESTAMP):
+        for fmt in _DATE_FORMATS:
+            try:
+                parsed = datetime.strptime(value, fmt)
+            except ValueError:
+                continue
+            return parsed.date() if kind == DATE else parsed
+        raise ValueError(f"Not a date: {value!r}")
+    if kind == COUNT:
+        return int(float(value))
+    if kind == NUMBER:
+        return float(value)
+    if kind == FLAG:
+        return value.upper() in ("TRUE", "YES", "Y", "1")
+    return value
+
+
+def read_records(path, table):
+    """Records of a CSV or JSON file, typed by the table's schema."""
+    if path.lower().endswith(".json"):
+        with open(path, encoding="utf-8") as f:
+            raw = json.load(f)
+    else:
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            raw = list(csv.DictReader(f))
+    schema = TABLE_SCHEMAS[table]
+    return [{k: _parse(v, schema.get(k)) for k, v in r.items()} for r in raw]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Append records to a data table without Excel")
+    parser.add_argument("workbook", help="Workbook to update (.xlsx/.xlsm)")
+    parser.add_argument("table", choices=sorted(ENTRY_TABLES), help="Table to append to")
+    parser.add_argument("records", help="CSV (header row of column names) or JSON list of objects")
+    parser.add_argument("-o", "--output", help="Write to this path instead of updating the workbook")
+    parser.add_argument("--journal", help="Also record the new rows in this entry journal (.jsonl)")
+    args = parser.parse_args()
+
+    records = read_records(args.records, args.table)
+    start = time.perf_counter()
+    try:
+        result = append_records(args.workbook, args.table, records, args.output,
+                                journal=Journal(args.journal) if args.journal else None)
+    except ValueError as e:
+        sys.exit(f"Error: {e}")
+    last = result.first_row + result.rows - 1
+    print(f"Appended {result.rows} rows to {result.table} ({result.sheet}!{result.first_row}:{last}, "
+          f"table {result.ref}) in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Keep a columnar archive of every year's data tables
+
+Exports the data tables of one or more yearly workbooks into an archive
+directory of memory-mapped NumPy columns (one subdirectory per year), and
+lists what the archive holds. Load it in Python with src.archive.open_archive.
+
+Usage:
+    python tools/archive.py export archive Bed_Utilization_2024.xlsm Bed_Utilization_2025.xlsm
+    python tools/archive.py export archive old_copy.xlsm --year 2023
+    python tools/archive.py list archive
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.archive import ARCHIVE_TABLES, archive_years, export_year, open_archive
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Columnar archive of the yearly data tables")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="Add or replace years from workbooks")
+    export.add_argument("archive", help="Archive directory")
+    export.add_argument("workbooks", nargs="+", help="Workbooks to export (.xlsx/.xlsm)")
+    export.add_argument("--year", type=int, help="Year to file a single workbook under (default: Control!B5)")
+    listing = commands.add_parser("list", help="Rows per table and year")
+    listing.add_argument("archive", help="Archive directory")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        if args.year and len(args.workbooks) > 1:
+            parser.error("--year needs a single workbook")
+        for path in args.workbooks:
+            result = export_year(path, args.archive, args.year)
+            print(f"{result.year}: {sum(result.rows.values())} rows, "
+                  f"{result.bytes / 1e6:.1f} MB from {os.path.basename(path)}")
+        return
+
+    if not archive_years(args.archive):
+        print(f"No years in {args.archive}")
+        return
+    print(f"{'Year':<6}" + "".join(f"{name:>15}" for name in ARCHIVE_TABLES))
+    for year, tables in open_archive(args.archive).items():
+        print(f"{year:<6}" + "".join(f"{len(tables[name]):>15}" for name in ARCHIVE_TABLES))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""
+Audit the PrevRemaining/Remaining chain of a workbook's tblDaily
+
+Recomputes every ward's chain in Python (same formula as the VBA
+CalculateRemainingForRow) and lists rows whose stored values disagree.
+Exits with status 1 when any row is wrong, so it can gate scripts.
+
+Usage:
+    python tools/audit_remaining.py Bed_Utilization_2026.xlsm
+    python tools/audit_remaining.py Bed_Utilization_2026.xlsm --limit 0
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.remaining import audit_remaining
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check tblDaily PrevRemaining/Remaining values")
+    parser.add_argument("workbook", help="Workbook to audit (.xlsx/.xlsm)")
+    parser.add_argument("--limit", type=int, default=20,
+                        help="Rows to list (0 = all, default: 20)")
+    args = parser.parse_args()
+
+    audit = audit_remaining(args.workbook)
+    print(audit.format(args.limit or None))
+    sys.exit(1 if audit.mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
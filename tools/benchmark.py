@@ -0,0 +1,86 @@
+"""
+Phase 1 build benchmark
+
+Builds the workbook (no VBA) for every ward count x preference combination x
+leap/non-leap year, records build time, file size, cell/formula counts and
+peak memory, and fails (exit code 1) when a case regresses against the
+stored baseline.
+
+Usage:
+    python tools/benchmark.py                       # full matrix (4 x 8 x 2 cases)
+    python tools/benchmark.py --quick               # 9/30 wards, prefs all off/all on
+    python tools/benchmark.py --wards 9,100 --years 2028
+    python tools/benchmark.py --quick --update-baseline
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.benchmark import (
+    PREF_FLAGS, WARD_COUNTS, YEARS, cases, compare, load_baseline, run_isolated, save_baseline,
+)
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                "benchmarks", "baseline.json")
+
+
+def _int_list(text):
+    return [int(x) for x in text.split(",") if x.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Phase 1 workbook generation")
+    parser.add_argument("--wards", type=_int_list, default=list(WARD_COUNTS),
+                        help="Comma-separated ward counts (default: 9,30,100,250)")
+    parser.add_argument("--years", type=_int_list, default=list(YEARS),
+                        help="Comma-separated years (default: 2027,2028 = non-leap, leap)")
+    parser.add_argument("--quick", action="store_true",
+                        help="9 and 30 wards, preferences all off and all on")
+    parser.add_argument("--baseline", type=str, default=DEFAULT_BASELINE,
+                        help="Baseline JSON (default: benchmarks/baseline.json)")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Store these results as the baseline instead of comparing")
+    parser.add_argument("--json", type=str, default=None, help="Also write the results as JSON")
+    args = parser.parse_args()
+
+    selected = cases(args.wards, args.years)
+    if args.quick:
+        selected = [c for c in cases((9, 30), args.years) if len(set(c.prefs)) == 1]
+
+    baseline = load_baseline(args.baseline)
+    print(f"{len(selected)} cases; prefs flags = {', '.join(PREF_FLAGS)}")
+    print(f"{'case':<22}{'build s':>9}{'MB file':>9}{'cells':>10}{'formulas':>10}{'peak MB':>9}  vs baseline")
+
+    results = []
+    for case in selected:
+        r = run_isolated(case)
+        results.append(r)
+        base = baseline.get(r["id"])
+        delta = f"{r['build_s'] / base['build_s'] - 1:+.0%} time" if base else "(new)"
+        print(f"{r['id']:<22}{r['build_s']:>9.2f}{r['bytes'] / 1e6:>9.2f}{r['cells']:>10}"
+              f"{r['formulas']:>10}{r['peak_rss_mb']:>9.1f}  {delta}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"results": results}, f, indent=1)
+
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        save_baseline(args.baseline, results)
+        print(f"\nBaseline updated: {args.baseline}")
+        return
+
+    regressions = compare(results, baseline)
+    if regressions:
+        print(f"\nREGRESSIONS ({len(regressions)}):")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print("\nNo regressions against baseline." if baseline else "\nNo baseline to compare against.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""
+Store computed values alongside every formula of a workbook
+
+Evaluates the workbook's formulas (the SUMIFS / COUNTIFS / INDEX / MATCH /
+IFERROR subset the builders emit) against its own table contents and writes
+the results as cached values. When every formula is supported, Excel opens
+the file without recalculating and viewers without a calc engine show the
+figures.
+
+Usage:
+    python tools/cache_values.py Bed_Utilization_2026.xlsx
+    python tools/cache_values.py Bed_Utilization_2026.xlsm -o Bed_Utilization_2026_cached.xlsm
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.xlsx import fill_cached_values
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write cached values for every formula cell")
+    parser.add_argument("workbook", help="Workbook to process (.xlsx/.xlsm)")
+    parser.add_argument("-o", "--output", type=str, default=None,
+                        help="Write here instead of overwriting the workbook")
+    args = parser.parse_args()
+
+    report = fill_cached_values(args.workbook, args.output)
+    print(report.format())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Year-end rollover without Excel
+
+Exports the carry-forward figures of a workbook (each ward's last
+Remaining, as the Export Carry Forward macro does) to
+config/carry_forward_YYYY.json next to the workbook, and optionally builds
+next year's workbook from them. Other arguments are passed on to
+build_workbook.py, which runs from the project root (so a relative
+--output-dir is relative to it).
+
+Usage:
+    python tools/carry_forward.py Bed_Utilization_2026.xlsm
+    python tools/carry_forward.py Bed_Utilization_2026.xlsm --recompute
+    python tools/carry_forward.py Bed_Utilization_2026.xlsm --build --offline-vba
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from src.year_end import carry_forward, write_carry_forward
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export carry-forward data and roll over to next year")
+    parser.add_argument("workbook", help="Workbook of the year being closed (.xlsx/.xlsm)")
+    parser.add_argument("--output", help="JSON path (default: config/carry_forward_<year>.json "
+                                         "next to the workbook)")
+    parser.add_argument("--recompute", action="store_true",
+                        help="Use the recomputed Remaining chain instead of the stored values")
+    parser.add_argument("--build", action="store_true",
+                        help="Then build next year's workbook with build_workbook.py")
+    args, build_args = parser.parse_known_args()
+    if build_args and not args.build:
+        parser.error(f"unrecognized arguments: {' '.join(build_args)}")
+
+    start = time.perf_counter()
+    result = carry_forward(args.workbook, args.recompute)
+    output = os.path.abspath(args.output or os.path.join(
+        os.path.dirname(os.path.abspath(args.workbook)), "config", f"carry_forward_{result.year}.json"))
+    write_carry_forward(result, output)
+    print(f"Carry-forward for {result.year} written to {output} "
+          f"({time.perf_counter() - start:.2f}s)")
+    for code, remaining in result.wards.items():
+        print(f"  {code:<8}{remaining:>6}")
+
+    if args.build:
+        command = [sys.executable, os.path.join(PROJECT_ROOT, "build_workbook.py"),
+                   "--year", str(result.year + 1), "--carry-forward", output] + build_args
+        print(f"\n{' '.join(command)}")
+        sys.exit(subprocess.call(command, cwd=PROJECT_ROOT))
+
+
+if __name__ == "__main__":
+    main()
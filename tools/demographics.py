@@ -0,0 +1,58 @@
+"""
+Age/sex/insurance summaries of a workbook without Excel
+
+Buckets tblAdmissions and tblDeaths once into a (month, ward, age group,
+sex, NHIS) cube and prints the DHIMS Summary for any ward/month filter, or
+writes the Ages Summary, Deaths Summary and DHIMS Summary sheets as static
+values (replacing their COUNTIFS formulas).
+
+Usage:
+    python tools/demographics.py Bed_Utilization_2026.xlsm
+    python tools/demographics.py Bed_Utilization_2026.xlsm --ward MW --month 3
+    python tools/demographics.py Bed_Utilization_2026.xlsm --write
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.age_groups import AGE_GROUPS
+from src.demographics import (ALL_MONTHS, ALL_WARDS, build_cubes, dhims_summary,
+                              write_demographic_summaries)
+from src.xlsx import load_tables
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ages/Deaths/DHIMS summaries from a saved workbook")
+    parser.add_argument("workbook", help="Workbook to read (.xlsx/.xlsm)")
+    parser.add_argument("--ward", help=f"DHIMS ward filter (default: {ALL_WARDS})")
+    parser.add_argument("--month", type=int, help=f"DHIMS month filter 1-12 (default: {ALL_MONTHS})")
+    parser.add_argument("--write", action="store_true",
+                        help="Write the three summary sheets as static values")
+    parser.add_argument("--output", help="With --write: save to this path instead of in place")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.write:
+        write_demographic_summaries(args.workbook, args.output, args.ward, args.month)
+        print(f"Wrote Ages Summary, Deaths Summary and DHIMS Summary values to "
+              f"{args.output or args.workbook} in {time.perf_counter() - start:.2f}s")
+        return
+
+    cubes = build_cubes(load_tables(args.workbook, ["tblAdmissions", "tblDeaths"]))
+    ward = args.ward or ALL_WARDS
+    month = args.month or ALL_MONTHS
+    figures = dhims_summary(cubes["tblAdmissions"], cubes["tblDeaths"], ward, month)
+    print(f"DHIMS Summary: {ward}, {month} ({time.perf_counter() - start:.2f}s)")
+    print(f"{'':<14}{'Insured':^32}{'Non-Insured':^32}{'Total':^16}")
+    print(f"{'Age group':<14}" + "".join(f"{h:>8}" for h in
+                                         ["Adm M", "Adm F", "Dth M", "Dth F"] * 2 + ["M", "F"]))
+    labels = [g.dhims_label for g in AGE_GROUPS] + ["TOTAL"]
+    for label, row in zip(labels, figures):
+        print(f"{label:<14}" + "".join(f"{v:>8}" for v in row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Formula-cost report for a generated workbook
+
+Shows, per sheet, how many SUMIFS / COUNTIFS / INDEX-MATCH cells it holds,
+which table columns they scan, and the estimated recalculation cost at a
+given number of rows in tblDaily / tblAdmissions / tblDeaths.
+
+Usage:
+    python tools/formula_cost.py Bed_Utilization_2026.xlsm
+    python tools/formula_cost.py Bed_Utilization_2026.xlsx --rows tblDaily=3300 --rows tblAdmissions=8000
+    python tools/formula_cost.py Bed_Utilization_2026.xlsx --columns --json cost.json
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.formula_cost import analyze_workbook, format_report, resolve_rows
+
+
+def _parse_rows(items):
+    rows = {}
+    for item in items:
+        table, _, count = item.partition("=")
+        if not count.isdigit():
+            raise argparse.ArgumentTypeError(f"Expected TABLE=ROWS, got '{item}'")
+        rows[table] = int(count)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Estimate per-sheet formula recalculation cost")
+    parser.add_argument("workbook", help="Workbook built by build_workbook.py (.xlsx/.xlsm)")
+    parser.add_argument(
+        "--rows", action="append", default=[], metavar="TABLE=ROWS",
+        help="Evaluate at this row count instead of the table's current size (repeatable)"
+    )
+    parser.add_argument("--columns", action="store_true", help="List scanned columns per sheet")
+    parser.add_argument("--json", type=str, default=None, help="Also write the raw profile as JSON")
+    args = parser.parse_args()
+
+    sheets = analyze_workbook(args.workbook)
+    rows = resolve_rows(args.workbook, _parse_rows(args.rows))
+    print(format_report(sheets, rows, show_columns=args.columns))
+
+    if args.json:
+        data = {
+            "workbook": os.path.abspath(args.workbook),
+            "rows": rows,
+            "sheets": [
+                {
+                    "name": s.name,
+                    "formula_cells": s.formula_cells,
+                    "functions": dict(s.functions),
+                    "scans_per_row": s.scans_per_row(),
+                    "column_scans": {f"{t}[{c}]": n for (t, c), n in s.column_scans.items()},
+                    "estimated_cost": s.estimated_cost(rows),
+                }
+                for s in sheets
+            ],
+        }
+        with open(args.json, "w") as f:
+            json.dump(data, f, indent=2)
+        print(f"\nProfile written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Keep an append-only journal of the data tables and rebuild workbooks from it
+
+Every change to tblDaily, tblAdmissions, tblDeaths, tblTransfers and
+tblWardConfig is one line of a JSON Lines journal; the tables, Remaining
+chain included, are rebuilt by replaying it from the last snapshot.
+
+Usage:
+    python tools/journal.py import Bed_Utilization_2026.xlsm entries.jsonl
+    python tools/journal.py status entries.jsonl
+    python tools/journal.py snapshot entries.jsonl
+    python tools/journal.py materialize entries.jsonl Bed_Utilization_2026.xlsm
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.journal import JOURNAL_TABLES, Journal, import_workbook, materialize_workbook
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Entry journal of the data tables")
+    commands = parser.add_subparsers(dest="command", required=True)
+    imp = commands.add_parser("import", help="Journal the rows of a workbook that differ from the journal")
+    imp.add_argument("workbook", help="Workbook to read (.xlsx/.xlsm)")
+    imp.add_argument("journal", help="Journal file (.jsonl)")
+    status = commands.add_parser("status", help="Replay the journal and print table sizes")
+    status.add_argument("journal", help="Journal file (.jsonl)")
+    snap = commands.add_parser("snapshot", help="Write a snapshot of the current tables")
+    snap.add_argument("journal", help="Journal file (.jsonl)")
+    mat = commands.add_parser("materialize", help="Write the tables into a workbook with empty data tables")
+    mat.add_argument("journal", help="Journal file (.jsonl)")
+    mat.add_argument("workbook", help="Workbook to fill, e.g. freshly built")
+    mat.add_argument("-o", "--output", help="Output path (default: overwrite the workbook)")
+    args = parser.parse_args()
+
+    journal = Journal(args.journal)
+    if args.command == "import":
+        before = journal.state().seq
+        skipped = import_workbook(args.workbook, journal)
+        journal.snapshot()
+        print(f"{journal.state().seq - before} events appended")
+        for name in JOURNAL_TABLES:
+            print(f"{name:<16}{len(journal.state().tables[name]):>8} rows  {skipped[name]} skipped")
+    elif args.command == "status":
+        start = time.perf_counter()
+        state = journal.state()
+        replay_s = time.perf_counter() - start
+        start = time.perf_counter()
+        tables = journal.materialize()
+        print(f"{args.journal}: {state.seq} events, replay {replay_s:.2f}s, "
+              f"materialize {time.perf_counter() - start:.2f}s")
+        for name in JOURNAL_TABLES:
+            print(f"{name:<16}{len(tables[name]):>8} rows")
+    elif args.command == "snapshot":
+        journal.snapshot()
+        print(f"{journal.snapshot_path}: {journal.state().seq} events")
+    else:
+        written = materialize_workbook(journal, args.workbook, args.output)
+        for name in JOURNAL_TABLES:
+            print(f"{name:<16}{written[name]:>8} rows")
+
+
+if __name__ == "__main__":
+    main()
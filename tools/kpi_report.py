@@ -0,0 +1,80 @@
+"""
+Compute the summary-sheet KPIs of a workbook without Excel
+
+Prints (or writes as CSV) the Monthly Summary, Quarterly Summary, Half-Year
+Summary and Statement of Inpatient figures, computed from tblDaily with the
+same definitions as the sheet formulas.
+
+Usage:
+    python tools/kpi_report.py Bed_Utilization_2026.xlsm
+    python tools/kpi_report.py Bed_Utilization_2026.xlsm --report quarterly
+    python tools/kpi_report.py Bed_Utilization_2026.xlsm --csv kpis_2026.csv
+    python tools/kpi_report.py Bed_Utilization_2026.xlsm --range 2026-02-10 2026-03-05
+    python tools/kpi_report.py Bed_Utilization_2026.xlsm --rolling 7 --csv rolling7.csv
+"""
+import argparse
+import csv
+import os
+import sys
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.kpi import COLUMNS, REPORTS, DateRange, workbook_index, workbook_kpis
+
+CHOICES = {
+    "monthly": "Monthly Summary",
+    "quarterly": "Quarterly Summary",
+    "halfyear": "Half-Year Summary",
+    "year": "Statement of Inpatient",
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bed utilization KPIs from a saved workbook")
+    parser.add_argument("workbook", help="Workbook to read (.xlsx/.xlsm)")
+    parser.add_argument("--report", choices=["all"] + list(CHOICES), default="all",
+                        help="Which summary to produce (default: all)")
+    parser.add_argument("--range", nargs=2, metavar=("FROM", "TO"), type=date.fromisoformat,
+                        help="Any window of days instead (YYYY-MM-DD, both included)")
+    parser.add_argument("--rolling", type=int, metavar="DAYS",
+                        help="A window of DAYS days ending on every day with data")
+    parser.add_argument("--csv", metavar="PATH", help="Write the figures to a CSV file")
+    args = parser.parse_args()
+
+    if args.range or args.rolling:
+        index = workbook_index(args.workbook)
+        if args.range:
+            start, end = args.range
+            if start > end:
+                parser.error(f"--range: FROM ({start}) is after TO ({end})")
+            report = index.query([DateRange(f"{start} to {end}", start, end)])
+        else:
+            report = index.rolling(args.rolling)
+    else:
+        sheets = list(CHOICES.values()) if args.report == "all" else [CHOICES[args.report]]
+        periods = [p for sheet in sheets for p in REPORTS[sheet]]
+        report = workbook_kpis(args.workbook, periods)
+
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=["Period", "Ward"] + COLUMNS)
+            writer.writeheader()
+            writer.writerows(report.records())
+        print(f"Wrote {len(report.periods) * len(report.rows)} rows to {args.csv} "
+              f"(computed in {report.seconds * 1000:.1f} ms)")
+        return
+
+    short = ["Beg", "BC", "Adm", "Dis", "Dth", "D<24", "PD", "TI", "TO",
+             "ADO", "ALOS", "TOI", "TOR", "%Occ", "DR"]
+    for p, period in enumerate(report.periods):
+        print(f"\n{period.label} ({report.days[p]} days)")
+        print(f"{'Ward':<18}" + "".join(f"{h:>9}" for h in short))
+        for r, row in enumerate(report.rows):
+            values = report.values[p, r]
+            print(f"{row:<18}" + "".join(f"{v:>9.0f}" for v in values[:9])
+                  + "".join(f"{v:>9.2f}" for v in values[9:]))
+
+
+if __name__ == "__main__":
+    main()
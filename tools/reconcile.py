@@ -0,0 +1,48 @@
+"""
+Reconcile a workbook's daily totals with its individual records
+
+Compares tblDaily Admissions, Deaths and DeathsUnder24Hrs with the
+tblAdmissions and tblDeaths records of the same date and ward, for every
+ward and day of the report year (the checks of modValidation), and lists
+every disagreement. Exits with status 1 when there is any, so it can gate
+scripts.
+
+Usage:
+    python tools/reconcile.py Bed_Utilization_2026.xlsm
+    python tools/reconcile.py Bed_Utilization_2026.xlsm --limit 0
+    python tools/reconcile.py Bed_Utilization_2026.xlsm --csv discrepancies.csv
+"""
+import argparse
+import csv
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.reconcile import reconcile_workbook
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check tblDaily totals against individual records")
+    parser.add_argument("workbook", help="Workbook to check (.xlsx/.xlsm)")
+    parser.add_argument("--year", type=int, help="Year to check (default: Control!B5)")
+    parser.add_argument("--limit", type=int, default=20,
+                        help="Discrepancies to list (0 = all, default: 20)")
+    parser.add_argument("--csv", metavar="PATH", help="Write every discrepancy to a CSV file")
+    args = parser.parse_args()
+
+    result = reconcile_workbook(args.workbook, args.year)
+    print(result.format(args.limit or None))
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["Date", "Ward", "Check", "Status", "Daily", "Records", "Delta"])
+            for d in result.discrepancies:
+                writer.writerow([d.date.isoformat(), d.ward, d.check, d.status,
+                                 d.daily, d.records, d.delta])
+        print(f"Wrote {len(result.discrepancies)} rows to {args.csv}")
+    sys.exit(1 if result.discrepancies else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Refresh the report sheets of a workbook without Excel
+
+Headless replacement for the "Refresh Reports" macros: prints the COD
+Summary (deaths by cause and month) and the Non-Insured Report computed from
+tblDeaths and tblAdmissions, writes the Non-Insured Report to CSV, or writes
+both sheets into the workbook. The VBA project is left untouched.
+
+Usage:
+    python tools/reports.py Bed_Utilization_2026.xlsm
+    python tools/reports.py Bed_Utilization_2026.xlsm --csv non_insured.csv
+    python tools/reports.py Bed_Utilization_2026.xlsm --write
+    python tools/reports.py Bed_Utilization_2026.xlsm --write --output refreshed.xlsm
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import WorkbookConfig
+from src.reports import (NON_INSURED_HEADERS, cod_matrix, non_insured_report,
+                         write_non_insured_csv, write_reports)
+from src.xlsx import load_tables
+
+
+def _print_cod(matrix):
+    print(f"COD Summary: {matrix.deaths} deaths, {len(matrix.causes)} causes")
+    width = max([len("Cause of Death")] + [len(c) for c in matrix.causes]) + 2
+    print(f"{'Cause of Death':<{width}}" + "".join(f"{m[:3]:>6}" for m in WorkbookConfig.MONTH_NAMES)
+          + f"{'TOTAL':>7}")
+    for cause, counts, total in zip(matrix.causes, matrix.counts, matrix.totals):
+        print(f"{cause:<{width}}" + "".join(f"{v:>6}" for v in counts) + f"{total:>7}")
+
+
+def _print_non_insured(report, limit=20):
+    print(f"Non-Insured Report: {len(report.rows)} of {report.admissions} admissions")
+    print("  ".join(NON_INSURED_HEADERS[:8]) + "  " + NON_INSURED_HEADERS[9])
+    for row in report.rows[:limit]:
+        admitted = row[1].strftime("%d/%m/%Y") if row[1] else ""
+        values = [row[0], admitted] + row[2:8] + [row[9]]
+        print("  ".join("" if v is None else str(v) for v in values))
+    if len(report.rows) > limit:
+        print(f"  ... {len(report.rows) - limit} more")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report sheets from a saved workbook")
+    parser.add_argument("workbook", help="Workbook to read (.xlsx/.xlsm)")
+    parser.add_argument("--csv", metavar="PATH", help="Write the Non-Insured Report to a CSV file")
+    parser.add_argument("--write", action="store_true", help="Write the report sheets into the workbook")
+    parser.add_argument("--output", help="With --write: save to this path instead of in place")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.write:
+        matrix, report = write_reports(args.workbook, args.output)
+        print(f"Wrote COD Summary ({len(matrix.causes)} causes) and Non-Insured Report "
+              f"({len(report.rows)} patients) to {args.output or args.workbook} "
+              f"in {time.perf_counter() - start:.2f}s")
+    else:
+        tables = load_tables(args.workbook, ["tblDeaths", "tblAdmissions"])
+        matrix = cod_matrix(tables["tblDeaths"])
+        report = non_insured_report(tables["tblAdmissions"])
+        if not args.csv:
+            _print_cod(matrix)
+            print()
+            _print_non_insured(report)
+            print(f"({time.perf_counter() - start:.2f}s)")
+    if args.csv:
+        write_non_insured_csv(report, args.csv)
+        print(f"Wrote {len(report.rows)} rows to {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
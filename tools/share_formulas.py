@@ -0,0 +1,35 @@
+"""
+Shrink a generated workbook by storing repeated formulas as shared formulas
+
+Runs of formulas that are identical in R1C1 form (the same formula copied
+down a column) are rewritten as OOXML shared formulas. Works on .xlsx and
+.xlsm packages; the VBA project is copied unchanged.
+
+Usage:
+    python tools/share_formulas.py Bed_Utilization_2026.xlsx
+    python tools/share_formulas.py Bed_Utilization_2026.xlsm -o Bed_Utilization_2026_small.xlsm
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.xlsx import share_formulas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rewrite repeated formulas as shared formulas")
+    parser.add_argument("workbook", help="Workbook to process (.xlsx/.xlsm)")
+    parser.add_argument("-o", "--output", type=str, default=None,
+                        help="Write here instead of overwriting the workbook")
+    parser.add_argument("--min-run", type=int, default=2,
+                        help="Shortest run of equal formulas to share (default: 2)")
+    args = parser.parse_args()
+
+    report = share_formulas(args.workbook, args.output, min_run=args.min_run)
+    print(report.format())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Mirror a workbook's data tables into SQLite
+
+Copies tblDaily, tblAdmissions, tblDeaths, tblTransfers and tblWardConfig
+into an indexed SQLite database (default: next to the workbook, same name
+with .sqlite). Re-running it only inserts new or changed rows and deletes
+removed ones, so it can run after every data-entry session.
+
+Usage:
+    python tools/sqlite_mirror.py Bed_Utilization_2026.xlsm
+    python tools/sqlite_mirror.py Bed_Utilization_2026.xlsm --db mirror.sqlite
+    python tools/sqlite_mirror.py Bed_Utilization_2026.xlsm --query \\
+        "SELECT WardCode, SUM(Admissions) FROM tblDaily WHERE Month = 3 GROUP BY WardCode"
+"""
+import argparse
+import os
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.sqlite_mirror import MIRROR_TABLES, sync_workbook
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mirror the data tables into SQLite")
+    parser.add_argument("workbook", help="Workbook to read (.xlsx/.xlsm)")
+    parser.add_argument("--db", help="SQLite database (default: <workbook>.sqlite)")
+    parser.add_argument("--tables", nargs="+", choices=MIRROR_TABLES, help="Tables to mirror (default: all)")
+    parser.add_argument("--query", help="SQL to run after the sync; rows are printed tab-separated")
+    args = parser.parse_args()
+
+    result = sync_workbook(args.workbook, args.db, args.tables)
+    print(result.format())
+    if args.query:
+        db = sqlite3.connect(result.database)
+        try:
+            cursor = db.execute(args.query)
+            print("\t".join(d[0] for d in cursor.description or []))
+            for row in cursor:
+                print("\t".join("" if v is None else str(v) for v in row))
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    main()